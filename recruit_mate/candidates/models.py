@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from dashboard.models import TimeStampedModel
 
@@ -9,11 +10,97 @@ class Candidate(TimeStampedModel):
     resume_file = models.FileField(upload_to='resumes/', blank=True, null=True)
     resume_data = models.JSONField(default=dict, blank=True)
     skills = models.JSONField(default=list, blank=True)
-    experience_years = models.IntegerField(null=True, blank=True)
+    experience_years = models.IntegerField(null=True, blank=True, db_index=True)
     education = models.TextField(blank=True)
+    # Recruiter who added the candidate; candidates from interview links are reached through their sessions
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_candidates')
+    # Normalized copy of ``skills`` for indexed filtering; see services.skill_index
+    skill_set = models.ManyToManyField('dashboard.Skill', through='CandidateSkill', related_name='candidates', blank=True)
     
     class Meta:
         ordering = ['-created_at']
     
     def __str__(self):
         return f"{self.name} ({self.email})"
+
+
+class CandidateSkill(models.Model):
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='skill_links')
+    skill = models.ForeignKey('dashboard.Skill', on_delete=models.CASCADE, related_name='candidate_links')
+    mentions = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        # skill first: filters look up candidates by skill
+        unique_together = [('skill', 'candidate')]
+
+    def __str__(self):
+        return f"{self.candidate_id}: {self.skill_id}"
+
+
+class CandidateImport(TimeStampedModel):
+    """One bulk resume import (ZIP, folder or directory) and its progress"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='candidate_imports')
+    source_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    duplicate_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # [{"file": ..., "error": ...}]
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Import {self.source_name} ({self.processed}/{self.total})"
+
+    @property
+    def progress_percent(self):
+        return int(self.processed * 100 / self.total) if self.total else 100
+
+
+class CandidateIdentity(TimeStampedModel):
+    """One person behind candidate sessions on a recruiter's links, possibly under several emails"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='candidate_identities')
+    name = models.CharField(max_length=255, blank=True)
+    email = models.EmailField(blank=True)  # first email seen
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.name or self.email} (identity {self.pk})"
+
+
+class IdentityRecord(TimeStampedModel):
+    """Normalized identity features of one candidate session; see services.identity_resolution"""
+    session = models.OneToOneField('interviews.InterviewSession', on_delete=models.CASCADE, related_name='identity_record')
+    identity = models.ForeignKey(CandidateIdentity, on_delete=models.CASCADE, related_name='records')
+    email_key = models.CharField(max_length=255, blank=True)
+    phone_key = models.CharField(max_length=20, blank=True)
+    name_key = models.CharField(max_length=255, blank=True)
+    resume_sha256 = models.CharField(max_length=64, blank=True)
+    resume_signature = models.BinaryField(blank=True, default=b'')
+
+    def __str__(self):
+        return f"Session {self.session_id} -> identity {self.identity_id}"
+
+
+class IdentityBlockKey(models.Model):
+    """Blocking key of an IdentityRecord; only records sharing a key are compared"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=100)
+    record = models.ForeignKey(IdentityRecord, on_delete=models.CASCADE, related_name='block_keys')
+
+    class Meta:
+        indexes = [models.Index(fields=['user', 'key'])]
+
+    def __str__(self):
+        return self.key
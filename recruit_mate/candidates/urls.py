@@ -9,7 +9,10 @@ urlpatterns = [
     path('profile/<str:email>/', views.candidate_profile_view, name='profile'),
     path('interview/<int:pk>/report/', views.interview_report_view, name='interview_report'),
     path('create/', views.candidate_create_view, name='create'),
+    path('import/', views.candidate_import_view, name='import'),
+    path('import/<int:pk>/', views.candidate_import_detail_view, name='import_detail'),
     path('<int:pk>/', views.candidate_detail_view, name='detail'),
     path('<int:pk>/edit/', views.candidate_edit_view, name='edit'),
+    path('<int:pk>/resume/', views.candidate_resume_view, name='resume'),
     path('<int:pk>/delete/', views.candidate_delete_view, name='delete'),
 ]
\ No newline at end of file
@@ -1,17 +1,37 @@
+import csv
+import io
+import os
+import shutil
+import tempfile
+import zipfile
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Count, Q, Avg
-from .models import Candidate
+from django.utils.text import slugify
+from .models import Candidate, CandidateImport, IdentityRecord
 from interviews.models import InterviewSession
-from .models import Candidate
-from dashboard.services.resume_parser import ResumeParser
 
 
 @login_required
 def candidate_list_view(request):
-    candidates = Candidate.objects.all()
-    return render(request, 'candidates/candidate_list.html', {'candidates': candidates})
+    skills = [name.strip() for name in request.GET.get('skills', '').split(',') if name.strip()]
+    match = 'any' if request.GET.get('match') == 'any' else 'all'
+    try:
+        min_experience = int(request.GET['min_experience'])
+    except (KeyError, ValueError):
+        min_experience = None
+
+    candidates = filter_candidates(Candidate.objects.all(), skills, match=match, min_experience=min_experience)
+    return render(request, 'candidates/candidate_list.html', {
+        'candidates': candidates,
+        'filters': {
+            'skills': ', '.join(skills),
+            'match': match,
+            'min_experience': '' if min_experience is None else min_experience,
+            'active': bool(skills) or min_experience is not None,
+        },
+    })
 
 @login_required
 def candidates_all_view(request):
@@ -20,35 +40,41 @@ def candidates_all_view(request):
         master_token__isnull=False  
     ).exclude(
         candidate_email=''
-    ).select_related('result').order_by('candidate_email', '-created_at')
+    ).select_related('result', 'identity_record').order_by('candidate_email', '-created_at')
     
     candidates_dict = {}
     
     for session in candidate_sessions:
         email = session.candidate_email.strip().lower() 
+        # Sessions resolved to the same person are listed once, whatever email they used
+        record = getattr(session, 'identity_record', None)
+        key = f"identity:{record.identity_id}" if record else email
         
-        if email not in candidates_dict:
-            candidates_dict[email] = {
+        if key not in candidates_dict:
+            candidates_dict[key] = {
                 'name': session.candidate_name,
                 'email': session.candidate_email,  
                 'phone': session.candidate_phone,
+                'other_emails': [],
                 'total_interviews': 0,
                 'completed_interviews': 0,
                 'latest_status': session.status,
                 'best_score': None,
                 'sessions': []
             }
+        elif email != candidates_dict[key]['email'].strip().lower() and email not in candidates_dict[key]['other_emails']:
+            candidates_dict[key]['other_emails'].append(email)
         
-        candidates_dict[email]['sessions'].append(session)
-        candidates_dict[email]['total_interviews'] += 1
+        candidates_dict[key]['sessions'].append(session)
+        candidates_dict[key]['total_interviews'] += 1
         
         if session.status == 'completed':
-            candidates_dict[email]['completed_interviews'] += 1
+            candidates_dict[key]['completed_interviews'] += 1
         
             if session.result:
-                current_best = candidates_dict[email]['best_score']
+                current_best = candidates_dict[key]['best_score']
                 if current_best is None or session.result.overall_score > current_best:
-                    candidates_dict[email]['best_score'] = session.result.overall_score
+                    candidates_dict[key]['best_score'] = session.result.overall_score
     
     candidates_data = list(candidates_dict.values())
     
@@ -60,9 +86,13 @@ def candidates_all_view(request):
 
 @login_required
 def candidate_profile_view(request, email):
+    # Include sessions the same person took under another email
+    identities = IdentityRecord.objects.filter(
+        session__user=request.user, session__candidate_email=email,
+    ).values('identity_id')
     interviews = InterviewSession.objects.filter(
+        Q(candidate_email=email) | Q(identity_record__identity__in=identities),
         user=request.user,
-        candidate_email=email,
         master_token__isnull=False 
     ).select_related('job', 'result').prefetch_related('questions', 'answers').order_by('-created_at')
     
@@ -76,6 +106,7 @@ def candidate_profile_view(request, email):
         'email': email,
         'phone': first_session.candidate_phone,
         'resume_file': first_session.candidate_resume_file,
+        'session_pk': first_session.pk,
     }
     
     total_interviews = interviews.count()
@@ -126,6 +157,10 @@ def interview_report_view(request, pk):
     
     result = session.result if hasattr(session, 'result') else None
     answers = session.answers.select_related('question').order_by('question__order')
+    duplicates = duplicate_matches(answers)
+    answer_list = list(answers)
+    for answer in answer_list:
+        answer.duplicates = duplicates.get(answer.pk, [])
     
     technical_answers = answers.filter(question__question_type='technical')
     behavioral_answers = answers.filter(question__question_type='behavioral')
@@ -142,12 +177,15 @@ def interview_report_view(request, pk):
     return render(request, 'candidates/interview_report.html', {
         'session': session,
         'result': result,
-        'answers': answers,
+        'answers': answer_list,
         'technical_score': technical_score,
         'behavioral_score': behavioral_score,
     })
 
-from dashboard.services import ResumeParser
+from dashboard.downloads import protected_file_response
+from dashboard.services import StorageService, filter_candidates, get_resume_pipeline
+from dashboard.services.answer_similarity import duplicate_matches
+from dashboard.services.bulk_import import read_manifest, save_uploads, start_import_job, unpack_archive
 
 @login_required
 def candidate_create_view(request):
@@ -159,32 +197,87 @@ def candidate_create_view(request):
         resume_url = request.POST.get('resume_url', '')
 
         candidate_data = {
+            'created_by': request.user,
             'name': name,
             'email': email,
             'phone': phone,
-            'resume_file': resume_file,
             'resume_url': resume_url
         }
-
         if resume_file:
-            parsed_data = ResumeParser.parse_resume(resume_file)
-            candidate_data.update({
-                'skills': parsed_data.get('skills', []),
-                'experience_years': parsed_data.get('experience_years'),
-                'education': parsed_data.get('education', '')
-            })
+            candidate_data['resume_file'] = StorageService().store(resume_file)
 
         candidate = Candidate.objects.create(**candidate_data)
+        if resume_file:
+            # Skills, experience and education are filled in once parsing finishes
+            get_resume_pipeline().enqueue(candidate.resume_file.name, candidate=candidate)
         messages.success(request, 'Candidate created successfully')
         return redirect('candidates:detail', pk=candidate.pk)
 
     return render(request, 'candidates/candidate_create.html')
 
 
+@login_required
+def candidate_import_view(request):
+    """Bulk import from a ZIP or a folder of resumes, with an optional CSV manifest"""
+    if request.method == 'POST':
+        archive = request.FILES.get('archive')
+        resumes = request.FILES.getlist('resumes')
+        manifest_file = request.FILES.get('manifest')
+
+        if not archive and not resumes:
+            messages.error(request, 'Upload a ZIP file or choose a folder of resumes')
+            return render(request, 'candidates/candidate_import.html')
+
+        # Uploads are deleted after the request; the import works from its own copy
+        workdir = tempfile.mkdtemp(prefix='resume-import-')
+        try:
+            files = unpack_archive(archive, workdir) if archive else save_uploads(resumes, workdir)
+            manifest = read_manifest(io.TextIOWrapper(manifest_file, encoding='utf-8-sig', newline='')) if manifest_file else {}
+        except (zipfile.BadZipFile, ValueError, UnicodeDecodeError, csv.Error) as e:
+            shutil.rmtree(workdir, ignore_errors=True)
+            messages.error(request, f'Could not read upload: {e}')
+            return render(request, 'candidates/candidate_import.html')
+
+        if not files:
+            shutil.rmtree(workdir, ignore_errors=True)
+            messages.error(request, 'No PDF or DOCX resumes found in the upload')
+            return render(request, 'candidates/candidate_import.html')
+
+        job = CandidateImport.objects.create(
+            created_by=request.user,
+            source_name=archive.name if archive else f'{len(files)} files',
+            total=len(files),
+        )
+        start_import_job(job.pk, files, manifest, workdir)
+        return redirect('candidates:import_detail', pk=job.pk)
+
+    return render(request, 'candidates/candidate_import.html', {
+        'recent_imports': CandidateImport.objects.filter(created_by=request.user)[:10],
+    })
+
+
+@login_required
+def candidate_import_detail_view(request, pk):
+    job = get_object_or_404(CandidateImport, pk=pk, created_by=request.user)
+    return render(request, 'candidates/candidate_import_detail.html', {'job': job})
+
+
 @login_required
 def candidate_detail_view(request, pk):
     candidate = get_object_or_404(Candidate, pk=pk)
-    return render(request, 'candidates/candidate_detail.html', {'candidate': candidate})
+    return render(request, 'candidates/candidate_detail.html', {
+        'candidate': candidate,
+        'resume_ingestion': candidate.resume_ingestions.first(),
+    })
+
+@login_required
+def candidate_resume_view(request, pk):
+    """Resume download; the file itself is sent by the front proxy when configured"""
+    # Only candidates this recruiter added or interviewed; anything else is a 404
+    owned = Candidate.objects.filter(Q(created_by=request.user) | Q(interview_sessions__user=request.user)).distinct()
+    candidate = get_object_or_404(owned, pk=pk)
+    extension = os.path.splitext(candidate.resume_file.name)[1]
+    return protected_file_response(request, candidate.resume_file, f"{slugify(candidate.name) or 'candidate'}-resume{extension}")
 
 @login_required
 def candidate_edit_view(request, pk):
@@ -196,15 +289,14 @@ def candidate_edit_view(request, pk):
         candidate.phone = request.POST.get('phone', '')
         
         resume_file = request.FILES.get('resume')
+        previous_resume = candidate.resume_file.name
         if resume_file:
-            candidate.resume_file = resume_file
-            parsed_data = ResumeParser.parse_resume(resume_file)
-            candidate.skills = parsed_data.get('skills', [])
-            candidate.experience_years = parsed_data.get('experience_years')
-            candidate.education = parsed_data.get('education', '')
+            candidate.resume_file = StorageService().store(resume_file)
 
-        
         candidate.save()
+        if resume_file:
+            StorageService().release(previous_resume)
+            get_resume_pipeline().enqueue(candidate.resume_file.name, candidate=candidate)
         messages.success(request, 'Candidate updated successfully')
         return redirect('candidates:detail', pk=candidate.pk)
     
@@ -1,4 +1,5 @@
 from django.urls import path, include
+from . import api_views
 
 app_name = 'api'
 
@@ -6,4 +7,7 @@ urlpatterns = [
     path('jobs/', include('jobs.api_urls')),
     path('candidates/', include('candidates.api_urls')),
     path('interviews/', include('interviews.api_urls')),
+    path('webhooks/', api_views.WebhookEndpointListCreateAPIView.as_view(), name='webhooks'),
+    path('webhooks/<int:pk>/', api_views.WebhookEndpointDetailAPIView.as_view(), name='webhook-detail'),
+    path('webhooks/<int:pk>/deliveries/', api_views.WebhookDeliveryListAPIView.as_view(), name='webhook-deliveries'),
 ]
@@ -0,0 +1,33 @@
+import secrets
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, permissions
+from .models import WebhookDelivery, WebhookEndpoint
+from .serializers import WebhookDeliverySerializer, WebhookEndpointSerializer
+
+class WebhookEndpointListCreateAPIView(generics.ListCreateAPIView):
+    """API view for listing and registering webhook endpoints; the signing secret is generated"""
+    serializer_class = WebhookEndpointSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return WebhookEndpoint.objects.filter(user=self.request.user)
+    
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user, secret=secrets.token_hex(32))
+
+class WebhookEndpointDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+    """API view for webhook endpoint detail, update, delete"""
+    serializer_class = WebhookEndpointSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return WebhookEndpoint.objects.filter(user=self.request.user)
+
+class WebhookDeliveryListAPIView(generics.ListAPIView):
+    """API view for an endpoint's most recent deliveries"""
+    serializer_class = WebhookDeliverySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        endpoint = get_object_or_404(WebhookEndpoint, pk=self.kwargs['pk'], user=self.request.user)
+        return WebhookDelivery.objects.filter(endpoint=endpoint).select_related('event').order_by('-pk')[:100]
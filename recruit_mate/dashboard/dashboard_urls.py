@@ -1,8 +1,9 @@
 from django.urls import path
-from .dashboard_views import dashboard_view
+from .dashboard_views import dashboard_view, search_view
 
 app_name = 'dashboard'
 
 urlpatterns = [
     path('', dashboard_view, name='home'),
+    path('search/', search_view, name='search'),
 ]
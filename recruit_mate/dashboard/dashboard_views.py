@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from interviews.models import InterviewSession
+from django.urls import reverse
+from interviews.models import InterviewAnswer, InterviewSession
 from candidates.models import Candidate
 from jobs.models import JobDescription
+from .services.search_index import get_search_backend
 
 @login_required
 def dashboard_view(request):
@@ -42,3 +45,62 @@ def dashboard_view(request):
     }
     
     return render(request, 'dashboard/dashboard.html', context)
+
+
+SEARCH_TYPES = [
+    ('candidate', 'Candidates'),
+    ('session', 'Interview candidates'),
+    ('job', 'Jobs'),
+    ('answer', 'Answers'),
+]
+
+
+def _search_result_url(hit, answer_sessions):
+    if hit.doc_type == 'candidate':
+        return reverse('candidates:detail', args=[hit.object_id])
+    if hit.doc_type == 'job':
+        return reverse('jobs:detail', args=[hit.object_id])
+    if hit.doc_type == 'answer':
+        session_id = answer_sessions.get(hit.object_id)
+        return reverse('interviews:detail', args=[session_id]) if session_id else ''
+    return reverse('interviews:detail', args=[hit.object_id])
+
+
+@login_required
+def search_view(request):
+    """Full-text search over candidates, resumes, jobs and interview answers"""
+    query = request.GET.get('q', '').strip()
+    doc_type = request.GET.get('type', '')
+    doc_types = [doc_type] if doc_type in dict(SEARCH_TYPES) else None
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+    per_page = getattr(settings, 'SEARCH_RESULTS_PER_PAGE', 20)
+
+    results = []
+    has_next = False
+    if query:
+        # One extra row tells whether there is a next page without counting matches
+        hits = get_search_backend().search(
+            query, request.user.pk, doc_types=doc_types, offset=(page - 1) * per_page, limit=per_page + 1,
+        )
+        has_next = len(hits) > per_page
+        hits = hits[:per_page]
+        answer_sessions = dict(InterviewAnswer.objects.filter(
+            pk__in=[hit.object_id for hit in hits if hit.doc_type == 'answer'],
+        ).values_list('pk', 'session_id'))
+        results = [
+            {'hit': hit, 'label': dict(SEARCH_TYPES)[hit.doc_type], 'url': _search_result_url(hit, answer_sessions)}
+            for hit in hits
+        ]
+
+    return render(request, 'dashboard/search.html', {
+        'query': query,
+        'doc_type': doc_type if doc_types else '',
+        'search_types': SEARCH_TYPES,
+        'results': results,
+        'page': page,
+        'has_previous': page > 1,
+        'has_next': has_next,
+    })
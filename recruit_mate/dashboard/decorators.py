@@ -0,0 +1,17 @@
+from functools import wraps
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+
+
+def async_login_required(view_func):
+    """login_required for async views (Django 5.0's decorator only wraps sync views)"""
+    @wraps(view_func)
+    async def _wrapper_view(request, *args, **kwargs):
+        # Resolve the user once without blocking the event loop, and replace the
+        # lazy request.user so views and templates never hit the DB synchronously.
+        request.user = await request.auser()
+        if request.user.is_authenticated:
+            return await view_func(request, *args, **kwargs)
+        return redirect_to_login(request.get_full_path(), settings.LOGIN_URL)
+
+    return _wrapper_view
@@ -0,0 +1,172 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+from .services.result_export import FORMATS
+from .services.storage_service import StorageService
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def _etag(name, size, modified):
+    # Content-addressed blobs have their hash as a strong validator.
+    digest = StorageService.blob_sha256(name)
+    if digest:
+        return f'"{digest}"'
+    return f'"{size:x}-{int(modified):x}"'
+
+
+def _parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable byte range, None for no/multi range, False if unsatisfiable"""
+    match = _RANGE_RE.match(header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    start, end = match.groups()
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def protected_file_response(request, field_file, download_name):
+    """
+    Serve a stored file after the caller has checked permissions.
+
+    PROTECTED_MEDIA_BACKEND selects how the bytes are sent:
+      "nginx"  - X-Accel-Redirect to PROTECTED_MEDIA_INTERNAL_URL (an internal
+                 location aliased to MEDIA_ROOT); nginx streams the file and
+                 handles ranges.
+      "sendfile" - X-Sendfile with the absolute path (Apache mod_xsendfile,
+                 lighttpd).
+      "django" - FileResponse from the worker, with single-range support;
+                 meant for development and small deployments.
+    Every response carries ETag/Last-Modified and answers conditional
+    requests with 304 without touching the file.
+    """
+    name = field_file.name if field_file else ""
+    if not name or not default_storage.exists(name):
+        raise Http404("File not found")
+
+    path = default_storage.path(name)
+    stat = os.stat(path)
+    etag = _etag(name, stat.st_size, stat.st_mtime)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return _with_cache_headers(response, etag, last_modified)
+
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    backend = getattr(settings, "PROTECTED_MEDIA_BACKEND", "django")
+
+    if backend == "nginx":
+        response = HttpResponse(content_type=content_type)
+        internal = getattr(settings, "PROTECTED_MEDIA_INTERNAL_URL", "/protected-media/")
+        response["X-Accel-Redirect"] = internal + quote(name)
+    elif backend == "sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = path
+    else:
+        response = _django_file_response(request, path, stat.st_size, content_type, etag)
+
+    response["Content-Disposition"] = content_disposition_header(False, download_name)
+    response["Accept-Ranges"] = "bytes"
+    return _with_cache_headers(response, etag, last_modified)
+
+
+def _django_file_response(request, path, size, content_type, etag):
+    byte_range = None
+    if "HTTP_RANGE" in request.META:
+        # If-Range with a stale validator means "send the whole file"
+        if_range = request.META.get("HTTP_IF_RANGE")
+        if not if_range or if_range.strip() == etag:
+            byte_range = _parse_range(request.META["HTTP_RANGE"], size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416, content_type=content_type)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        return FileResponse(open(path, "rb"), content_type=content_type)
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(_read_range(path, start, length), status=206, content_type=content_type)
+    response["Content-Length"] = str(length)
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
+
+
+def _with_cache_headers(response, etag, last_modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    # Resumes are personal data: never in shared caches, always revalidated.
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _batched(lines, size=CHUNK_SIZE):
+    """The first line on its own, then lines joined into ~``size`` byte chunks"""
+    buffer, buffered = [], 0
+    for i, line in enumerate(lines):
+        data = line.encode("utf-8")
+        if i == 0:
+            yield data
+            continue
+        buffer.append(data)
+        buffered += len(data)
+        if buffered >= size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+async def _aiterate(chunks):
+    # Under ASGI a synchronous iterator would be read to the end before sending;
+    # pull it chunk by chunk on the sync thread (where its DB cursor lives) instead.
+    chunks = iter(chunks)
+    done = object()
+    while (chunk := await sync_to_async(next)(chunks, done)) is not done:
+        yield chunk
+
+
+def export_response(request, export, fmt):
+    """Stream a services.result_export.ResultExport in ``fmt`` as a download"""
+    content_type, _ = FORMATS[fmt]
+    chunks = _batched(export.lines(fmt))
+    if isinstance(request, ASGIRequest):
+        chunks = _aiterate(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = content_disposition_header(True, export.filename(fmt))
+    response["Cache-Control"] = "private, no-store"
+    # Let nginx pass rows on as they are produced instead of buffering the export
+    response["X-Accel-Buffering"] = "no"
+    return response
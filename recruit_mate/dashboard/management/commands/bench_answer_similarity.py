@@ -0,0 +1,70 @@
+import random
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from dashboard.services.answer_similarity import NUM_PERM, cluster_signatures, minhash, shingles
+
+WORDS = (
+    "the a we i my our team system service data user request database cache query index latency "
+    "design build deploy test monitor scale queue worker api endpoint client server error retry "
+    "timeout load balance shard replica consistency availability partition memory cpu thread lock"
+).split()
+
+
+def synthetic_answers(count, words, copy_rate, rng):
+    """Random answers where ``copy_rate`` of them are lightly edited copies; returns (texts, planted pairs)"""
+    texts, pairs = [], set()
+    for i in range(count):
+        if texts and rng.random() < copy_rate:
+            source = rng.randrange(len(texts))
+            tokens = texts[source].split()
+            # Change about 5% of the words
+            for _ in range(max(1, len(tokens) // 20)):
+                tokens[rng.randrange(len(tokens))] = rng.choice(WORDS)
+            texts.append(" ".join(tokens))
+            pairs.add((source, i))
+        else:
+            texts.append(" ".join(rng.choice(WORDS) for _ in range(words)))
+    return texts, pairs
+
+
+class Command(BaseCommand):
+    help = "Benchmark MinHash/LSH near-duplicate detection against all-pairs comparison"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--answers", type=int, default=20000, help="Answers to one question")
+        parser.add_argument("--words", type=int, default=120, help="Words per answer")
+        parser.add_argument("--copy-rate", type=float, default=0.05)
+        parser.add_argument("--threshold", type=float, default=0.6)
+        parser.add_argument("--brute-force-sample", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=3)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        texts, planted = synthetic_answers(options["answers"], options["words"], options["copy_rate"], rng)
+        ids = list(range(len(texts)))
+
+        started = time.perf_counter()
+        signatures = np.vstack([minhash(shingles(text)[0]) for text in texts])
+        sign_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        clusters = cluster_signatures(ids, signatures, options["threshold"])
+        cluster_s = time.perf_counter() - started
+
+        found = sum(1 for a, b in planted if a in clusters and b in clusters and clusters[a][0] == clusters[b][0])
+        self.stdout.write(f"{len(texts)} answers, {len(planted)} planted copies, "
+                          f"{signatures.nbytes // len(texts)} bytes/signature")
+        self.stdout.write(f"signatures: {sign_s * 1000 / len(texts):.2f} ms/answer "
+                          f"({len(texts) / sign_s:.0f} answers/s)")
+        self.stdout.write(f"LSH clustering: {cluster_s * 1000:.0f} ms, {len(clusters)} answers flagged, "
+                          f"recall {found / max(1, len(planted)):.1%}")
+
+        sample = min(options["brute_force_sample"], len(texts))
+        started = time.perf_counter()
+        for i in range(sample):
+            (signatures[i + 1:sample] == signatures[i]).mean(axis=1)
+        brute_s = time.perf_counter() - started
+        projected = brute_s * (len(texts) / sample) ** 2
+        self.stdout.write(f"all pairs over signatures: {brute_s * 1000:.0f} ms for {sample}, "
+                          f"~{projected:.0f} s projected for {len(texts)} (O(n^2)); {NUM_PERM} permutations")
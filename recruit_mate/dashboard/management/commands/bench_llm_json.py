@@ -0,0 +1,103 @@
+import json
+import re
+import time
+from django.core.management.base import BaseCommand
+from dashboard.services.llm_json import EVALUATION_SCHEMA, QUESTIONS_SCHEMA, extract_json, parse_llm_json
+
+
+def legacy_gemini_extract(text):
+    """GeminiService._extract_json before the single-pass parser"""
+    cleaned = text.strip()
+    try:
+        return json.loads(cleaned)
+    except Exception:
+        pass
+    match = re.search(r'(\[.*\]|\{.*\})', cleaned, re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group(1))
+        except Exception:
+            return None
+    return None
+
+
+def legacy_openai_extract(text):
+    """AIService._extract_json before the single-pass parser"""
+    m = re.search(r'```(?:json)?\s*(\[.*?\]|\{.*?\})\s*```', text, re.DOTALL)
+    if m:
+        try:
+            return json.loads(m.group(1))
+        except Exception:
+            pass
+    m = re.search(r'(\[.*?\]|\{.*?\})', text, re.DOTALL)
+    if m:
+        try:
+            return json.loads(m.group(1))
+        except Exception:
+            pass
+    try:
+        return json.loads(text)
+    except Exception:
+        return None
+
+
+def build_cases(size):
+    questions = [
+        {"question": f"Question {i}?", "type": "technical", "difficulty": "medium",
+         "expected_key_points": [f"point {i}", {"nested": [i, [i]]}]}
+        for i in range(size // 100)
+    ]
+    payload = json.dumps(questions)
+    return {
+        "clean array": payload,
+        "fenced + trailing prose": f"Sure! Here you go:\n```json\n{payload}\n```\nLet me know if [you] need {{more}}.",
+        "prose with stray brackets": "Note [1] and {draft} " * (size // 40) + payload,
+        "unclosed openers": "[" * size + " " + json.dumps({"score": 80}),
+        "many closers, no JSON": "] } ] " * (size // 6),
+        "nested evaluation": "Result: " + json.dumps({"score": 70, "feedback": "ok", "strengths": [["a"]], "improvements": []}) + " done.",
+    }
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark the LLM JSON extractor against the legacy regex extractors"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=20000, help="Approximate input size in characters")
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--legacy-repeat-under", type=float, default=1.0,
+                            help="Repeat a legacy extractor only when one run takes less than this many seconds")
+
+    def _time(self, func, text, repeat):
+        best = None
+        result = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func(text)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        size = options["size"]
+        repeat = options["repeat"]
+        self.stdout.write(f"{'case':28} {'chars':>8} {'new ms':>9} {'gemini ms':>10} {'openai ms':>10}  found(new/gemini/openai)")
+        for name, text in build_cases(size).items():
+            new_time, new_result = self._time(extract_json, text, repeat)
+            row = [f"{name:28} {len(text):>8} {new_time * 1000:>9.2f}"]
+            found = [new_result is not None]
+            for legacy in (legacy_gemini_extract, legacy_openai_extract):
+                elapsed, result = self._time(legacy, text, 1)
+                if elapsed < options["legacy_repeat_under"] and repeat > 1:
+                    elapsed, result = self._time(legacy, text, repeat)
+                row.append(f"{elapsed * 1000:>10.2f}")
+                found.append(result is not None)
+            self.stdout.write(" ".join(row) + "  " + "/".join("y" if f else "n" for f in found))
+
+        cases = build_cases(size)
+        for name in ("fenced + trailing prose", "prose with stray brackets"):
+            started = time.perf_counter()
+            questions = parse_llm_json(cases[name], QUESTIONS_SCHEMA)
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(f"schema parse '{name}': {len(questions or [])} questions in {elapsed:.2f} ms")
+        evaluation = parse_llm_json('{"score": "85/100", "strengths": "clear; concise"}', EVALUATION_SCHEMA)
+        self.stdout.write(f"schema coercion: {evaluation}")
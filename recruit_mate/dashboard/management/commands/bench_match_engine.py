@@ -0,0 +1,62 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from dashboard.services.match_engine import DIMENSIONS, MatchIndex
+
+
+def synthetic_vectors(candidates, terms_per_candidate, vocabulary, rng):
+    """CSR-style arrays like MatchIndex._load() returns, with Zipf-distributed terms"""
+    lengths = rng.integers(300, 1500, size=candidates).astype(np.float32)
+    ranks = np.minimum(rng.zipf(1.3, size=(candidates, terms_per_candidate * 2)), vocabulary) - 1
+    features = (ranks * 2654435761 % DIMENSIONS).astype(np.int32)
+    terms, indptr = [], [0]
+    for row in features:
+        unique = np.unique(row)[:terms_per_candidate]
+        terms.append(unique)
+        indptr.append(indptr[-1] + len(unique))
+    terms = np.concatenate(terms)
+    counts = rng.integers(1, 12, size=len(terms)).astype(np.float32)
+    return (np.arange(1, candidates + 1, dtype=np.int64), lengths,
+            np.array(indptr, dtype=np.int64), terms, counts)
+
+
+class Command(BaseCommand):
+    help = "Benchmark top-K job matching over a synthetic candidate pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--candidates", type=int, default=100000)
+        parser.add_argument("--terms", type=int, default=256, help="Stored terms per candidate")
+        parser.add_argument("--query-terms", type=int, default=150, help="Distinct terms per job")
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--k", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        vocabulary = 200000
+        arrays = synthetic_vectors(options["candidates"], options["terms"], vocabulary, rng)
+
+        index = MatchIndex()
+        started = time.perf_counter()
+        index.build_from_arrays(*arrays)
+        build_s = time.perf_counter() - started
+
+        queries = []
+        for _ in range(options["queries"]):
+            ranks = np.minimum(rng.zipf(1.3, size=options["query_terms"] * 2), vocabulary) - 1
+            features = np.unique(ranks * 2654435761 % DIMENSIONS)[:options["query_terms"]]
+            queries.append({int(f): int(rng.integers(1, 4)) for f in features})
+
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            index.top_k(query, k=options["k"])
+            timings.append((time.perf_counter() - started) * 1000)
+        timings = np.array(timings)
+
+        nnz = len(arrays[3])
+        self.stdout.write(f"pool: {options['candidates']} candidates, {nnz} stored terms, "
+                          f"index built in {build_s:.2f} s")
+        self.stdout.write(f"top-{options['k']}: p50 {np.percentile(timings, 50):.1f} ms, "
+                          f"p95 {np.percentile(timings, 95):.1f} ms, max {timings.max():.1f} ms")
+        self.stdout.write(f"throughput: {1000 / timings.mean():.0f} jobs/s on one thread")
@@ -0,0 +1,44 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from dashboard.services.question_analytics import DIFFICULTIES, question_statistics
+
+
+def synthetic_arrays(answers, questions, seed):
+    """load_arrays()-shaped data: ``answers`` answers spread over ``questions`` wordings"""
+    rng = np.random.default_rng(seed)
+    difficulty = rng.uniform(30, 85, size=questions)
+    group = rng.integers(0, questions, size=answers)
+    ability = rng.normal(0, 15, size=answers)
+    score = np.clip(difficulty[group] + ability + rng.normal(0, 10, size=answers), 0, 100).astype(np.int64)
+    overall = np.clip(60 + ability, 0, 100).astype(np.int64)
+    overall[rng.random(answers) < 0.1] = -1  # sessions without a result
+    return {
+        "texts": [f"Question {i}" for i in range(questions)],
+        "hashes": [f"{i:016x}" for i in range(questions)],
+        "question_group": np.concatenate([group, rng.integers(0, questions, size=answers // 10)]),
+        "question_label": rng.integers(0, len(DIFFICULTIES), size=answers + answers // 10),
+        "answer_group": group,
+        "score": score,
+        "blank": rng.random(answers) < 0.02,
+        "overall": overall,
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark the vectorized question statistics on synthetic answers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--answers", type=int, default=2000000)
+        parser.add_argument("--questions", type=int, default=20000)
+        parser.add_argument("--seed", type=int, default=5)
+
+    def handle(self, *args, **options):
+        arrays = synthetic_arrays(options["answers"], options["questions"], options["seed"])
+        started = time.perf_counter()
+        stats = question_statistics(arrays, min_answers=5, min_pairs=10, bands=(45, 70))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{options['answers']} answers over {options['questions']} questions: "
+                          f"{elapsed * 1000:.0f} ms ({options['answers'] / elapsed:,.0f} answers/s)")
+        self.stdout.write(f"median discrimination {np.nanmedian(stats['discrimination']):.3f}, "
+                          f"empirical difficulty counts {np.bincount(stats['empirical'] + 1, minlength=4)[1:].tolist()}")
@@ -0,0 +1,95 @@
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from django.core.management.base import BaseCommand
+from PyPDF2 import PdfReader
+from dashboard.services.resume_parser import ResumeParser
+
+WORDS = (
+    "python django rest api postgres docker kubernetes aws led team delivered migrated "
+    "designed scalable services reduced latency improved throughput mentored engineers "
+    "experience years project bachelor master react javascript git ci cd testing"
+).split()
+
+
+def write_synthetic_pdf(path, pages, lines_per_page, rng):
+    """Minimal uncompressed PDF with one Helvetica text block per page"""
+    offsets = []
+    with open(path, "wb") as out:
+        def obj(body):
+            offsets.append(out.tell())
+            out.write(f"{len(offsets)} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        out.write(b"%PDF-1.4\n")
+        page_ids = [4 + 2 * i for i in range(pages)]
+        obj(b"<< /Type /Catalog /Pages 2 0 R >>")
+        kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+        obj(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+        obj(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        for pid in page_ids:
+            obj(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {pid + 1} 0 R >>".encode())
+            lines = [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(lines_per_page)]
+            content = "BT /F1 9 Tf 11 TL 36 770 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+            obj(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream".encode())
+
+        xref = out.tell()
+        out.write(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+        for offset in offsets:
+            out.write(f"{offset:010d} 00000 n \n".encode())
+        out.write(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+def legacy_extract_text(file):
+    """ResumeParser.extract_text before streaming extraction"""
+    reader = PdfReader(file)
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text() + "\n"
+    return text
+
+
+class Command(BaseCommand):
+    help = "Benchmark resume text extraction on synthetic large PDFs (time and peak Python memory)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--files", type=int, default=3)
+        parser.add_argument("--pages", type=int, default=200, help="Pages per synthetic PDF")
+        parser.add_argument("--lines", type=int, default=60, help="Text lines per page")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def _measure(self, extract, path):
+        tracemalloc.start()
+        started = time.perf_counter()
+        with open(path, "rb") as file:
+            text = extract(file)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak, len(text)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        limits = {"max_pages": options["pages"], "max_chars": 10 ** 9, "timeout": 3600}
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for index in range(options["files"]):
+                path = os.path.join(tmp, f"resume_{index}.pdf")
+                write_synthetic_pdf(path, options["pages"], options["lines"], rng)
+                paths.append(path)
+
+            self.stdout.write(f"{'file':14} {'MB':>6} {'chars':>9} {'legacy s':>9} {'legacy MB':>10} "
+                              f"{'stream s':>9} {'stream MB':>10} {'capped s':>9} {'capped MB':>10}")
+            for path in paths:
+                legacy = self._measure(legacy_extract_text, path)
+                streamed = self._measure(lambda f: ResumeParser.extract_text(f, **limits), path)
+                # Default RESUME_MAX_* limits, as used for real uploads
+                capped = self._measure(ResumeParser.extract_text, path)
+                self.stdout.write(
+                    f"{os.path.basename(path):14} {os.path.getsize(path) / 2 ** 20:6.1f} {streamed[2]:9d} "
+                    f"{legacy[0]:9.2f} {legacy[1] / 2 ** 20:10.1f} "
+                    f"{streamed[0]:9.2f} {streamed[1] / 2 ** 20:10.1f} "
+                    f"{capped[0]:9.2f} {capped[1] / 2 ** 20:10.1f}"
+                )
@@ -0,0 +1,88 @@
+import json
+import random
+import time
+from django.core.management.base import BaseCommand
+from dashboard.services.skill_taxonomy import DEFAULT_TAXONOMY_PATH, SkillTaxonomy
+
+SYLLABLES = "ka lo mi nu ra te vo xi ze pa qu ly dor fen gim hux jat".split()
+FILLER = (
+    "led the team that designed and shipped services for customers improving reliability "
+    "and reducing costs across several products while mentoring engineers"
+).split()
+
+
+def synthetic_taxonomy(size, rng):
+    """Real taxonomy padded with generated skills (each with two aliases) up to ``size`` entries"""
+    with open(DEFAULT_TAXONOMY_PATH, encoding="utf-8") as f:
+        entries = json.load(f)
+    seen = {e["name"].lower() for e in entries}
+    while len(entries) < size:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if rng.random() < 0.3:
+            name += " " + "".join(rng.choice(SYLLABLES) for _ in range(2))
+        if name in seen:
+            continue
+        seen.add(name)
+        entries.append({
+            "id": f"gen_{len(entries)}",
+            "name": name.title(),
+            "category": "generated",
+            "aliases": [name.replace(" ", "-") + "js", name.replace(" ", "") + " framework"],
+        })
+    return entries
+
+
+def synthetic_resume(entries, words, mentions, rng):
+    tokens = [rng.choice(FILLER) for _ in range(words)]
+    for _ in range(mentions):
+        entry = rng.choice(entries)
+        tokens.insert(rng.randrange(len(tokens)), rng.choice([entry["name"], *entry.get("aliases", [])]))
+    return " ".join(tokens)
+
+
+def naive_match(surfaces, text):
+    """The old approach: substring test of every surface against the lowered text"""
+    text_lower = text.lower()
+    return {skill_id for surface, skill_id in surfaces if surface in text_lower}
+
+
+class Command(BaseCommand):
+    help = "Benchmark the skill taxonomy matcher against naive substring search"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--skills", type=int, default=10000, help="Taxonomy size")
+        parser.add_argument("--resumes", type=int, default=200)
+        parser.add_argument("--words", type=int, default=800, help="Words per synthetic resume")
+        parser.add_argument("--mentions", type=int, default=25, help="Skill mentions per resume")
+        parser.add_argument("--seed", type=int, default=11)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        entries = synthetic_taxonomy(options["skills"], rng)
+        resumes = [
+            synthetic_resume(entries, options["words"], options["mentions"], rng)
+            for _ in range(options["resumes"])
+        ]
+
+        started = time.perf_counter()
+        taxonomy = SkillTaxonomy(entries)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        found = sum(len(taxonomy.match(text)) for text in resumes)
+        matcher_ms = (time.perf_counter() - started) * 1000
+
+        surfaces = [
+            (surface.lower(), entry["id"])
+            for entry in entries
+            for surface in [entry["name"], *entry.get("aliases", [])]
+        ]
+        started = time.perf_counter()
+        naive_found = sum(len(naive_match(surfaces, text)) for text in resumes)
+        naive_ms = (time.perf_counter() - started) * 1000
+
+        count = len(resumes)
+        self.stdout.write(f"taxonomy: {len(entries)} skills, {len(surfaces)} surface forms, built in {build_ms:.0f} ms")
+        self.stdout.write(f"trie regex: {matcher_ms / count:8.2f} ms/resume  ({found / count:.1f} skills/resume)")
+        self.stdout.write(f"naive:      {naive_ms / count:8.2f} ms/resume  ({naive_found / count:.1f} skills/resume, "
+                          f"includes substring false positives)")
@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand
+from dashboard.models import QuestionStats
+from dashboard.services.question_analytics import refresh_question_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute per-question difficulty, discrimination, completion and skip rates from all answers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--show", type=int, default=10,
+                            help="List this many questions whose model difficulty label disagrees with their scores")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = refresh_question_stats()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Wrote statistics for {written} question(s) in {elapsed:.1f} s"))
+
+        mismatched = [
+            stats for stats in QuestionStats.objects.exclude(empirical_difficulty="").order_by("-answered")
+            if stats.miscalibrated
+        ]
+        self.stdout.write(f"{len(mismatched)} question(s) labelled at the wrong difficulty")
+        for stats in mismatched[:options["show"]]:
+            self.stdout.write(
+                f"  labelled {stats.labelled_difficulty}, answered like {stats.empirical_difficulty} "
+                f"(mean {stats.mean_score}, {stats.answered} answers): {stats.question_text[:80]}"
+            )
@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from dashboard.services.webhooks import WebhookSender, delivery_report, emit_expired_links
+
+
+class Command(BaseCommand):
+    help = "Emit link.expired events and deliver due webhook batches, once or as a polling worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running, polling every --interval seconds")
+        parser.add_argument("--interval", type=float, default=5.0)
+        parser.add_argument("--report", action="store_true", help="Print per-endpoint delivery statistics and exit")
+
+    def handle(self, *args, **options):
+        if options["report"]:
+            for entry in delivery_report():
+                self.stdout.write(
+                    f"{entry['url']}: {entry['delivered']} delivered ({entry['retried']} after retries), "
+                    f"{entry['pending']} pending, {entry['failed']} failed; "
+                    f"latency p50 {entry['latency_p50_ms']} ms, p95 {entry['latency_p95_ms']} ms"
+                )
+            return
+
+        sender = WebhookSender(max_workers=0)
+        while True:
+            expired = emit_expired_links()
+            delivered = sender.deliver_due()
+            if expired or delivered or not options["loop"]:
+                self.stdout.write(f"{expired} link.expired event(s) emitted, {delivered} event(s) delivered")
+            if not options["loop"]:
+                break
+            close_old_connections()
+            time.sleep(options["interval"])
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from dashboard.services.answer_similarity import AnswerSimilarityEngine
+
+
+class Command(BaseCommand):
+    help = "Compute missing answer signatures and re-cluster near-duplicate answers on public links"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true",
+                            help="Check every answer, rebuild LSH bands and re-cluster every question "
+                                 "(e.g. after changing the threshold or upgrading)")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        answers, groups = AnswerSimilarityEngine(max_workers=0).process_pending(
+            batch_size=options["batch_size"], recluster_all=options["all"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Checked {answers} answer(s), re-clustered {groups} question(s)"))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from dashboard.models import EvaluationCacheQuestion
+from dashboard.services.evaluation_cache import EvaluationCache
+from dashboard.services.evaluation_dispatcher import get_evaluation_dispatcher
+
+
+class Command(BaseCommand):
+    help = "Show evaluation cache hit rates, or drop cached evaluations"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--invalidate", metavar="QUESTION", help="Drop cached evaluations for this question wording")
+        parser.add_argument("--clear", action="store_true", help="Drop every cached evaluation")
+        parser.add_argument("--prune", action="store_true",
+                            help="Drop evaluations made by other models or prompt versions than the current one")
+        parser.add_argument("--top", type=int, default=10, help="Questions to list by hits")
+
+    def handle(self, *args, **options):
+        cache = EvaluationCache()
+        if options["prune"]:
+            version = get_evaluation_dispatcher().version
+            removed = cache.invalidate(keep_version=version)
+            self.stdout.write(self.style.SUCCESS(f"Removed {removed} cached evaluation(s) not made by {version}"))
+            return
+        if options["clear"] or options["invalidate"]:
+            removed = cache.invalidate(None if options["clear"] else options["invalidate"])
+            self.stdout.write(self.style.SUCCESS(f"Removed {removed} cached evaluation(s)"))
+            return
+
+        stats = cache.stats()
+        self.stdout.write(
+            f"{stats['entries']} cached evaluation(s) for {stats['questions']} question(s); "
+            f"{stats['lookups']} lookup(s), {stats['exact_hits']} exact and {stats['near_hits']} near-duplicate hit(s), "
+            f"hit rate {stats['hit_rate']:.1%}"
+        )
+        top = EvaluationCacheQuestion.objects.filter(lookups__gt=0).order_by("-exact_hits", "-near_hits")[:options["top"]]
+        for row in top:
+            hits = row.exact_hits + row.near_hits
+            self.stdout.write(f"  {row.question_hash} @ {row.evaluator_version}: {hits}/{row.lookups} ({hits / row.lookups:.0%})")
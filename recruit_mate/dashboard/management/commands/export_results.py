@@ -0,0 +1,43 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.services.result_export import FORMATS, ResultExport
+from interviews.models import InterviewSession
+from jobs.models import JobDescription
+
+
+class Command(BaseCommand):
+    help = "Export the interview results of a link or a job as CSV, NDJSON or spreadsheet CSV"
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--link", help="Primary key or token of the interview link")
+        target.add_argument("--job", type=int, help="Primary key of the job")
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--output", help="File to write; defaults to stdout")
+        parser.add_argument("--chunk-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options["link"]:
+            link = options["link"]
+            lookup = {"pk": int(link)} if link.isdigit() else {"token": link}
+            session = InterviewSession.objects.select_related("job", "user").filter(**lookup).first()
+            if session is None:
+                raise CommandError(f"No interview link {link}")
+            export = ResultExport.for_link(session, chunk_size=options["chunk_size"])
+        else:
+            job = JobDescription.objects.filter(pk=options["job"]).first()
+            if job is None:
+                raise CommandError(f"No job {options['job']}")
+            export = ResultExport.for_job(job, chunk_size=options["chunk_size"])
+
+        out = open(options["output"], "w", encoding="utf-8", newline="") if options["output"] else sys.stdout
+        rows = -1 if options["format"] != "ndjson" else 0  # CSV starts with a header line
+        try:
+            for line in export.lines(options["format"]):
+                out.write(line)
+                rows += 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if options["output"]:
+            self.stdout.write(self.style.SUCCESS(f"Wrote {rows} result(s) to {options['output']}"))
@@ -0,0 +1,81 @@
+from collections import Counter
+from datetime import timedelta
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from candidates.models import Candidate
+from dashboard.models import StoredBlob
+from dashboard.services.storage_service import BLOB_PREFIX
+from interviews.models import InterviewSession
+
+
+class Command(BaseCommand):
+    help = "Delete unreferenced content-addressed resume blobs and stray files under the blob directory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grace-minutes", type=int, default=60,
+                            help="Only remove blobs/files untouched for this long (protects in-flight uploads)")
+        parser.add_argument("--recount", action="store_true",
+                            help="Recompute reference counts from Candidate and InterviewSession rows first")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def _recount(self):
+        counts = Counter()
+        for name in Candidate.objects.exclude(resume_file="").values_list("resume_file", flat=True):
+            counts[name] += 1
+        for name in InterviewSession.objects.exclude(candidate_resume_file="").values_list("candidate_resume_file", flat=True):
+            counts[name] += 1
+
+        fixed = 0
+        for blob in StoredBlob.objects.only("pk", "path", "ref_count").iterator():
+            actual = counts.get(blob.path, 0)
+            if blob.ref_count != actual:
+                StoredBlob.objects.filter(pk=blob.pk).update(ref_count=actual)
+                fixed += 1
+        self.stdout.write(f"Recounted references; corrected {fixed} blob(s)")
+
+    def _walk(self, directory):
+        dirs, files = default_storage.listdir(directory)
+        for name in files:
+            yield f"{directory}/{name}"
+        for sub in dirs:
+            yield from self._walk(f"{directory}/{sub}")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        cutoff = timezone.now() - timedelta(minutes=options["grace_minutes"])
+        if options["recount"] and not dry_run:
+            self._recount()
+
+        # 1. Blobs nobody references any more
+        removed = 0
+        for blob in StoredBlob.objects.filter(ref_count__lte=0, updated_at__lt=cutoff):
+            if dry_run:
+                self.stdout.write(f"would delete {blob.path}")
+                removed += 1
+                continue
+            # Claim it first so a concurrent upload of the same content waits
+            # instead of reusing a file that is about to disappear.
+            if not StoredBlob.objects.filter(pk=blob.pk, ref_count=0).update(ref_count=-1):
+                continue
+            default_storage.delete(blob.path)
+            blob.delete()
+            removed += 1
+
+        # 2. Files with no blob row (crashed uploads, leftovers in tmp/)
+        known = set(StoredBlob.objects.values_list("path", flat=True))
+        stray = 0
+        if default_storage.exists(BLOB_PREFIX):
+            for name in self._walk(BLOB_PREFIX):
+                if name in known:
+                    continue
+                if default_storage.get_modified_time(name) >= cutoff:
+                    continue
+                if dry_run:
+                    self.stdout.write(f"would delete stray {name}")
+                else:
+                    default_storage.delete(name)
+                stray += 1
+
+        verb = "Would remove" if dry_run else "Removed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {removed} unreferenced blob(s) and {stray} stray file(s)"))
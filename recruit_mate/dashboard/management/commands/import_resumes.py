@@ -0,0 +1,64 @@
+import os
+import tempfile
+import zipfile
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.services.bulk_import import BulkResumeImporter, collect_directory, read_manifest, unpack_archive
+
+
+class Command(BaseCommand):
+    help = "Bulk-create candidates from a folder or ZIP of resumes (PDF/DOCX), with an optional CSV manifest"
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Directory or .zip file of resumes")
+        parser.add_argument("--manifest", help="CSV with columns file,name,email,phone")
+        parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: one per core)")
+        parser.add_argument("--chunk-size", type=int, default=None, help="Candidates per bulk insert")
+        parser.add_argument("--owner", help="Username of the recruiter the candidates belong to")
+
+    def _progress(self, report):
+        self.stdout.write(
+            f"  {report['processed']}/{report['total']} processed, {report['created']} created, "
+            f"{report['duplicates']} duplicates, {len(report['errors'])} errors"
+        )
+
+    def handle(self, *args, **options):
+        source = options["source"]
+        manifest = {}
+        if options["manifest"]:
+            try:
+                with open(options["manifest"], newline="", encoding="utf-8-sig") as f:
+                    manifest = read_manifest(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read manifest: {e}")
+
+        owner = None
+        if options["owner"]:
+            try:
+                owner = get_user_model().objects.get(username=options["owner"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user {options['owner']}")
+
+        importer = BulkResumeImporter(
+            workers=options["workers"], chunk_size=options["chunk_size"], progress=self._progress, created_by=owner,
+        )
+        with tempfile.TemporaryDirectory(prefix="resume-import-") as workdir:
+            if os.path.isdir(source):
+                files = collect_directory(source)
+            elif source.lower().endswith(".zip"):
+                try:
+                    files = unpack_archive(source, workdir)
+                except (OSError, ValueError, zipfile.BadZipFile) as e:
+                    raise CommandError(str(e))
+            else:
+                raise CommandError(f"{source} is not a directory or .zip file")
+
+            self.stdout.write(f"Importing {len(files)} resume(s) with {importer.workers} worker(s)")
+            report = importer.run(files, manifest)
+
+        for error in report["errors"]:
+            self.stderr.write(f"{error['file']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report['created']} candidate(s); {report['duplicates']} duplicate(s), "
+            f"{len(report['errors'])} error(s)"
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from dashboard.services.resume_ingestion import ResumeIngestionPipeline
+
+
+class Command(BaseCommand):
+    help = "Process queued resume ingestions (and optionally retry failed ones) in this process"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Process at most this many files")
+        parser.add_argument("--retry-failed", action="store_true",
+                            help="Also retry failed files below RESUME_INGESTION_MAX_ATTEMPTS")
+        parser.add_argument("--stale-after", type=int, default=600,
+                            help="Requeue files stuck in 'running' for this many seconds")
+
+    def handle(self, *args, **options):
+        processed = ResumeIngestionPipeline(max_workers=0).process_pending(
+            limit=options["limit"],
+            retry_failed=options["retry_failed"],
+            stale_after=options["stale_after"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} resume file(s)"))
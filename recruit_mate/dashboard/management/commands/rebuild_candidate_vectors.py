@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from dashboard.services.match_engine import rebuild_candidate_vectors
+
+
+class Command(BaseCommand):
+    help = "Compute match vectors for candidates whose resume or skills changed"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--force", action="store_true", help="Recompute every vector")
+
+    def handle(self, *args, **options):
+        written = rebuild_candidate_vectors(batch_size=options["batch_size"], force=options["force"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} candidate vector(s)"))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from dashboard.models import LeaderboardEntry
+from dashboard.services.leaderboard import Leaderboard
+from interviews.models import InterviewSession
+
+
+class Command(BaseCommand):
+    help = "Re-rank the leaderboard of every interview link (or one, with --token)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--token", help="Master token of a single link")
+
+    def handle(self, *args, **options):
+        if options["token"]:
+            tokens = [options["token"]]
+        else:
+            # Links with results, plus links whose entries may now be stale
+            tokens = set(
+                InterviewSession.objects.filter(result__isnull=False, master_token__isnull=False)
+                .values_list("master_token", flat=True).distinct()
+            )
+            tokens.update(LeaderboardEntry.objects.values_list("master_token", flat=True).distinct())
+        leaderboard = Leaderboard(max_workers=0)
+        written = sum(leaderboard.refresh(token) for token in tokens)
+        self.stdout.write(self.style.SUCCESS(f"Ranked {len(tokens)} link(s); {written} entr{'y' if written == 1 else 'ies'} written"))
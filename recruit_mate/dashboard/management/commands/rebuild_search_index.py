@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from dashboard.services.search_index import DOC_TYPES, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index from the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--type", dest="doc_types", action="append", choices=DOC_TYPES,
+                            help="Only rebuild this document type (repeatable)")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        def progress(doc_type, count):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{doc_type}: {count}")
+
+        counts = rebuild_index(options["doc_types"], batch_size=options["batch_size"], progress=progress)
+        for doc_type, count in counts.items():
+            self.stdout.write(self.style.SUCCESS(f"Indexed {count} {doc_type} document(s)"))
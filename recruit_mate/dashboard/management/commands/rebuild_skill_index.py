@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from dashboard.services.skill_index import rebuild_skill_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the normalized Skill table and candidate/job skill links from their skills lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        candidates, jobs = rebuild_skill_index(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Linked skills for {candidates} candidate(s) and {jobs} job(s)"))
@@ -0,0 +1,77 @@
+import json
+from django.core.management.base import BaseCommand
+from dashboard.services.answer_prescorer import KeyPointScorer, record_replay, replay_agreement
+from interviews.models import InterviewAnswer
+
+
+def stored_corpus(limit=None):
+    """Model-scored answers as replay items"""
+    queryset = (
+        InterviewAnswer.objects
+        .filter(evaluation_source="llm")
+        .exclude(question__expected_key_points=[])
+        .select_related("question")
+        .order_by("-pk")
+    )
+    for answer in queryset[:limit].iterator(chunk_size=1000):
+        yield {
+            "question": answer.question.question_text,
+            "answer": answer.answer_text,
+            "expected_key_points": answer.question.expected_key_points,
+            "score": answer.score,
+        }
+
+
+class Command(BaseCommand):
+    help = "Measure how well local pre-scores agree with model scores on a replay corpus"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--corpus", help="JSONL file of {question, answer, expected_key_points, score}; "
+                                             "defaults to model-scored answers in the database")
+        parser.add_argument("--export", help="Write the database corpus to this JSONL file and exit")
+        parser.add_argument("--limit", type=int, default=None)
+        parser.add_argument("--pass-mark", type=int, default=60)
+        parser.add_argument("--dry-run", action="store_true", help="Report only; don't record the replay")
+
+    def handle(self, *args, **options):
+        if options["export"]:
+            count = 0
+            with open(options["export"], "w", encoding="utf-8") as f:
+                for item in stored_corpus(options["limit"]):
+                    f.write(json.dumps(item) + "\n")
+                    count += 1
+            self.stdout.write(self.style.SUCCESS(f"Exported {count} answer(s) to {options['export']}"))
+            return
+
+        if options["corpus"]:
+            with open(options["corpus"], encoding="utf-8") as f:
+                items = [json.loads(line) for line in f if line.strip()][:options["limit"]]
+        else:
+            items = list(stored_corpus(options["limit"]))
+        if not items:
+            self.stdout.write("Nothing to replay")
+            return
+
+        report = replay_agreement(KeyPointScorer(require_calibration=False), items, pass_mark=options["pass_mark"])
+        self.stdout.write(f"Replayed {report['items']} answer(s); {report['local_rate']:.0%} would skip the model")
+        for label, key in (("All answers", "all"), ("Scored locally", "local")):
+            metrics = report[key]
+            if not metrics["count"]:
+                self.stdout.write(f"{label}: none")
+                continue
+            self.stdout.write(
+                f"{label} ({metrics['count']}): mean abs error {metrics['mean_abs_error']}, "
+                f"within 15 points {metrics['within_15']:.0%}, "
+                f"pass/fail agreement {metrics['pass_agreement']:.0%}, "
+                f"correlation {metrics['correlation'] if metrics['correlation'] is not None else 'n/a'}"
+            )
+
+        if options["dry_run"]:
+            return
+        replay = record_replay(report)
+        if replay.approved:
+            self.stdout.write(self.style.SUCCESS("Recorded; local scores are now final for confident answers"))
+        else:
+            self.stdout.write(self.style.WARNING(
+                "Recorded; not enough agreement or answers kept local, so every answer still goes to the model"
+            ))
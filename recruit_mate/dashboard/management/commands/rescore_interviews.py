@@ -0,0 +1,62 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from dashboard.services.rescoring import DELTA_BUCKETS, RESCORERS, get_run
+
+
+class Command(BaseCommand):
+    help = ("Re-score historical answers and/or interview results with the current model and prompts. "
+            "Runs are checkpointed per --score-version and resume where they stopped.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--score-version", required=True,
+                            help="Label stored with the new scores, e.g. 2024-07-gemini-1.5-pro")
+        parser.add_argument("--target", choices=["answers", "results", "all"], default="all",
+                            help="'all' re-scores answers first, so reports use the new answer scores")
+        parser.add_argument("--dry-run", action="store_true", help="Only report score deltas; nothing is written")
+        parser.add_argument("--restart", action="store_true", help="Start this version over instead of resuming")
+        parser.add_argument("--since", help="Only rows created on or after this date (YYYY-MM-DD)")
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many rows per target")
+        parser.add_argument("--chunk-size", type=int, default=None)
+        parser.add_argument("--concurrency", type=int, default=None)
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = timezone.make_aware(datetime.strptime(options["since"], "%Y-%m-%d"))
+            except ValueError:
+                raise CommandError("--since must be YYYY-MM-DD")
+
+        targets = ["answers", "results"] if options["target"] == "all" else [options["target"]]
+        for target in targets:
+            run = get_run(options["score_version"], target, dry_run=options["dry_run"], restart=options["restart"])
+            if run.status == "done":
+                self.stdout.write(f"{run} already finished; use --restart to run it again")
+                continue
+            if run.checkpoint:
+                self.stdout.write(f"Resuming {target} after id {run.checkpoint}")
+            rescorer = RESCORERS[target](
+                run, chunk_size=options["chunk_size"], concurrency=options["concurrency"], since=since,
+            )
+            rescorer.execute(
+                limit=options["limit"],
+                progress=lambda r: self.stdout.write(f"  {r.target}: {r.processed}/{r.total} ({r.failed} failed)"),
+            )
+            self.report(run)
+
+    def report(self, run):
+        self.stdout.write(self.style.SUCCESS(str(run)))
+        stats = run.stats or {}
+        scored = stats.get("scored", 0)
+        if not scored:
+            return
+        self.stdout.write(
+            f"  {scored} scored, {run.changed} changed, {run.failed} failed; "
+            f"mean delta {stats['delta_sum'] / scored:+.1f}, mean |delta| {stats['abs_delta_sum'] / scored:.1f}"
+        )
+        self.stdout.write("  deltas: " + ", ".join(f"{label}: {stats['deltas'].get(label, 0)}" for label, _ in DELTA_BUCKETS))
+        if "recommendation_changes" in stats:
+            self.stdout.write(f"  recommendation changed for {stats['recommendation_changes']}")
+        for pk, old, new in stats.get("largest", []):
+            self.stdout.write(f"  {run.target[:-1]} {pk}: {old} -> {new}")
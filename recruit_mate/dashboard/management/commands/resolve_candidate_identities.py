@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from dashboard.services.identity_resolution import IdentityResolver
+
+
+class Command(BaseCommand):
+    help = "Group candidate sessions on public links into identities (same person under different emails)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--refresh", action="store_true",
+                            help="Re-resolve every session, not only new ones (e.g. after changing the threshold)")
+        parser.add_argument("--limit", type=int, default=None)
+
+    def handle(self, *args, **options):
+        resolver = IdentityResolver(max_workers=0)
+        sessions = resolver.resolve_pending(refresh=options["refresh"], limit=options["limit"])
+        self.stdout.write(self.style.SUCCESS(f"Resolved {sessions} candidate session(s)"))
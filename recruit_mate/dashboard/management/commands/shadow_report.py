@@ -0,0 +1,44 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from dashboard.models import ShadowComparison
+from dashboard.services.shadow_mode import shadow_report
+
+
+class Command(BaseCommand):
+    help = "Compare primary and shadow LLM providers: latency, failure rate and score agreement per operation"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Only calls from the last N days")
+        parser.add_argument("--operation", default=None)
+
+    def handle(self, *args, **options):
+        queryset = ShadowComparison.objects.all()
+        if options["days"]:
+            queryset = queryset.filter(created_at__gte=timezone.now() - timedelta(days=options["days"]))
+        if options["operation"]:
+            queryset = queryset.filter(operation=options["operation"])
+
+        report = shadow_report(queryset)
+        if not report:
+            self.stdout.write("No shadow calls recorded; set SHADOW_SAMPLE_RATE to enable shadow mode")
+            return
+
+        def fmt(value, suffix=""):
+            return "n/a" if value is None else f"{value}{suffix}"
+
+        for entry in report:
+            self.stdout.write(self.style.SUCCESS(
+                f"{entry['operation']}: {entry['primary']} vs {entry['secondary']} ({entry['calls']} calls)"
+            ))
+            for side in ("primary", "secondary"):
+                self.stdout.write(
+                    f"  {entry[side]:<10} p50 {fmt(entry[side + '_p50_ms'], ' ms')}, "
+                    f"p95 {fmt(entry[side + '_p95_ms'], ' ms')}, "
+                    f"failures {entry[side + '_failure_rate']:.1%}"
+                )
+            if entry["scored_pairs"]:
+                self.stdout.write(
+                    f"  scores: {entry['scored_pairs']} pairs, correlation {fmt(entry['score_correlation'])}, "
+                    f"mean abs difference {fmt(entry['mean_abs_score_diff'])}"
+                )
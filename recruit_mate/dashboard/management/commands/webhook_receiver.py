@@ -0,0 +1,37 @@
+import json
+from django.core.management.base import BaseCommand
+from dashboard.services.webhooks import WebhookReceiver
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local stand-in webhook receiver that verifies signatures and prints the events; senders "
+        "need DEBUG and WEBHOOK_ALLOW_PRIVATE_HOSTS to reach it"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--secret", required=True, help="The endpoint's signing secret")
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--fail-rate", type=float, default=0.0,
+                            help="Answer this share of batches with HTTP 500 to exercise retries")
+
+    def handle(self, *args, **options):
+        def print_batch(events):
+            self.stdout.write(f"batch of {len(events)}")
+            for event in events:
+                self.stdout.write(f"  {event['type']} {event['id']} {json.dumps(event['data'])[:200]}")
+
+        receiver = WebhookReceiver(
+            options["secret"], host=options["host"], port=options["port"],
+            fail_rate=options["fail_rate"], on_batch=print_batch,
+        )
+        self.stdout.write(f"Listening on {receiver.url}")
+        try:
+            receiver.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            receiver.server.server_close()
+            self.stdout.write(f"{receiver.batches} batch(es), {len(receiver.events)} event(s), "
+                              f"{receiver.rejected} rejected signature(s)")
@@ -1,3 +1,5 @@
+import uuid
+from django.conf import settings
 from django.db import models
 
 class TimeStampedModel(models.Model):
@@ -6,4 +8,415 @@ class TimeStampedModel(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        abstract = True
\ No newline at end of file
+        abstract = True
+
+class RateLimitBucket(models.Model):
+    """Shared token-bucket state for outbound LLM calls, one row per provider"""
+    provider = models.CharField(max_length=50, unique=True)
+    requests = models.FloatField()
+    tokens = models.FloatField()
+    updated_at = models.FloatField()
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.provider}: {self.requests:.1f} req / {self.tokens:.0f} tok"
+
+
+class ParsedResume(TimeStampedModel):
+    """Extracted text and parsed fields for one unique resume file, keyed by SHA-256 of its bytes"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    text = models.TextField(blank=True)
+    data = models.JSONField(default=dict, blank=True)
+
+    def __str__(self):
+        return self.sha256
+
+
+class ResumeIngestion(TimeStampedModel):
+    """Processing status of one uploaded resume file through the ingestion pipeline"""
+    STAGES = [
+        ('stored', 'Stored'),
+        ('hashed', 'Hashed'),
+        ('extracted', 'Text extracted'),
+        ('parsed', 'Parsed'),
+        ('indexed', 'Indexed'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    file = models.CharField(max_length=255)  # storage name of the uploaded file
+    stage = models.CharField(max_length=20, choices=STAGES, default='stored')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
+    sha256 = models.CharField(max_length=64, blank=True)
+    parsed = models.ForeignKey(ParsedResume, on_delete=models.SET_NULL, null=True, blank=True, related_name='ingestions')
+    candidate = models.ForeignKey('candidates.Candidate', on_delete=models.CASCADE, null=True, blank=True, related_name='resume_ingestions')
+    session = models.ForeignKey('interviews.InterviewSession', on_delete=models.CASCADE, null=True, blank=True, related_name='resume_ingestions')
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.file} [{self.stage}/{self.status}]"
+
+
+class CandidateVector(TimeStampedModel):
+    """
+    Hashed term frequencies of one candidate for services.match_engine:
+    ``terms`` is a little-endian uint32 array of feature ids, ``counts`` the
+    matching uint16 frequencies.
+    """
+    candidate = models.OneToOneField('candidates.Candidate', on_delete=models.CASCADE, related_name='match_vector')
+    digest = models.CharField(max_length=40)  # of the source text, to skip unchanged candidates
+    length = models.PositiveIntegerField(default=0)  # total terms before truncation
+    terms = models.BinaryField()
+    counts = models.BinaryField()
+
+    class Meta:
+        indexes = [models.Index(fields=['updated_at'])]
+
+    def __str__(self):
+        return f"Vector for candidate {self.candidate_id} ({len(self.terms) // 4} terms)"
+
+
+class AnswerSignature(TimeStampedModel):
+    """
+    MinHash signature of one answer for services.answer_similarity, with the
+    near-duplicate cluster it was last placed in. ``signature`` is NUM_PERM
+    little-endian uint32 values, empty for answers too short to compare.
+    """
+    answer = models.OneToOneField('interviews.InterviewAnswer', on_delete=models.CASCADE, related_name='signature')
+    group_key = models.CharField(max_length=64)  # master link token + question wording hash
+    digest = models.CharField(max_length=40)  # of the answer text, to skip unchanged answers
+    signature = models.BinaryField()
+    cluster = models.BigIntegerField(null=True, blank=True)  # lowest answer id in the cluster
+    similarity = models.FloatField(null=True, blank=True)  # best estimated Jaccard within it
+
+    class Meta:
+        indexes = [models.Index(fields=['group_key', 'cluster'])]
+
+    def __str__(self):
+        return f"Signature for answer {self.answer_id}"
+
+
+class AnswerBand(models.Model):
+    """
+    One LSH band of an answer's signature. Answers of a group sharing a key
+    are near-duplicate candidates, so a new answer is compared with those
+    only instead of with the whole group.
+    """
+    answer = models.ForeignKey('interviews.InterviewAnswer', on_delete=models.CASCADE, related_name='+')
+    group_key = models.CharField(max_length=64)
+    key = models.BigIntegerField()  # hash of the band index and its rows
+
+    class Meta:
+        indexes = [models.Index(fields=['group_key', 'key'])]
+
+    def __str__(self):
+        return f"Band {self.key} of answer {self.answer_id}"
+
+
+class StoredBlob(TimeStampedModel):
+    """One content-addressed file in media storage, shared by every record that references it"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    path = models.CharField(max_length=255, unique=True)  # storage name
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.path} (refs: {self.ref_count})"
+
+
+class Skill(models.Model):
+    """
+    Canonical skill shared by candidates and jobs.
+
+    ``key`` is the taxonomy id for skills in SKILL_TAXONOMY_PATH, or
+    "custom:<lower-cased name>" for names the taxonomy does not know.
+    """
+    key = models.CharField(max_length=150, unique=True)
+    name = models.CharField(max_length=150)
+    category = models.CharField(max_length=50, blank=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class PrescoreReplay(TimeStampedModel):
+    """
+    Agreement of services.answer_prescorer with model scores on one replay
+    corpus (replay_prescorer). Local scores only become final while the
+    latest replay for the current scorer version is ``approved``.
+    """
+    scorer_version = models.PositiveIntegerField()
+    items = models.PositiveIntegerField()
+    local_count = models.PositiveIntegerField()
+    local_rate = models.FloatField()
+    pass_agreement = models.FloatField(null=True, blank=True)  # on the answers kept local
+    mean_abs_error = models.FloatField(null=True, blank=True)
+    approved = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"v{self.scorer_version}: {self.local_count}/{self.items} local, agreement {self.pass_agreement}"
+
+
+class EvaluationCacheQuestion(TimeStampedModel):
+    """
+    One question wording and set of expected key points in
+    services.evaluation_cache for one evaluator (model and prompt version),
+    with lookup counters for hit rates.
+    """
+    question_hash = models.CharField(max_length=16)
+    evaluator_version = models.CharField(max_length=100, default='')
+    key_points_digest = models.CharField(max_length=16)
+    lookups = models.PositiveIntegerField(default=0)
+    exact_hits = models.PositiveIntegerField(default=0)
+    near_hits = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [('question_hash', 'evaluator_version', 'key_points_digest')]
+
+    def __str__(self):
+        return f"{self.question_hash}@{self.evaluator_version} ({self.exact_hits + self.near_hits}/{self.lookups} hits)"
+
+
+class EvaluationCacheEntry(TimeStampedModel):
+    """
+    A model evaluation of one normalized answer to a cached question.
+    ``signature`` is the answer's MinHash (empty for short answers), used by
+    the near-duplicate tier.
+    """
+    question = models.ForeignKey(EvaluationCacheQuestion, on_delete=models.CASCADE, related_name='entries')
+    answer_hash = models.CharField(max_length=40)
+    signature = models.BinaryField(blank=True, default=b'')
+    evaluation = models.JSONField()
+    hits = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [('question', 'answer_hash')]
+
+    def __str__(self):
+        return f"{self.question.question_hash}/{self.answer_hash[:8]} ({self.hits} hits)"
+
+
+class RescoreRun(TimeStampedModel):
+    """
+    Progress of one re-scoring pass (services.rescoring) over historical answers
+    or results. ``checkpoint`` is the last processed primary key, so an
+    interrupted run resumes where it stopped.
+    """
+    TARGETS = [
+        ('answers', 'Answers'),
+        ('results', 'Results'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('paused', 'Paused'),
+        ('done', 'Done'),
+    ]
+
+    version = models.CharField(max_length=50)
+    target = models.CharField(max_length=10, choices=TARGETS)
+    dry_run = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    checkpoint = models.BigIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    changed = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    stats = models.JSONField(default=dict, blank=True)  # score delta summary
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = [('version', 'target', 'dry_run')]
+        ordering = ['-created_at']
+
+    def __str__(self):
+        mode = " (dry run)" if self.dry_run else ""
+        return f"Re-score {self.target} to {self.version}{mode}: {self.processed}/{self.total} [{self.status}]"
+
+
+class ScoreVersion(TimeStampedModel):
+    """
+    One version of the evaluation of an answer or the report of a result,
+    kept when historical scores are re-scored. ``data`` holds the rest of
+    the evaluation (feedback, strengths, ...).
+    """
+    answer = models.ForeignKey('interviews.InterviewAnswer', on_delete=models.CASCADE, null=True, blank=True, related_name='score_versions')
+    result = models.ForeignKey('interviews.InterviewResult', on_delete=models.CASCADE, null=True, blank=True, related_name='score_versions')
+    version = models.CharField(max_length=50)
+    score = models.IntegerField()
+    data = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        unique_together = [('answer', 'version'), ('result', 'version')]
+
+    def __str__(self):
+        target = f"answer {self.answer_id}" if self.answer_id else f"result {self.result_id}"
+        return f"{target} @ {self.version}: {self.score}"
+
+
+class ShadowComparison(TimeStampedModel):
+    """
+    One LLM call mirrored to the secondary provider by services.shadow_mode,
+    with both results and latencies. Latencies are wall-clock milliseconds
+    as the caller sees them; a batched primary evaluation reports the
+    latency of its whole batch, with ``primary_batch_size`` items in it.
+    """
+    operation = models.CharField(max_length=50)
+    primary_provider = models.CharField(max_length=50)
+    secondary_provider = models.CharField(max_length=50)
+    primary_latency_ms = models.FloatField()
+    secondary_latency_ms = models.FloatField(null=True, blank=True)
+    primary_batch_size = models.PositiveIntegerField(default=1)
+    primary_failed = models.BooleanField(default=False)
+    secondary_failed = models.BooleanField(default=False)
+    primary_score = models.IntegerField(null=True, blank=True)
+    secondary_score = models.IntegerField(null=True, blank=True)
+    primary_result = models.JSONField(default=dict, blank=True)
+    secondary_result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['operation', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.operation}: {self.primary_provider} vs {self.secondary_provider}"
+
+
+class LeaderboardEntry(TimeStampedModel):
+    """
+    A completed candidate session's place on its link's leaderboard, kept
+    by services.leaderboard. ``rank`` is 1-based (equal scores share a
+    rank); ``percentile`` is the share of the link's other candidates
+    ranked below, 0-100.
+    """
+    BUCKET_CHOICES = [
+        ('top10', 'Top 10%'),
+        ('top25', 'Top 25%'),
+        ('top50', 'Top 50%'),
+        ('rest', 'Bottom 50%'),
+    ]
+
+    master_token = models.UUIDField()
+    session = models.OneToOneField('interviews.InterviewSession', on_delete=models.CASCADE, related_name='leaderboard_entry')
+    score = models.IntegerField()
+    recommendation = models.CharField(max_length=20)
+    rank = models.PositiveIntegerField()
+    percentile = models.PositiveSmallIntegerField()
+    bucket = models.CharField(max_length=10, choices=BUCKET_CHOICES)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['master_token', 'rank', 'session']),
+            models.Index(fields=['master_token', 'recommendation', 'rank', 'session']),
+        ]
+
+    def __str__(self):
+        return f"#{self.rank} {self.session_id} ({self.score})"
+
+
+class QuestionStats(TimeStampedModel):
+    """
+    Empirical statistics of one question wording across every link that
+    asked it, computed in batch by services.question_analytics. Rates are
+    over the candidate sessions the question was copied into; score
+    statistics are over non-blank answers.
+    """
+    question_hash = models.CharField(max_length=16, unique=True)
+    question_text = models.TextField()
+    labelled_difficulty = models.CharField(max_length=10, blank=True)  # most common model label
+    empirical_difficulty = models.CharField(max_length=10, blank=True)  # blank until enough answers
+    asked = models.PositiveIntegerField(default=0)
+    answered = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    mean_score = models.FloatField(null=True, blank=True)
+    score_std = models.FloatField(null=True, blank=True)
+    score_histogram = models.JSONField(default=list)  # answer counts per 20-point band, 0-19 first
+    discrimination = models.FloatField(null=True, blank=True)  # correlation with the overall score
+    discrimination_pairs = models.PositiveIntegerField(default=0)
+    completion_rate = models.FloatField(default=0.0)
+    skip_rate = models.FloatField(default=0.0)
+
+    @property
+    def miscalibrated(self):
+        return bool(self.empirical_difficulty) and self.empirical_difficulty != self.labelled_difficulty
+
+    def __str__(self):
+        return f"{self.question_hash}: {self.empirical_difficulty or '?'} ({self.answered} answers)"
+
+
+class WebhookEndpoint(TimeStampedModel):
+    """A recruiter's URL that receives batches of interview lifecycle events"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='webhook_endpoints')
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=64)  # HMAC-SHA256 key for the signature header
+    events = models.JSONField(default=list, blank=True)  # event types to send; empty means all
+    is_active = models.BooleanField(default=True)
+
+    def subscribes_to(self, event_type):
+        return self.is_active and (not self.events or event_type in self.events)
+
+    def __str__(self):
+        return self.url
+
+
+class WebhookEvent(TimeStampedModel):
+    """
+    Outbox row written in the same transaction as the state change it
+    describes; services.webhooks delivers it to the user's endpoints.
+    """
+    uid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)  # event id receivers dedupe on
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='webhook_events')
+    event_type = models.CharField(max_length=40)
+    subject_id = models.BigIntegerField()  # session, answer or link primary key
+    payload = models.JSONField(default=dict)
+
+    class Meta:
+        indexes = [models.Index(fields=['event_type', 'subject_id'])]
+
+    def __str__(self):
+        return f"{self.event_type} {self.subject_id}"
+
+
+class WebhookDelivery(TimeStampedModel):
+    """One event's delivery to one endpoint, with its retry state and latency"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('delivered', 'Delivered'),
+        ('failed', 'Failed'),
+    ]
+
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='deliveries')
+    event = models.ForeignKey(WebhookEvent, on_delete=models.CASCADE, related_name='deliveries')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    claim = models.CharField(max_length=32, blank=True)  # sender currently holding the row
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    latency_ms = models.FloatField(null=True, blank=True)  # event written -> receiver acknowledged
+    response_ms = models.FloatField(null=True, blank=True)  # round trip of the last attempt
+    last_status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+        unique_together = [('endpoint', 'event')]
+
+    def __str__(self):
+        return f"{self.event} -> {self.endpoint}: {self.status}"
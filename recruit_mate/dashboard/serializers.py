@@ -0,0 +1,28 @@
+from rest_framework import serializers
+from .models import WebhookDelivery, WebhookEndpoint
+from .services.webhooks import EVENT_TYPES, UnsafeWebhookURL, check_url
+
+class WebhookEndpointSerializer(serializers.ModelSerializer):
+    events = serializers.ListField(child=serializers.ChoiceField(choices=EVENT_TYPES), required=False)
+
+    class Meta:
+        model = WebhookEndpoint
+        fields = ['id', 'url', 'secret', 'events', 'is_active', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'secret', 'created_at', 'updated_at']
+
+    def validate_url(self, value):
+        try:
+            check_url(value)
+        except UnsafeWebhookURL as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+class WebhookDeliverySerializer(serializers.ModelSerializer):
+    event_id = serializers.UUIDField(source='event.uid', read_only=True)
+    event_type = serializers.CharField(source='event.event_type', read_only=True)
+
+    class Meta:
+        model = WebhookDelivery
+        fields = ['id', 'event_id', 'event_type', 'status', 'attempts', 'next_attempt_at', 'delivered_at',
+                  'latency_ms', 'response_ms', 'last_status_code', 'last_error', 'created_at']
+        read_only_fields = fields
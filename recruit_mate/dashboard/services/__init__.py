@@ -2,5 +2,41 @@ from .ai_service import AIService
 from .gemini_service import GeminiService
 from .storage_service import StorageService
 from .resume_parser import ResumeParser
+from .skill_taxonomy import SkillTaxonomy, get_skill_taxonomy
+from .rate_limiter import RateLimiter, RateLimitExceeded, get_rate_limiter
+from .answer_prescorer import KeyPointScorer, get_keypoint_scorer
+from .evaluation_cache import EvaluationCache, get_evaluation_cache
+from .evaluation_dispatcher import EvaluationDispatcher, get_evaluation_dispatcher
+from .rescoring import AnswerRescorer, ResultRescorer
+from .resume_ingestion import ResumeIngestionPipeline, get_resume_pipeline
+from .skill_index import filter_candidates, matching_candidates
+from .match_engine import MatchIndex, best_matches, get_match_index
+from .answer_similarity import AnswerSimilarityEngine, get_answer_similarity_engine
+from .identity_resolution import IdentityResolver, get_identity_resolver
+from .shadow_mode import ShadowRunner, get_shadow_runner
+from .leaderboard import Leaderboard, get_leaderboard
+from .question_analytics import refresh_question_stats, stats_for_questions
+from .result_export import ResultExport
+from .webhooks import WebhookSender, get_webhook_sender
+from .search_index import SearchBackend, SQLiteFTS5Backend, get_search_backend
 
-__all__ = ['AIService', 'GeminiService', 'StorageService', 'ResumeParser']
+__all__ = [
+    'AIService', 'GeminiService', 'StorageService', 'ResumeParser',
+    'SkillTaxonomy', 'get_skill_taxonomy',
+    'RateLimiter', 'RateLimitExceeded', 'get_rate_limiter',
+    'KeyPointScorer', 'get_keypoint_scorer',
+    'EvaluationCache', 'get_evaluation_cache',
+    'EvaluationDispatcher', 'get_evaluation_dispatcher',
+    'AnswerRescorer', 'ResultRescorer',
+    'ResumeIngestionPipeline', 'get_resume_pipeline',
+    'filter_candidates', 'matching_candidates',
+    'MatchIndex', 'best_matches', 'get_match_index',
+    'AnswerSimilarityEngine', 'get_answer_similarity_engine',
+    'IdentityResolver', 'get_identity_resolver',
+    'ShadowRunner', 'get_shadow_runner',
+    'Leaderboard', 'get_leaderboard',
+    'refresh_question_stats', 'stats_for_questions',
+    'ResultExport',
+    'WebhookSender', 'get_webhook_sender',
+    'SearchBackend', 'SQLiteFTS5Backend', 'get_search_backend',
+]
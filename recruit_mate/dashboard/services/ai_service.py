@@ -1,39 +1,50 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from asgiref.sync import sync_to_async
 from django.conf import settings
-import json
-import re
+from .llm_json import EVALUATION_SCHEMA, QUESTIONS_SCHEMA, REPORT_SCHEMA, SKILLS_SCHEMA, extract_json, parse_llm_json
+from .prompt_builder import estimate_tokens, get_budget, log_llm_call, truncate_to_budget
+from .rate_limiter import BACKGROUND, INTERACTIVE, RateLimitExceeded, get_rate_limiter
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 class AIService:
+    provider = "openai"
+    # Bump when the evaluation prompt changes; cached evaluations are kept per version
+    evaluation_prompt_version = 1
 
     def __init__(self):
         api_key = getattr(settings, "OPENAI_API_KEY", None)
         if not api_key:
             logger.warning("OPENAI_API_KEY is not set. OpenAIService will fail at runtime.")
         self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.async_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
 
+    @classmethod
+    def evaluation_version(cls):
+        """Model and prompt that answer evaluations come from"""
+        return f"{cls.provider}:{getattr(settings, 'OPENAI_MODEL', 'gpt-4o-mini')}:p{cls.evaluation_prompt_version}"
+
+    def _generate(self, prompt, priority=INTERACTIVE, operation="generate"):
+        get_rate_limiter().acquire("openai", estimate_tokens(prompt), priority)
+        started = time.monotonic()
+        resp = self.client.responses.create(model=self.model, input=prompt)
+        log_llm_call("openai", operation, prompt, (time.monotonic() - started) * 1000)
+        return self._get_text_from_response(resp)
+
+    async def _agenerate(self, prompt, priority=INTERACTIVE, operation="generate"):
+        if not getattr(settings, "ASYNC_LLM_CLIENTS", False):
+            return await sync_to_async(self._generate, thread_sensitive=False)(prompt, priority, operation)
+        await get_rate_limiter().aacquire("openai", estimate_tokens(prompt), priority)
+        started = time.monotonic()
+        resp = await self.async_client.responses.create(model=self.model, input=prompt)
+        log_llm_call("openai", operation, prompt, (time.monotonic() - started) * 1000)
+        return self._get_text_from_response(resp)
+
     def _extract_json(self, text):
-        if not text:
-            return None
-        m = re.search(r'```(?:json)?\s*(\[.*?\]|\{.*?\})\s*```', text, re.DOTALL)
-        if m:
-            try:
-                return json.loads(m.group(1))
-            except Exception:
-                pass
-        m = re.search(r'(\[.*?\]|\{.*?\})', text, re.DOTALL)
-        if m:
-            try:
-                return json.loads(m.group(1))
-            except Exception:
-                pass
-        try:
-            return json.loads(text)
-        except Exception:
-            return None
+        return extract_json(text)
 
     def _get_text_from_response(self, resp):
         try:
@@ -55,37 +66,58 @@ class AIService:
             logger.exception("Failed to extract text from response: %s", e)
         return ""
 
-    def extract_skills(self, job_description):
-        prompt = (
+    def _skills_prompt(self, job_description):
+        return (
             "Extract key technical and soft skills from this job description.\n"
             "Return ONLY a JSON array of strings (no markdown, no extra text).\n\n"
-            f"Job Description:\n{job_description}\n\n"
+            f"Job Description:\n{truncate_to_budget(job_description, get_budget('extract_skills', 'text'))}\n\n"
             "Example: [\"Python\", \"Django\", \"Communication\"]"
         )
+
+    def _parse_skills(self, text):
+        return parse_llm_json(text, SKILLS_SCHEMA) or []
+
+    def extract_skills(self, job_description, priority=BACKGROUND):
+        try:
+            return self._parse_skills(self._generate(self._skills_prompt(job_description), priority, "extract_skills"))
+        except Exception as e:
+            logger.exception("extract_skills failed: %s", e)
+            return []
+
+    async def aextract_skills(self, job_description, priority=BACKGROUND):
         try:
-            resp = self.client.responses.create(model=self.model, input=prompt)
-            text = self._get_text_from_response(resp)
-            skills = self._extract_json(text)
-            return skills if isinstance(skills, list) else []
+            return self._parse_skills(await self._agenerate(self._skills_prompt(job_description), priority, "extract_skills"))
         except Exception as e:
             logger.exception("extract_skills failed: %s", e)
             return []
 
-    def generate_questions(self, job_description, resume_data, num_questions=10):
-        prompt = (
+    def _questions_prompt(self, job_description, resume_data, num_questions):
+        return (
             f"You're an expert interviewer. Generate exactly {num_questions} interview questions based on the job description "
             "and candidate resume. Return ONLY a JSON array of objects (no markdown):\n\n"
             "[{ \"question\": \"...\", \"type\": \"technical|behavioral|situational\", "
             "\"difficulty\": \"easy|medium|hard\", \"expected_key_points\": [\"...\"] }]\n\n"
             f"Job Description:\n{job_description}\n\nCandidate Resume:\n{resume_data}\n"
         )
+
+    def _parse_questions(self, text, num_questions):
+        questions = parse_llm_json(text, QUESTIONS_SCHEMA)
+        if not questions:
+            return self._get_fallback_questions(num_questions)
+        return questions[:num_questions]
+
+    def generate_questions(self, job_description, resume_data, num_questions=10, priority=BACKGROUND):
+        prompt = self._questions_prompt(job_description, resume_data, num_questions)
         try:
-            resp = self.client.responses.create(model=self.model, input=prompt)
-            text = self._get_text_from_response(resp)
-            questions = self._extract_json(text)
-            if not questions or not isinstance(questions, list):
-                return self._get_fallback_questions(num_questions)
-            return questions[:num_questions]
+            return self._parse_questions(self._generate(prompt, priority, "generate_questions"), num_questions)
+        except Exception as e:
+            logger.exception("generate_questions failed: %s", e)
+            return self._get_fallback_questions(num_questions)
+
+    async def agenerate_questions(self, job_description, resume_data, num_questions=10, priority=BACKGROUND):
+        prompt = self._questions_prompt(job_description, resume_data, num_questions)
+        try:
+            return self._parse_questions(await self._agenerate(prompt, priority, "generate_questions"), num_questions)
         except Exception as e:
             logger.exception("generate_questions failed: %s", e)
             return self._get_fallback_questions(num_questions)
@@ -119,44 +151,61 @@ class AIService:
         ]
         return fallback[:n]
 
-    def evaluate_answer(self, question, answer, expected_key_points):
-        prompt = (
+    def _evaluation_prompt(self, question, answer, expected_key_points):
+        return (
             "Evaluate this interview answer and return ONLY a JSON object (no markdown):\n\n"
             "{ \"score\": 0-100, \"feedback\": \"\", \"strengths\": [], \"improvements\": [] }\n\n"
             f"Question: {question}\n"
             f"Expected Key Points: {', '.join(expected_key_points) if expected_key_points else 'General evaluation'}\n"
-            f"Candidate Answer: {answer}\n"
+            f"Candidate Answer: {truncate_to_budget(answer, get_budget('evaluate_answer', 'answer'))}\n"
         )
-        try:
-            resp = self.client.responses.create(model=self.model, input=prompt)
-            text = self._get_text_from_response(resp)
-            evaluation = self._extract_json(text)
-            if not evaluation or not isinstance(evaluation, dict):
-                return {
-                    "score": 50,
-                    "feedback": "Could not parse model output. Answer recorded.",
-                    "strengths": [],
-                    "improvements": ["Provide more detail"]
-                }
-            try:
-                evaluation["score"] = max(0, min(100, int(evaluation.get("score", 50))))
-            except Exception:
-                evaluation["score"] = 50
-            return evaluation
-        except Exception as e:
-            logger.exception("evaluate_answer failed: %s", e)
+
+    def _parse_evaluation(self, text):
+        evaluation = parse_llm_json(text, EVALUATION_SCHEMA)
+        if evaluation is None:
             return {
                 "score": 50,
-                "feedback": "Evaluation failed due to system error.",
+                "feedback": "Could not parse model output. Answer recorded.",
                 "strengths": [],
-                "improvements": []
+                "improvements": ["Provide more detail"],
+                "source": "fallback"
             }
+        return evaluation
+
+    def _evaluation_error(self):
+        return {
+            "score": 50,
+            "feedback": "Evaluation failed due to system error.",
+            "strengths": [],
+            "improvements": [],
+            "source": "fallback"
+        }
+
+    def evaluate_answer(self, question, answer, expected_key_points, priority=INTERACTIVE):
+        prompt = self._evaluation_prompt(question, answer, expected_key_points)
+        try:
+            return self._parse_evaluation(self._generate(prompt, priority, "evaluate_answer"))
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            logger.exception("evaluate_answer failed: %s", e)
+            return self._evaluation_error()
 
-    def generate_report(self, interview_data):
+    async def aevaluate_answer(self, question, answer, expected_key_points, priority=INTERACTIVE):
+        prompt = self._evaluation_prompt(question, answer, expected_key_points)
+        try:
+            return self._parse_evaluation(await self._agenerate(prompt, priority, "evaluate_answer"))
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            logger.exception("evaluate_answer failed: %s", e)
+            return self._evaluation_error()
+
+    def _report_prompt(self, interview_data):
         answers = interview_data.get("answers", [])
         scores_summary = "\n".join([f"Q: {a.get('question')} | Score: {a.get('score', 'N/A')}" for a in answers])
 
-        prompt = (
+        return (
             "Generate a final interview report and return ONLY a JSON object (no markdown):\n\n"
             "{ \"overall_score\": 0-100, \"summary\": \"\", \"strengths\": [], \"weaknesses\": [], "
             "\"recommendation\": \"hire|maybe|no\", \"detailed_feedback\": \"\" }\n\n"
@@ -165,32 +214,46 @@ class AIService:
             f"Average Score: {interview_data.get('average_score', 0):.1f}\n"
             f"Question Scores:\n{scores_summary}\n"
         )
-        try:
-            resp = self.client.responses.create(model=self.model, input=prompt)
-            text = self._get_text_from_response(resp)
-            report = self._extract_json(text)
-            if not report or not isinstance(report, dict):
-                return {
-                    "overall_score": int(interview_data.get("average_score", 50)),
-                    "summary": "Report generation failed; manual review needed.",
-                    "strengths": [],
-                    "weaknesses": [],
-                    "recommendation": "maybe",
-                    "detailed_feedback": "Manual review recommended."
-                }
-            try:
-                report["overall_score"] = max(0, min(100, int(report.get("overall_score", interview_data.get("average_score", 50)))))
-            except Exception:
-                report["overall_score"] = int(interview_data.get("average_score", 50))
-            return report
-        except Exception as e:
-            logger.exception("generate_report failed: %s", e)
+
+    def _parse_report(self, text, interview_data):
+        report = parse_llm_json(text, REPORT_SCHEMA)
+        if report is None:
             return {
                 "overall_score": int(interview_data.get("average_score", 50)),
-                "summary": "Report failed to generate.",
+                "summary": "Report generation failed; manual review needed.",
                 "strengths": [],
                 "weaknesses": [],
                 "recommendation": "maybe",
                 "detailed_feedback": "Manual review recommended."
             }
+        if report["overall_score"] is None:
+            report["overall_score"] = int(interview_data.get("average_score", 50))
+        return report
 
+    def _report_error(self, interview_data):
+        return {
+            "overall_score": int(interview_data.get("average_score", 50)),
+            "summary": "Report failed to generate.",
+            "strengths": [],
+            "weaknesses": [],
+            "recommendation": "maybe",
+            "detailed_feedback": "Manual review recommended."
+        }
+
+    def generate_report(self, interview_data, priority=INTERACTIVE):
+        try:
+            return self._parse_report(self._generate(self._report_prompt(interview_data), priority, "generate_report"), interview_data)
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            logger.exception("generate_report failed: %s", e)
+            return self._report_error(interview_data)
+
+    async def agenerate_report(self, interview_data, priority=INTERACTIVE):
+        try:
+            return self._parse_report(await self._agenerate(self._report_prompt(interview_data), priority, "generate_report"), interview_data)
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            logger.exception("generate_report failed: %s", e)
+            return self._report_error(interview_data)
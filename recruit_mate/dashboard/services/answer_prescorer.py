@@ -0,0 +1,307 @@
+import json
+import re
+import threading
+import time
+from collections import Counter, namedtuple
+from difflib import SequenceMatcher
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from .match_engine import STOPWORDS
+from .skill_taxonomy import get_skill_taxonomy
+
+DEFAULT_SYNONYMS_PATH = Path(__file__).resolve().parent.parent / "data" / "keypoint_synonyms.json"
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+# Ordered so the longest suffix wins; (suffix, replacement)
+_SUFFIXES = (
+    ("izations", "ize"), ("ization", "ize"), ("isation", "ize"), ("ations", "ate"), ("ation", "ate"),
+    ("nesses", ""), ("ness", ""), ("ments", ""), ("ment", ""), ("ingly", ""), ("edly", ""),
+    ("ings", ""), ("ing", ""), ("ies", "y"), ("ied", "y"), ("ers", "er"), ("ed", ""), ("es", "e"),
+    ("ly", ""), ("s", ""),
+)
+_NON_ANSWER_RE = re.compile(
+    r"^\W*(?:(?:i\s+)?(?:don'?t|do\s+not|dont)\s+know|no\s+idea|not\s+sure|pass|skip|n/?a|none|nothing|idk)\b"
+)
+MAX_PHRASE = 3
+FUZZY_MIN_LENGTH = 5
+SCORER_VERSION = 2  # bump when scoring changes; earlier replays no longer approve local scores
+CALIBRATION_TTL = 300  # seconds between checks for a newer replay
+
+PreScore = namedtuple("PreScore", "score confidence escalate covered missed feedback strengths improvements")
+
+
+def stem(word):
+    """Light suffix-stripping stemmer: "optimization", "optimizing" and "optimized" share a stem"""
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word.endswith(("ss", "us", "is")):
+                break
+            word = word[:-len(suffix)] + replacement
+            break
+    if len(word) > 4 and word.endswith("e"):
+        word = word[:-1]
+    if len(word) >= 4 and word[-1] == word[-2] and word[-1] not in "aeioulsz":
+        word = word[:-1]  # "running" -> "runn" -> "run"
+    return word
+
+
+class KeyPointScorer:
+    """
+    Deterministic, local scoring of an answer against its question's expected key points.
+
+    Text is lower-cased, stemmed and mapped through synonym groups (and the
+    skill taxonomy, so "k8s" covers "Kubernetes"); remaining key-point words
+    may match an answer word fuzzily, which absorbs typos. A key point is
+    covered when enough of its content words are found. Coverage, relevance
+    to the question and answer length give a provisional 0-100 score.
+
+    The score comes with a confidence. Lexical coverage can only vouch for
+    a high score: answers below or inside the borderline band
+    (PRESCORE_BORDERLINE) may be correct in other words, answers that are
+    mostly key-point keywords (PRESCORE_MAX_KEYWORD_DENSITY) or barely prose
+    (PRESCORE_MIN_FUNCTION_WORDS) may be gaming it, and few key points give
+    little evidence; all of these get a low confidence. Only clear
+    non-answers and confident high scores stay local, and only while the
+    latest replay_prescorer run for SCORER_VERSION measured at least
+    PRESCORE_MIN_AGREEMENT pass/fail agreement with the model
+    (``require_calibration=False`` skips that check, for replays).
+    """
+
+    KEYPOINT_COVERAGE = 0.5  # share of a key point's words that must be found
+
+    def __init__(self, synonyms=None, require_calibration=True):
+        if synonyms is None:
+            path = getattr(settings, "PRESCORE_SYNONYMS_PATH", DEFAULT_SYNONYMS_PATH)
+            with open(path, encoding="utf-8") as f:
+                synonyms = json.load(f)
+        self.min_confidence = getattr(settings, "PRESCORE_MIN_CONFIDENCE", 0.7)
+        self.borderline = getattr(settings, "PRESCORE_BORDERLINE", (40, 75))
+        self.max_keyword_density = getattr(settings, "PRESCORE_MAX_KEYWORD_DENSITY", 0.5)
+        self.min_function_words = getattr(settings, "PRESCORE_MIN_FUNCTION_WORDS", 0.2)
+        self.require_calibration = require_calibration
+        self._calibration = (None, 0.0)  # (approved, checked at)
+        self._phrases = {}
+        for idx, group in enumerate(synonyms):
+            for surface in group:
+                words = tuple(stem(w) for w in _WORD_RE.findall(surface.lower()))
+                if words and len(words) <= MAX_PHRASE:
+                    self._phrases.setdefault(words, f"syn:{idx}")
+        self._stats = Counter()
+        self._lock = threading.Lock()
+
+    # --- Text ------------------------------------------------------------
+
+    def terms(self, text):
+        """Set of canonical terms (stems, synonym groups, "skill:<id>") of ``text``"""
+        words = [stem(w) for w in _WORD_RE.findall((text or "").lower())]
+        terms = set()
+        i = 0
+        while i < len(words):
+            # Longest synonym phrase starting here, else the word itself
+            for size in range(min(MAX_PHRASE, len(words) - i), 0, -1):
+                canonical = self._phrases.get(tuple(words[i:i + size]))
+                if canonical:
+                    terms.add(canonical)
+                    i += size
+                    break
+            else:
+                if words[i] not in STOPWORDS:
+                    terms.add(words[i])
+                i += 1
+        terms.update("skill:" + skill_id for skill_id in get_skill_taxonomy().match(text or ""))
+        return terms
+
+    def _found(self, term, answer_terms, by_initial):
+        if term in answer_terms:
+            return True
+        if len(term) < FUZZY_MIN_LENGTH or ":" in term:
+            return False
+        return any(
+            abs(len(other) - len(term)) <= 2 and SequenceMatcher(None, term, other).ratio() >= 0.85
+            for other in by_initial.get(term[0], ())
+        )
+
+    def coverage(self, answer_terms, key_point):
+        """Share of ``key_point``'s terms present in the answer"""
+        wanted = self.terms(key_point)
+        if not wanted:
+            return 0.0
+        by_initial = {}
+        for term in answer_terms:
+            if len(term) >= FUZZY_MIN_LENGTH - 2:
+                by_initial.setdefault(term[0], []).append(term)
+        return sum(self._found(term, answer_terms, by_initial) for term in wanted) / len(wanted)
+
+    # --- Scoring ---------------------------------------------------------
+
+    def score(self, question, answer, expected_key_points):
+        answer = (answer or "").strip()
+        key_points = [str(kp) for kp in expected_key_points or [] if str(kp).strip()]
+        words = len(answer.split())
+
+        if words == 0 or (words < 12 and _NON_ANSWER_RE.match(answer.lower())):
+            return self._result(
+                5 if words else 0, 0.95, [], key_points,
+                "The answer does not attempt the question.",
+            )
+
+        answer_terms = self.terms(answer)
+        coverages = [self.coverage(answer_terms, kp) for kp in key_points]
+        covered = [kp for kp, c in zip(key_points, coverages) if c >= self.KEYPOINT_COVERAGE]
+        missed = [kp for kp, c in zip(key_points, coverages) if c < self.KEYPOINT_COVERAGE]
+
+        # Share of content words that are key-point keywords, and of words that are not content at all
+        key_terms = set().union(*(self.terms(kp) for kp in key_points)) if key_points else set()
+        tokens = _WORD_RE.findall(answer.lower())
+        content = [stem(t) for t in tokens if t not in STOPWORDS]
+        keyword_density = sum(t in key_terms for t in content) / len(content) if content else 0.0
+        function_words = 1 - len(content) / len(tokens) if tokens else 0.0
+
+        question_terms = self.terms(question)
+        relevance = len(question_terms & answer_terms) / len(question_terms) if question_terms else 0.0
+        length = min(1.0, words / 40)  # ~40 words is enough room for a complete answer
+
+        if key_points:
+            # Half for whole points covered, half partial credit for each point
+            partial = np.minimum(1.0, np.array(coverages) / self.KEYPOINT_COVERAGE)
+            points = 0.5 * len(covered) / len(key_points) + 0.5 * float(partial.mean())
+        else:
+            points = relevance
+        score = int(round(100 * (0.75 * points + 0.15 * min(1.0, relevance * 2) + 0.10 * length)))
+        if words < 5:
+            score = min(score, 20)
+
+        low, high = self.borderline
+        margin = max(0, score - high)
+        # Confident only above the borderline band, on prose rather than a keyword
+        # list, and with enough key points to judge by
+        evidence = min(1.0, len(key_points) / 3)
+        stuffed = keyword_density > self.max_keyword_density or function_words < self.min_function_words
+        confidence = 0.3 if margin == 0 or stuffed else min(0.95, 0.6 + margin / 50)
+        confidence = round(confidence * evidence, 2)
+
+        if covered and missed:
+            feedback = f"Covers {len(covered)} of {len(key_points)} expected points."
+        elif covered:
+            feedback = "Covers all the expected points."
+        elif key_points:
+            feedback = "Does not address the expected points."
+        else:
+            feedback = "Scored on relevance to the question."
+        if words < 15:
+            feedback += " The answer is very brief."
+        return self._result(score, confidence, covered, missed, feedback)
+
+    def calibrated(self):
+        """Whether a replay approved local scores for this SCORER_VERSION; re-checked every CALIBRATION_TTL"""
+        from dashboard.models import PrescoreReplay
+
+        if not self.require_calibration:
+            return True
+        approved, checked_at = self._calibration
+        if approved is None or time.monotonic() - checked_at > CALIBRATION_TTL:
+            latest = PrescoreReplay.objects.filter(scorer_version=SCORER_VERSION).order_by("-created_at", "-pk").first()
+            approved = bool(latest and latest.approved)
+            self._calibration = (approved, time.monotonic())
+        return approved
+
+    def _result(self, score, confidence, covered, missed, feedback):
+        escalate = confidence < self.min_confidence or not self.calibrated()
+        with self._lock:
+            self._stats["escalated" if escalate else "local"] += 1
+        return PreScore(
+            score=max(0, min(100, score)),
+            confidence=confidence,
+            escalate=escalate,
+            covered=covered,
+            missed=missed,
+            feedback=feedback + " (Provisional automated score.)",
+            strengths=[f"Addressed: {kp}" for kp in covered[:3]],
+            improvements=[f"Did not address: {kp}" for kp in missed[:3]],
+        )
+
+    def evaluation(self, prescore):
+        """``prescore`` as an evaluate_answer result"""
+        return {
+            "score": prescore.score,
+            "feedback": prescore.feedback,
+            "strengths": prescore.strengths,
+            "improvements": prescore.improvements,
+            "source": "local",
+        }
+
+    def stats(self):
+        """Answers scored locally vs escalated since the process started"""
+        with self._lock:
+            return dict(self._stats)
+
+
+def replay_agreement(scorer, items, pass_mark=60):
+    """
+    Compare local scores with model scores on a replay corpus of
+    {question, answer, expected_key_points, score} dicts. Returns summary
+    metrics for all items and for those the scorer would keep local.
+    """
+    local, model, kept = [], [], []
+    for item in items:
+        prescore = scorer.score(item["question"], item["answer"], item.get("expected_key_points", []))
+        local.append(prescore.score)
+        model.append(int(item["score"]))
+        kept.append(not prescore.escalate)
+    local, model, kept = np.array(local, dtype=float), np.array(model, dtype=float), np.array(kept, dtype=bool)
+
+    def metrics(mask):
+        if not mask.any():
+            return {"count": 0}
+        a, b = local[mask], model[mask]
+        error = np.abs(a - b)
+        return {
+            "count": int(mask.sum()),
+            "mean_abs_error": round(float(error.mean()), 1),
+            "within_15": round(float((error <= 15).mean()), 3),
+            "pass_agreement": round(float(((a >= pass_mark) == (b >= pass_mark)).mean()), 3),
+            "correlation": round(float(np.corrcoef(a, b)[0, 1]), 3) if mask.sum() > 2 and a.std() and b.std() else None,
+        }
+
+    return {
+        "items": len(local),
+        "local_rate": round(float(kept.mean()), 3) if len(kept) else 0.0,
+        "all": metrics(np.ones(len(local), dtype=bool)),
+        "local": metrics(kept),
+    }
+
+
+def record_replay(report):
+    """Store a replay_agreement() report; approved when the answers kept local agreed often enough"""
+    from dashboard.models import PrescoreReplay
+
+    local = report["local"]
+    approved = (
+        local["count"] >= getattr(settings, "PRESCORE_MIN_REPLAY_ITEMS", 200)
+        and (local.get("pass_agreement") or 0) >= getattr(settings, "PRESCORE_MIN_AGREEMENT", 0.9)
+    )
+    return PrescoreReplay.objects.create(
+        scorer_version=SCORER_VERSION,
+        items=report["items"],
+        local_count=local["count"],
+        local_rate=report["local_rate"],
+        pass_agreement=local.get("pass_agreement"),
+        mean_abs_error=local.get("mean_abs_error"),
+        approved=approved,
+    )
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def get_keypoint_scorer():
+    """Process-wide scorer; synonyms are loaded once"""
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            _scorer = KeyPointScorer()
+        return _scorer
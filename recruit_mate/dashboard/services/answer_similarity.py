@@ -0,0 +1,370 @@
+import hashlib
+import logging
+import re
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+BANDS = 32  # 32 bands of 4 rows: pairs above ~0.5 Jaccard share a band with high probability
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+_rng = np.random.default_rng(20240601)  # fixed, so signatures are comparable across processes
+_A = _rng.integers(1, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_question(text):
+    return " ".join(_WORD_RE.findall((text or "").lower()))
+
+
+def question_hash(text):
+    """Stable id for a question's wording; copies of a link's questions share it"""
+    return hashlib.sha1(normalize_question(text).encode("utf-8")).hexdigest()[:16]
+
+
+def shingles(text):
+    """crc32 hashes of the word 3-grams of ``text`` (lower-cased, punctuation dropped)"""
+    words = _WORD_RE.findall((text or "").lower())
+    if len(words) < SHINGLE_SIZE:
+        grams = words
+    else:
+        grams = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    return np.fromiter({zlib.crc32(g.encode("utf-8")) for g in grams}, dtype=np.uint64), len(words)
+
+
+def minhash(hashes):
+    """NUM_PERM uint32 MinHash of a shingle hash array"""
+    # (a*x + b) fits in uint64 since a, b and x are all below 2**32
+    values = (_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME
+    return values.min(axis=1).astype(np.uint32)
+
+
+def band_keys(signature):
+    """Signed 64-bit key per LSH band of one signature; equal keys mean an equal band"""
+    raw = np.asarray(signature, dtype="<u4").tobytes()
+    width = ROWS * 4
+    return [
+        int.from_bytes(
+            hashlib.blake2b(bytes([band]) + raw[band * width:(band + 1) * width], digest_size=8).digest(),
+            "little", signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def cluster_signatures(ids, signatures, threshold):
+    """
+    Near-duplicate clusters among ``signatures`` (n x NUM_PERM uint32 array).
+
+    Rows sharing any LSH band are candidates; each candidate is checked
+    against the first row of its bucket with the estimated Jaccard
+    similarity, so a bucket costs O(size) comparisons rather than O(size^2).
+    Returns {id: (representative id, best similarity)} for clustered rows only.
+    """
+    n = len(ids)
+    if n < 2:
+        return {}
+    parent = list(range(n))
+    best = np.zeros(n, dtype=np.float32)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(BANDS):
+        chunk = np.ascontiguousarray(signatures[:, band * ROWS:(band + 1) * ROWS])
+        keys = chunk.view(np.dtype((np.void, chunk.dtype.itemsize * ROWS))).ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        # Start of each run of equal band values
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], n]
+        for start, end in zip(starts, ends):
+            if end - start < 2:
+                continue
+            members = order[start:end]
+            head = members[0]
+            similarity = (signatures[members[1:]] == signatures[head]).mean(axis=1)
+            for member, sim in zip(members[1:], similarity):
+                if sim >= threshold:
+                    best[member] = max(best[member], sim)
+                    best[head] = max(best[head], sim)
+                    root_a, root_b = find(head), find(member)
+                    if root_a != root_b:
+                        parent[root_b] = root_a
+
+    clusters = {}
+    for i in range(n):
+        clusters.setdefault(find(i), []).append(i)
+    result = {}
+    for members in clusters.values():
+        if len(members) < 2:
+            continue
+        representative = min(ids[i] for i in members)
+        for i in members:
+            result[ids[i]] = (representative, float(best[i]))
+    return result
+
+
+class AnswerSimilarityEngine:
+    """
+    Flags near-duplicate answers to the same question across a link's candidates.
+
+    Each answer gets a MinHash signature (NUM_PERM uint32 values in an
+    AnswerSignature row) keyed by a group: the public link plus the
+    question's wording, and its LSH band keys as AnswerBand rows. A new
+    answer is compared only with the answers it shares a band with and
+    merged into their clusters, so saving an answer costs its bucket mates,
+    not its group. An edited answer may have to leave its cluster, which
+    only a full re-cluster of the group can do; that, and
+    process_pending(recluster_all=True), cluster whole groups with LSH one
+    at a time, so memory is bounded by the largest group. Work runs on a
+    background thread after the answer is committed
+    (ANSWER_SIMILARITY_WORKERS = 0 runs it inline); detect_duplicate_answers
+    processes anything missed.
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, max_workers=None):
+        if max_workers is None:
+            max_workers = getattr(settings, "ANSWER_SIMILARITY_WORKERS", 1)
+        self.max_workers = max_workers
+        self.threshold = getattr(settings, "ANSWER_DUPLICATE_THRESHOLD", 0.6)
+        self.min_words = getattr(settings, "ANSWER_DUPLICATE_MIN_WORDS", 8)
+        self._lock = threading.Lock()
+        self._executor = None
+        # Answers of one group are clustered one at a time; striped so the lock count stays fixed
+        self._group_locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+    def enqueue(self, answer_id):
+        transaction.on_commit(lambda: self.submit(answer_id))
+
+    def submit(self, answer_id):
+        if self.max_workers <= 0:
+            self._process(answer_id)
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="answer-similarity")
+        self._executor.submit(self._run_in_worker, answer_id)
+
+    def _run_in_worker(self, answer_id):
+        try:
+            self._process(answer_id)
+        except Exception as e:
+            logger.exception("Duplicate detection for answer %s failed: %s", answer_id, e)
+        finally:
+            close_old_connections()
+
+    def _group_lock(self, group_key):
+        return self._group_locks[zlib.crc32(group_key.encode("utf-8")) % self.LOCK_STRIPES]
+
+    def _process(self, answer_id):
+        from interviews.models import InterviewAnswer
+
+        for row, replaced in self._sign(InterviewAnswer.objects.filter(pk=answer_id)):
+            with self._group_lock(row.group_key):
+                if replaced:
+                    self.cluster_group(row.group_key)
+                else:
+                    self.insert(row.answer_id, row.group_key, row.signature)
+
+    def group_key(self, answer):
+        session = answer.session
+        if not session.master_token:
+            return None
+        return f"{session.master_token.hex}:{question_hash(answer.question.question_text)}"
+
+    def sign(self, answers):
+        """Compute signatures for ``answers`` whose text changed; returns the group keys touched"""
+        return {row.group_key for row, _ in self._sign(answers)}
+
+    def _sign(self, answers):
+        """[(AnswerSignature, whether it replaced an earlier signature)] for answers whose text changed"""
+        from dashboard.models import AnswerSignature
+
+        answers = list(answers.select_related("session", "question"))
+        existing = dict(
+            AnswerSignature.objects.filter(answer_id__in=[a.pk for a in answers]).values_list("answer_id", "digest")
+        )
+        rows = []
+        for answer in answers:
+            group_key = self.group_key(answer)
+            if group_key is None:
+                continue
+            digest = hashlib.sha1(answer.answer_text.encode("utf-8")).hexdigest()
+            if existing.get(answer.pk) == digest:
+                continue
+            hashes, words = shingles(answer.answer_text)
+            # Very short answers ("Yes", "I don't know") are alike by nature
+            signature = minhash(hashes).astype("<u4").tobytes() if words >= self.min_words else b""
+            rows.append(AnswerSignature(answer_id=answer.pk, group_key=group_key, digest=digest, signature=signature))
+        if rows:
+            AnswerSignature.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["answer"],
+                update_fields=["group_key", "digest", "signature", "updated_at"],
+            )
+            self._index_bands([(row.answer_id, row.group_key, row.signature) for row in rows])
+        return [(row, row.answer_id in existing) for row in rows]
+
+    def _index_bands(self, rows):
+        """Replace the AnswerBand rows of (answer id, group key, signature bytes) ``rows``"""
+        from dashboard.models import AnswerBand
+
+        AnswerBand.objects.filter(answer_id__in=[answer_id for answer_id, _, _ in rows]).delete()
+        AnswerBand.objects.bulk_create(
+            [
+                AnswerBand(answer_id=answer_id, group_key=group_key, key=key)
+                for answer_id, group_key, signature in rows if signature
+                for key in band_keys(np.frombuffer(signature, dtype="<u4"))
+            ],
+            batch_size=1000,
+        )
+
+    def insert(self, answer_id, group_key, signature):
+        """
+        Cluster one newly signed answer against the answers it shares an LSH
+        band with, merging their clusters; returns its cluster or None.
+        """
+        from dashboard.models import AnswerBand, AnswerSignature
+
+        if not signature:
+            return None
+        vector = np.frombuffer(signature, dtype="<u4")
+        mate_ids = (
+            AnswerBand.objects.filter(group_key=group_key, key__in=band_keys(vector))
+            .exclude(answer_id=answer_id).values_list("answer_id", flat=True).distinct()
+        )
+        mates = list(
+            AnswerSignature.objects.filter(answer_id__in=list(mate_ids))
+            .values_list("answer_id", "signature", "cluster", "similarity")
+        )
+        if not mates:
+            return None
+        matrix = np.vstack([np.frombuffer(mate_signature, dtype="<u4") for _, mate_signature, _, _ in mates])
+        similarity = (matrix == vector).mean(axis=1)
+        matched = [(mate, float(sim)) for mate, sim in zip(mates, similarity) if sim >= self.threshold]
+        if not matched:
+            return None
+
+        # A cluster is named by its lowest answer id, so the merged one takes the lowest of them all
+        old_clusters = {cluster for (_, _, cluster, _), _ in matched if cluster is not None}
+        cluster = min(old_clusters | {answer_id} | {mate_id for (mate_id, _, _, _), _ in matched})
+        with transaction.atomic():
+            AnswerSignature.objects.filter(group_key=group_key, cluster__in=old_clusters - {cluster}).update(cluster=cluster)
+            for (mate_id, _, _, mate_similarity), sim in matched:
+                AnswerSignature.objects.filter(answer_id=mate_id).update(
+                    cluster=cluster, similarity=round(max(mate_similarity or 0.0, sim), 3),
+                )
+            AnswerSignature.objects.filter(answer_id=answer_id).update(
+                cluster=cluster, similarity=round(max(sim for _, sim in matched), 3),
+            )
+        return cluster
+
+    def cluster_group(self, group_key, reindex_bands=False):
+        """Re-cluster one group and store the changes; returns the number of flagged answers"""
+        from dashboard.models import AnswerSignature
+
+        ids, signatures, current = [], [], {}
+        for pk, answer_id, signature, cluster, similarity in AnswerSignature.objects.filter(
+            group_key=group_key,
+        ).values_list("pk", "answer_id", "signature", "cluster", "similarity").iterator(chunk_size=2000):
+            current[answer_id] = (pk, cluster, similarity)
+            if signature:
+                ids.append(answer_id)
+                signatures.append(np.frombuffer(signature, dtype="<u4"))
+        if reindex_bands:
+            self._index_bands([(answer_id, group_key, signature.tobytes()) for answer_id, signature in zip(ids, signatures)])
+        matrix = np.vstack(signatures) if signatures else np.zeros((0, NUM_PERM), dtype=np.uint32)
+        clusters = cluster_signatures(ids, matrix, self.threshold)
+
+        changed = []
+        for answer_id, (pk, cluster, similarity) in current.items():
+            new_cluster, new_similarity = clusters.get(answer_id, (None, None))
+            if new_similarity is not None:
+                new_similarity = round(new_similarity, 3)
+            if (cluster, similarity) != (new_cluster, new_similarity):
+                changed.append(AnswerSignature(pk=pk, cluster=new_cluster, similarity=new_similarity))
+        if changed:
+            AnswerSignature.objects.bulk_update(changed, ["cluster", "similarity"], batch_size=500)
+        return len(clusters)
+
+    def process_pending(self, batch_size=1000, recluster_all=False):
+        """Sign answers that have no signature (all with ``recluster_all``) and re-cluster their groups; returns (answers, groups)"""
+        from dashboard.models import AnswerSignature
+        from interviews.models import InterviewAnswer
+
+        queryset = InterviewAnswer.objects.filter(session__master_token__isnull=False)
+        if not recluster_all:
+            queryset = queryset.filter(signature__isnull=True)
+        groups = set()
+        pks = list(queryset.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(pks), batch_size):
+            groups |= self.sign(InterviewAnswer.objects.filter(pk__in=pks[start:start + batch_size]))
+        if recluster_all:
+            groups = set(AnswerSignature.objects.values_list("group_key", flat=True).distinct())
+        for group_key in sorted(groups):
+            with self._group_lock(group_key):
+                self.cluster_group(group_key, reindex_bands=recluster_all)
+        return len(pks), len(groups)
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_answer_similarity_engine():
+    """Process-wide duplicate answer engine"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AnswerSimilarityEngine()
+        return _engine
+
+
+def duplicate_matches(answers):
+    """
+    {answer id: [(other session, similarity)]} for the given answers that sit
+    in a near-duplicate cluster; ``similarity`` is that answer's best match.
+    """
+    from dashboard.models import AnswerSignature
+    from interviews.models import InterviewSession
+
+    flagged = {
+        answer_id: (group_key, cluster, similarity)
+        for answer_id, group_key, cluster, similarity in AnswerSignature.objects.filter(
+            answer__in=answers, cluster__isnull=False,
+        ).values_list("answer_id", "group_key", "cluster", "similarity")
+    }
+    if not flagged:
+        return {}
+    members = {}
+    for group_key, cluster, answer_id, session_id in AnswerSignature.objects.filter(
+        group_key__in={g for g, _, _ in flagged.values()},
+        cluster__in={c for _, c, _ in flagged.values()},
+    ).values_list("group_key", "cluster", "answer_id", "answer__session_id"):
+        members.setdefault((group_key, cluster), []).append((answer_id, session_id))
+    sessions = InterviewSession.objects.only("pk", "candidate_name", "candidate_email").in_bulk(
+        {session_id for rows in members.values() for _, session_id in rows}
+    )
+    return {
+        answer_id: [
+            (sessions[session_id], similarity)
+            for other_id, session_id in members.get((group_key, cluster), [])
+            if other_id != answer_id and session_id in sessions
+        ]
+        for answer_id, (group_key, cluster, similarity) in flagged.items()
+    }
@@ -0,0 +1,326 @@
+import csv
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import django
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connections, transaction
+from django.db.models.functions import Lower
+from .match_engine import index_candidate_vectors
+from .resume_parser import ResumeParser, file_sha256
+from .search_index import reindex_on_commit
+from .skill_index import index_candidate_skills
+from .storage_service import StorageService
+
+logger = logging.getLogger(__name__)
+
+RESUME_EXTENSIONS = (".pdf", ".docx")
+
+
+def _init_worker():
+    # Workers are spawned, not forked, so each sets up its own app registry.
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _parse_file(path):
+    """Process-pool task: extract and parse one resume. No database access."""
+    with open(path, "rb") as file:
+        text = ResumeParser.extract_text(file)
+    return text, ResumeParser.parse_text(text)
+
+
+def collect_directory(path):
+    """[(file name, path)] for every resume below ``path``"""
+    files = []
+    for root, _, names in os.walk(path):
+        for name in sorted(names):
+            if name.lower().endswith(RESUME_EXTENSIONS) and not name.startswith("."):
+                files.append((name, os.path.join(root, name)))
+    return files
+
+
+def unpack_archive(archive, dest):
+    """
+    Extract resumes from a ZIP into ``dest`` and return [(file name, path)].
+
+    Members are written under generated flat names (never the archive's own
+    paths), and the file count and uncompressed size are capped by
+    BULK_IMPORT_MAX_FILES / BULK_IMPORT_MAX_BYTES.
+    """
+    max_files = getattr(settings, "BULK_IMPORT_MAX_FILES", 5000)
+    max_bytes = getattr(settings, "BULK_IMPORT_MAX_BYTES", 500 * 1024 * 1024)
+    files = []
+    total_bytes = 0
+    with zipfile.ZipFile(archive) as zf:
+        for info in zf.infolist():
+            name = os.path.basename(info.filename)
+            # Skips directories and macOS "._" resource forks
+            if info.is_dir() or name.startswith(".") or not name.lower().endswith(RESUME_EXTENSIONS):
+                continue
+            if len(files) >= max_files:
+                raise ValueError(f"Archive contains more than {max_files} resumes")
+            total_bytes += info.file_size
+            if total_bytes > max_bytes:
+                raise ValueError("Archive is too large once extracted")
+            target = os.path.join(dest, f"{len(files):05d}{os.path.splitext(name)[1].lower()}")
+            with zf.open(info) as src, open(target, "wb") as out:
+                shutil.copyfileobj(src, out, 1024 * 1024)
+            files.append((name, target))
+    return files
+
+
+def save_uploads(uploads, dest):
+    """Copy uploaded files (e.g. a folder picked in the browser) into ``dest``"""
+    files = []
+    for upload in uploads:
+        name = os.path.basename(upload.name)
+        if not name.lower().endswith(RESUME_EXTENSIONS):
+            continue
+        target = os.path.join(dest, f"{len(files):05d}{os.path.splitext(name)[1].lower()}")
+        with open(target, "wb") as out:
+            for chunk in upload.chunks():
+                out.write(chunk)
+        files.append((name, target))
+    return files
+
+
+def read_manifest(lines):
+    """
+    Manifest rows keyed by lower-cased file name. Columns: file, name, email,
+    phone (header names are case-insensitive; only ``file`` is required).
+    """
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames or "file" not in {f.strip().lower() for f in reader.fieldnames}:
+        raise ValueError("Manifest needs a 'file' column")
+    manifest = {}
+    for row in reader:
+        row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+        if row.get("file"):
+            manifest[os.path.basename(row["file"]).lower()] = row
+    return manifest
+
+
+class BulkResumeImporter:
+    """
+    Creates Candidate rows from a batch of resume files.
+
+    Files are hashed first so identical uploads are parsed once; resumes
+    already in the ParsedResume cache are not parsed again. The rest are
+    parsed in a ProcessPoolExecutor (BULK_IMPORT_WORKERS, default one per
+    core). Candidates are deduplicated by email against each other and the
+    database, then written with bulk_create in chunks of BULK_IMPORT_CHUNK_SIZE.
+    Manifest values (name, email, phone) override what was parsed.
+    Candidates are recorded as created by ``created_by``.
+    """
+
+    def __init__(self, workers=None, chunk_size=None, progress=None, created_by=None):
+        self.workers = workers or getattr(settings, "BULK_IMPORT_WORKERS", None) or os.cpu_count() or 1
+        self.chunk_size = chunk_size or getattr(settings, "BULK_IMPORT_CHUNK_SIZE", 500)
+        self.progress = progress
+        self.created_by = created_by
+
+    def _report_progress(self, report):
+        if self.progress:
+            self.progress(report)
+
+    def _fail(self, report, name, error):
+        report["errors"].append({"file": name, "error": str(error)})
+        report["processed"] += 1
+
+    def run(self, files, manifest=None):
+        """Import [(file name, path)]; returns counts and a per-file error list"""
+        from dashboard.models import ParsedResume
+
+        manifest = manifest or {}
+        report = {"total": len(files), "processed": 0, "created": 0, "duplicates": 0, "errors": []}
+
+        # 1. Hash and drop identical files
+        unique = {}
+        for name, path in files:
+            try:
+                with open(path, "rb") as file:
+                    digest = file_sha256(file)
+            except OSError as e:
+                self._fail(report, name, e)
+                continue
+            if digest in unique:
+                report["duplicates"] += 1
+                report["processed"] += 1
+                continue
+            unique[digest] = (name, path)
+        self._report_progress(report)
+
+        # 2. Reuse cached parses, parse the rest in worker processes
+        parsed = {}
+        for cached in ParsedResume.objects.filter(sha256__in=list(unique)):
+            ResumeParser.refresh(cached)
+            parsed[cached.sha256] = (cached.text, cached.data)
+        new_parses = self._parse_all(unique, parsed, report)
+        ParsedResume.objects.bulk_create(
+            [ParsedResume(sha256=digest, text=text, data=data) for digest, (text, data) in new_parses.items()],
+            batch_size=self.chunk_size,
+            ignore_conflicts=True,
+        )
+
+        # 3. Build candidates, one per email
+        rows = []
+        seen_emails = set()
+        for digest, (name, path) in unique.items():
+            if digest not in parsed:
+                continue
+            text, data = parsed[digest]
+            extra = manifest.get(name.lower(), {})
+            email = (extra.get("email") or data.get("email") or "").strip().lower()
+            if not email:
+                self._fail(report, name, "No email address in manifest or resume")
+                continue
+            if email in seen_emails:
+                report["duplicates"] += 1
+                report["processed"] += 1
+                continue
+            seen_emails.add(email)
+            rows.append((name, path, digest, email, extra, text, data))
+
+        existing = self._existing_emails(seen_emails)
+        for chunk_start in range(0, len(rows), self.chunk_size):
+            self._create_chunk(rows[chunk_start:chunk_start + self.chunk_size], existing, report)
+            self._report_progress(report)
+        return report
+
+    def _parse_all(self, unique, parsed, report):
+        pending = {digest: entry for digest, entry in unique.items() if digest not in parsed}
+        if not pending:
+            return {}
+
+        # Imports also run on a thread of the web process, whose other threads
+        # (DB connections, logging, dispatcher and limiter) may hold locks a
+        # forked child would inherit locked; spawn fresh interpreters instead.
+        connections.close_all()
+
+        new_parses = {}
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(pending)), initializer=_init_worker,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            futures = {pool.submit(_parse_file, path): digest for digest, (_, path) in pending.items()}
+            for done, future in enumerate(as_completed(futures), 1):
+                digest = futures[future]
+                try:
+                    new_parses[digest] = parsed[digest] = future.result()
+                except Exception as e:
+                    self._fail(report, pending[digest][0], e)
+                if done % 50 == 0:
+                    self._report_progress(report)
+        return new_parses
+
+    def _existing_emails(self, emails):
+        from candidates.models import Candidate
+
+        existing = set()
+        emails = list(emails)
+        for start in range(0, len(emails), self.chunk_size):
+            existing.update(
+                Candidate.objects.annotate(email_lower=Lower("email"))
+                .filter(email_lower__in=emails[start:start + self.chunk_size])
+                .values_list("email_lower", flat=True)
+            )
+        return existing
+
+    def _create_chunk(self, rows, existing, report):
+        from candidates.models import Candidate
+
+        storage = StorageService()
+        candidates = []
+        names = []
+        for name, path, digest, email, extra, text, data in rows:
+            if email in existing:
+                report["duplicates"] += 1
+                report["processed"] += 1
+                continue
+            try:
+                with open(path, "rb") as file:
+                    stored = storage.store(file, name=name)
+            except OSError as e:
+                self._fail(report, name, e)
+                continue
+            candidates.append(Candidate(
+                created_by=self.created_by,
+                name=extra.get("name") or data.get("name") or os.path.splitext(name)[0].replace("_", " ").title(),
+                email=email,
+                phone=(extra.get("phone") or data.get("phone") or "")[:20],
+                resume_file=stored,
+                resume_data={**data, "full_text": text, "sha256": digest},
+                skills=data.get("skills", []),
+                experience_years=data.get("experience_years"),
+                education=data.get("education", ""),
+            ))
+            names.append(name)
+
+        try:
+            with transaction.atomic():
+                Candidate.objects.bulk_create(candidates)
+                # bulk_create sends no post_save signals
+                index_candidate_skills(candidates)
+                index_candidate_vectors(candidates)
+                reindex_on_commit("candidate", [candidate.pk for candidate in candidates])
+            report["created"] += len(candidates)
+            report["processed"] += len(candidates)
+        except IntegrityError:
+            # Someone added one of these emails meanwhile; fall back to row by row.
+            for name, candidate in zip(names, candidates):
+                try:
+                    with transaction.atomic():
+                        candidate.save()
+                    report["created"] += 1
+                    report["processed"] += 1
+                except IntegrityError:
+                    storage.release(candidate.resume_file.name)
+                    report["duplicates"] += 1
+                    report["processed"] += 1
+
+
+def run_import_job(job_id, files, manifest, workdir):
+    """Run a CandidateImport recorded by the upload view, then remove its temp files"""
+    from candidates.models import CandidateImport
+
+    def save_progress(report):
+        CandidateImport.objects.filter(pk=job_id).update(
+            processed=report["processed"],
+            created_count=report["created"],
+            duplicate_count=report["duplicates"],
+            errors=report["errors"],
+        )
+
+    try:
+        CandidateImport.objects.filter(pk=job_id).update(status="running")
+        job = CandidateImport.objects.select_related("created_by").get(pk=job_id)
+        report = BulkResumeImporter(progress=save_progress, created_by=job.created_by).run(files, manifest)
+        save_progress(report)
+        CandidateImport.objects.filter(pk=job_id).update(status="done")
+    except Exception as e:
+        logger.exception("Candidate import %s failed: %s", job_id, e)
+        CandidateImport.objects.filter(pk=job_id).update(
+            status="failed", errors=[{"file": "", "error": str(e)}],
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        close_old_connections()
+
+
+_import_executor = None
+_import_lock = threading.Lock()
+
+
+def start_import_job(job_id, files, manifest, workdir):
+    """Queue an import on this process's import thread; one import runs at a time"""
+    global _import_executor
+    with _import_lock:
+        if _import_executor is None:
+            _import_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="candidate-import")
+    return _import_executor.submit(run_import_job, job_id, files, manifest, workdir)
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import threading
+import numpy as np
+from django.conf import settings
+from django.db.models import F, Sum
+from .answer_similarity import minhash, normalize_question, question_hash, shingles
+
+logger = logging.getLogger(__name__)
+
+
+def key_points_digest(expected_key_points):
+    points = [normalize_question(str(kp)) for kp in expected_key_points or []]
+    return hashlib.sha1(json.dumps(points).encode("utf-8")).hexdigest()[:16]
+
+
+def answer_hash(answer):
+    """Hash of the answer with case, punctuation and spacing removed"""
+    return hashlib.sha1(normalize_question(answer).encode("utf-8")).hexdigest()
+
+
+class EvaluationCache:
+    """
+    Memoizes model evaluations per (question wording, expected key points,
+    evaluator, normalized answer).
+
+    Questions are keyed by the hash of their wording, so the copies of a
+    link's questions in every candidate session share entries; by a digest
+    of the expected key points, so links asking the same question against
+    different key points keep separate entries; and by the evaluator
+    version (provider, model and prompt version, see
+    GeminiService.evaluation_version), so a model or prompt change starts
+    from an empty cache instead of serving old evaluations.
+
+    With EVALUATION_CACHE_NEAR_DUPLICATES, answers of at least
+    ANSWER_DUPLICATE_MIN_WORDS words that miss the exact tier reuse the
+    evaluation of the most similar cached answer (MinHash estimate, at
+    least EVALUATION_CACHE_NEAR_THRESHOLD) among the question's
+    EVALUATION_CACHE_NEAR_CANDIDATES most recent entries.
+    """
+
+    def __init__(self):
+        self.near_duplicates = getattr(settings, "EVALUATION_CACHE_NEAR_DUPLICATES", False)
+        self.near_threshold = getattr(settings, "EVALUATION_CACHE_NEAR_THRESHOLD", 0.9)
+        self.near_candidates = getattr(settings, "EVALUATION_CACHE_NEAR_CANDIDATES", 1000)
+        self.min_words = getattr(settings, "ANSWER_DUPLICATE_MIN_WORDS", 8)
+
+    def _question(self, question, expected_key_points, version):
+        from dashboard.models import EvaluationCacheQuestion
+
+        row, _ = EvaluationCacheQuestion.objects.get_or_create(
+            question_hash=question_hash(question), evaluator_version=version,
+            key_points_digest=key_points_digest(expected_key_points),
+        )
+        return row
+
+    def _signature(self, answer):
+        hashes, words = shingles(answer)
+        return minhash(hashes).astype("<u4").tobytes() if words >= self.min_words else b""
+
+    def get(self, question, answer, expected_key_points, version=""):
+        """Cached evaluation by ``version`` for this answer (or a near-identical one), or None"""
+        from dashboard.models import EvaluationCacheEntry, EvaluationCacheQuestion
+
+        row = self._question(question, expected_key_points, version)
+        counters = EvaluationCacheQuestion.objects.filter(pk=row.pk)
+        entry = EvaluationCacheEntry.objects.filter(question=row, answer_hash=answer_hash(answer)).only("pk", "evaluation").first()
+        tier = "exact_hits"
+        if entry is None and self.near_duplicates:
+            entry = self._nearest(row, answer)
+            tier = "near_hits"
+        if entry is None:
+            counters.update(lookups=F("lookups") + 1)
+            return None
+        counters.update(lookups=F("lookups") + 1, **{tier: F(tier) + 1})
+        EvaluationCacheEntry.objects.filter(pk=entry.pk).update(hits=F("hits") + 1)
+        return {**entry.evaluation, "source": "cache"}
+
+    def _nearest(self, row, answer):
+        from dashboard.models import EvaluationCacheEntry
+
+        signature = self._signature(answer)
+        if not signature:
+            return None
+        rows = list(
+            EvaluationCacheEntry.objects.filter(question=row).exclude(signature=b"")
+            .order_by("-pk").values_list("pk", "signature")[:self.near_candidates]
+        )
+        if not rows:
+            return None
+        matrix = np.vstack([np.frombuffer(sig, dtype="<u4") for _, sig in rows])
+        similarity = (matrix == np.frombuffer(signature, dtype="<u4")).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] < self.near_threshold:
+            return None
+        return EvaluationCacheEntry.objects.filter(pk=rows[best][0]).only("pk", "evaluation").first()
+
+    def put(self, question, answer, expected_key_points, evaluation, version=""):
+        from dashboard.models import EvaluationCacheEntry
+
+        if evaluation.get("source", "llm") != "llm":
+            return  # fallbacks, local scores and cache hits are not model evaluations
+        row = self._question(question, expected_key_points, version)
+        EvaluationCacheEntry.objects.update_or_create(
+            question=row, answer_hash=answer_hash(answer),
+            defaults={
+                "signature": self._signature(answer),
+                "evaluation": {key: value for key, value in evaluation.items() if key != "source"},
+            },
+        )
+
+    def invalidate(self, question=None, keep_version=None):
+        """
+        Drop cached evaluations for one question wording, or all of them;
+        with ``keep_version``, only those made by other evaluators. Returns
+        the number of entries removed.
+        """
+        from dashboard.models import EvaluationCacheEntry
+
+        entries = EvaluationCacheEntry.objects.all()
+        if question is not None:
+            entries = entries.filter(question__question_hash=question_hash(question))
+        if keep_version is not None:
+            entries = entries.exclude(question__evaluator_version=keep_version)
+        return entries.delete()[1].get("dashboard.EvaluationCacheEntry", 0)
+
+    def stats(self):
+        """Lookup and hit totals over all questions"""
+        from dashboard.models import EvaluationCacheEntry, EvaluationCacheQuestion
+
+        totals = EvaluationCacheQuestion.objects.aggregate(
+            lookups=Sum("lookups"), exact_hits=Sum("exact_hits"), near_hits=Sum("near_hits"),
+        )
+        totals = {key: value or 0 for key, value in totals.items()}
+        hits = totals["exact_hits"] + totals["near_hits"]
+        totals["hit_rate"] = round(hits / totals["lookups"], 3) if totals["lookups"] else 0.0
+        totals["entries"] = EvaluationCacheEntry.objects.count()
+        totals["questions"] = EvaluationCacheQuestion.objects.count()
+        return totals
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_evaluation_cache():
+    """Process-wide evaluation cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EvaluationCache()
+        return _cache
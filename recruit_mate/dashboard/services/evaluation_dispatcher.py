@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from .answer_prescorer import get_keypoint_scorer
+from .evaluation_cache import get_evaluation_cache
+from .gemini_service import GeminiService
+from .rate_limiter import RateLimitExceeded
+from .shadow_mode import get_shadow_runner, provider_name
+
+logger = logging.getLogger(__name__)
+
+
+class EvaluationDispatcher:
+    """
+    Micro-batches evaluate_answer calls across interview sessions.
+
+    Requests are collected for up to EVALUATION_BATCH_WINDOW_MS (or until
+    EVALUATION_BATCH_MAX_SIZE is reached) and sent to the model as one
+    multi-item prompt; each caller gets its own evaluation back through a
+    future. A window of 0 disables batching.
+
+    Before that, answers already evaluated for the same question are
+    answered from the evaluation cache (EVALUATION_CACHE_ENABLED), and the
+    rest are pre-scored locally against the question's expected key points
+    (PRESCORE_ENABLED); only those the local scorer is unsure about are sent
+    to the model. Model evaluations are added to the cache, keyed by the
+    service's evaluation_version(); fallback scores never are. When the model
+    quota cannot be had within LLM_RATE_LIMIT_MAX_WAIT, callers get
+    RateLimitExceeded rather than a made-up score.
+    """
+
+    def __init__(self, service_class=GeminiService, window_ms=None, max_batch_size=None, max_workers=None,
+                 prescorer=None, cache=None):
+        self.service_class = service_class
+        if prescorer is None and getattr(settings, "PRESCORE_ENABLED", True):
+            prescorer = get_keypoint_scorer()
+        self.prescorer = prescorer
+        if cache is None and getattr(settings, "EVALUATION_CACHE_ENABLED", True):
+            cache = get_evaluation_cache()
+        self.cache = cache
+        self.version = service_class.evaluation_version()
+        if window_ms is None:
+            window_ms = getattr(settings, "EVALUATION_BATCH_WINDOW_MS", 100)
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size or getattr(settings, "EVALUATION_BATCH_MAX_SIZE", 20)
+        self.max_workers = max_workers or getattr(settings, "EVALUATION_BATCH_WORKERS", 4)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._collector = None
+        self._executor = None
+
+    def _without_model(self, question, answer, expected_key_points):
+        """Cached or confident local evaluation, or None if the model has to decide"""
+        if self.cache is not None:
+            cached = self.cache.get(question, answer, expected_key_points, self.version)
+            if cached is not None:
+                return cached
+        if self.prescorer is not None:
+            prescore = self.prescorer.score(question, answer, expected_key_points)
+            if not prescore.escalate:
+                return self.prescorer.evaluation(prescore)
+        return None
+
+    def _remember(self, question, answer, expected_key_points, evaluation):
+        if self.cache is not None and evaluation.get("source") == "llm":
+            self.cache.put(question, answer, expected_key_points, evaluation, self.version)
+
+    def submit(self, question, answer, expected_key_points):
+        """Queue an answer for the model; the future resolves to its evaluation"""
+        future = Future()
+        item = {
+            "question": question,
+            "answer": answer,
+            "expected_key_points": expected_key_points,
+        }
+        if self.window <= 0:
+            self._dispatch([(item, future)])
+            return future
+        self._ensure_started()
+        self._queue.put((item, future))
+        return future
+
+    def evaluate(self, question, answer, expected_key_points):
+        evaluation = self._without_model(question, answer, expected_key_points)
+        if evaluation is None:
+            evaluation = self.submit(question, answer, expected_key_points).result()
+            self._remember(question, answer, expected_key_points, evaluation)
+        return evaluation
+
+    async def aevaluate(self, question, answer, expected_key_points):
+        evaluation = await sync_to_async(self._without_model)(question, answer, expected_key_points)
+        if evaluation is None:
+            if self.window <= 0:
+                # Without batching submit() calls the model (and the database-backed
+                # limiter) inline; that has to happen off the event loop.
+                future = await sync_to_async(self.submit, thread_sensitive=False)(
+                    question, answer, expected_key_points,
+                )
+            else:
+                future = self.submit(question, answer, expected_key_points)
+            # Waiting callers only hold a future, never a thread.
+            evaluation = await asyncio.wrap_future(future)
+            await sync_to_async(self._remember)(question, answer, expected_key_points, evaluation)
+        return evaluation
+
+    def _ensure_started(self):
+        # Started lazily so forked gunicorn workers each get their own thread.
+        with self._lock:
+            if self._collector is None or not self._collector.is_alive():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="evaluation-batch")
+                self._collector = threading.Thread(target=self._collect, name="evaluation-collector", daemon=True)
+                self._collector.start()
+
+    def _collect(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # Keep collecting the next window while this batch is in flight.
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch):
+        # Whatever goes wrong, every caller's future must resolve or it waits forever.
+        try:
+            self._evaluate_batch(batch)
+        except Exception as e:
+            if isinstance(e, RateLimitExceeded):
+                logger.warning("Evaluation batch of %d got no quota: %s", len(batch), e)
+            else:
+                logger.exception("Evaluation batch of %d failed: %s", len(batch), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _evaluate_batch(self, batch):
+        items = [item for item, _ in batch]
+        started = time.monotonic()
+        try:
+            results = self.service_class().evaluate_answers(items)
+            logger.info("Evaluated batch of %d answers in one request", len(items))
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            logger.exception("Evaluation batch of %d failed: %s", len(items), e)
+            results = [None] * len(items)
+        elapsed_ms = (time.monotonic() - started) * 1000
+
+        shadow = get_shadow_runner()
+        for (item, future), result in zip(batch, results):
+            if result is None:
+                result = {"score": 50, "feedback": "Evaluation failed.", "strengths": [], "improvements": [], "source": "fallback"}
+            # The services' own per-item fallbacks are made-up scores too
+            failed = result.get("source") == "fallback"
+            future.set_result({"source": "llm", **result})
+            if shadow.enabled("evaluate_answer"):
+                shadow.mirror(
+                    "evaluate_answer", (item["question"], item["answer"], item["expected_key_points"]),
+                    provider_name(self.service_class), result, elapsed_ms,
+                    primary_failed=failed, batch_size=len(items),
+                )
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_evaluation_dispatcher():
+    """Process-wide dispatcher shared by all sessions"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = EvaluationDispatcher()
+        return _dispatcher
@@ -1,17 +1,36 @@
 import google.generativeai as genai
+from asgiref.sync import sync_to_async
 from django.conf import settings
-import json
-import re
+from .llm_json import (
+    EVALUATION_BATCH_SCHEMA, EVALUATION_SCHEMA, QUESTIONS_SCHEMA, REPORT_SCHEMA, SKILLS_SCHEMA,
+    extract_json, parse_llm_json,
+)
+from .prompt_builder import (
+    compact_interview_data, compact_json, estimate_tokens, get_budget, log_llm_call, truncate_to_budget,
+)
+from .rate_limiter import BACKGROUND, INTERACTIVE, RateLimitExceeded, get_rate_limiter
 import logging
+import random
+import time
 
 logger = logging.getLogger(__name__)
 
 class GeminiService:
+    provider = "gemini"
+    model_name = "models/gemini-flash-lite-latest"
+    # Bump when the evaluation prompts change; cached evaluations are kept per version
+    evaluation_prompt_version = 1
+
     def __init__(self):
         genai.configure(api_key=settings.GEMINI_API_KEY)
 
         # Use valid model (gemini-pro is deprecated)
-        self.model = genai.GenerativeModel("models/gemini-flash-lite-latest")
+        self.model = genai.GenerativeModel(self.model_name)
+
+    @classmethod
+    def evaluation_version(cls):
+        """Model and prompt that answer evaluations come from"""
+        return f"{cls.provider}:{cls.model_name}:p{cls.evaluation_prompt_version}"
 
 
 
@@ -25,25 +44,26 @@ class GeminiService:
         except Exception:
             return ""
 
-    def _extract_json(self, text):
-        if not text:
-            return None
-
-        cleaned = text.strip()
-
-        try:
-            return json.loads(cleaned)
-        except:
-            pass
+    def _generate(self, prompt, priority=INTERACTIVE, operation="generate"):
+        get_rate_limiter().acquire("gemini", estimate_tokens(prompt), priority)
+        started = time.monotonic()
+        response = self.model.generate_content(prompt)
+        log_llm_call("gemini", operation, prompt, (time.monotonic() - started) * 1000)
+        return self._get_text(response)
+
+    async def _agenerate(self, prompt, priority=INTERACTIVE, operation="generate"):
+        if not getattr(settings, "ASYNC_LLM_CLIENTS", False):
+            # WSGI workers run every async view on a fresh event loop, which the
+            # cached gRPC aio client cannot follow; fall back to a worker thread.
+            return await sync_to_async(self._generate, thread_sensitive=False)(prompt, priority, operation)
+        await get_rate_limiter().aacquire("gemini", estimate_tokens(prompt), priority)
+        started = time.monotonic()
+        response = await self.model.generate_content_async(prompt)
+        log_llm_call("gemini", operation, prompt, (time.monotonic() - started) * 1000)
+        return self._get_text(response)
 
-        match = re.search(r'(\[.*\]|\{.*\})', cleaned, re.DOTALL)
-        if match:
-            try:
-                return json.loads(match.group(1))
-            except:
-                return None
-
-        return None
+    def _extract_json(self, text):
+        return extract_json(text)
 
     def _get_fallback_questions(self, num_questions):
         fallback = []
@@ -56,10 +76,9 @@ class GeminiService:
             })
         return fallback
 
-    def generate_questions(self, job_description, resume_data, num_questions=10):
-        
-        prompt = f"""
-        You are an AI that outputs ONLY valid JSON. 
+    def _questions_prompt(self, job_description, resume_data, num_questions):
+        return f"""
+        You are an AI that outputs ONLY valid JSON.
         NO explanation. NO markdown. NO other text.
 
         Generate exactly {num_questions} interview questions.
@@ -81,25 +100,39 @@ class GeminiService:
         {resume_data}
         """
 
+    def _parse_questions(self, text, num_questions):
+        data = parse_llm_json(text, QUESTIONS_SCHEMA)
+
+        if data:
+            return data[:num_questions]
+        return self._get_fallback_questions(num_questions)
+
+    def generate_questions(self, job_description, resume_data, num_questions=10, priority=BACKGROUND):
+        prompt = self._questions_prompt(job_description, resume_data, num_questions)
 
         try:
-            response = self.model.generate_content(prompt)
-            data = self._extract_json(self._get_text(response))
+            return self._parse_questions(self._generate(prompt, priority, "generate_questions"), num_questions)
 
-            if isinstance(data, list):
-                return data[:num_questions]
+        except Exception as e:
+            logger.exception("Question generation error: %s", e)
             return self._get_fallback_questions(num_questions)
 
+    async def agenerate_questions(self, job_description, resume_data, num_questions=10, priority=BACKGROUND):
+        prompt = self._questions_prompt(job_description, resume_data, num_questions)
+
+        try:
+            return self._parse_questions(await self._agenerate(prompt, priority, "generate_questions"), num_questions)
+
         except Exception as e:
             logger.exception("Question generation error: %s", e)
             return self._get_fallback_questions(num_questions)
 
-    def evaluate_answer(self, question, answer, expected_key_points):
-        prompt = f"""
+    def _evaluation_prompt(self, question, answer, expected_key_points):
+        return f"""
 Evaluate the following interview answer.
 
 Question: {question}
-Answer: {answer}
+Answer: {truncate_to_budget(answer, get_budget("evaluate_answer", "answer"))}
 
 Expected Key Points: {expected_key_points}
 
@@ -112,25 +145,118 @@ Return STRICT JSON ONLY:
 }}
 """
 
+    def _evaluation_fallback(self):
+        return {"score": 50, "feedback": "Evaluation failed.", "strengths": [], "improvements": [], "source": "fallback"}
+
+    def _parse_evaluation(self, text):
+        data = parse_llm_json(text, EVALUATION_SCHEMA)
+
+        if data is None:
+            return self._evaluation_fallback()
+        return data
+
+    def _batch_evaluation_prompt(self, items):
+        payload = [
+            {
+                "id": idx,
+                "question": item["question"],
+                "answer": truncate_to_budget(item["answer"], get_budget("evaluate_answer", "answer")),
+                "expected_key_points": item["expected_key_points"],
+            }
+            for idx, item in enumerate(items)
+        ]
+        return f"""
+Evaluate each of the following interview answers independently.
+Each answer is scored only against its own question and expected key points.
+
+Answers:
+{compact_json(payload)}
+
+Return STRICT JSON ONLY: an array with exactly one object per answer, keeping its "id":
+[
+  {{
+    "id": 0,
+    "score": 0-100,
+    "feedback": "",
+    "strengths": ["", ""],
+    "improvements": ["", ""]
+  }}
+]
+"""
+
+    def _parse_batch_evaluation(self, text, count):
+        """Map the model's array back onto request positions; None marks a missing item"""
+        data = parse_llm_json(text, EVALUATION_BATCH_SCHEMA) or []
+        results = [None] * count
+
+        for entry in data:
+            idx = entry.pop("id")
+            if 0 <= idx < count:
+                results[idx] = entry
+        return results
+
+    def evaluate_answers(self, items, priority=INTERACTIVE):
+        """Evaluate a list of {question, answer, expected_key_points} dicts in one request"""
+        if len(items) == 1:
+            item = items[0]
+            return [self.evaluate_answer(item["question"], item["answer"], item["expected_key_points"], priority)]
+
+        results = [None] * len(items)
+        missing = list(range(len(items)))
+        retries = getattr(settings, "EVALUATION_BATCH_RETRIES", 1)
+        for attempt in range(retries + 1):
+            if attempt:
+                # Back off, then send only what the model skipped or mangled as one new batch
+                time.sleep(getattr(settings, "EVALUATION_BATCH_RETRY_DELAY", 1.0) * 2 ** (attempt - 1) * random.uniform(1, 1.5))
+            batch = [items[idx] for idx in missing]
+            try:
+                parsed = self._parse_batch_evaluation(self._generate(self._batch_evaluation_prompt(batch), priority, "evaluate_answers"), len(batch))
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                logger.exception("Batch evaluation error: %s", e)
+                parsed = [None] * len(batch)
+            for idx, result in zip(missing, parsed):
+                results[idx] = result
+            missing = [idx for idx in missing if results[idx] is None]
+            if not missing:
+                break
+
+        for idx in missing:
+            results[idx] = self._evaluation_fallback()
+        return results
+
+    def evaluate_answer(self, question, answer, expected_key_points, priority=INTERACTIVE):
+        prompt = self._evaluation_prompt(question, answer, expected_key_points)
+
         try:
-            response = self.model.generate_content(prompt)
-            data = self._extract_json(self._get_text(response))
+            return self._parse_evaluation(self._generate(prompt, priority, "evaluate_answer"))
 
-            if not data:
-                return {"score": 50, "feedback": "Evaluation failed.", "strengths": [], "improvements": []}
+        except RateLimitExceeded:
+            # No quota is not a score; the caller decides whether to retry or tell the candidate
+            raise
+        except Exception as e:
+            logger.exception("Answer evaluation error: %s", e)
+            return self._evaluation_fallback()
 
-            data["score"] = max(0, min(100, int(data.get("score", 50))))
-            return data
+    async def aevaluate_answer(self, question, answer, expected_key_points, priority=INTERACTIVE):
+        prompt = self._evaluation_prompt(question, answer, expected_key_points)
 
-        except:
-            return {"score": 50, "feedback": "Evaluation failed.", "strengths": [], "improvements": []}
+        try:
+            return self._parse_evaluation(await self._agenerate(prompt, priority, "evaluate_answer"))
+
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            logger.exception("Answer evaluation error: %s", e)
+            return self._evaluation_fallback()
 
-    def generate_report(self, interview_data):
-        prompt = f"""
+    def _report_prompt(self, interview_data):
+        return f"""
 Generate a detailed interview report.
 
 Interview Data:
-{json.dumps(interview_data, indent=2)}
+{compact_json(compact_interview_data(interview_data))}
 
 Return STRICT JSON ONLY:
 {{
@@ -143,27 +269,50 @@ Return STRICT JSON ONLY:
 }}
 """
 
+    def _report_fallback(self, interview_data, summary):
+        avg = int(interview_data.get("average_score", 50))
+        return {"overall_score": avg, "summary": summary, "strengths": [], "weaknesses": [], "recommendation": "maybe"}
+
+    def _parse_report(self, text, interview_data):
+        data = parse_llm_json(text, REPORT_SCHEMA)
+
+        if data is None:
+            return self._report_fallback(interview_data, "Fallback")
+
+        if data["overall_score"] is None:
+            data["overall_score"] = int(interview_data.get("average_score", 50))
+        return data
+
+    def generate_report(self, interview_data, priority=INTERACTIVE):
+        prompt = self._report_prompt(interview_data)
+
         try:
-            response = self.model.generate_content(prompt)
-            data = self._extract_json(self._get_text(response))
+            return self._parse_report(self._generate(prompt, priority, "generate_report"), interview_data)
 
-            if not data:
-                avg = int(interview_data.get("average_score", 50))
-                return {"overall_score": avg, "summary": "Fallback", "strengths": [], "weaknesses": [], "recommendation": "maybe"}
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            logger.exception("Report generation error: %s", e)
+            return self._report_fallback(interview_data, "Error")
 
-            data["overall_score"] = max(0, min(100, int(data.get("overall_score", interview_data.get("average_score", 50)))))
-            return data
+    async def agenerate_report(self, interview_data, priority=INTERACTIVE):
+        prompt = self._report_prompt(interview_data)
 
-        except Exception:
-            avg = int(interview_data.get("average_score", 50))
-            return {"overall_score": avg, "summary": "Error", "strengths": [], "weaknesses": [], "recommendation": "maybe"}
+        try:
+            return self._parse_report(await self._agenerate(prompt, priority, "generate_report"), interview_data)
 
-    def extract_skills(self, text):
-        prompt = f"""
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            logger.exception("Report generation error: %s", e)
+            return self._report_fallback(interview_data, "Error")
+
+    def _skills_prompt(self, text):
+        return f"""
     Extract a list of technical skills from the following text.
 
     Text:
-    {text}
+    {truncate_to_budget(text, get_budget("extract_skills", "text"))}
 
     Return STRICT JSON ONLY:
     {{
@@ -171,17 +320,25 @@ Return STRICT JSON ONLY:
     }}
     """
 
-        try:
-            response = self.model.generate_content(prompt)
-            raw = self._get_text(response)
-            data = self._extract_json(raw)
+    def _parse_skills(self, raw):
+        return parse_llm_json(raw, SKILLS_SCHEMA) or []
 
-            if data and "skills" in data:
-                return data["skills"]
+    def extract_skills(self, text, priority=BACKGROUND):
+        prompt = self._skills_prompt(text)
 
-            return []
+        try:
+            return self._parse_skills(self._generate(prompt, priority, "extract_skills"))
 
         except Exception as e:
-            print("Skill extraction error:", e)
+            logger.exception("Skill extraction error: %s", e)
             return []
 
+    async def aextract_skills(self, text, priority=BACKGROUND):
+        prompt = self._skills_prompt(text)
+
+        try:
+            return self._parse_skills(await self._agenerate(prompt, priority, "extract_skills"))
+
+        except Exception as e:
+            logger.exception("Skill extraction error: %s", e)
+            return []
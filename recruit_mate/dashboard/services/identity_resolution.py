@@ -0,0 +1,238 @@
+import hashlib
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count
+from .answer_similarity import NUM_PERM, minhash, shingles
+
+logger = logging.getLogger(__name__)
+
+RESUME_BANDS = 16  # of 8 rows: resumes above ~0.7 similarity share a band
+_NAME_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+_GMAIL_DOMAINS = {"gmail.com", "googlemail.com"}
+
+
+def normalize_email(email):
+    """Lower-cased address without +tags (and without dots for Gmail, which ignores them)"""
+    email = (email or "").strip().lower()
+    if "@" not in email:
+        return email
+    local, domain = email.rsplit("@", 1)
+    local = local.split("+", 1)[0]
+    if domain in _GMAIL_DOMAINS:
+        local = local.replace(".", "")
+        domain = "gmail.com"
+    return f"{local}@{domain}"
+
+
+def normalize_phone(phone):
+    """Last nine digits, so +44 7700 900123 and 07700900123 agree; "" for too few digits"""
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-9:] if len(digits) >= 7 else ""
+
+
+def name_tokens(name):
+    return sorted({t for t in _NAME_RE.findall((name or "").lower()) if len(t) > 1})
+
+
+def resume_signature(text):
+    if not text or len(text.split()) < 30:
+        return b""
+    return minhash(shingles(text)[0]).astype("<u4").tobytes()
+
+
+def block_keys(record):
+    """Keys under which ``record`` is filed; records are only compared within a shared key"""
+    keys = set()
+    if record.email_key:
+        keys.add("e:" + record.email_key[:98])
+    if record.phone_key:
+        keys.add("p:" + record.phone_key)
+    tokens = record.name_key.split()
+    if len(tokens) >= 2:
+        keys.add("n:" + hashlib.sha1(record.name_key.encode("utf-8")).hexdigest()[:20])
+        # First and last token, so a middle name or initial does not split a block
+        keys.add("f:" + hashlib.sha1(f"{tokens[0]} {tokens[-1]}".encode("utf-8")).hexdigest()[:20])
+    if record.resume_sha256:
+        keys.add("h:" + record.resume_sha256)
+    if record.resume_signature:
+        signature = np.frombuffer(record.resume_signature, dtype="<u4")
+        rows = NUM_PERM // RESUME_BANDS
+        for band in range(RESUME_BANDS):
+            digest = hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()
+            keys.add(f"r{band}:{digest}")
+    return keys
+
+
+def match_score(a, b):
+    """
+    Evidence that two records are the same person, 0..1. The same
+    (normalized) email is conclusive; otherwise phone, name and resume
+    similarity add up, and no single one of them is enough on its own.
+    """
+    if a.email_key and a.email_key == b.email_key:
+        return 1.0
+    score = 0.0
+    if a.phone_key and a.phone_key == b.phone_key:
+        score += 0.45
+    names_a, names_b = set(a.name_key.split()), set(b.name_key.split())
+    if names_a and names_b:
+        overlap = len(names_a & names_b) / len(names_a | names_b)
+        if overlap == 1:
+            score += 0.35
+        elif overlap >= 0.5:
+            score += 0.2
+    if a.resume_sha256 and a.resume_sha256 == b.resume_sha256:
+        score += 0.6
+    elif a.resume_signature and b.resume_signature:
+        similarity = float((np.frombuffer(a.resume_signature, dtype="<u4")
+                            == np.frombuffer(b.resume_signature, dtype="<u4")).mean())
+        if similarity >= 0.8:
+            score += 0.5
+        elif similarity >= 0.5:
+            score += 0.25
+    return min(score, 1.0)
+
+
+class IdentityResolver:
+    """
+    Groups candidate sessions on a recruiter's links into CandidateIdentity rows.
+
+    Each session gets an IdentityRecord with normalized email, phone, name
+    tokens and a resume MinHash, filed under blocking keys (email, phone,
+    name, resume file hash, resume LSH bands). A new or updated session is
+    compared only with records sharing one of its keys, never the whole
+    pool, and joins (or merges) the identities it scores at least
+    IDENTITY_MATCH_THRESHOLD against. Keys shared by more than
+    IDENTITY_MAX_BLOCK_SIZE records are too common to be useful and skipped.
+    Sessions are resolved one at a time on a single background thread.
+    """
+
+    def __init__(self, max_workers=None):
+        if max_workers is None:
+            max_workers = getattr(settings, "IDENTITY_RESOLUTION_WORKERS", 1)
+        self.max_workers = max_workers
+        self.threshold = getattr(settings, "IDENTITY_MATCH_THRESHOLD", 0.7)
+        self.max_block_size = getattr(settings, "IDENTITY_MAX_BLOCK_SIZE", 200)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def enqueue(self, session_id):
+        transaction.on_commit(lambda: self.submit(session_id))
+
+    def submit(self, session_id):
+        if self.max_workers <= 0:
+            self.resolve(session_id)
+            return
+        with self._lock:
+            if self._executor is None:
+                # One worker: concurrent resolutions could each create an identity for the same person
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="identity-resolution")
+        self._executor.submit(self._run_in_worker, session_id)
+
+    def _run_in_worker(self, session_id):
+        try:
+            self.resolve(session_id)
+        except Exception as e:
+            logger.exception("Identity resolution for session %s failed: %s", session_id, e)
+        finally:
+            close_old_connections()
+
+    def _features(self, session):
+        data = session.candidate_resume_data or {}
+        return {
+            "email_key": normalize_email(session.candidate_email)[:255],
+            "phone_key": normalize_phone(session.candidate_phone),
+            "name_key": " ".join(name_tokens(session.candidate_name))[:255],
+            "resume_sha256": data.get("sha256", ""),
+            "resume_signature": resume_signature(data.get("full_text", "")),
+        }
+
+    def resolve(self, session_id):
+        """(Re)file one candidate session and return its CandidateIdentity, or None for non-candidate sessions"""
+        from candidates.models import CandidateIdentity, IdentityBlockKey, IdentityRecord
+        from interviews.models import InterviewSession
+
+        session = InterviewSession.objects.filter(pk=session_id, master_token__isnull=False).first()
+        if session is None or not (session.candidate_email or session.candidate_name):
+            return None
+
+        with transaction.atomic():
+            record = IdentityRecord.objects.select_for_update().filter(session=session).first()
+            features = self._features(session)
+            if record is None:
+                record = IdentityRecord(session=session, **features)
+            else:
+                for field, value in features.items():
+                    setattr(record, field, value)
+            keys = block_keys(record)
+
+            matched = {record.identity_id} if record.identity_id else set()
+            for other in self._block_candidates(session.user_id, keys, exclude=record.pk):
+                if other.identity_id not in matched and match_score(record, other) >= self.threshold:
+                    matched.add(other.identity_id)
+
+            if matched:
+                identity = CandidateIdentity.objects.get(pk=min(matched))  # the oldest one survives
+                merged = matched - {identity.pk}
+                if merged:
+                    IdentityRecord.objects.filter(identity_id__in=merged).update(identity=identity)
+                    CandidateIdentity.objects.filter(pk__in=merged).delete()
+            else:
+                identity = CandidateIdentity.objects.create(
+                    user_id=session.user_id, name=session.candidate_name, email=session.candidate_email,
+                )
+            record.identity = identity
+            record.save()
+
+            record.block_keys.all().delete()
+            IdentityBlockKey.objects.bulk_create(
+                [IdentityBlockKey(user_id=session.user_id, key=key, record=record) for key in keys]
+            )
+        return identity
+
+    def _block_candidates(self, user_id, keys, exclude=None):
+        from candidates.models import IdentityBlockKey, IdentityRecord
+
+        if not keys:
+            return []
+        sizes = IdentityBlockKey.objects.filter(user_id=user_id, key__in=keys).values("key").annotate(size=Count("pk"))
+        usable = [row["key"] for row in sizes if row["size"] <= self.max_block_size]
+        if not usable:
+            return []
+        return (
+            IdentityRecord.objects
+            .filter(pk__in=IdentityBlockKey.objects.filter(user_id=user_id, key__in=usable).values("record_id"))
+            .exclude(pk=exclude)
+        )
+
+    def resolve_pending(self, refresh=False, limit=None):
+        """Resolve candidate sessions without an identity (every one with ``refresh``); returns the count"""
+        from interviews.models import InterviewSession
+
+        queryset = InterviewSession.objects.filter(master_token__isnull=False).exclude(
+            candidate_email="", candidate_name="",
+        )
+        if not refresh:
+            queryset = queryset.filter(identity_record__isnull=True)
+        pks = list(queryset.order_by("created_at", "pk").values_list("pk", flat=True)[:limit])
+        for pk in pks:
+            self.resolve(pk)
+        return len(pks)
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_identity_resolver():
+    """Process-wide identity resolver"""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = IdentityResolver()
+        return _resolver
@@ -0,0 +1,155 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# (lowest percentile, bucket), best first
+BUCKETS = ((90, "top10"), (75, "top25"), (50, "top50"), (0, "rest"))
+FIELDS = ["score", "recommendation", "rank", "percentile", "bucket"]
+
+
+def rank_scores(scores):
+    """
+    (rank, percentile) arrays for ``scores`` sorted high to low. Equal scores
+    share the best rank; percentile is the share of the other candidates
+    with a lower score.
+    """
+    desc = -np.asarray(scores, dtype=np.int64)
+    n = len(desc)
+    ranks = np.searchsorted(desc, desc, side="left") + 1
+    below = n - np.searchsorted(desc, desc, side="right")
+    percentiles = np.rint(100 * below / (n - 1)).astype(int) if n > 1 else np.full(n, 100)
+    return ranks, percentiles
+
+
+def bucket(percentile):
+    return next(name for low, name in BUCKETS if percentile >= low)
+
+
+class Leaderboard:
+    """
+    Per-link ranking of completed candidates by InterviewResult.overall_score.
+
+    Ranks, percentiles and buckets are stored as LeaderboardEntry rows
+    indexed by (link, rank), so any page of a link's leaderboard, with or
+    without a recommendation filter, is one indexed range read. A link is
+    re-ranked whenever one of its results is written or removed: on a
+    background thread after commit (LEADERBOARD_WORKERS = 0 runs it inline),
+    with writes arriving meanwhile coalesced into one more pass. Only
+    entries whose place changed are written. rebuild_leaderboards re-ranks
+    every link.
+    """
+
+    def __init__(self, max_workers=None):
+        if max_workers is None:
+            max_workers = getattr(settings, "LEADERBOARD_WORKERS", 1)
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor = None
+        self._running = set()
+        self._dirty = set()
+
+    def enqueue(self, master_token):
+        if master_token:
+            transaction.on_commit(lambda: self.submit(master_token))
+
+    def submit(self, master_token):
+        if self.max_workers <= 0:
+            self._process(master_token)
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="leaderboard")
+        self._executor.submit(self._run_in_worker, master_token)
+
+    def _run_in_worker(self, master_token):
+        try:
+            self._process(master_token)
+        except Exception as e:
+            logger.exception("Ranking link %s failed: %s", master_token, e)
+        finally:
+            close_old_connections()
+
+    def _process(self, master_token):
+        with self._lock:
+            if master_token in self._running:
+                self._dirty.add(master_token)
+                return
+            self._running.add(master_token)
+        try:
+            while True:
+                self.refresh(master_token)
+                with self._lock:
+                    if master_token not in self._dirty:
+                        self._running.discard(master_token)
+                        break
+                    self._dirty.discard(master_token)
+        except Exception:
+            with self._lock:
+                self._running.discard(master_token)
+            raise
+
+    def refresh(self, master_token):
+        """Re-rank one link; returns the number of entries written or removed"""
+        from dashboard.models import LeaderboardEntry
+        from interviews.models import InterviewResult
+
+        rows = list(
+            InterviewResult.objects.filter(session__master_token=master_token)
+            .order_by("-overall_score", "session_id")
+            .values_list("session_id", "overall_score", "recommendation")
+        )
+        ranks, percentiles = rank_scores([score for _, score, _ in rows])
+        existing = {entry.session_id: entry for entry in LeaderboardEntry.objects.filter(master_token=master_token)}
+
+        created, updated = [], []
+        for (session_id, score, recommendation), rank, percentile in zip(rows, ranks, percentiles):
+            values = {
+                "score": score, "recommendation": recommendation, "rank": int(rank),
+                "percentile": int(percentile), "bucket": bucket(percentile),
+            }
+            entry = existing.pop(session_id, None)
+            if entry is None:
+                created.append(LeaderboardEntry(master_token=master_token, session_id=session_id, **values))
+            elif any(getattr(entry, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(entry, field, value)
+                updated.append(entry)
+
+        with transaction.atomic():
+            if existing:
+                LeaderboardEntry.objects.filter(pk__in=[entry.pk for entry in existing.values()]).delete()
+            if created:
+                # Another process may have ranked the same link meanwhile
+                LeaderboardEntry.objects.bulk_create(
+                    created, update_conflicts=True, unique_fields=["session"], update_fields=FIELDS + ["updated_at"],
+                )
+            if updated:
+                LeaderboardEntry.objects.bulk_update(updated, FIELDS, batch_size=500)
+        return len(created) + len(updated) + len(existing)
+
+    def entries(self, master_token, recommendation=None):
+        """A link's entries best first, optionally for one recommendation"""
+        from dashboard.models import LeaderboardEntry
+
+        entries = LeaderboardEntry.objects.filter(master_token=master_token)
+        if recommendation:
+            entries = entries.filter(recommendation=recommendation)
+        return entries.order_by("rank", "session_id")
+
+
+_leaderboard = None
+_leaderboard_lock = threading.Lock()
+
+
+def get_leaderboard():
+    """Process-wide leaderboard maintainer"""
+    global _leaderboard
+    with _leaderboard_lock:
+        if _leaderboard is None:
+            _leaderboard = Leaderboard()
+        return _leaderboard
@@ -0,0 +1,292 @@
+import json
+import re
+
+_FENCE = "```"
+_OPENERS = {"[": "]", "{": "}"}
+_CLOSERS = {"]", "}"}
+_SPECIAL_RE = re.compile(r'[\[\]{}"\\]')
+_TRAILING_COMMA_RE = re.compile(r",\s*([\]}])")
+
+
+def _loads(candidate):
+    try:
+        return json.loads(candidate)
+    except (ValueError, RecursionError):
+        pass
+    # Models often leave a trailing comma before a closing bracket.
+    try:
+        return json.loads(_TRAILING_COMMA_RE.sub(r"\1", candidate))
+    except (ValueError, RecursionError):
+        return None
+
+
+def _fenced_blocks(text):
+    """Contents of ``` fenced blocks, language tag stripped"""
+    pos = 0
+    while True:
+        start = text.find(_FENCE, pos)
+        if start == -1:
+            return
+        end = text.find(_FENCE, start + 3)
+        if end == -1:
+            return
+        body = text[start + 3:end]
+        newline = body.find("\n")
+        if newline != -1 and body[:newline].strip().isalnum():
+            body = body[newline + 1:]
+        yield body
+        pos = end + 3
+
+
+def _balanced_spans(text):
+    """
+    Yield (start, end) of every outermost balanced [...] / {...} span, in
+    order, from a single pass over the bracket/quote characters.
+
+    Quotes only count inside brackets, so apostrophes and quotes in the
+    surrounding prose do not confuse the scan. An opener that never closes
+    (or is closed by the wrong bracket) is dropped instead of swallowing the
+    rest of the text, so a valid object after stray brackets is still found.
+    """
+    pairs = []
+    stack = []
+    in_string = False
+    skip = -1
+    for match in _SPECIAL_RE.finditer(text):
+        i = match.start()
+        if i == skip:
+            continue
+        ch = text[i]
+        if in_string:
+            if ch == "\\":
+                skip = i + 1
+            elif ch == '"':
+                in_string = False
+        elif ch in _OPENERS:
+            stack.append((i, _OPENERS[ch]))
+        elif not stack:
+            continue
+        elif ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            start, expected = stack.pop()
+            if ch == expected:
+                pairs.append((start, i + 1))
+            else:
+                stack.clear()
+
+    # Pairs close inner-first; keep only those not nested inside another pair.
+    pairs.sort()
+    covered = -1
+    for start, end in pairs:
+        if start >= covered:
+            covered = end
+            yield start, end
+
+
+def iter_json_candidates(text):
+    """
+    Yield every JSON array/object found in model output, best guess first:
+    the whole text, then fenced blocks, then outermost bracket spans in order.
+    Spans never overlap, so the work stays linear in the length of the text.
+    """
+    if not text:
+        return
+    text = text.strip()
+    if text[:1] in _OPENERS:
+        data = _loads(text)
+        if data is not None:
+            yield data
+
+    for block in _fenced_blocks(text):
+        yield from _span_candidates(block)
+    yield from _span_candidates(text)
+
+
+def _span_candidates(text):
+    for start, end in _balanced_spans(text):
+        data = _loads(text[start:end])
+        if data is not None:
+            yield data
+
+
+def extract_json(text):
+    """Return the first JSON array/object found in model output, or None"""
+    return next(iter_json_candidates(text), None)
+
+
+# --- Schemas -----------------------------------------------------------------
+
+class Field:
+    """One schema field: coercion function plus default used when missing or invalid"""
+
+    def __init__(self, coerce, default=None, required=False):
+        self.coerce = coerce
+        self.default = default
+        self.required = required
+
+    def clean(self, raw):
+        if raw is None or raw == "":
+            if self.required:
+                raise ValueError("missing required field")
+            return self.default() if callable(self.default) else self.default
+        try:
+            return self.coerce(raw)
+        except (TypeError, ValueError):
+            if self.required:
+                raise
+            return self.default() if callable(self.default) else self.default
+
+
+class ObjectSchema:
+    def __init__(self, **fields):
+        self.fields = tuple(fields.items())
+
+    def validate(self, data):
+        if not isinstance(data, dict):
+            return None
+        try:
+            return {name: field.clean(data.get(name)) for name, field in self.fields}
+        except (TypeError, ValueError):
+            return None
+
+
+class ListSchema:
+    """List of items validated by ``item``; invalid items are dropped"""
+
+    def __init__(self, item, unwrap=None):
+        self.item = item
+        self.unwrap = unwrap
+
+    def validate(self, data):
+        if self.unwrap and isinstance(data, dict):
+            data = data.get(self.unwrap)
+        if not isinstance(data, list):
+            return None
+        cleaned = (self.item.validate(entry) for entry in data)
+        return [entry for entry in cleaned if entry is not None]
+
+
+class StringItem:
+    def validate(self, data):
+        if isinstance(data, (str, int, float)) and not isinstance(data, bool):
+            text = str(data).strip()
+            return text or None
+        return None
+
+
+_STRING_ITEM = StringItem()
+
+
+def coerce_score(value):
+    """0-100 integer from 85, 85.5, "85", "85/100" or "85%" """
+    if isinstance(value, bool):
+        raise ValueError("boolean score")
+    if isinstance(value, str):
+        match = re.match(r"\s*(-?\d+(?:\.\d+)?)", value)
+        if not match:
+            raise ValueError(value)
+        value = match.group(1)
+    return max(0, min(100, int(round(float(value)))))
+
+
+def coerce_text(value):
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    if isinstance(value, dict):
+        raise ValueError("object where text expected")
+    return str(value).strip()
+
+
+def coerce_string_list(value):
+    if isinstance(value, str):
+        value = [part for part in re.split(r"[\n;]+", value)]
+    if not isinstance(value, (list, tuple)):
+        raise ValueError("not a list")
+    items = (_STRING_ITEM.validate(v) for v in value)
+    return [v for v in items if v]
+
+
+def choice(options, aliases=None, default=None):
+    aliases = aliases or {}
+
+    def coerce(value):
+        key = str(value).strip().lower()
+        key = aliases.get(key, key)
+        if key not in options:
+            raise ValueError(value)
+        return key
+
+    return Field(coerce, default=default)
+
+
+def _unique_skills(value):
+    seen = set()
+    skills = []
+    for skill in coerce_string_list(value):
+        if skill.lower() not in seen:
+            seen.add(skill.lower())
+            skills.append(skill)
+    return skills
+
+
+class SkillsSchema:
+    """Accepts either ["Python", ...] or {"skills": [...]}"""
+
+    def validate(self, data):
+        if isinstance(data, dict):
+            data = data.get("skills")
+        if not isinstance(data, list):
+            return None
+        return _unique_skills(data)
+
+
+QUESTION_SCHEMA = ObjectSchema(
+    question=Field(coerce_text, required=True),
+    type=choice(
+        {"technical", "behavioral", "situational"},
+        aliases={"text": "technical", "behavioural": "behavioral"},
+        default="technical",
+    ),
+    difficulty=choice({"easy", "medium", "hard"}, default="medium"),
+    expected_key_points=Field(coerce_string_list, default=list),
+)
+QUESTIONS_SCHEMA = ListSchema(QUESTION_SCHEMA, unwrap="questions")
+
+_EVALUATION_FIELDS = dict(
+    # An evaluation without a readable score is no evaluation; callers fall back.
+    score=Field(coerce_score, required=True),
+    feedback=Field(coerce_text, default=""),
+    strengths=Field(coerce_string_list, default=list),
+    improvements=Field(coerce_string_list, default=list),
+)
+EVALUATION_SCHEMA = ObjectSchema(**_EVALUATION_FIELDS)
+EVALUATION_BATCH_SCHEMA = ListSchema(
+    ObjectSchema(id=Field(int, required=True), **_EVALUATION_FIELDS),
+    unwrap="evaluations",
+)
+
+REPORT_SCHEMA = ObjectSchema(
+    # None means "not given"; callers fall back to the average answer score.
+    overall_score=Field(coerce_score, default=None),
+    summary=Field(coerce_text, default=""),
+    strengths=Field(coerce_string_list, default=list),
+    weaknesses=Field(coerce_string_list, default=list),
+    recommendation=choice(
+        {"hire", "maybe", "no"},
+        aliases={"reject": "no", "no hire": "no", "strong hire": "hire", "yes": "hire"},
+        default="maybe",
+    ),
+    detailed_feedback=Field(coerce_text, default=""),
+)
+
+SKILLS_SCHEMA = SkillsSchema()
+
+
+def parse_llm_json(text, schema):
+    """First JSON value in ``text`` that passes ``schema``; None when nothing usable was found"""
+    for data in iter_json_candidates(text):
+        cleaned = schema.validate(data)
+        if cleaned:
+            return cleaned
+    return None
@@ -0,0 +1,287 @@
+import hashlib
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from .skill_index import skill_keys
+
+VECTOR_VERSION = 1
+DIMENSIONS = 1 << 20  # hashed feature space
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = frozenset("""
+a about above after all also am an and any are as at be been being below between both but by can could
+did do does doing down during each few for from further had has have having he her here hers him his how
+i if in into is it its itself just me more most my no nor not now of off on once only or other our ours
+out over own same she should so some such than that the their theirs them then there these they this
+those through to too under until up very was we were what when where which while who whom why will with
+would you your yours etc using used use work worked working including within per years year experience
+""".split())
+
+
+def tokenize(text):
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS and len(t) < 40]
+
+
+def feature(term):
+    # crc32 rather than hash(): stable across processes and restarts
+    return zlib.crc32(term.encode("utf-8")) & (DIMENSIONS - 1)
+
+
+def term_counts(text, skills=(), skill_weight=1):
+    """Counter of hashed feature -> term frequency; skills add canonical "skill:<key>" terms"""
+    counts = Counter(feature(t) for t in tokenize(text))
+    for key in skill_keys(skills).values():
+        counts[feature("skill:" + key)] += skill_weight
+    return counts
+
+
+def candidate_source(candidate):
+    """What a candidate's vector is built from: (text, skills)"""
+    data = candidate.resume_data or {}
+    return "\n".join([data.get("full_text", ""), candidate.education or ""]), candidate.skills or []
+
+
+def candidate_digest(candidate):
+    text, skills = candidate_source(candidate)
+    # The resume hash stands in for its full text; education is edited separately
+    sha256 = (candidate.resume_data or {}).get("sha256")
+    source = f"{sha256}|{candidate.education or ''}" if sha256 else text
+    return hashlib.sha1(f"{VECTOR_VERSION}|{source}|{'|'.join(skills)}".encode("utf-8")).hexdigest()
+
+
+def job_query(job):
+    """Weighted query terms for a job: the title counts twice, skills three times"""
+    text = "\n".join([job.title, job.title, job.description, job.requirements])
+    return term_counts(text, job.skills or [], skill_weight=3)
+
+
+def index_candidate_vectors(candidates):
+    """Store compact term vectors for ``candidates``, skipping those whose source is unchanged"""
+    from dashboard.models import CandidateVector
+
+    candidates = list(candidates)
+    if not candidates:
+        return 0
+    max_terms = getattr(settings, "MATCH_MAX_TERMS", 256)
+    existing = dict(
+        CandidateVector.objects.filter(candidate_id__in=[c.pk for c in candidates]).values_list("candidate_id", "digest")
+    )
+    vectors = []
+    for candidate in candidates:
+        digest = candidate_digest(candidate)
+        if existing.get(candidate.pk) == digest:
+            continue
+        text, skills = candidate_source(candidate)
+        counts = term_counts(text, skills)
+        length = sum(counts.values())
+        # Keep the most frequent terms; the tail rarely decides a ranking
+        top = counts.most_common(max_terms)
+        terms = np.array([t for t, _ in top], dtype="<u4")
+        freqs = np.minimum([c for _, c in top], 65535).astype("<u2")
+        vectors.append(CandidateVector(
+            candidate_id=candidate.pk, digest=digest, length=length,
+            terms=terms.tobytes(), counts=freqs.tobytes(),
+        ))
+    if vectors:
+        CandidateVector.objects.bulk_create(
+            vectors,
+            update_conflicts=True,
+            unique_fields=["candidate"],
+            update_fields=["digest", "length", "terms", "counts", "updated_at"],
+        )
+    return len(vectors)
+
+
+class MatchIndex:
+    """
+    In-memory BM25 index over every stored candidate vector.
+
+    Candidate rows are held as a CSC matrix of BM25 term weights, so scoring
+    a job is a column slice for the job's terms and one sparse mat-vec.
+    Vectors changed since the index was built are loaded into a small delta
+    matrix on the next query and override their old rows. Delta rows are
+    weighted with the IDF of the last build, so the index is rebuilt once
+    the delta passes MATCH_DELTA_RATIO of its size.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._main = None
+        self._delta = None
+        self.built_at = None
+
+    # Main and delta are (candidate ids, CSC weight matrix) with one row per id
+    def _load(self, queryset):
+        ids, lengths, indptr, terms, counts = [], [], [0], [], []
+        for candidate_id, length, term_bytes, count_bytes in queryset.values_list(
+            "candidate_id", "length", "terms", "counts",
+        ).iterator(chunk_size=2000):
+            row_terms = np.frombuffer(term_bytes, dtype="<u4")
+            ids.append(candidate_id)
+            lengths.append(length)
+            terms.append(row_terms)
+            counts.append(np.frombuffer(count_bytes, dtype="<u2"))
+            indptr.append(indptr[-1] + len(row_terms))
+        return (
+            np.array(ids, dtype=np.int64),
+            np.array(lengths, dtype=np.float32),
+            np.array(indptr, dtype=np.int64),
+            np.concatenate(terms).astype(np.int32) if terms else np.zeros(0, dtype=np.int32),
+            np.concatenate(counts).astype(np.float32) if counts else np.zeros(0, dtype=np.float32),
+        )
+
+    def _weights(self, lengths, indptr, terms, counts, idf, avg_length):
+        # BM25 term weight, computed once per stored term instead of per query
+        row_lengths = np.repeat(lengths, np.diff(indptr))
+        norm = self.K1 * (1 - self.B + self.B * row_lengths / max(avg_length, 1.0))
+        data = idf[terms] * counts * (self.K1 + 1) / (counts + norm)
+        return sparse.csr_matrix((data.astype(np.float32), terms, indptr), shape=(len(lengths), DIMENSIONS)).tocsc()
+
+    def build(self):
+        from dashboard.models import CandidateVector
+
+        watermark = CandidateVector.objects.order_by("-updated_at").values_list("updated_at", flat=True).first()
+        arrays = self._load(CandidateVector.objects.order_by("candidate_id"))
+        return self.build_from_arrays(*arrays, watermark=watermark)
+
+    def build_from_arrays(self, ids, lengths, indptr, terms, counts, watermark=None):
+        """Install an index from CSR-style arrays (one row per candidate); used by build() and benchmarks"""
+        started = time.time()
+        n = len(ids)
+        df = np.bincount(terms, minlength=DIMENSIONS).astype(np.float32)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avg_length = float(lengths.mean()) if n else 1.0
+        main = (ids, self._weights(lengths, indptr, terms, counts, idf, avg_length))
+        with self._lock:
+            self._idf = idf
+            self._avg_length = avg_length
+            self._main = main
+            self._delta = None
+            self._delta_ids = set()
+            self._watermark = watermark
+            self._size = n
+            self.built_at = started
+        return n
+
+    def refresh(self):
+        """Pick up vectors written since the last build/refresh; cheap when nothing changed"""
+        from dashboard.models import CandidateVector
+
+        if self._main is None:
+            return self.build()
+        if self._watermark is None:
+            changed = CandidateVector.objects.all()
+        else:
+            changed = CandidateVector.objects.filter(updated_at__gt=self._watermark)
+        changed = changed.order_by("candidate_id")
+        if not changed.exists():
+            return 0
+        # Everything changed so far goes into one delta matrix scored with the main IDF
+        changed_ids = set(changed.values_list("candidate_id", flat=True)) | self._delta_ids
+        ratio = getattr(settings, "MATCH_DELTA_RATIO", 0.05)
+        if len(changed_ids) > max(1000, ratio * self._size):
+            return self.build()
+        watermark = CandidateVector.objects.order_by("-updated_at").values_list("updated_at", flat=True).first()
+        ids, lengths, indptr, terms, counts = self._load(
+            CandidateVector.objects.filter(candidate_id__in=changed_ids).order_by("candidate_id")
+        )
+        delta = (ids, self._weights(lengths, indptr, terms, counts, self._idf, self._avg_length))
+        with self._lock:
+            self._delta = delta
+            self._delta_ids = changed_ids
+            self._watermark = watermark
+        return len(ids)
+
+    def _scores(self, matrix, columns, weights):
+        if matrix.shape[0] == 0:
+            return np.zeros(0, dtype=np.float32)
+        return matrix[:, columns] @ weights
+
+    def top_k(self, query_counts, k=20, exclude=()):
+        """[(candidate id, score)] for the ``k`` best candidates, best first; call refresh() first"""
+        with self._lock:
+            if self._main is None:
+                return []
+            main_ids, main = self._main
+            delta = self._delta
+            idf = self._idf
+        if not query_counts:
+            return []
+
+        columns = np.fromiter(query_counts.keys(), dtype=np.int32)
+        tf = np.fromiter(query_counts.values(), dtype=np.float32)
+        # Query terms: sub-linear tf; IDF is already in the candidate weights
+        weights = 1.0 + np.log(tf)
+        keep = idf[columns] > 0
+        columns, weights = columns[keep], weights[keep]
+
+        ids = main_ids
+        scores = self._scores(main, columns, weights)
+        if delta is not None:
+            delta_ids, delta_matrix = delta
+            # Rows in the delta replace their stale versions in the main matrix
+            stale = np.isin(main_ids, delta_ids)
+            ids = np.concatenate([main_ids[~stale], delta_ids])
+            scores = np.concatenate([scores[~stale], self._scores(delta_matrix, columns, weights)])
+        if exclude:
+            scores = np.where(np.isin(ids, list(exclude)), 0, scores)
+
+        k = min(k, len(ids))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+
+def best_matches(job, k=20):
+    """[(Candidate, score)] for ``job``, best first"""
+    from candidates.models import Candidate
+
+    index = get_match_index()
+    index.refresh()
+    # Ask for a few extra in case some candidates were deleted since indexing
+    hits = index.top_k(job_query(job), k=k + 10)
+    candidates = Candidate.objects.only("pk", "name", "email", "experience_years", "skills").in_bulk(
+        [pk for pk, _ in hits]
+    )
+    return [(candidates[pk], score) for pk, score in hits if pk in candidates][:k]
+
+
+def rebuild_candidate_vectors(batch_size=500, force=False):
+    """Vectorize every candidate (only changed ones unless ``force``); returns the number written"""
+    from candidates.models import Candidate
+    from dashboard.models import CandidateVector
+
+    if force:
+        CandidateVector.objects.all().delete()
+    written = 0
+    batch = []
+    queryset = Candidate.objects.only("pk", "skills", "resume_data", "education").order_by("pk")
+    for candidate in queryset.iterator(chunk_size=batch_size):
+        batch.append(candidate)
+        if len(batch) >= batch_size:
+            written += index_candidate_vectors(batch)
+            batch = []
+    return written + index_candidate_vectors(batch)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_match_index():
+    """Process-wide match index, built on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = MatchIndex()
+        return _index
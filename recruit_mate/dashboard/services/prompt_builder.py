@@ -0,0 +1,194 @@
+import json
+import logging
+import re
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Token budgets per operation and prompt part. LLM_PROMPT_BUDGETS in settings
+# overrides individual entries.
+DEFAULT_BUDGETS = {
+    "generate_questions": {"job": 1200, "resume": 1500},
+    "evaluate_answer": {"answer": 1200},
+    "generate_report": {"answer": 150, "feedback": 60, "total": 4000},
+    "extract_skills": {"text": 2000},
+}
+
+# Resume sections in the order they are kept when the budget is tight.
+RESUME_SECTION_PRIORITY = [
+    "skills", "experience", "projects", "summary", "education", "certifications", "other",
+]
+
+RESUME_HEADINGS = {
+    "skills": ["skills", "technical skills", "core competencies", "technologies", "tech stack"],
+    "experience": ["experience", "work experience", "professional experience", "employment", "work history"],
+    "projects": ["projects", "personal projects", "key projects"],
+    "summary": ["summary", "profile", "objective", "about me", "professional summary"],
+    "education": ["education", "academic background", "qualifications"],
+    "certifications": ["certifications", "certificates", "courses", "training", "awards"],
+}
+
+_HEADING_LOOKUP = {alias: section for section, aliases in RESUME_HEADINGS.items() for alias in aliases}
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_INLINE_SPACE_RE = re.compile(r"[ \t\f\v\u00a0]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Cheap local token estimate: word/punctuation pieces, floored at chars/4"""
+    if not text:
+        return 0
+    return max(len(_TOKEN_RE.findall(text)), len(text) // CHARS_PER_TOKEN)
+
+
+def get_budget(operation, part):
+    overrides = getattr(settings, "LLM_PROMPT_BUDGETS", {}).get(operation, {})
+    return overrides.get(part, DEFAULT_BUDGETS[operation][part])
+
+
+def compact_whitespace(text):
+    """Collapse runs of spaces, strip each line and keep at most one blank line"""
+    if not text:
+        return ""
+    lines = (_INLINE_SPACE_RE.sub(" ", line).strip() for line in text.replace("\r\n", "\n").split("\n"))
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def truncate_to_budget(text, max_tokens):
+    """Cut text to roughly ``max_tokens`` on a word boundary"""
+    text = compact_whitespace(text)
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max_tokens * CHARS_PER_TOKEN
+    cut = text[:limit]
+    space = cut.rfind(" ")
+    if space > limit // 2:
+        cut = cut[:space]
+    # The estimator can count more pieces than chars/4 on punctuation-heavy text.
+    while cut and estimate_tokens(cut) > max_tokens:
+        cut = cut[: int(len(cut) * 0.9)]
+    return cut.rstrip() + " …"
+
+
+def _split_resume_sections(text):
+    """Return [(section, lines)] in document order; text before any heading is the header"""
+    sections = [("header", [])]
+    for line in text.split("\n"):
+        key = line.strip().strip(":").strip().lower()
+        section = _HEADING_LOOKUP.get(key) if len(key) < 40 else None
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in sections if "\n".join(lines).strip()]
+
+
+def compact_resume(text, max_tokens):
+    """
+    Section-aware resume truncation.
+
+    The contact header is kept (capped at a tenth of the budget), then the
+    rest is shared between sections by weighted water-filling: short sections
+    keep their full text and long ones are trimmed, with higher-priority
+    sections (RESUME_SECTION_PRIORITY) getting a larger share. Output keeps
+    the original section order.
+    """
+    text = compact_whitespace(text)
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    sections = _split_resume_sections(text)
+    costs = [estimate_tokens(body) for _, body in sections]
+    weights = [
+        len(RESUME_SECTION_PRIORITY) - RESUME_SECTION_PRIORITY.index(name if name in RESUME_SECTION_PRIORITY else "other")
+        for name, _ in sections
+    ]
+
+    allowance = {}
+    remaining = max_tokens
+    pending = list(range(len(sections)))
+    if sections[0][0] == "header":
+        allowance[0] = min(costs[0], max(50, max_tokens // 10), remaining)
+        remaining -= allowance[0]
+        pending.remove(0)
+
+    while pending:
+        total_weight = sum(weights[i] for i in pending)
+        fits = [i for i in pending if costs[i] <= remaining * weights[i] / total_weight]
+        if not fits:
+            for i in pending:
+                allowance[i] = int(remaining * weights[i] / total_weight)
+            break
+        for i in fits:
+            allowance[i] = costs[i]
+            remaining -= costs[i]
+            pending.remove(i)
+
+    kept = []
+    for i, (_, body) in enumerate(sections):
+        if allowance.get(i, 0) < min(10, costs[i]):
+            continue
+        kept.append(body if allowance[i] >= costs[i] else truncate_to_budget(body, allowance[i]))
+    return "\n\n".join(kept)
+
+
+def compact_job_context(description, requirements, max_tokens):
+    """Fit description + requirements into one budget; whichever is shorter keeps its full text"""
+    description = compact_whitespace(description)
+    requirements = compact_whitespace(requirements)
+    half = max_tokens // 2
+    if estimate_tokens(description) <= half:
+        requirements = truncate_to_budget(requirements, max_tokens - estimate_tokens(description))
+    elif estimate_tokens(requirements) <= half:
+        description = truncate_to_budget(description, max_tokens - estimate_tokens(requirements))
+    else:
+        description = truncate_to_budget(description, half)
+        requirements = truncate_to_budget(requirements, half)
+    return description, requirements
+
+
+def compact_json(data):
+    """JSON without indentation or padding"""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def compact_interview_data(interview_data):
+    """Shrink per-answer text in generate_report input to the configured budgets"""
+    answer_budget = get_budget("generate_report", "answer")
+    feedback_budget = get_budget("generate_report", "feedback")
+    data = dict(interview_data)
+    data["answers"] = [
+        {
+            **answer,
+            "answer": truncate_to_budget(answer.get("answer", ""), answer_budget),
+            "feedback": truncate_to_budget(answer.get("feedback", ""), feedback_budget),
+        }
+        for answer in interview_data.get("answers", [])
+    ]
+    if "average_score" in data:
+        data["average_score"] = round(data["average_score"], 1)
+
+    # Very long interviews: drop answer text, keep question + score.
+    if estimate_tokens(compact_json(data)) > get_budget("generate_report", "total"):
+        data["answers"] = [
+            {"question": a.get("question"), "score": a.get("score")} for a in data["answers"]
+        ]
+    return data
+
+
+def log_llm_call(provider, operation, prompt, elapsed_ms):
+    """Record input size next to latency for every outbound LLM request"""
+    tokens = estimate_tokens(prompt)
+    logger.info(
+        "LLM call provider=%s operation=%s input_chars=%d input_tokens=%d latency_ms=%.0f",
+        provider, operation, len(prompt), tokens, elapsed_ms,
+        extra={
+            "llm_provider": provider,
+            "llm_operation": operation,
+            "llm_input_chars": len(prompt),
+            "llm_input_tokens": tokens,
+            "llm_latency_ms": elapsed_ms,
+        },
+    )
@@ -0,0 +1,198 @@
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce, Length, Trim
+from django.utils import timezone
+from .answer_similarity import question_hash
+
+DIFFICULTIES = ("easy", "medium", "hard")
+HISTOGRAM_BINS = 5  # 20-point bands; a score of 100 falls in the last one
+FETCH_SIZE = 50000
+FIELDS = [
+    "question_text", "labelled_difficulty", "empirical_difficulty", "asked", "answered", "skipped",
+    "mean_score", "score_std", "score_histogram", "discrimination", "discrimination_pairs",
+    "completion_rate", "skip_rate", "updated_at",
+]
+
+
+def _fetch_array(queryset, columns):
+    """
+    Rows of an integer values_list() queryset as an (n, columns) int64 array,
+    read through the cursor so no per-row Python objects beyond the tuples
+    are built.
+    """
+    sql, params = queryset.query.sql_with_params()
+    chunks = []
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            chunks.append(np.array(rows, dtype=np.int64).reshape(-1, columns))
+    return np.vstack(chunks) if chunks else np.empty((0, columns), dtype=np.int64)
+
+
+def load_arrays():
+    """
+    Questions and answers of candidate sessions as arrays:
+
+    ``texts`` and ``hashes``: one entry per question wording (group);
+    ``question_group`` / ``question_label``: group and DIFFICULTIES index of every question row;
+    ``answer_group`` / ``score`` / ``blank`` / ``overall``: per answer, with
+    the session's overall score or -1 when it has no result.
+    """
+    from interviews.models import InterviewAnswer, InterviewQuestion
+
+    groups, texts, hashes = {}, [], []
+    labels = {label: i for i, label in enumerate(DIFFICULTIES)}
+    by_wording = {}  # raw text -> group; copies of a link's questions repeat verbatim
+    ids, question_group, question_label = [], [], []
+    questions = (
+        InterviewQuestion.objects.filter(session__master_token__isnull=False)
+        .order_by("pk").values_list("pk", "question_text", "difficulty")
+    )
+    for pk, text, difficulty in questions.iterator(chunk_size=FETCH_SIZE):
+        group = by_wording.get(text)
+        if group is None:
+            digest = question_hash(text)
+            group = groups.get(digest)
+            if group is None:
+                group = groups[digest] = len(hashes)
+                hashes.append(digest)
+                texts.append(text)
+            by_wording[text] = group
+        ids.append(pk)
+        question_group.append(group)
+        question_label.append(labels.get(difficulty, 1))
+    ids = np.array(ids, dtype=np.int64)
+    question_group = np.array(question_group, dtype=np.int64)
+
+    answers = _fetch_array(
+        InterviewAnswer.objects.filter(session__master_token__isnull=False).annotate(
+            text_length=Length(Trim("answer_text")),
+            overall=Coalesce("session__result__overall_score", Value(-1)),
+        ).order_by().values_list("question_id", "score", "text_length", "overall"),
+        4,
+    )
+    # Question ids are sorted, so each answer finds its question's group by binary search
+    positions = np.searchsorted(ids, answers[:, 0])
+    known = positions < len(ids)
+    known[known] = ids[positions[known]] == answers[known, 0]
+    answers, positions = answers[known], positions[known]
+    return {
+        "texts": texts,
+        "hashes": hashes,
+        "question_group": question_group,
+        "question_label": np.array(question_label, dtype=np.int64),
+        "answer_group": question_group[positions],
+        "score": np.clip(answers[:, 1], 0, 100),
+        "blank": answers[:, 2] == 0,
+        "overall": answers[:, 3],
+    }
+
+
+def question_statistics(arrays, min_answers=None, min_pairs=None, bands=None):
+    """
+    Per-group statistics from load_arrays() output, with one bincount per
+    quantity over all answers at once. Returns a dict of arrays indexed by
+    group; undefined values are NaN.
+    """
+    if min_answers is None:
+        min_answers = getattr(settings, "QUESTION_ANALYTICS_MIN_ANSWERS", 5)
+    if min_pairs is None:
+        min_pairs = getattr(settings, "QUESTION_DISCRIMINATION_MIN_PAIRS", 10)
+    hard_below, easy_from = bands or getattr(settings, "QUESTION_DIFFICULTY_BANDS", (45, 70))
+    groups = len(arrays["hashes"])
+
+    def count(group, weights=None, width=1):
+        return np.bincount(group, weights=weights, minlength=groups * width)
+
+    asked = count(arrays["question_group"])
+    labels = count(arrays["question_group"] * len(DIFFICULTIES) + arrays["question_label"], width=len(DIFFICULTIES))
+    labelled = labels.reshape(groups, len(DIFFICULTIES)).argmax(axis=1)
+
+    blank = arrays["blank"]
+    group = arrays["answer_group"][~blank]
+    score = arrays["score"][~blank].astype(float)
+    answered = count(group)
+    skipped = count(arrays["answer_group"][blank])
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = count(group, score) / answered
+        variance = count(group, score * score) / answered - mean * mean
+        std = np.sqrt(np.maximum(variance, 0))
+        bins = np.minimum(score.astype(np.int64) * HISTOGRAM_BINS // 100, HISTOGRAM_BINS - 1)
+        histogram = count(group * HISTOGRAM_BINS + bins, width=HISTOGRAM_BINS).reshape(groups, HISTOGRAM_BINS)
+
+        # Pearson correlation with the overall score, from per-group sums
+        paired = arrays["overall"][~blank] >= 0
+        g, x, y = group[paired], score[paired], arrays["overall"][~blank][paired].astype(float)
+        n = count(g)
+        sx, sy = count(g, x), count(g, y)
+        sxy, sxx, syy = count(g, x * y), count(g, x * x), count(g, y * y)
+        denominator = np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+        discrimination = (n * sxy - sx * sy) / denominator
+        discrimination[(n < min_pairs) | ~(denominator > 0)] = np.nan
+
+        completion = answered / asked
+        skip = skipped / asked
+
+    empirical = np.where(mean < hard_below, 2, np.where(mean >= easy_from, 0, 1))
+    empirical[answered < min_answers] = -1
+    return {
+        "asked": asked, "answered": answered, "skipped": skipped,
+        "labelled": labelled, "empirical": empirical,
+        "mean": mean, "std": std, "histogram": histogram,
+        "discrimination": discrimination, "pairs": n,
+        "completion": completion, "skip": skip,
+    }
+
+
+def _number(value, digits):
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def refresh_question_stats():
+    """Recompute and store QuestionStats for every question wording; returns the number of rows"""
+    from dashboard.models import QuestionStats
+
+    started = timezone.now()
+    arrays = load_arrays()
+    stats = question_statistics(arrays)
+    rows = [
+        QuestionStats(
+            question_hash=digest,
+            question_text=arrays["texts"][i],
+            labelled_difficulty=DIFFICULTIES[stats["labelled"][i]],
+            empirical_difficulty=DIFFICULTIES[stats["empirical"][i]] if stats["empirical"][i] >= 0 else "",
+            asked=int(stats["asked"][i]),
+            answered=int(stats["answered"][i]),
+            skipped=int(stats["skipped"][i]),
+            mean_score=_number(stats["mean"][i], 1),
+            score_std=_number(stats["std"][i], 1),
+            score_histogram=stats["histogram"][i].tolist(),
+            discrimination=_number(stats["discrimination"][i], 3),
+            discrimination_pairs=int(stats["pairs"][i]),
+            completion_rate=_number(stats["completion"][i], 3) or 0.0,
+            skip_rate=_number(stats["skip"][i], 3) or 0.0,
+        )
+        for i, digest in enumerate(arrays["hashes"])
+    ]
+    with transaction.atomic():
+        QuestionStats.objects.bulk_create(
+            rows, batch_size=1000, update_conflicts=True, unique_fields=["question_hash"], update_fields=FIELDS,
+        )
+        # Wordings no longer asked anywhere were not rewritten above
+        QuestionStats.objects.filter(updated_at__lt=started).delete()
+    return len(rows)
+
+
+def stats_for_questions(questions):
+    """{question pk: QuestionStats} for ``questions``, in one query"""
+    from dashboard.models import QuestionStats
+
+    hashes = {question.pk: question_hash(question.question_text) for question in questions}
+    stats = QuestionStats.objects.in_bulk(set(hashes.values()), field_name="question_hash")
+    return {pk: stats[digest] for pk, digest in hashes.items() if digest in stats}
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+# Priority classes. Candidate-facing calls are INTERACTIVE; recruiter-side work
+# (skill extraction, question generation, batch jobs) is BACKGROUND.
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call could not get quota within the allowed wait"""
+
+
+class _Bucket:
+    """Token-bucket state for one provider: request and token allowances"""
+
+    def __init__(self, requests, tokens, updated_at):
+        self.requests = requests
+        self.tokens = tokens
+        self.updated_at = updated_at
+
+    def take(self, limits, cost_tokens, floor, now):
+        """Refill, then spend if both allowances stay above ``floor``; returns seconds to wait"""
+        rpm = limits["requests_per_minute"]
+        tpm = limits["tokens_per_minute"]
+        elapsed = max(0.0, now - self.updated_at)
+        self.requests = min(rpm, self.requests + elapsed * rpm / 60)
+        self.tokens = min(tpm, self.tokens + elapsed * tpm / 60)
+        self.updated_at = now
+
+        # A single call larger than the whole budget can never fit; let it
+        # through once the bucket is full rather than block forever.
+        cost_tokens = min(cost_tokens, tpm)
+        request_deficit = 1 + floor * rpm - self.requests
+        token_deficit = cost_tokens + floor * tpm - self.tokens
+        if request_deficit <= 0 and token_deficit <= 0:
+            self.requests -= 1
+            self.tokens -= cost_tokens
+            return 0.0
+        return max(request_deficit * 60 / rpm, token_deficit * 60 / tpm, 0.01)
+
+
+class LocalBucketBackend:
+    """In-process buckets; only correct for a single worker process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def try_acquire(self, provider, limits, cost_tokens, floor):
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets.get(provider)
+            if bucket is None:
+                bucket = _Bucket(limits["requests_per_minute"], limits["tokens_per_minute"], now)
+                self._buckets[provider] = bucket
+            return bucket.take(limits, cost_tokens, floor, now)
+
+
+class DatabaseBucketBackend:
+    """
+    Buckets stored in the RateLimitBucket table so every worker process shares
+    one budget. Updates are compare-and-swap on a version column, which is safe
+    on SQLite as well as on databases with row locking.
+    """
+
+    max_retries = 20
+
+    def try_acquire(self, provider, limits, cost_tokens, floor):
+        from dashboard.models import RateLimitBucket
+
+        for _ in range(self.max_retries):
+            now = time.time()
+            row = RateLimitBucket.objects.filter(provider=provider).values(
+                "requests", "tokens", "updated_at", "version"
+            ).first()
+            if row is None:
+                try:
+                    RateLimitBucket.objects.create(
+                        provider=provider,
+                        requests=limits["requests_per_minute"],
+                        tokens=limits["tokens_per_minute"],
+                        updated_at=now,
+                    )
+                except IntegrityError:
+                    pass
+                continue
+
+            bucket = _Bucket(row["requests"], row["tokens"], row["updated_at"])
+            wait = bucket.take(limits, cost_tokens, floor, now)
+            updated = RateLimitBucket.objects.filter(provider=provider, version=row["version"]).update(
+                requests=bucket.requests,
+                tokens=bucket.tokens,
+                updated_at=bucket.updated_at,
+                version=row["version"] + 1,
+            )
+            if updated:
+                return wait
+        # Heavy contention on the row; report a short wait and let the caller retry.
+        return 0.05
+
+
+BACKENDS = {
+    "local": LocalBucketBackend,
+    "database": DatabaseBucketBackend,
+}
+
+
+class RateLimiter:
+    """
+    Priority-aware token-bucket limiter for outbound LLM traffic.
+
+    Limits come from LLM_RATE_LIMITS (requests and tokens per minute per
+    provider). Callers queue until quota is available instead of failing.
+    Background calls may not dip into the last LLM_RATE_LIMIT_INTERACTIVE_RESERVE
+    of either allowance, and within a process they also yield to any waiting
+    interactive call, so candidate traffic preempts recruiter-side work.
+    """
+
+    poll_interval = 0.05
+
+    def __init__(self, backend=None, limits=None, reserve=None, max_wait=None):
+        if backend is None:
+            backend = BACKENDS[getattr(settings, "LLM_RATE_LIMIT_BACKEND", "database")]()
+        self.backend = backend
+        self.limits = limits if limits is not None else getattr(settings, "LLM_RATE_LIMITS", {})
+        self.reserve = reserve if reserve is not None else getattr(settings, "LLM_RATE_LIMIT_INTERACTIVE_RESERVE", 0.2)
+        self.max_wait = max_wait if max_wait is not None else getattr(settings, "LLM_RATE_LIMIT_MAX_WAIT", 30)
+        self._waiting_lock = threading.Lock()
+        self._interactive_waiting = defaultdict(int)
+
+    def _floor(self, priority):
+        return 0.0 if priority == INTERACTIVE else self.reserve
+
+    def _yield_to_interactive(self, provider, priority):
+        return priority != INTERACTIVE and self._interactive_waiting[provider] > 0
+
+    def _track(self, provider, priority, delta):
+        if priority == INTERACTIVE:
+            with self._waiting_lock:
+                self._interactive_waiting[provider] += delta
+
+    def acquire(self, provider, tokens=0, priority=INTERACTIVE):
+        limits = self.limits.get(provider)
+        if not limits:
+            return
+        deadline = time.monotonic() + self.max_wait
+        self._track(provider, priority, 1)
+        try:
+            while True:
+                if self._yield_to_interactive(provider, priority):
+                    wait = self.poll_interval
+                else:
+                    wait = self.backend.try_acquire(provider, limits, tokens, self._floor(priority))
+                    if wait == 0:
+                        return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RateLimitExceeded(f"{provider} quota unavailable for {priority} call")
+                time.sleep(min(wait, remaining))
+        finally:
+            self._track(provider, priority, -1)
+
+    async def aacquire(self, provider, tokens=0, priority=INTERACTIVE):
+        limits = self.limits.get(provider)
+        if not limits:
+            return
+        try_acquire = sync_to_async(self.backend.try_acquire, thread_sensitive=False)
+        deadline = time.monotonic() + self.max_wait
+        self._track(provider, priority, 1)
+        try:
+            while True:
+                if self._yield_to_interactive(provider, priority):
+                    wait = self.poll_interval
+                else:
+                    wait = await try_acquire(provider, limits, tokens, self._floor(priority))
+                    if wait == 0:
+                        return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RateLimitExceeded(f"{provider} quota unavailable for {priority} call")
+                await asyncio.sleep(min(wait, remaining))
+        finally:
+            self._track(provider, priority, -1)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Process-wide limiter shared by all LLM services"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
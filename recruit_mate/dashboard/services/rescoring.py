@@ -0,0 +1,317 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from .gemini_service import GeminiService
+from .rate_limiter import BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+ORIGINAL_VERSION = "original"
+# Score delta buckets for run reports: (label, upper bound inclusive)
+DELTA_BUCKETS = (("<= -21", -21), ("-20..-6", -6), ("-5..5", 5), ("6..20", 20), (">= 21", None))
+LARGEST_CHANGES = 10
+
+
+def get_run(version, target, dry_run=False, restart=False):
+    """The RescoreRun for (version, target, dry_run), created or reset as needed"""
+    from dashboard.models import RescoreRun
+
+    run, created = RescoreRun.objects.get_or_create(version=version, target=target, dry_run=dry_run)
+    if restart and not created:
+        run.status = "pending"
+        run.checkpoint = run.total = run.processed = run.changed = run.failed = 0
+        run.stats = {}
+        run.error = ""
+        run.started_at = run.finished_at = None
+        run.save()
+    return run
+
+
+class Rescorer:
+    """
+    Re-scores historical rows with the current model and prompts.
+
+    Rows are processed in primary-key order, RESCORE_CHUNK_SIZE at a time; model
+    calls within a chunk run on at most RESCORE_CONCURRENCY threads at
+    BACKGROUND priority, so the shared rate limiter keeps headroom for live
+    interviews. Each chunk is written in one transaction: the previous score
+    is kept as a ScoreVersion (once), the new one is stored under the run's
+    version, the live rows are bulk_updated and the checkpoint advances.
+    A dry run only records the score deltas.
+    """
+
+    target = None
+    model_field = None  # ScoreVersion foreign key
+
+    def __init__(self, run, chunk_size=None, concurrency=None, service_class=GeminiService, since=None):
+        self.run = run
+        self.chunk_size = chunk_size or getattr(settings, "RESCORE_CHUNK_SIZE", 100)
+        self.concurrency = concurrency or getattr(settings, "RESCORE_CONCURRENCY", 4)
+        self.service_class = service_class
+        self.since = since
+
+    # --- Per-target hooks ------------------------------------------------
+
+    def queryset(self):
+        raise NotImplementedError
+
+    def evaluate(self, rows, service, executor):
+        """New evaluations for ``rows``, in order; None where the model call failed"""
+        raise NotImplementedError
+
+    def old_score(self, row):
+        raise NotImplementedError
+
+    def snapshot(self, row):
+        """(score, data) of a row's current evaluation"""
+        raise NotImplementedError
+
+    def new_score(self, evaluation):
+        raise NotImplementedError
+
+    def apply(self, row, evaluation):
+        """Copy ``evaluation`` onto ``row``; returns the changed field names"""
+        raise NotImplementedError
+
+    def compare(self, row, evaluation, stats):
+        """Record target-specific differences in the run stats (dry runs included)"""
+
+    # --- Run -------------------------------------------------------------
+
+    def _rows(self):
+        queryset = self.queryset()
+        if self.since:
+            queryset = queryset.filter(created_at__gte=self.since)
+        return queryset
+
+    def execute(self, limit=None, progress=None):
+        """Process rows after the checkpoint (at most ``limit``); returns the run"""
+        run = self.run
+        if run.status == "done":
+            return run
+        run.status = "running"
+        run.started_at = run.started_at or timezone.now()
+        run.total = run.processed + self._rows().filter(pk__gt=run.checkpoint).count()
+        run.error = ""
+        run.save()
+
+        service = self.service_class()
+        done = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="rescore") as executor:
+                while limit is None or done < limit:
+                    size = self.chunk_size if limit is None else min(self.chunk_size, limit - done)
+                    rows = list(self._rows().filter(pk__gt=run.checkpoint).order_by("pk")[:size])
+                    if not rows:
+                        run.status = "done"
+                        run.finished_at = timezone.now()
+                        break
+                    self._write_chunk(rows, self.evaluate(rows, service, executor))
+                    done += len(rows)
+                    if progress:
+                        progress(run)
+                else:
+                    # Stopped at ``limit`` with rows left
+                    run.status = "paused"
+        except BaseException as e:
+            # Interrupted (including Ctrl-C): the checkpoint is at the last written chunk
+            run.status = "paused"
+            run.error = repr(e)
+            run.save(update_fields=["status", "error", "updated_at"])
+            raise
+        run.save()
+        return run
+
+    def _write_chunk(self, rows, evaluations):
+        from dashboard.models import ScoreVersion
+
+        run = self.run
+        stats = run.stats or {}
+        buckets = stats.setdefault("deltas", {label: 0 for label, _ in DELTA_BUCKETS})
+        largest = stats.setdefault("largest", [])
+        old_versions, new_versions, updated, fields = [], [], [], set()
+
+        for row, evaluation in zip(rows, evaluations):
+            run.processed += 1
+            if evaluation is None:
+                run.failed += 1
+                continue
+            old, new = self.old_score(row), self.new_score(evaluation)
+            delta = new - old
+            stats["delta_sum"] = stats.get("delta_sum", 0) + delta
+            stats["abs_delta_sum"] = stats.get("abs_delta_sum", 0) + abs(delta)
+            stats["scored"] = stats.get("scored", 0) + 1
+            for label, bound in DELTA_BUCKETS:
+                if bound is None or delta <= bound:
+                    buckets[label] += 1
+                    break
+            if delta:
+                run.changed += 1
+                largest.append([row.pk, old, new])
+            self.compare(row, evaluation, stats)
+            if run.dry_run:
+                continue
+
+            score, data = self.snapshot(row)
+            old_versions.append(ScoreVersion(
+                **{self.model_field: row}, version=row.score_version or ORIGINAL_VERSION, score=score, data=data,
+            ))
+            fields.update(self.apply(row, evaluation))
+            row.score_version = run.version
+            score, data = self.snapshot(row)
+            new_versions.append(ScoreVersion(**{self.model_field: row}, version=run.version, score=score, data=data))
+            updated.append(row)
+
+        largest.sort(key=lambda change: -abs(change[2] - change[1]))
+        del largest[LARGEST_CHANGES:]
+        run.stats = stats
+        run.checkpoint = rows[-1].pk
+
+        with transaction.atomic():
+            if updated:
+                # The first re-score keeps the original; later ones keep what they replaced
+                ScoreVersion.objects.bulk_create(old_versions, ignore_conflicts=True)
+                ScoreVersion.objects.bulk_create(
+                    new_versions,
+                    update_conflicts=True,
+                    unique_fields=[self.model_field, "version"],
+                    update_fields=["score", "data", "updated_at"],
+                )
+                type(rows[0]).objects.bulk_update(updated, sorted(fields | {"score_version"}))
+            run.save()
+
+
+class AnswerRescorer(Rescorer):
+    """Re-evaluates InterviewAnswer rows, batching answers into multi-item prompts"""
+
+    target = "answers"
+    model_field = "answer"
+
+    def queryset(self):
+        from interviews.models import InterviewAnswer
+
+        return InterviewAnswer.objects.select_related("question")
+
+    def evaluate(self, rows, service, executor):
+        size = getattr(settings, "EVALUATION_BATCH_MAX_SIZE", 20)
+        batches = [rows[i:i + size] for i in range(0, len(rows), size)]
+
+        def run(batch):
+            items = [
+                {"question": a.question.question_text, "answer": a.answer_text,
+                 "expected_key_points": a.question.expected_key_points}
+                for a in batch
+            ]
+            try:
+                results = service.evaluate_answers(items, priority=BACKGROUND)
+            except Exception as e:
+                logger.exception("Re-scoring batch failed: %s", e)
+                return [None] * len(batch)
+            finally:
+                close_old_connections()
+            return [None if result.get("source") == "fallback" else result for result in results]
+
+        return [evaluation for batch in executor.map(run, batches) for evaluation in batch]
+
+    def old_score(self, row):
+        return row.score
+
+    def snapshot(self, row):
+        return row.score, {
+            "feedback": row.feedback, "strengths": row.strengths, "improvements": row.improvements,
+            "evaluation_source": row.evaluation_source,
+        }
+
+    def new_score(self, evaluation):
+        return int(evaluation.get("score", 0))
+
+    def apply(self, row, evaluation):
+        row.score = self.new_score(evaluation)
+        row.feedback = evaluation.get("feedback", "")
+        row.strengths = evaluation.get("strengths", [])
+        row.improvements = evaluation.get("improvements", [])
+        row.evaluation_source = "llm"
+        return {"score", "feedback", "strengths", "improvements", "evaluation_source"}
+
+
+class ResultRescorer(Rescorer):
+    """Regenerates InterviewResult reports from the session's current answer scores"""
+
+    target = "results"
+    model_field = "result"
+
+    def queryset(self):
+        from interviews.models import InterviewResult
+
+        return InterviewResult.objects.select_related("session__job")
+
+    def _interview_data(self, result):
+        from interviews.models import InterviewAnswer
+
+        answers = list(InterviewAnswer.objects.filter(session_id=result.session_id).select_related("question"))
+        scores = [a.score for a in answers]
+        return {
+            "candidate_name": result.session.candidate_name or "Anonymous",
+            "position": result.session.job.title,
+            "total_questions": len(answers),
+            "average_score": sum(scores) / len(scores) if scores else 0,
+            "answers": [
+                {"question": a.question.question_text, "answer": a.answer_text, "score": a.score, "feedback": a.feedback}
+                for a in answers
+            ],
+        }
+
+    def evaluate(self, rows, service, executor):
+        data = [self._interview_data(result) for result in rows]
+
+        def run(interview_data):
+            try:
+                report = service.generate_report(interview_data, priority=BACKGROUND)
+            except Exception as e:
+                logger.exception("Re-scoring report failed: %s", e)
+                return None
+            finally:
+                close_old_connections()
+            # generate_report falls back to the average score when the model fails
+            return None if report.get("summary") in ("Error", "Fallback") else report
+
+        return list(executor.map(run, data))
+
+    def old_score(self, row):
+        return row.overall_score
+
+    def snapshot(self, row):
+        return row.overall_score, {
+            "summary": row.summary, "strengths": row.strengths, "weaknesses": row.weaknesses,
+            "recommendation": row.recommendation, "detailed_feedback": row.detailed_feedback,
+        }
+
+    def new_score(self, evaluation):
+        return int(evaluation.get("overall_score", 0))
+
+    def _write_chunk(self, rows, evaluations):
+        from .leaderboard import get_leaderboard
+
+        super()._write_chunk(rows, evaluations)
+        if not self.run.dry_run:
+            # bulk_update sends no signals
+            for master_token in {result.session.master_token for result in rows}:
+                get_leaderboard().enqueue(master_token)
+
+    def compare(self, row, evaluation, stats):
+        if evaluation.get("recommendation", row.recommendation) != row.recommendation:
+            stats["recommendation_changes"] = stats.get("recommendation_changes", 0) + 1
+
+    def apply(self, row, evaluation):
+        row.overall_score = self.new_score(evaluation)
+        row.summary = evaluation.get("summary", "")
+        row.strengths = evaluation.get("strengths", [])
+        row.weaknesses = evaluation.get("weaknesses", [])
+        row.recommendation = evaluation.get("recommendation", "maybe")
+        row.detailed_feedback = evaluation.get("detailed_feedback", "")
+        return {"overall_score", "summary", "strengths", "weaknesses", "recommendation", "detailed_feedback"}
+
+
+RESCORERS = {cls.target: cls for cls in (AnswerRescorer, ResultRescorer)}
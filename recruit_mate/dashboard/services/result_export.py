@@ -0,0 +1,169 @@
+import csv
+import json
+import re
+from itertools import islice
+from django.conf import settings
+from django.utils.text import slugify
+from .answer_similarity import question_hash
+
+QUESTION_TYPES = ("technical", "behavioral", "situational")
+FIELDS = [
+    "session_id", "candidate_name", "candidate_email", "candidate_phone", "job", "link", "status",
+    "started_at", "completed_at", "overall_score", "recommendation",
+] + [f"{question_type}_score" for question_type in QUESTION_TYPES] + ["answered"]
+# format -> (content type, file extension)
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "excel": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+RESULT_COLUMNS = (
+    "session_id", "session__candidate_name", "session__candidate_email", "session__candidate_phone",
+    "session__candidate__name", "session__candidate__email", "session__candidate__phone", "session__job__title",
+    "session__master_token", "session__token", "session__status", "session__started_at", "session__completed_at",
+    "overall_score", "recommendation",
+)
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+_PHONE_RE = re.compile(r"^[+-][\d\s().-]*$")
+
+
+class _Echo:
+    """File-like object whose write() returns the line csv.writer produced"""
+
+    def write(self, value):
+        return value
+
+
+def _excel_cell(value):
+    # Spreadsheets evaluate cells starting with these as formulas; "+1 555 0100" is left alone
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES) and not _PHONE_RE.match(value):
+        return "'" + value
+    return value
+
+
+class ResultExport:
+    """
+    Interview results of one link or job, streamed as CSV, NDJSON or
+    spreadsheet-safe CSV (UTF-8 BOM, CRLF rows, formula cells escaped).
+
+    Results are read as plain rows with iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    and each chunk's answers are fetched with one query, so memory stays at
+    one chunk whatever the export size. The header is produced before the
+    results query runs, so the first bytes go out immediately.
+
+    CSV has a score column per question of the link(s) the results came
+    from, matched by question wording; NDJSON rows carry a list of
+    {question, type, score} instead.
+    """
+
+    def __init__(self, results, questions, name="results", chunk_size=None):
+        self.results = results
+        self.questions = questions
+        self.name = name
+        self.chunk_size = chunk_size or getattr(settings, "EXPORT_CHUNK_SIZE", 500)
+
+    @classmethod
+    def for_link(cls, master_session, **kwargs):
+        from interviews.models import InterviewResult
+
+        results = InterviewResult.objects.filter(
+            session__master_token=master_session.token, session__user=master_session.user,
+        )
+        return cls(results, master_session.questions.all(), name=f"{master_session.job.title}-link", **kwargs)
+
+    @classmethod
+    def for_job(cls, job, **kwargs):
+        from interviews.models import InterviewQuestion, InterviewResult
+
+        results = InterviewResult.objects.filter(session__job=job, session__user=job.user)
+        # Links and direct interviews hold the questions; candidate sessions copy them
+        questions = InterviewQuestion.objects.filter(
+            session__job=job, session__user=job.user, session__master_token__isnull=True,
+        ).order_by("session__created_at", "order", "pk")
+        return cls(results, questions, name=job.title, **kwargs)
+
+    # --- Rows ------------------------------------------------------------
+
+    def question_columns(self):
+        """[(question hash, header)] in question order, one per wording"""
+        columns, seen = [], set()
+        for text in self.questions.values_list("question_text", flat=True):
+            digest = question_hash(text)
+            if digest not in seen:
+                seen.add(digest)
+                columns.append((digest, f"Q{len(columns) + 1}: {' '.join(text.split())[:80]}"))
+        return columns
+
+    def records(self):
+        """One dict per result; ``questions`` holds (hash, text, type, score) per answer"""
+        from interviews.models import InterviewAnswer
+
+        hashes = {}
+        rows = self.results.order_by("pk").values_list(*RESULT_COLUMNS).iterator(chunk_size=self.chunk_size)
+        while True:
+            batch = list(islice(rows, self.chunk_size))
+            if not batch:
+                break
+            answers = {}
+            for session_id, text, question_type, score in (
+                InterviewAnswer.objects.filter(session_id__in=[row[0] for row in batch])
+                .order_by("session_id", "question__order", "pk")
+                .values_list("session_id", "question__question_text", "question__question_type", "score")
+            ):
+                digest = hashes.get(text)
+                if digest is None:
+                    digest = hashes[text] = question_hash(text)
+                answers.setdefault(session_id, []).append((digest, text, question_type, score))
+
+            for (session_id, name, email, phone, candidate_name, candidate_email, candidate_phone, job,
+                 master_token, token, status, started_at, completed_at, overall_score, recommendation) in batch:
+                questions = answers.get(session_id, [])
+                record = {
+                    "session_id": session_id,
+                    "candidate_name": name or candidate_name or "",
+                    "candidate_email": email or candidate_email or "",
+                    "candidate_phone": phone or candidate_phone or "",
+                    "job": job,
+                    "link": str(master_token or token),
+                    "status": status,
+                    "started_at": started_at.isoformat() if started_at else "",
+                    "completed_at": completed_at.isoformat() if completed_at else "",
+                    "overall_score": overall_score,
+                    "recommendation": recommendation,
+                    "answered": len(questions),
+                    "questions": questions,
+                }
+                for question_type in QUESTION_TYPES:
+                    scores = [score for _, _, kind, score in questions if kind == question_type]
+                    record[f"{question_type}_score"] = round(sum(scores) / len(scores), 1) if scores else None
+                yield record
+
+    # --- Formats ---------------------------------------------------------
+
+    def csv_lines(self, excel=False):
+        columns = self.question_columns()
+        writer = csv.writer(_Echo(), lineterminator="\r\n" if excel else "\n")
+        clean = _excel_cell if excel else (lambda value: value)
+        header = writer.writerow(FIELDS + [header for _, header in columns])
+        yield ("\ufeff" + header) if excel else header
+        for record in self.records():
+            scores = {digest: score for digest, _, _, score in record["questions"]}
+            yield writer.writerow(
+                [clean(record[field]) for field in FIELDS] + [scores.get(digest, "") for digest, _ in columns]
+            )
+
+    def ndjson_lines(self):
+        for record in self.records():
+            record["questions"] = [
+                {"question": text, "type": question_type, "score": score}
+                for _, text, question_type, score in record["questions"]
+            ]
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+
+    def lines(self, fmt):
+        if fmt == "ndjson":
+            return self.ndjson_lines()
+        return self.csv_lines(excel=fmt == "excel")
+
+    def filename(self, fmt):
+        return f"{slugify(self.name) or 'interview'}-results.{FORMATS[fmt][1]}"
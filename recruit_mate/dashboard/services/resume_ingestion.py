@@ -0,0 +1,188 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .resume_parser import ResumeParser, file_sha256
+from .search_index import reindex_on_commit
+from .identity_resolution import get_identity_resolver
+from .match_engine import index_candidate_vectors
+from .skill_index import index_candidate_skills
+from .storage_service import StorageService
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeIngestionPipeline:
+    """
+    Processes uploaded resumes off the request path.
+
+    The upload view stores the file and records a ResumeIngestion row; the
+    remaining stages (hash, extract text, parse fields, index onto the
+    candidate/session) run on a small worker pool after the transaction
+    commits. Each stage is recorded on the row, so recruiters can see how far
+    a file got and failed files can be retried with process_resume_ingestions.
+    RESUME_INGESTION_WORKERS = 0 runs the stages inline.
+    """
+
+    def __init__(self, max_workers=None):
+        if max_workers is None:
+            max_workers = getattr(settings, "RESUME_INGESTION_WORKERS", 2)
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def enqueue(self, file_name, candidate=None, session=None):
+        from dashboard.models import ResumeIngestion
+
+        ingestion = ResumeIngestion.objects.create(file=file_name, candidate=candidate, session=session)
+        transaction.on_commit(lambda: self.submit(ingestion.pk))
+        return ingestion
+
+    def submit(self, pk):
+        if self.max_workers <= 0:
+            self.run(pk)
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="resume-ingestion")
+        self._executor.submit(self._run_in_worker, pk)
+
+    def _run_in_worker(self, pk):
+        try:
+            self.run(pk)
+        finally:
+            close_old_connections()
+
+    def run(self, pk):
+        """Run every outstanding stage for one ingestion; returns False if another worker owns it"""
+        from dashboard.models import ResumeIngestion
+
+        claimed = ResumeIngestion.objects.filter(pk=pk, status__in=["pending", "failed"]).update(
+            status="running", started_at=timezone.now(), attempts=F("attempts") + 1, error="",
+        )
+        if not claimed:
+            return False
+
+        ingestion = ResumeIngestion.objects.select_related("parsed").get(pk=pk)
+        context = {}
+        try:
+            for stage in (self._hash, self._extract, self._parse, self._index):
+                stage(ingestion, context)
+        except Exception as e:
+            logger.exception("Resume ingestion %s failed at stage %s: %s", pk, ingestion.stage, e)
+            ingestion.status = "failed"
+            ingestion.error = str(e)[:2000]
+            ingestion.finished_at = timezone.now()
+            ingestion.save(update_fields=["status", "error", "finished_at", "updated_at"])
+            return True
+
+        ingestion.status = "done"
+        ingestion.finished_at = timezone.now()
+        ingestion.save(update_fields=["status", "finished_at", "updated_at"])
+        return True
+
+    def _advance(self, ingestion, stage, *fields):
+        ingestion.stage = stage
+        ingestion.save(update_fields=["stage", "updated_at", *fields])
+
+    def _hash(self, ingestion, context):
+        if not ingestion.sha256:
+            # Content-addressed files already carry their hash in the name
+            ingestion.sha256 = StorageService.blob_sha256(ingestion.file) or ""
+        if not ingestion.sha256:
+            with default_storage.open(ingestion.file, "rb") as file:
+                ingestion.sha256 = file_sha256(file)
+        self._advance(ingestion, "hashed", "sha256")
+
+    def _extract(self, ingestion, context):
+        from dashboard.models import ParsedResume
+
+        # Identical files uploaded earlier skip extraction and parsing entirely.
+        if ingestion.parsed is None:
+            ingestion.parsed = ParsedResume.objects.filter(sha256=ingestion.sha256).first()
+        if ingestion.parsed is None:
+            with default_storage.open(ingestion.file, "rb") as file:
+                context["text"] = ResumeParser.extract_text(file)
+        self._advance(ingestion, "extracted", "parsed")
+
+    def _parse(self, ingestion, context):
+        from dashboard.models import ParsedResume
+
+        if ingestion.parsed is None:
+            text = context["text"]
+            ingestion.parsed, _ = ParsedResume.objects.get_or_create(
+                sha256=ingestion.sha256,
+                defaults={"text": text, "data": ResumeParser.parse_text(text)},
+            )
+        else:
+            ResumeParser.refresh(ingestion.parsed)
+        self._advance(ingestion, "parsed", "parsed")
+
+    def _index(self, ingestion, context):
+        from candidates.models import Candidate
+        from interviews.models import InterviewSession
+
+        parsed = ingestion.parsed
+        data = {**parsed.data, "full_text": parsed.text, "sha256": parsed.sha256}
+
+        # Queryset updates so a candidate answering questions meanwhile is not overwritten.
+        if ingestion.candidate_id:
+            Candidate.objects.filter(pk=ingestion.candidate_id).update(
+                resume_data=data,
+                skills=data.get("skills", []),
+                experience_years=data.get("experience_years"),
+                education=data.get("education", ""),
+            )
+        if ingestion.session_id:
+            InterviewSession.objects.filter(pk=ingestion.session_id).update(candidate_resume_data=data)
+            reindex_on_commit("session", [ingestion.session_id])
+            # The resume is what links a session sent under another email
+            get_identity_resolver().enqueue(ingestion.session_id)
+        if ingestion.candidate_id:
+            candidate = Candidate.objects.only("pk", "skills", "resume_data", "education").get(pk=ingestion.candidate_id)
+            index_candidate_skills([candidate])
+            index_candidate_vectors([candidate])
+            reindex_on_commit("candidate", [ingestion.candidate_id])
+        self._advance(ingestion, "indexed")
+
+    def process_pending(self, limit=None, retry_failed=False, stale_after=None):
+        """Synchronously process queued work; used by the management command"""
+        from dashboard.models import ResumeIngestion
+
+        # Rows left "running" by a worker that died are put back in the queue.
+        if stale_after is not None:
+            ResumeIngestion.objects.filter(
+                status="running", started_at__lt=timezone.now() - timedelta(seconds=stale_after),
+            ).update(status="pending")
+
+        statuses = ["pending", "failed"] if retry_failed else ["pending"]
+        max_attempts = getattr(settings, "RESUME_INGESTION_MAX_ATTEMPTS", 3)
+        queryset = ResumeIngestion.objects.filter(status__in=statuses).filter(
+            Q(status="pending") | Q(attempts__lt=max_attempts)
+        ).order_by("created_at").values_list("pk", flat=True)
+        if limit:
+            queryset = queryset[:limit]
+
+        processed = 0
+        for pk in list(queryset):
+            if self.run(pk):
+                processed += 1
+        return processed
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_resume_pipeline():
+    """Process-wide ingestion pipeline"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = ResumeIngestionPipeline()
+        return _pipeline
@@ -1,43 +1,106 @@
+import hashlib
+import logging
 import re
+import time
+from django.conf import settings
 from docx import Document
 from PyPDF2 import PdfReader
+from .skill_taxonomy import get_skill_taxonomy
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(file):
+    """SHA-256 of an uploaded or stored file, read in chunks; leaves the file at position 0"""
+    digest = hashlib.sha256()
+    if hasattr(file, "chunks"):
+        for chunk in file.chunks():
+            digest.update(chunk)
+    else:
+        file.seek(0)
+        for chunk in iter(lambda: file.read(64 * 1024), b""):
+            digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
 
 class ResumeParser:
 
-    SKILLS_KEYWORDS = [
-        "Python", "Django", "Flask", "JavaScript", "React", "Node.js", "MongoDB",
-        "SQL", "Flutter", "Unity", "C++", "Java", "Git", "Docker", "AWS"
-    ]
+    # Bump when parse_text output changes; cached parses are refreshed from their stored text.
+    PARSER_VERSION = 3
 
     EDUCATION_KEYWORDS = [
         "Bachelor", "Master", "B.Tech", "B.E", "M.Tech", "MBA", "PhD", "Diploma"
     ]
 
     EXPERIENCE_REGEX = r'(\d+)\s+(?:years|yrs|year)'
+    EMAIL_REGEX = r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+'
+    PHONE_REGEX = r'\+?\d[\d\s().-]{7,}\d'
 
     @staticmethod
-    def extract_text(file):
-        """Extract text from PDF or DOCX file"""
-        if file.name.endswith('.pdf'):
-            reader = PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text
-        elif file.name.endswith('.docx'):
-            doc = Document(file)
-            text = "\n".join([p.text for p in doc.paragraphs])
-            return text
+    def _iter_pdf_pages(file, max_pages):
+        # PdfReader seeks within the file object instead of copying it, so a
+        # disk-backed upload is never fully loaded into memory.
+        reader = PdfReader(file)
+        for index in range(min(len(reader.pages), max_pages)):
+            yield reader.pages[index].extract_text() or ""
+            # Decoded content streams are cached per object; drop them once the page is read.
+            reader.resolved_objects.clear()
+
+    @staticmethod
+    def _iter_docx_paragraphs(file):
+        for paragraph in Document(file).paragraphs:
+            yield paragraph.text
+
+    @classmethod
+    def iter_text(cls, file, max_pages=None, max_chars=None, timeout=None):
+        """
+        Yield resume text page by page (PDF) or paragraph by paragraph (DOCX).
+
+        Stops early at RESUME_MAX_PAGES pages, RESUME_MAX_CHARS characters or
+        once RESUME_EXTRACT_TIMEOUT seconds have passed. The timeout is a
+        budget checked between pages (paragraphs for DOCX), not a hard limit:
+        a page that is already being extracted runs to completion, so one
+        pathological page can overrun it by that page's extraction time.
+        """
+        max_pages = max_pages or getattr(settings, "RESUME_MAX_PAGES", 50)
+        max_chars = max_chars or getattr(settings, "RESUME_MAX_CHARS", 200000)
+        timeout = timeout or getattr(settings, "RESUME_EXTRACT_TIMEOUT", 20)
+
+        name = file.name.lower()
+        if name.endswith(".pdf"):
+            chunks = cls._iter_pdf_pages(file, max_pages)
+        elif name.endswith(".docx"):
+            chunks = cls._iter_docx_paragraphs(file)
         else:
-            return ""
+            return
+
+        deadline = time.monotonic() + timeout
+        remaining = max_chars
+        for chunk in chunks:
+            if len(chunk) >= remaining:
+                yield chunk[:remaining]
+                logger.warning("Resume %s truncated at %d characters", file.name, max_chars)
+                return
+            remaining -= len(chunk)
+            yield chunk
+            if time.monotonic() > deadline:
+                logger.warning("Resume %s extraction stopped after %ss", file.name, timeout)
+                return
 
     @classmethod
-    def parse_resume(cls, file):
-        text = cls.extract_text(file)
+    def extract_text(cls, file, **limits):
+        """Extract text from PDF or DOCX file"""
+        return "\n".join(cls.iter_text(file, **limits))
+
+    @classmethod
+    def parse_text(cls, text):
         text_lower = text.lower()
 
         # Extract skills
-        skills = [skill for skill in cls.SKILLS_KEYWORDS if skill.lower() in text_lower]
+        taxonomy = get_skill_taxonomy()
+        skill_counts = taxonomy.match(text)
+        skill_ids = taxonomy.ranked_ids(skill_counts)
 
         # Extract experience
         experience_matches = re.findall(cls.EXPERIENCE_REGEX, text_lower)
@@ -49,8 +112,60 @@ class ResumeParser:
             if keyword.lower() in text_lower:
                 education.append(keyword)
 
+        # Contact details: first email/phone, and a short first line as the name
+        email = re.search(cls.EMAIL_REGEX, text)
+        phone = re.search(cls.PHONE_REGEX, text)
+        first_line = next((line.strip() for line in text.splitlines() if line.strip()), "")
+        looks_like_name = (
+            re.fullmatch(r"(?:[^\W\d_]|[.' -]){2,60}", first_line)
+            and len(first_line.split()) <= 5
+            and first_line.lower() not in ("resume", "curriculum vitae", "cv")
+        )
+        name = first_line if looks_like_name else ""
+
         return {
-            "skills": skills,
+            "name": name,
+            "email": email.group().lower() if email else "",
+            "phone": " ".join(phone.group().split()) if phone else "",
+            "skills": taxonomy.names(skill_ids),
+            "skill_ids": skill_ids,
+            "skill_counts": dict(skill_counts),
             "experience_years": experience_years,
-            "education": ", ".join(education)
+            "education": ", ".join(education),
+            "parser_version": cls.PARSER_VERSION,
         }
+
+    @classmethod
+    def parse_resume(cls, file):
+        return cls.parse_text(cls.extract_text(file))
+
+    @classmethod
+    def get_or_parse(cls, file):
+        """
+        Parse a resume once per unique file content.
+
+        Returns the parsed fields plus ``full_text`` and ``sha256``, suitable
+        for storing in Candidate.resume_data / InterviewSession.candidate_resume_data.
+        """
+        from dashboard.models import ParsedResume
+
+        digest = file_sha256(file)
+        cached = ParsedResume.objects.filter(sha256=digest).first()
+        if cached is None:
+            text = cls.extract_text(file)
+            file.seek(0)
+            cached, _ = ParsedResume.objects.get_or_create(
+                sha256=digest,
+                defaults={"text": text, "data": cls.parse_text(text)},
+            )
+        else:
+            cls.refresh(cached)
+        return {**cached.data, "full_text": cached.text, "sha256": digest}
+
+    @classmethod
+    def refresh(cls, parsed):
+        """Re-parse a cached ParsedResume from its stored text if an older parser produced it"""
+        if parsed.data.get("parser_version") != cls.PARSER_VERSION:
+            parsed.data = cls.parse_text(parsed.text)
+            parsed.save(update_fields=["data", "updated_at"])
+        return parsed
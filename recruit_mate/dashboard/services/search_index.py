@@ -0,0 +1,366 @@
+import logging
+import re
+import threading
+from collections import namedtuple
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Prefetch
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+logger = logging.getLogger(__name__)
+
+SearchDocument = namedtuple("SearchDocument", "doc_type object_id owner_ids title body")
+SearchHit = namedtuple("SearchHit", "doc_type object_id title snippet score")
+
+# A document is only visible to the recruiters in its owner_ids: the owner of
+# a job, session or answer, and for a candidate whoever added them or
+# interviewed them (the same rule as resume downloads).
+
+_HIT_START = "\x02"
+_HIT_END = "\x03"
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+# Matches the FTS5 prefix index, so prefix queries are index lookups
+MIN_PREFIX_LENGTH = 3
+
+
+def owner_scope(user_id):
+    return f"u{user_id}"
+
+
+def document_scope(doc):
+    owners = sorted({owner_id for owner_id in doc.owner_ids if owner_id is not None})
+    return " ".join([owner_scope(owner_id) for owner_id in owners] + [f"t{doc.doc_type}"])
+
+
+def highlight_html(text):
+    """Escape an FTS snippet and turn its match markers into <mark> tags"""
+    return mark_safe(escape(text).replace(_HIT_START, "<mark>").replace(_HIT_END, "</mark>"))
+
+
+def build_match_query(query):
+    """
+    FTS5 MATCH expression for free text typed by a user.
+
+    Every word is quoted, so operators and column filters in the input are
+    searched for literally, and the last word matches as a prefix so results
+    show up while a word is still being typed. Prefixes shorter than
+    MIN_PREFIX_LENGTH would expand to a large part of the vocabulary, so
+    those only match whole words. Returns "" if nothing is left.
+    """
+    terms = _TERM_RE.findall(query or "")[:16]
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    if len(terms[-1]) >= MIN_PREFIX_LENGTH:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+class SearchBackend:
+    """
+    Interface for full-text search backends.
+
+    Documents are identified by (doc_type, object_id); index() replaces any
+    earlier version. search() only returns documents visible to ``user_id``.
+    """
+
+    def index(self, documents):
+        raise NotImplementedError
+
+    def remove(self, doc_type, object_ids):
+        raise NotImplementedError
+
+    def search(self, query, user_id, doc_types=None, offset=0, limit=20):
+        """[SearchHit] best match first; snippets are safe HTML"""
+        raise NotImplementedError
+
+    def clear(self, doc_type=None):
+        raise NotImplementedError
+
+
+class NullSearchBackend(SearchBackend):
+    """Keeps no index; for databases without a search extension"""
+
+    def index(self, documents):
+        pass
+
+    def remove(self, doc_type, object_ids):
+        pass
+
+    def search(self, query, user_id, doc_types=None, offset=0, limit=20):
+        return []
+
+    def clear(self, doc_type=None):
+        pass
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """
+    Search index in an FTS5 virtual table inside the main SQLite database.
+
+    The row id is derived from (doc_type, object_id), so updates and deletes
+    are rowid lookups. The visibility scope is an indexed column and part of
+    every query, so a recruiter's search intersects posting lists instead of
+    filtering matches afterwards. Results are ranked with BM25, title matches
+    weighing more than body matches.
+    """
+
+    TABLE = "dashboard_search_index"
+    TYPE_CODES = {"candidate": 1, "session": 2, "job": 3, "answer": 4}
+    TYPE_BITS = 3
+    TITLE_WEIGHT = 5.0
+    BODY_WEIGHT = 1.0
+    SNIPPET_TOKENS = 24
+
+    def __init__(self):
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _rowid(self, doc_type, object_id):
+        return (int(object_id) << self.TYPE_BITS) | self.TYPE_CODES[doc_type]
+
+    def _ensure_table(self, cursor):
+        if self._ready:
+            return
+        with self._lock:
+            # Created on first use rather than in a migration, since virtual
+            # tables are specific to the SQLite backend.
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.TABLE} USING fts5("
+                "title, body, scope, doc_type UNINDEXED, object_id UNINDEXED, "
+                f"tokenize = 'unicode61 remove_diacritics 2', prefix = '{MIN_PREFIX_LENGTH}')"
+            )
+            self._ready = True
+
+    def index(self, documents):
+        documents = list(documents)
+        if not documents:
+            return
+        with connection.cursor() as cursor:
+            self._ensure_table(cursor)
+            rowids = [self._rowid(doc.doc_type, doc.object_id) for doc in documents]
+            self._delete_rowids(cursor, rowids)
+            cursor.executemany(
+                f"INSERT INTO {self.TABLE} (rowid, title, body, scope, doc_type, object_id) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                [
+                    (rowid, doc.title or "", doc.body or "", document_scope(doc), doc.doc_type, int(doc.object_id))
+                    for rowid, doc in zip(rowids, documents)
+                ],
+            )
+
+    def _delete_rowids(self, cursor, rowids):
+        for start in range(0, len(rowids), 500):
+            chunk = rowids[start:start + 500]
+            cursor.execute(
+                f"DELETE FROM {self.TABLE} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})", chunk,
+            )
+
+    def remove(self, doc_type, object_ids):
+        rowids = [self._rowid(doc_type, pk) for pk in object_ids]
+        if not rowids:
+            return
+        with connection.cursor() as cursor:
+            self._ensure_table(cursor)
+            self._delete_rowids(cursor, rowids)
+
+    def search(self, query, user_id, doc_types=None, offset=0, limit=20):
+        match = build_match_query(query)
+        if not match:
+            return []
+        expression = f'({match}) AND scope : "{owner_scope(user_id)}"'
+        if doc_types:
+            expression += " AND scope : (" + " OR ".join(f'"t{t}"' for t in doc_types) + ")"
+
+        with connection.cursor() as cursor:
+            self._ensure_table(cursor)
+            cursor.execute(
+                f"SELECT doc_type, object_id, "
+                f"highlight({self.TABLE}, 0, %s, %s), "
+                f"snippet({self.TABLE}, 1, %s, %s, '…', {self.SNIPPET_TOKENS}), "
+                f"bm25({self.TABLE}, {self.TITLE_WEIGHT}, {self.BODY_WEIGHT}, 0.0) AS score "
+                f"FROM {self.TABLE} WHERE {self.TABLE} MATCH %s "
+                "ORDER BY score LIMIT %s OFFSET %s",
+                [_HIT_START, _HIT_END, _HIT_START, _HIT_END, expression, limit, offset],
+            )
+            rows = cursor.fetchall()
+        return [
+            SearchHit(doc_type, object_id, highlight_html(title), highlight_html(snippet), -score)
+            for doc_type, object_id, title, snippet, score in rows
+        ]
+
+    def clear(self, doc_type=None):
+        with connection.cursor() as cursor:
+            self._ensure_table(cursor)
+            if doc_type is None:
+                cursor.execute(f"DELETE FROM {self.TABLE}")
+            else:
+                cursor.execute(f"DELETE FROM {self.TABLE} WHERE scope MATCH %s", [f'"t{doc_type}"'])
+
+    def optimize(self):
+        """Merge index segments; worth running after a full rebuild"""
+        with connection.cursor() as cursor:
+            self._ensure_table(cursor)
+            cursor.execute(f"INSERT INTO {self.TABLE} ({self.TABLE}) VALUES ('optimize')")
+
+
+# --- Documents -----------------------------------------------------------
+
+def _resume_text(data):
+    return (data or {}).get("full_text", "")
+
+
+def _candidate_owners(candidate):
+    return {candidate.created_by_id} | {session.user_id for session in candidate.interview_sessions.all()}
+
+
+def _candidate_documents(candidates):
+    for candidate in candidates:
+        yield SearchDocument(
+            "candidate", candidate.pk, _candidate_owners(candidate),
+            candidate.name,
+            "\n".join([candidate.email, " ".join(candidate.skills or []), _resume_text(candidate.resume_data)]),
+        )
+
+
+def _session_documents(sessions):
+    for session in sessions:
+        candidate = session.candidate
+        name = candidate.name if candidate else session.candidate_name
+        email = candidate.email if candidate else session.candidate_email
+        if not (name or email):
+            # Master links have no candidate to find
+            continue
+        resume = _resume_text(session.candidate_resume_data) or (_resume_text(candidate.resume_data) if candidate else "")
+        yield SearchDocument(
+            "session", session.pk, (session.user_id,),
+            f"{name or email} - {session.job.title}",
+            "\n".join([email or "", resume]),
+        )
+
+
+def _job_documents(jobs):
+    for job in jobs:
+        yield SearchDocument(
+            "job", job.pk, (job.user_id,),
+            job.title,
+            "\n".join([job.description, job.requirements, " ".join(job.skills or [])]),
+        )
+
+
+def _answer_documents(answers):
+    for answer in answers:
+        session = answer.session
+        who = session.candidate.name if session.candidate else session.candidate_name
+        yield SearchDocument(
+            "answer", answer.pk, (session.user_id,),
+            f"{who or 'Candidate'}: {answer.question.question_text[:200]}",
+            answer.answer_text,
+        )
+
+
+def _querysets():
+    from candidates.models import Candidate
+    from interviews.models import InterviewAnswer, InterviewSession
+    from jobs.models import JobDescription
+
+    return {
+        "candidate": (
+            Candidate.objects.prefetch_related(
+                Prefetch("interview_sessions", queryset=InterviewSession.objects.only("pk", "candidate_id", "user_id")),
+            ),
+            _candidate_documents,
+        ),
+        "session": (InterviewSession.objects.select_related("candidate", "job"), _session_documents),
+        "job": (JobDescription.objects.all(), _job_documents),
+        "answer": (InterviewAnswer.objects.select_related("session__candidate", "question"), _answer_documents),
+    }
+
+
+DOC_TYPES = ("candidate", "session", "job", "answer")
+
+
+def reindex(doc_type, pks):
+    """Load the given objects and (re)index them; pks that no longer exist are removed"""
+    pks = set(pks)
+    if not pks:
+        return
+    queryset, build = _querysets()[doc_type]
+    objects = list(queryset.filter(pk__in=pks))
+    documents = list(build(objects))
+    backend = get_search_backend()
+    backend.index(documents)
+    backend.remove(doc_type, pks - {doc.object_id for doc in documents})
+
+
+def reindex_on_commit(doc_type, pks):
+    """Schedule reindex() after the current transaction; indexing errors never fail the write"""
+    pks = list(pks)
+
+    def run():
+        try:
+            reindex(doc_type, pks)
+        except Exception as e:
+            logger.exception("Search indexing of %s %s failed: %s", doc_type, pks, e)
+
+    transaction.on_commit(run)
+
+
+def remove_on_commit(doc_type, pks):
+    pks = list(pks)
+
+    def run():
+        try:
+            get_search_backend().remove(doc_type, pks)
+        except Exception as e:
+            logger.exception("Search index removal of %s %s failed: %s", doc_type, pks, e)
+
+    transaction.on_commit(run)
+
+
+def rebuild_index(doc_types=None, batch_size=500, progress=None):
+    """Re-index every object of ``doc_types`` (default all); returns {doc_type: documents indexed}"""
+    backend = get_search_backend()
+    counts = {}
+    for doc_type in doc_types or DOC_TYPES:
+        queryset, build = _querysets()[doc_type]
+        backend.clear(doc_type)
+        counts[doc_type] = 0
+        batch = []
+        for obj in queryset.order_by("pk").iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                counts[doc_type] += _index_batch(backend, build, batch)
+                batch = []
+                if progress:
+                    progress(doc_type, counts[doc_type])
+        counts[doc_type] += _index_batch(backend, build, batch)
+    if hasattr(backend, "optimize"):
+        backend.optimize()
+    return counts
+
+
+def _index_batch(backend, build, objects):
+    documents = list(build(objects))
+    with transaction.atomic():
+        backend.index(documents)
+    return len(documents)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_search_backend():
+    """Process-wide backend chosen by SEARCH_BACKEND"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            path = getattr(settings, "SEARCH_BACKEND", None)
+            if path is None:
+                path = ("dashboard.services.search_index.SQLiteFTS5Backend" if connection.vendor == "sqlite"
+                        else "dashboard.services.search_index.NullSearchBackend")
+            _backend = import_string(path)()
+        return _backend
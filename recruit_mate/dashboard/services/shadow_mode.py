@@ -0,0 +1,190 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+from .llm_json import EVALUATION_SCHEMA, QUESTIONS_SCHEMA, parse_llm_json
+from .rate_limiter import BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ("evaluate_answer", "generate_questions")
+
+
+def _evaluation_call(service, question, answer, expected_key_points):
+    return service._evaluation_prompt(question, answer, expected_key_points), EVALUATION_SCHEMA
+
+
+def _questions_call(service, job_description, resume_data, num_questions):
+    return service._questions_prompt(job_description, resume_data, num_questions), QUESTIONS_SCHEMA
+
+
+# operation -> builds (prompt, schema) with the provider's own prompt
+_CALLS = {"evaluate_answer": _evaluation_call, "generate_questions": _questions_call}
+
+
+def provider_name(service_class):
+    return getattr(service_class, "provider", service_class.__name__)
+
+
+class ShadowRunner:
+    """
+    Mirrors a sample of primary LLM calls to a secondary provider.
+
+    mirror() is called after the primary call has returned, and only draws a
+    random number and hands the work to a background thread, so shadow
+    traffic never adds latency to the primary response. SHADOW_SAMPLE_RATE
+    of the calls for SHADOW_OPERATIONS are sent to SHADOW_SECONDARY_SERVICE
+    at BACKGROUND priority with that provider's own prompt; both results
+    and latencies are stored as a ShadowComparison. When more than
+    SHADOW_MAX_PENDING mirrors are waiting, new ones are dropped.
+    """
+
+    def __init__(self, sample_rate=None, secondary=None):
+        if sample_rate is None:
+            sample_rate = getattr(settings, "SHADOW_SAMPLE_RATE", 0.0)
+        self.sample_rate = sample_rate
+        self.secondary = secondary or getattr(settings, "SHADOW_SECONDARY_SERVICE", "dashboard.services.ai_service.AIService")
+        self.operations = set(getattr(settings, "SHADOW_OPERATIONS", OPERATIONS))
+        self.max_pending = getattr(settings, "SHADOW_MAX_PENDING", 100)
+        self.max_workers = getattr(settings, "SHADOW_WORKERS", 2)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = 0
+        self.dropped = 0
+
+    def enabled(self, operation):
+        return self.sample_rate > 0 and operation in self.operations
+
+    def mirror(self, operation, args, primary_provider, primary_result, primary_latency_ms,
+               primary_failed=False, batch_size=1):
+        """Maybe replay ``operation(*args)`` on the secondary provider; returns at once"""
+        if not self.enabled(operation) or random.random() >= self.sample_rate:
+            return False
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="llm-shadow")
+        self._executor.submit(
+            self._run, operation, args, primary_provider, primary_result, primary_latency_ms, primary_failed, batch_size,
+        )
+        return True
+
+    def _run(self, operation, args, primary_provider, primary_result, primary_latency_ms, primary_failed, batch_size):
+        from dashboard.models import ShadowComparison
+
+        try:
+            service_class = import_string(self.secondary)
+            secondary_result, secondary_latency, error = None, None, ""
+            started = time.monotonic()
+            try:
+                service = service_class()
+                prompt, schema = _CALLS[operation](service, *args)
+                text = service._generate(prompt, BACKGROUND, operation)
+                secondary_result = parse_llm_json(text, schema)
+                if secondary_result is None:
+                    error = "Unparseable response"
+            except Exception as e:
+                error = repr(e)
+            secondary_latency = (time.monotonic() - started) * 1000
+
+            ShadowComparison.objects.create(
+                operation=operation,
+                primary_provider=primary_provider,
+                secondary_provider=provider_name(service_class),
+                primary_latency_ms=primary_latency_ms,
+                secondary_latency_ms=secondary_latency,
+                primary_batch_size=batch_size,
+                primary_failed=primary_failed,
+                secondary_failed=secondary_result is None,
+                primary_score=self._score(operation, None if primary_failed else primary_result),
+                secondary_score=self._score(operation, secondary_result),
+                primary_result=self._jsonable(primary_result),
+                secondary_result=self._jsonable(secondary_result),
+                error=error[:2000],
+            )
+        except Exception as e:
+            logger.exception("Shadow %s call failed: %s", operation, e)
+        finally:
+            with self._lock:
+                self._pending -= 1
+            close_old_connections()
+
+    def _score(self, operation, result):
+        if operation == "evaluate_answer" and isinstance(result, dict) and result.get("score") is not None:
+            return int(result["score"])
+        return None
+
+    def _jsonable(self, result):
+        if result is None:
+            return {}
+        return result if isinstance(result, dict) else {"items": result}
+
+
+def _percentile(values, q):
+    return round(float(np.percentile(values, q)), 1) if len(values) else None
+
+
+def shadow_report(queryset=None):
+    """
+    Per-operation comparison of stored shadow calls: p50/p95 latency and
+    failure rate per side, and for evaluations the score correlation and
+    mean absolute difference where both sides returned a score.
+    """
+    from dashboard.models import ShadowComparison
+
+    if queryset is None:
+        queryset = ShadowComparison.objects.all()
+    rows = {}
+    for row in queryset.values_list(
+        "operation", "primary_provider", "secondary_provider", "primary_latency_ms", "secondary_latency_ms",
+        "primary_failed", "secondary_failed", "primary_score", "secondary_score",
+    ).iterator(chunk_size=2000):
+        rows.setdefault((row[0], row[1], row[2]), []).append(row[3:])
+
+    report = []
+    for (operation, primary, secondary), values in sorted(rows.items()):
+        p_lat = np.array([v[0] for v in values], dtype=float)
+        s_lat = np.array([v[1] for v in values if v[1] is not None], dtype=float)
+        pairs = np.array([(v[4], v[5]) for v in values if v[4] is not None and v[5] is not None], dtype=float)
+        entry = {
+            "operation": operation,
+            "primary": primary,
+            "secondary": secondary,
+            "calls": len(values),
+            "primary_p50_ms": _percentile(p_lat, 50),
+            "primary_p95_ms": _percentile(p_lat, 95),
+            "secondary_p50_ms": _percentile(s_lat, 50),
+            "secondary_p95_ms": _percentile(s_lat, 95),
+            "primary_failure_rate": round(sum(v[2] for v in values) / len(values), 3),
+            "secondary_failure_rate": round(sum(v[3] for v in values) / len(values), 3),
+            "scored_pairs": len(pairs),
+            "score_correlation": None,
+            "mean_abs_score_diff": None,
+        }
+        if len(pairs):
+            entry["mean_abs_score_diff"] = round(float(np.abs(pairs[:, 0] - pairs[:, 1]).mean()), 1)
+            if len(pairs) > 2 and pairs[:, 0].std() and pairs[:, 1].std():
+                entry["score_correlation"] = round(float(np.corrcoef(pairs[:, 0], pairs[:, 1])[0, 1]), 3)
+        report.append(entry)
+    return report
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_shadow_runner():
+    """Process-wide shadow runner"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = ShadowRunner()
+        return _runner
@@ -0,0 +1,177 @@
+from django.db.models import Count
+from .skill_taxonomy import get_skill_taxonomy
+
+CUSTOM_PREFIX = "custom:"
+
+
+def skill_key(name):
+    """(key, display name, category) for a skill name, canonicalized through the taxonomy"""
+    taxonomy = get_skill_taxonomy()
+    skill_id = taxonomy.lookup(name)
+    if skill_id:
+        skill = taxonomy.skills[skill_id]
+        return skill_id, skill["name"], skill["category"]
+    name = " ".join(name.split())[:150]
+    return (CUSTOM_PREFIX + name.lower())[:150], name, ""
+
+
+def skill_keys(names):
+    """{name: skill key} for the non-blank ``names``"""
+    return {name: skill_key(name)[0] for name in names if name and name.strip()}
+
+
+def get_skill_ids(names, create=True):
+    """{name: Skill pk} for ``names``; unknown skills are created unless ``create`` is False"""
+    from dashboard.models import Skill
+
+    keys = {}
+    meta = {}
+    for name in names:
+        if not name or not name.strip():
+            continue
+        key, display, category = skill_key(name)
+        keys[name] = key
+        meta[key] = (display, category)
+
+    ids = dict(Skill.objects.filter(key__in=list(meta)).values_list("key", "pk"))
+    missing = [key for key in meta if key not in ids]
+    if missing and create:
+        Skill.objects.bulk_create(
+            [Skill(key=key, name=meta[key][0], category=meta[key][1]) for key in missing],
+            ignore_conflicts=True,
+        )
+        ids.update(Skill.objects.filter(key__in=missing).values_list("key", "pk"))
+    return {name: ids[key] for name, key in keys.items() if key in ids}
+
+
+def _sync_links(model, owner_field, desired):
+    """
+    Make ``model`` rows for the owners in ``desired`` ({owner pk: {skill pk: extra fields}})
+    match it, writing only the differences.
+    """
+    if not desired:
+        return
+    existing = {}
+    for link in model.objects.filter(**{f"{owner_field}_id__in": list(desired)}):
+        existing[(getattr(link, f"{owner_field}_id"), link.skill_id)] = link
+
+    to_create, to_update, update_fields = [], [], set()
+    for owner_id, skills in desired.items():
+        for skill_id, fields in skills.items():
+            link = existing.pop((owner_id, skill_id), None)
+            if link is None:
+                to_create.append(model(**{f"{owner_field}_id": owner_id, "skill_id": skill_id, **fields}))
+            elif any(getattr(link, field) != value for field, value in fields.items()):
+                for field, value in fields.items():
+                    setattr(link, field, value)
+                to_update.append(link)
+                update_fields.update(fields)
+
+    if existing:
+        model.objects.filter(pk__in=[link.pk for link in existing.values()]).delete()
+    if to_create:
+        model.objects.bulk_create(to_create, ignore_conflicts=True)
+    if to_update:
+        model.objects.bulk_update(to_update, sorted(update_fields))
+
+
+def index_candidate_skills(candidates):
+    """
+    Sync CandidateSkill rows with each candidate's ``skills`` list. Mention
+    counts come from the parsed resume where available.
+    """
+    from candidates.models import CandidateSkill
+
+    candidates = list(candidates)
+    names = {name for candidate in candidates for name in candidate.skills or []}
+    keys = skill_keys(names)
+    ids = get_skill_ids(names)
+    desired = {}
+    for candidate in candidates:
+        counts = (candidate.resume_data or {}).get("skill_counts", {})
+        links = desired[candidate.pk] = {}
+        for name in candidate.skills or []:
+            if name in ids:
+                links[ids[name]] = {"mentions": max(1, int(counts.get(keys[name], 1)))}
+    _sync_links(CandidateSkill, "candidate", desired)
+
+
+def index_job_skills(jobs):
+    """Sync JobSkill rows with each job's ``skills`` list"""
+    from jobs.models import JobSkill
+
+    jobs = list(jobs)
+    ids = get_skill_ids({name for job in jobs for name in job.skills or []})
+    desired = {
+        job.pk: {ids[name]: {} for name in job.skills or [] if name in ids}
+        for job in jobs
+    }
+    _sync_links(JobSkill, "job", desired)
+
+
+def filter_candidates(queryset, skills=(), match="all", min_experience=None):
+    """
+    Narrow a Candidate queryset to those with all (or any) of ``skills`` and at
+    least ``min_experience`` years. Runs as one query against the skill links.
+    """
+    from candidates.models import CandidateSkill
+
+    if min_experience is not None:
+        queryset = queryset.filter(experience_years__gte=min_experience)
+    skills = [name for name in skills if name and name.strip()]
+    if not skills:
+        return queryset
+
+    skill_ids = set(get_skill_ids(skills, create=False).values())
+    wanted = len(set(skill_keys(skills).values()))
+    if match == "all" and len(skill_ids) < wanted:
+        # A skill nobody has yet
+        return queryset.none()
+    if not skill_ids:
+        return queryset.none()
+
+    links = CandidateSkill.objects.filter(skill_id__in=skill_ids).values("candidate_id")
+    if match == "all":
+        links = links.annotate(matched=Count("skill_id")).filter(matched=len(skill_ids)).values("candidate_id")
+    return queryset.filter(pk__in=links)
+
+
+def matching_candidates(job, min_overlap=1):
+    """
+    Candidates sharing at least ``min_overlap`` skills with ``job``, annotated
+    with ``skill_overlap`` and ordered by it; a single join over the link tables.
+    Only the summary columns are loaded, so the GROUP BY stays narrow.
+    """
+    from candidates.models import Candidate
+
+    return (
+        Candidate.objects
+        .only("pk", "name", "email", "experience_years", "skills")
+        .filter(skill_links__skill__job_links__job=job)
+        .annotate(skill_overlap=Count("skill_links"))
+        .filter(skill_overlap__gte=min_overlap)
+        .order_by("-skill_overlap", "-experience_years", "name")
+    )
+
+
+def rebuild_skill_index(batch_size=500):
+    """Re-sync skill links for every candidate and job; returns (candidates, jobs)"""
+    from candidates.models import Candidate
+    from jobs.models import JobDescription
+
+    counts = []
+    for queryset, index in (
+        (Candidate.objects.only("pk", "skills", "resume_data"), index_candidate_skills),
+        (JobDescription.objects.only("pk", "skills"), index_job_skills),
+    ):
+        total = 0
+        batch = []
+        for obj in queryset.order_by("pk").iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                index(batch)
+                total += len(batch)
+                batch = []
+        index(batch)
+        counts.append(total + len(batch))
+    return tuple(counts)
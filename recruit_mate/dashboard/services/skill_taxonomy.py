@@ -0,0 +1,184 @@
+import bisect
+import json
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from django.conf import settings
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).resolve().parent.parent / "data" / "skills.json"
+
+# A skill must not be glued to other word characters: "Java" is not found in
+# "JavaScript", "Git" not in "GitHub" or "digit", "SQL" not in "NoSQL".
+# "+", "#", "&" and "." count as part of a token so "C" stays out of
+# "C++"/"C#", "R" out of "R&D" and "Node" out of "Node.js"; a trailing full
+# stop is still a boundary.
+_BEFORE = r"(?<![\w+#&.])"
+_AFTER = r"(?![\w+#&]|\.\w)"
+_SPACE_RE = re.compile(r"\s+")
+
+# Exact-case forms this short ("R", "Go") are initials and sentence words in
+# prose ("John R. Smith", "Go to ..."), so they only count in a skill context:
+# an item of a punctuated list, "R language"/"Go programming", or right next
+# to another skill ("Go and Rust").
+SHORT_FORM_LENGTH = 2
+_LIST_BEFORE_RE = re.compile(r"[,;/|:•·(\[]\s*$")
+_LIST_AFTER_RE = re.compile(r"\s*[,;/|)\]]")
+_LANGUAGE_AFTER_RE = re.compile(r"\s+(?:language|programming|lang)\b", re.IGNORECASE)
+_JOINER_RE = re.compile(r"\s*(?:[,;/|&]|and|or)?\s*", re.IGNORECASE)
+
+
+def _normalize(surface):
+    return _SPACE_RE.sub(" ", surface.strip())
+
+
+def _trie_regex(surfaces):
+    """Regex matching any of ``surfaces`` with shared prefixes factored out, longest first"""
+    trie = {}
+    for surface in surfaces:
+        node = trie
+        for ch in surface:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def pattern(node):
+        branches = [
+            (r"\s+" if ch == " " else re.escape(ch)) + pattern(child)
+            for ch, child in sorted(node.items()) if ch
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional tail: the longer skill wins, the shorter one is the fallback.
+        if "" in node:
+            return "(?:" + body + ")?"
+        return body
+
+    return pattern(trie)
+
+
+class SkillTaxonomy:
+    """
+    Canonical skills with aliases, matched in one pass over the text.
+
+    Entries are {"id", "name", "category", "aliases", "case_sensitive"}. The
+    name and aliases match case-insensitively; forms listed in case_sensitive
+    (e.g. "Go", "R", "Swift") only match exactly as written, since their
+    lowercase spelling is an ordinary word; the one- and two-letter ones
+    also need a skill context (see SHORT_FORM_LENGTH). All surfaces are compiled into a
+    trie-shaped regex, so matching cost depends on the text length, not on
+    the number of skills.
+    """
+
+    def __init__(self, entries):
+        self.skills = {}
+        self._order = {}
+        insensitive = {}
+        sensitive = {}
+        for entry in entries:
+            skill_id = entry["id"]
+            self.skills[skill_id] = {"id": skill_id, "name": entry["name"], "category": entry.get("category", "")}
+            self._order[skill_id] = len(self._order)
+            exact = {_normalize(s) for s in entry.get("case_sensitive", [])}
+            for surface in exact:
+                sensitive[surface] = skill_id
+            for surface in [entry["name"], *entry.get("aliases", [])]:
+                surface = _normalize(surface)
+                if surface and surface not in exact:
+                    insensitive.setdefault(surface.lower(), skill_id)
+
+        self._insensitive = insensitive
+        self._sensitive = sensitive
+        self._sensitive_lower = {surface.lower(): skill_id for surface, skill_id in sensitive.items()}
+        self._regex = self._compile(insensitive, re.IGNORECASE)
+        self._strict_regex = self._compile(sensitive, 0)
+
+    @staticmethod
+    def _compile(surfaces, flags):
+        if not surfaces:
+            return None
+        return re.compile(_BEFORE + "(?:" + _trie_regex(surfaces) + ")" + _AFTER, flags)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def match(self, text):
+        """Counter of canonical skill id -> number of mentions"""
+        counts = Counter()
+        if not text:
+            return counts
+
+        starts, ends = [], []
+        if self._regex is not None:
+            for m in self._regex.finditer(text):
+                counts[self._insensitive[_normalize(m.group()).lower()]] += 1
+                starts.append(m.start())
+                ends.append(m.end())
+        spans = list(zip(starts, ends))
+        short = []
+        if self._strict_regex is not None:
+            for m in self._strict_regex.finditer(text):
+                # Skip exact-case hits inside a longer alias already counted ("Spring" in "spring boot").
+                i = bisect.bisect_right(starts, m.start()) - 1
+                if i >= 0 and m.start() < ends[i]:
+                    continue
+                if len(m.group()) <= SHORT_FORM_LENGTH:
+                    short.append(m)
+                    continue
+                counts[self._sensitive[_normalize(m.group())]] += 1
+                spans.append(m.span())
+        if short:
+            spans.sort()
+            for m in short:
+                if self._in_skill_context(text, m.start(), m.end(), spans):
+                    counts[self._sensitive[m.group()]] += 1
+        return counts
+
+    @staticmethod
+    def _in_skill_context(text, start, end, spans):
+        """Whether a short exact-case hit at text[start:end] reads as a skill rather than a word"""
+        after = text[end:end + 24]
+        if _LIST_BEFORE_RE.search(text[max(0, start - 12):start]) or _LIST_AFTER_RE.match(after):
+            return True
+        if _LANGUAGE_AFTER_RE.match(after):
+            return True
+        i = bisect.bisect_left(spans, (start, end))
+        if i > 0 and _JOINER_RE.fullmatch(text[spans[i - 1][1]:start]):
+            return True
+        return i < len(spans) and bool(_JOINER_RE.fullmatch(text[end:spans[i][0]]))
+
+    def lookup(self, name):
+        """
+        Skill id for a single skill name such as an LLM-extracted "golang",
+        or None. A bare name is known to be a skill, so exact-case forms
+        match in any case here. Longer names ("Python 3 scripting") fall back
+        to the skill they mention.
+        """
+        surface = _normalize(name or "").lower()
+        skill_id = self._insensitive.get(surface) or self._sensitive_lower.get(surface)
+        if skill_id:
+            return skill_id
+        counts = self.match(name)
+        return self.ranked_ids(counts)[0] if counts else None
+
+    def ranked_ids(self, counts):
+        """Skill ids by mention count, ties in taxonomy order"""
+        return sorted(counts, key=lambda skill_id: (-counts[skill_id], self._order[skill_id]))
+
+    def names(self, skill_ids):
+        return [self.skills[skill_id]["name"] for skill_id in skill_ids]
+
+
+_taxonomy = None
+_taxonomy_lock = threading.Lock()
+
+
+def get_skill_taxonomy():
+    """Taxonomy loaded once per process from SKILL_TAXONOMY_PATH"""
+    global _taxonomy
+    with _taxonomy_lock:
+        if _taxonomy is None:
+            _taxonomy = SkillTaxonomy.from_file(getattr(settings, "SKILL_TAXONOMY_PATH", DEFAULT_TAXONOMY_PATH))
+        return _taxonomy
@@ -1,9 +1,21 @@
+import hashlib
 import os
+import re
+import tempfile
+import time
 from django.conf import settings
-from django.core.files.storage import default_storage
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db.models import F
+from django.utils import timezone
+
+
+BLOB_PREFIX = "resumes/sha256"
+_BLOB_RE = re.compile(r"^" + re.escape(BLOB_PREFIX) + r"/[0-9a-f]{2}/([0-9a-f]{64})(\.\w+)?$")
+
 
 class StorageService:
-    
+
     def upload_file(self, file, file_path):
         """Upload file to local media storage"""
         try:
@@ -13,14 +25,14 @@ class StorageService:
         except Exception as e:
             print(f"Error uploading file: {e}")
             return None
-    
+
     def get_file_url(self, file_path):
         try:
             return settings.MEDIA_URL + file_path
         except Exception as e:
             print(f"Error getting file URL: {e}")
             return None
-    
+
     def delete_file(self, file_path):
         try:
             if default_storage.exists(file_path):
@@ -29,3 +41,99 @@ class StorageService:
         except Exception as e:
             print(f"Error deleting file: {e}")
             return None
+
+    # --- Content-addressed resume storage ---------------------------------
+    #
+    # Files are stored once per unique content at resumes/sha256/<ab>/<sha><ext>
+    # and tracked by a StoredBlob row whose ref_count is the number of records
+    # (candidates, candidate sessions) pointing at it. store() adds a reference,
+    # release() drops one; unreferenced blobs are removed by gc_resume_blobs,
+    # which marks a blob with ref_count -1 before deleting its file.
+
+    @staticmethod
+    def blob_path(digest, extension=""):
+        return f"{BLOB_PREFIX}/{digest[:2]}/{digest}{extension.lower()}"
+
+    @staticmethod
+    def blob_sha256(name):
+        """Content hash encoded in a blob path, or None for other storage names"""
+        match = _BLOB_RE.match(name or "")
+        return match.group(1) if match else None
+
+    def _spool(self, file):
+        """Copy ``file`` chunk by chunk to a temp file while hashing; returns (temp path, sha256, size)"""
+        # For local storage spool inside MEDIA_ROOT so the final move is a rename.
+        spool_dir = None
+        if isinstance(default_storage, FileSystemStorage):
+            spool_dir = default_storage.path(f"{BLOB_PREFIX}/tmp")
+            os.makedirs(spool_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        if hasattr(file, "seek"):
+            file.seek(0)
+        chunks = file.chunks() if hasattr(file, "chunks") else iter(lambda: file.read(64 * 1024), b"")
+        with tempfile.NamedTemporaryFile(dir=spool_dir, delete=False) as tmp:
+            for chunk in chunks:
+                digest.update(chunk)
+                tmp.write(chunk)
+                size += len(chunk)
+        if hasattr(file, "seek"):
+            file.seek(0)
+        return tmp.name, digest.hexdigest(), size
+
+    def _place(self, tmp_path, name):
+        if default_storage.exists(name):
+            os.unlink(tmp_path)
+            return
+        if isinstance(default_storage, FileSystemStorage):
+            target = default_storage.path(name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp_path, target)
+            return
+        try:
+            with open(tmp_path, "rb") as tmp:
+                default_storage.save(name, File(tmp))
+        finally:
+            os.unlink(tmp_path)
+
+    def store(self, file, name=None):
+        """
+        Store ``file`` (upload or open file) by content and add one reference.
+
+        Returns the storage name to assign to a FileField. Identical content
+        uploaded again returns the existing name without writing a second copy.
+        """
+        from dashboard.models import StoredBlob
+
+        name = name or getattr(file, "name", "") or ""
+        tmp_path, digest, size = self._spool(file)
+        try:
+            while True:
+                blob, _ = StoredBlob.objects.get_or_create(
+                    sha256=digest,
+                    defaults={"path": self.blob_path(digest, os.path.splitext(name)[1]), "size": size},
+                )
+                # Take the reference before touching the file; a blob that
+                # gc_resume_blobs has claimed (ref_count -1) is about to be
+                # deleted, so wait for that and create it afresh.
+                if StoredBlob.objects.filter(pk=blob.pk, ref_count__gte=0).update(
+                    ref_count=F("ref_count") + 1, updated_at=timezone.now(),
+                ):
+                    break
+                time.sleep(0.05)
+            self._place(tmp_path, blob.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return blob.path
+
+    def release(self, name):
+        """Drop one reference to a blob; files that are not blobs are left alone"""
+        from dashboard.models import StoredBlob
+
+        if self.blob_sha256(name):
+            StoredBlob.objects.filter(path=name, ref_count__gt=0).update(
+                ref_count=F("ref_count") - 1, updated_at=timezone.now(),
+            )
@@ -0,0 +1,486 @@
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import random
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ("session.started", "answer.scored", "session.completed", "link.expired")
+SIGNATURE_HEADER = "X-RecruitMate-Signature"
+TIMESTAMP_HEADER = "X-RecruitMate-Timestamp"
+
+
+def sign(secret, timestamp, body):
+    """Hex HMAC-SHA256 of "<timestamp>." + body; receivers recompute it to authenticate a batch"""
+    return hmac.new(secret.encode("utf-8"), f"{timestamp}.".encode("utf-8") + body, hashlib.sha256).hexdigest()
+
+
+def verify(secret, timestamp, body, signature, tolerance=300):
+    """Check a received batch's signature and reject timestamps more than ``tolerance`` seconds off"""
+    try:
+        if abs(time.time() - int(timestamp)) > tolerance:
+            return False
+    except (TypeError, ValueError):
+        return False
+    expected = "v1=" + sign(secret, timestamp, body)
+    return hmac.compare_digest(expected, signature or "")
+
+
+# --- Endpoint URLs ---------------------------------------------------------
+
+class UnsafeWebhookURL(ValueError):
+    """An endpoint URL the server must not POST to"""
+
+
+def check_url(url):
+    """
+    Raise UnsafeWebhookURL unless ``url`` is https (http too under DEBUG)
+    and every address its host resolves to is public; returns the address
+    to connect to. Private, loopback, link-local (cloud metadata), reserved
+    and multicast addresses would let an endpoint probe internal services;
+    WEBHOOK_ALLOW_PRIVATE_HOSTS lifts that for trying a local receiver.
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        raise UnsafeWebhookURL("Invalid URL.")
+    schemes = ("https", "http") if settings.DEBUG else ("https",)
+    if parts.scheme not in schemes:
+        raise UnsafeWebhookURL("Webhook URLs must use https.")
+    if not parts.hostname:
+        raise UnsafeWebhookURL("Webhook URLs need a host.")
+    try:
+        infos = socket.getaddrinfo(parts.hostname, port or 443, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        raise UnsafeWebhookURL(f"Cannot resolve {parts.hostname}.")
+    allow_private = getattr(settings, "WEBHOOK_ALLOW_PRIVATE_HOSTS", False)
+    addresses = []
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not allow_private and (not address.is_global or address.is_multicast):
+            raise UnsafeWebhookURL(f"{parts.hostname} resolves to a non-public address.")
+        addresses.append(str(address))
+    if not addresses:
+        raise UnsafeWebhookURL(f"Cannot resolve {parts.hostname}.")
+    return addresses[0]
+
+
+class PinnedAddressAdapter(HTTPAdapter):
+    """
+    Transport adapter that connects to one already vetted address instead of
+    resolving the URL's host again, so a DNS answer that changes after
+    check_url (DNS rebinding) cannot redirect the request. The URL's host is
+    still sent as the Host header and, for https, used for SNI and the
+    certificate check.
+    """
+
+    def __init__(self, address, **kwargs):
+        self.address = address
+        super().__init__(**kwargs)
+
+    def get_connection(self, url, proxies=None):
+        # Proxies are ignored on purpose: the connection must go to the vetted address
+        parts = urlsplit(url)
+        pool_kwargs = {}
+        if parts.scheme == "https":
+            pool_kwargs = {"server_hostname": parts.hostname, "assert_hostname": parts.hostname}
+        return self.poolmanager.connection_from_host(
+            self.address, port=parts.port or (443 if parts.scheme == "https" else 80), scheme=parts.scheme,
+            pool_kwargs=pool_kwargs,
+        )
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self.get_connection(request.url, proxies)
+
+    def add_headers(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        host = f"[{parts.hostname}]" if ":" in parts.hostname else parts.hostname
+        request.headers["Host"] = f"{host}:{parts.port}" if parts.port else host
+
+
+def post_pinned(url, address, **kwargs):
+    """POST to ``url`` over a connection to ``address``, ignoring proxy and netrc settings from the environment"""
+    with requests.Session() as session:
+        session.trust_env = False
+        session.mount(url, PinnedAddressAdapter(address))
+        return session.post(url, **kwargs)
+
+
+# --- Payloads --------------------------------------------------------------
+
+def session_payload(session):
+    return {
+        "session_id": session.pk,
+        "link_token": str(session.master_token) if session.master_token else None,
+        "job_id": session.job_id,
+        "job_title": session.job.title,
+        "candidate_name": session.candidate_name,
+        "candidate_email": session.candidate_email,
+        "status": session.status,
+        "started_at": session.started_at,
+        "completed_at": session.completed_at,
+    }
+
+
+def answer_payload(answer):
+    return {
+        **session_payload(answer.session),
+        "answer_id": answer.pk,
+        "question": answer.question.question_text,
+        "question_type": answer.question.question_type,
+        "score": answer.score,
+        "evaluation_source": answer.evaluation_source,
+    }
+
+
+def result_payload(result):
+    return {
+        **session_payload(result.session),
+        "overall_score": result.overall_score,
+        "recommendation": result.recommendation,
+        "summary": result.summary,
+    }
+
+
+def link_payload(link):
+    return {
+        "link_id": link.pk,
+        "link_token": str(link.token),
+        "job_id": link.job_id,
+        "job_title": link.job.title,
+        "expires_at": link.expires_at,
+    }
+
+
+def emit(user_id, event_type, subject_id, payload):
+    """
+    Write ``event_type`` to the outbox for each of the user's endpoints that
+    subscribe to it. Call inside the transaction making the state change, so
+    the event exists exactly when the change does; delivery starts after
+    commit. Returns the event, or None without subscribers.
+    """
+    from dashboard.models import WebhookDelivery, WebhookEndpoint, WebhookEvent
+
+    endpoints = [
+        endpoint for endpoint in WebhookEndpoint.objects.filter(user_id=user_id, is_active=True)
+        if endpoint.subscribes_to(event_type)
+    ]
+    if not endpoints:
+        return None
+    # Round-trip through JSON so datetimes are stored as ISO strings
+    payload = json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+    event = WebhookEvent.objects.create(user_id=user_id, event_type=event_type, subject_id=subject_id, payload=payload)
+    now = timezone.now()
+    WebhookDelivery.objects.bulk_create(
+        [WebhookDelivery(endpoint=endpoint, event=event, next_attempt_at=now) for endpoint in endpoints]
+    )
+    transaction.on_commit(get_webhook_sender().wake)
+    return event
+
+
+def emit_expired_links(now=None):
+    """Emit link.expired once for links that expired within WEBHOOK_EXPIRED_LOOKBACK_HOURS; returns the count"""
+    from dashboard.models import WebhookEndpoint, WebhookEvent
+    from interviews.models import InterviewSession
+
+    now = now or timezone.now()
+    lookback = timedelta(hours=getattr(settings, "WEBHOOK_EXPIRED_LOOKBACK_HOURS", 24))
+    links = (
+        InterviewSession.objects
+        .filter(master_token__isnull=True, expires_at__lte=now, expires_at__gt=now - lookback)
+        .filter(Exists(WebhookEndpoint.objects.filter(user=OuterRef("user"), is_active=True)))
+        .exclude(Exists(WebhookEvent.objects.filter(event_type="link.expired", subject_id=OuterRef("pk"))))
+        .select_related("job")
+    )
+    emitted = 0
+    for link in links:
+        with transaction.atomic():
+            if emit(link.user_id, "link.expired", link.pk, link_payload(link)):
+                emitted += 1
+    return emitted
+
+
+# --- Delivery --------------------------------------------------------------
+
+class WebhookSender:
+    """
+    Delivers outbox events to webhook endpoints.
+
+    Due deliveries are grouped per endpoint and sent as one signed POST of
+    up to WEBHOOK_BATCH_SIZE events: {"events": [{id, type, created_at,
+    data}]} with "v1=<HMAC>" in X-RecruitMate-Signature over the timestamp
+    header and the body. A 2xx acknowledges the whole batch; anything else
+    schedules its events again after WEBHOOK_BACKOFF_BASE * 2^(attempts - 1)
+    seconds (with jitter, capped at WEBHOOK_BACKOFF_MAX) until
+    WEBHOOK_MAX_ATTEMPTS. Rows are claimed before sending, so several
+    senders (in-process after each commit, or deliver_webhooks) never send
+    a batch twice; a claim left by a crashed sender lapses after
+    WEBHOOK_CLAIM_SECONDS. Each send re-checks the URL with check_url and
+    connects to the address it vetted (post_pinned).
+    """
+
+    def __init__(self, max_workers=None, post=None):
+        if max_workers is None:
+            max_workers = getattr(settings, "WEBHOOK_WORKERS", 1)
+        self.max_workers = max_workers
+        self.batch_size = getattr(settings, "WEBHOOK_BATCH_SIZE", 50)
+        self.max_attempts = getattr(settings, "WEBHOOK_MAX_ATTEMPTS", 8)
+        self.backoff_base = getattr(settings, "WEBHOOK_BACKOFF_BASE", 10)
+        self.backoff_max = getattr(settings, "WEBHOOK_BACKOFF_MAX", 3600)
+        self.timeout = getattr(settings, "WEBHOOK_TIMEOUT", 5)
+        self.claim_seconds = getattr(settings, "WEBHOOK_CLAIM_SECONDS", 60)
+        self.post = post or post_pinned
+        self._lock = threading.Lock()
+        self._executor = None
+        self._running = False
+        self._again = False
+
+    def wake(self):
+        """Deliver what is due on the background worker; calls while it runs coalesce into one more pass"""
+        if self.max_workers <= 0:
+            return
+        with self._lock:
+            if self._running:
+                self._again = True
+                return
+            self._running = True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="webhooks")
+        self._executor.submit(self._run_in_worker)
+
+    def _run_in_worker(self):
+        try:
+            while True:
+                try:
+                    self.deliver_due()
+                except Exception as e:
+                    logger.exception("Webhook delivery failed: %s", e)
+                with self._lock:
+                    if not self._again:
+                        self._running = False
+                        break
+                    self._again = False
+        finally:
+            close_old_connections()
+
+    def deliver_due(self, now=None):
+        """Send everything due, batch by batch per endpoint; returns the number of events acknowledged"""
+        from dashboard.models import WebhookDelivery
+
+        now = now or timezone.now()
+        endpoint_ids = list(
+            WebhookDelivery.objects.filter(status="pending", next_attempt_at__lte=now)
+            .order_by().values_list("endpoint_id", flat=True).distinct()
+        )
+        acknowledged = 0
+        for endpoint_id in endpoint_ids:
+            # A full acknowledged batch may have more behind it; a failure waits for its backoff
+            while True:
+                sent = self.deliver_endpoint(endpoint_id, now)
+                acknowledged += sent
+                if sent < self.batch_size:
+                    break
+        return acknowledged
+
+    def _claim(self, endpoint_id, now):
+        from dashboard.models import WebhookDelivery
+
+        due = WebhookDelivery.objects.filter(
+            endpoint_id=endpoint_id, status="pending", next_attempt_at__lte=now,
+        )
+        ids = list(due.order_by("event_id").values_list("pk", flat=True)[:self.batch_size])
+        claim = uuid.uuid4().hex
+        # The conditional update is the lock: rows another sender claimed first no longer match
+        due.filter(pk__in=ids).update(claim=claim, next_attempt_at=now + timedelta(seconds=self.claim_seconds))
+        return list(
+            WebhookDelivery.objects.filter(claim=claim).select_related("endpoint", "event").order_by("event_id")
+        )
+
+    def deliver_endpoint(self, endpoint_id, now=None):
+        """Send one batch of due events to one endpoint; returns the number acknowledged"""
+        from dashboard.models import WebhookDelivery
+
+        deliveries = self._claim(endpoint_id, now or timezone.now())
+        if not deliveries:
+            return 0
+        endpoint = deliveries[0].endpoint
+        body = json.dumps({
+            "events": [
+                {"id": str(d.event.uid), "type": d.event.event_type, "created_at": d.event.created_at.isoformat(),
+                 "data": d.event.payload}
+                for d in deliveries
+            ],
+        }).encode("utf-8")
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "RecruitMate-Webhooks/1",
+            TIMESTAMP_HEADER: timestamp,
+            SIGNATURE_HEADER: "v1=" + sign(endpoint.secret, timestamp, body),
+        }
+
+        status_code, error = None, ""
+        started = time.monotonic()
+        try:
+            # Checked again on every send, since the host may resolve elsewhere now,
+            # and the POST goes to exactly the address that was checked
+            address = check_url(endpoint.url)
+            # Redirects are not followed and the body is never kept, so recruiters
+            # only ever see a status code from whatever answers
+            response = self.post(
+                endpoint.url, address, data=body, headers=headers, timeout=self.timeout, allow_redirects=False,
+            )
+            status_code = response.status_code
+            if not 200 <= status_code < 300:
+                error = f"HTTP {status_code}"
+        except UnsafeWebhookURL as e:
+            error = f"Blocked: {e}"
+        except requests.RequestException as e:
+            logger.info("Webhook POST to %s raised %r", endpoint.url, e)
+            error = type(e).__name__
+        response_ms = (time.monotonic() - started) * 1000
+        finished = timezone.now()
+
+        for delivery in deliveries:
+            delivery.attempts += 1
+            delivery.claim = ""
+            delivery.response_ms = response_ms
+            delivery.last_status_code = status_code
+            delivery.last_error = error[:2000]
+            if not error:
+                delivery.status = "delivered"
+                delivery.delivered_at = finished
+                delivery.latency_ms = (finished - delivery.event.created_at).total_seconds() * 1000
+            elif delivery.attempts >= self.max_attempts:
+                delivery.status = "failed"
+            else:
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (delivery.attempts - 1))
+                delivery.next_attempt_at = finished + timedelta(seconds=delay * random.uniform(1.0, 1.25))
+        WebhookDelivery.objects.bulk_update(deliveries, [
+            "attempts", "claim", "response_ms", "last_status_code", "last_error", "status", "delivered_at",
+            "latency_ms", "next_attempt_at",
+        ])
+        if error:
+            logger.warning("Webhook batch of %d to %s failed: %s", len(deliveries), endpoint.url, error)
+            return 0
+        return len(deliveries)
+
+
+def _percentile(values, q):
+    return round(float(np.percentile(values, q)), 1) if len(values) else None
+
+
+def delivery_report(queryset=None):
+    """Per-endpoint delivery counts by status, retries and p50/p95 delivery latency"""
+    from dashboard.models import WebhookDelivery
+
+    if queryset is None:
+        queryset = WebhookDelivery.objects.all()
+    report = {}
+    for endpoint_id, url, status, count in (
+        queryset.order_by().values_list("endpoint_id", "endpoint__url", "status").annotate(count=Count("pk"))
+    ):
+        entry = report.setdefault(endpoint_id, {"url": url, "pending": 0, "delivered": 0, "failed": 0})
+        entry[status] = count
+    for endpoint_id, entry in report.items():
+        delivered = queryset.filter(endpoint_id=endpoint_id, status="delivered")
+        latencies = np.array(list(delivered.values_list("latency_ms", flat=True)), dtype=float)
+        attempts = np.array(list(delivered.values_list("attempts", flat=True)), dtype=float)
+        entry["latency_p50_ms"] = _percentile(latencies, 50)
+        entry["latency_p95_ms"] = _percentile(latencies, 95)
+        entry["retried"] = int((attempts > 1).sum())
+    return list(report.values())
+
+
+# --- Local receiver --------------------------------------------------------
+
+class WebhookReceiver:
+    """
+    Stand-in HTTP receiver for trying webhooks locally (webhook_receiver).
+
+    Verifies each batch's signature, records the events and answers 204, or
+    500 for a random ``fail_rate`` of batches to exercise retries. Batches
+    with a bad signature get 401.
+    """
+
+    def __init__(self, secret, host="127.0.0.1", port=0, fail_rate=0.0, on_batch=None):
+        self.secret = secret
+        self.fail_rate = fail_rate
+        self.on_batch = on_batch
+        self.events = []
+        self.batches = 0
+        self.rejected = 0
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not verify(receiver.secret, self.headers.get(TIMESTAMP_HEADER), body,
+                              self.headers.get(SIGNATURE_HEADER)):
+                    receiver.rejected += 1
+                    self.send_response(401)
+                elif random.random() < receiver.fail_rate:
+                    self.send_response(500)
+                else:
+                    events = json.loads(body)["events"]
+                    receiver.batches += 1
+                    receiver.events.extend(events)
+                    if receiver.on_batch:
+                        receiver.on_batch(events)
+                    self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def get_webhook_sender():
+    """Process-wide webhook sender"""
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            _sender = WebhookSender()
+        return _sender
@@ -0,0 +1,123 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .services.answer_similarity import get_answer_similarity_engine
+from .services.leaderboard import get_leaderboard
+from .services.match_engine import index_candidate_vectors
+from .services.search_index import remove_on_commit, reindex_on_commit
+from .services.skill_index import index_candidate_skills, index_job_skills
+from .services.storage_service import StorageService
+
+
+def _release_after_commit(name):
+    if name:
+        transaction.on_commit(lambda: StorageService().release(name))
+
+
+@receiver(post_delete, sender='candidates.Candidate')
+def release_candidate_resume(sender, instance, **kwargs):
+    _release_after_commit(instance.resume_file.name)
+
+
+@receiver(post_delete, sender='interviews.InterviewSession')
+def release_session_resume(sender, instance, **kwargs):
+    _release_after_commit(instance.candidate_resume_file.name)
+
+
+# Skill links and match vectors follow the candidate/job within the same transaction.
+
+@receiver(post_save, sender='candidates.Candidate')
+def link_candidate_skills(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_candidate_skills([instance])
+        index_candidate_vectors([instance])
+
+
+@receiver(post_save, sender='jobs.JobDescription')
+def link_job_skills(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_job_skills([instance])
+
+
+# Search index. Writes made with queryset update()/bulk_create() send no
+# signals; those call search_index.reindex() themselves.
+
+@receiver(post_save, sender='candidates.Candidate')
+def index_candidate(sender, instance, raw=False, **kwargs):
+    if not raw:
+        reindex_on_commit('candidate', [instance.pk])
+        reindex_on_commit('session', instance.interview_sessions.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender='interviews.InterviewSession')
+def index_session(sender, instance, raw=False, **kwargs):
+    if not raw:
+        reindex_on_commit('session', [instance.pk])
+        # Interviewing a candidate makes them searchable for the interviewer
+        if instance.candidate_id:
+            reindex_on_commit('candidate', [instance.candidate_id])
+
+
+@receiver(post_save, sender='jobs.JobDescription')
+def index_job(sender, instance, raw=False, **kwargs):
+    if not raw:
+        reindex_on_commit('job', [instance.pk])
+        reindex_on_commit('session', instance.interview_sessions.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender='interviews.InterviewAnswer')
+def index_answer(sender, instance, raw=False, **kwargs):
+    if not raw:
+        reindex_on_commit('answer', [instance.pk])
+
+
+@receiver(post_delete, sender='candidates.Candidate')
+def unindex_candidate(sender, instance, **kwargs):
+    remove_on_commit('candidate', [instance.pk])
+
+
+@receiver(post_delete, sender='interviews.InterviewSession')
+def unindex_session(sender, instance, **kwargs):
+    remove_on_commit('session', [instance.pk])
+    if instance.candidate_id:
+        reindex_on_commit('candidate', [instance.candidate_id])
+
+
+@receiver(post_delete, sender='jobs.JobDescription')
+def unindex_job(sender, instance, **kwargs):
+    remove_on_commit('job', [instance.pk])
+
+
+@receiver(post_delete, sender='interviews.InterviewAnswer')
+def unindex_answer(sender, instance, **kwargs):
+    remove_on_commit('answer', [instance.pk])
+
+
+# Near-duplicate answers are detected off the request path after commit.
+
+@receiver(post_save, sender='interviews.InterviewAnswer')
+def check_duplicate_answer(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_answer_similarity_engine().enqueue(instance.pk)
+
+
+# Link leaderboards are re-ranked off the request path after commit.
+
+@receiver(post_save, sender='interviews.InterviewResult')
+def rank_result(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_leaderboard().enqueue(instance.session.master_token)
+
+
+@receiver(post_delete, sender='interviews.InterviewResult')
+def unrank_result(sender, instance, **kwargs):
+    from interviews.models import InterviewSession
+
+    # When the session itself is being deleted, unrank_session covers it
+    for master_token in InterviewSession.objects.filter(pk=instance.session_id).values_list('master_token', flat=True):
+        get_leaderboard().enqueue(master_token)
+
+
+@receiver(post_delete, sender='interviews.InterviewSession')
+def unrank_session(sender, instance, **kwargs):
+    get_leaderboard().enqueue(instance.master_token)
@@ -1,3 +1,1339 @@
-from django.test import TestCase
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import os
+import socket
+import tempfile
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+from unittest import mock
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.exceptions import SynchronousOnlyOperation
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from docx import Document
+from PyPDF2 import PdfWriter
+from candidates.models import Candidate, CandidateIdentity, IdentityRecord
+from interviews.models import InterviewAnswer, InterviewQuestion, InterviewResult, InterviewSession
+from jobs.models import JobDescription
+from .downloads import _batched, _parse_range
+from .models import (
+    AnswerSignature, ParsedResume, PrescoreReplay, RateLimitBucket, RescoreRun, ResumeIngestion, ScoreVersion,
+    StoredBlob, WebhookDelivery, WebhookEndpoint,
+)
+from .services.answer_prescorer import SCORER_VERSION, KeyPointScorer, record_replay
+from .services.answer_similarity import NUM_PERM, AnswerSimilarityEngine, cluster_signatures, minhash, shingles
+from .services.bulk_import import BulkResumeImporter, read_manifest
+from .services.evaluation_cache import EvaluationCache
+from .services.evaluation_dispatcher import EvaluationDispatcher
+from .services.identity_resolution import (
+    IdentityResolver, match_score, name_tokens, normalize_email, normalize_phone, resume_signature,
+)
+from .services.leaderboard import bucket, rank_scores
+from .services.llm_json import (
+    EVALUATION_BATCH_SCHEMA, EVALUATION_SCHEMA, QUESTIONS_SCHEMA, REPORT_SCHEMA, SKILLS_SCHEMA,
+    _balanced_spans, extract_json, parse_llm_json,
+)
+from .services.match_engine import candidate_digest
+from .services.prompt_builder import (
+    compact_interview_data, compact_job_context, compact_resume, estimate_tokens, get_budget, truncate_to_budget,
+)
+from .services.question_analytics import question_statistics
+from .services.rescoring import ORIGINAL_VERSION, AnswerRescorer, get_run
+from .services.result_export import ResultExport
+from .services.resume_ingestion import ResumeIngestionPipeline
+from .services.resume_parser import ResumeParser, file_sha256
+from .services.search_index import SQLiteFTS5Backend
+from .services.skill_index import filter_candidates, matching_candidates
+from .services.skill_taxonomy import get_skill_taxonomy
+from .services.storage_service import BLOB_PREFIX, StorageService
+from .services.rate_limiter import (
+    BACKGROUND, INTERACTIVE, DatabaseBucketBackend, LocalBucketBackend, RateLimiter, RateLimitExceeded, _Bucket,
+)
+from .serializers import WebhookEndpointSerializer
+from .services.webhooks import (
+    PinnedAddressAdapter, UnsafeWebhookURL, WebhookReceiver, WebhookSender, check_url, emit, sign, verify,
+)
 
-# Create your tests here.
+LIMITS = {"requests_per_minute": 60, "tokens_per_minute": 6000}
+
+
+class BalancedSpansTests(SimpleTestCase):
+    def spans(self, text):
+        return [text[start:end] for start, end in _balanced_spans(text)]
+
+    def test_outermost_spans_only(self):
+        self.assertEqual(self.spans('a {"x": [1, {"y": 2}]} b [3]'), ['{"x": [1, {"y": 2}]}', "[3]"])
+
+    def test_brackets_inside_strings_are_ignored(self):
+        text = '{"a": "}{ ]", "b": "say \\"}\\""}'
+        self.assertEqual(self.spans(text), [text])
+
+    def test_quotes_in_prose_are_ignored(self):
+        self.assertEqual(self.spans('Here\'s the "result": {"a": 1}'), ['{"a": 1}'])
+
+    def test_unclosed_opener_does_not_swallow_the_rest(self):
+        self.assertEqual(self.spans('[oops {"a": 1}'), ['{"a": 1}'])
+
+    def test_mismatched_closer_drops_the_open_span(self):
+        self.assertEqual(self.spans('{"a": 1] then {"b": 2}'), ['{"b": 2}'])
+
+
+class ParseLLMJsonTests(SimpleTestCase):
+    def test_plain_object(self):
+        self.assertEqual(extract_json('{"a": 1}'), {"a": 1})
+
+    def test_trailing_prose_and_fences(self):
+        text = 'Sure!\n```json\n{"score": 80, "feedback": "ok"}\n```\nHope this helps {really}.'
+        self.assertEqual(parse_llm_json(text, EVALUATION_SCHEMA)["score"], 80)
+
+    def test_nested_and_escaped_braces(self):
+        text = 'Result: {"score": "90/100", "feedback": "uses {braces} and \\"quotes\\"", "strengths": ["a"]} done'
+        self.assertEqual(parse_llm_json(text, EVALUATION_SCHEMA), {
+            "score": 90, "feedback": 'uses {braces} and "quotes"', "strengths": ["a"], "improvements": [],
+        })
+
+    def test_trailing_comma(self):
+        self.assertEqual(extract_json('[1, 2, ]'), [1, 2])
+
+    def test_skips_candidates_failing_the_schema(self):
+        text = 'Example: {"foo": "bar"}. Answer: {"score": 70}'
+        self.assertEqual(parse_llm_json(text, EVALUATION_SCHEMA)["score"], 70)
+
+    def test_evaluation_without_score_is_rejected(self):
+        self.assertIsNone(parse_llm_json('{"note": 1}', EVALUATION_SCHEMA))
+        self.assertIsNone(parse_llm_json('{"score": "n/a", "feedback": "x"}', EVALUATION_SCHEMA))
+
+    def test_evaluation_defaults_and_coercion(self):
+        self.assertEqual(parse_llm_json('{"score": 120.6, "strengths": "a; b\\nc"}', EVALUATION_SCHEMA), {
+            "score": 100, "feedback": "", "strengths": ["a", "b", "c"], "improvements": [],
+        })
+
+    def test_batch_drops_items_without_id_or_score(self):
+        text = '{"evaluations": [{"id": 0, "score": 10}, {"score": 20}, {"id": 2}, {"id": "3", "score": "40%"}]}'
+        self.assertEqual([(e["id"], e["score"]) for e in parse_llm_json(text, EVALUATION_BATCH_SCHEMA)], [(0, 10), (3, 40)])
+
+    def test_questions_schema(self):
+        text = '{"questions": [{"question": "Why?", "type": "behavioural", "difficulty": "extreme"}, {"type": "text"}]}'
+        self.assertEqual(parse_llm_json(text, QUESTIONS_SCHEMA), [
+            {"question": "Why?", "type": "behavioral", "difficulty": "medium", "expected_key_points": []},
+        ])
+
+    def test_report_recommendation_aliases(self):
+        report = parse_llm_json('{"summary": "s", "recommendation": "No Hire"}', REPORT_SCHEMA)
+        self.assertEqual((report["recommendation"], report["overall_score"]), ("no", None))
+
+    def test_skills_deduplicated(self):
+        self.assertEqual(parse_llm_json('{"skills": ["Python", "python", " SQL "]}', SKILLS_SCHEMA), ["Python", "SQL"])
+
+    def test_nothing_usable(self):
+        self.assertIsNone(parse_llm_json("I cannot help with that.", EVALUATION_SCHEMA))
+        self.assertIsNone(parse_llm_json("", EVALUATION_SCHEMA))
+
+
+class PromptBudgetTests(SimpleTestCase):
+    words = " ".join(f"word{i}" for i in range(400))
+
+    def test_truncate_keeps_short_text_and_cuts_long_text_on_a_word(self):
+        self.assertEqual(truncate_to_budget("  a   b \n\n\n\n c ", 50), "a b\n\nc")
+        cut = truncate_to_budget(self.words, 50)
+        self.assertTrue(cut.endswith(" …"))
+        self.assertLessEqual(estimate_tokens(cut[:-2]), 50)
+        self.assertIn(cut[:-2].split()[-1], self.words.split())
+
+    def test_resume_keeps_header_and_prefers_skills(self):
+        resume = "\n".join([
+            "Ada Lovelace", "ada@example.com",
+            "Certifications", " ".join(f"cert{i}" for i in range(300)),
+            "Skills", "Python, SQL, Django",
+            "Experience", " ".join(f"job{i}" for i in range(300)),
+        ])
+        compacted = compact_resume(resume, 200)
+        self.assertLessEqual(estimate_tokens(compacted), 210)
+        self.assertTrue(compacted.startswith("Ada Lovelace\nada@example.com"))
+        self.assertIn("Python, SQL, Django", compacted)
+        # Original order is kept; the higher-priority experience section keeps more than certifications
+        self.assertLess(compacted.index("Certifications"), compacted.index("Skills"))
+        self.assertGreater(compacted.count("job"), compacted.count("cert"))
+
+    def test_resume_within_budget_is_only_whitespace_compacted(self):
+        self.assertEqual(compact_resume("Skills:\n\n\n\nPython   SQL", 100), "Skills:\n\nPython SQL")
+
+    def test_job_context_keeps_the_shorter_part_whole(self):
+        description, requirements = compact_job_context("Build APIs.", self.words, 100)
+        self.assertEqual(description, "Build APIs.")
+        self.assertLessEqual(estimate_tokens(requirements[:-2]), 100 - estimate_tokens("Build APIs."))
+
+    @override_settings(LLM_PROMPT_BUDGETS={"generate_report": {"total": 50}})
+    def test_long_interviews_drop_answer_text(self):
+        self.assertEqual(get_budget("generate_report", "total"), 50)
+        self.assertEqual(get_budget("generate_report", "answer"), 150)
+        data = compact_interview_data({
+            "average_score": 71.26,
+            "answers": [{"question": f"Q{i}", "answer": self.words, "score": 70, "feedback": "ok"} for i in range(3)],
+        })
+        self.assertEqual(data["average_score"], 71.3)
+        self.assertEqual(data["answers"][0], {"question": "Q0", "score": 70})
+
+
+class BucketTests(SimpleTestCase):
+    def test_spends_when_allowance_is_available(self):
+        b = _Bucket(60, 6000, 0)
+        self.assertEqual(b.take(LIMITS, 100, 0.0, 0), 0.0)
+        self.assertEqual((b.requests, b.tokens), (59, 5900))
+
+    def test_wait_until_refill(self):
+        b = _Bucket(0, 6000, 0)
+        self.assertAlmostEqual(b.take(LIMITS, 0, 0.0, 0), 1.0)
+        # One request per second refills
+        self.assertEqual(b.take(LIMITS, 0, 0.0, 1.0), 0.0)
+
+    def test_floor_keeps_reserve_for_interactive_calls(self):
+        b = _Bucket(10, 6000, 0)
+        self.assertGreater(b.take(LIMITS, 0, 0.2, 0), 0)  # 10 requests left, 12 reserved
+        self.assertEqual(b.take(LIMITS, 0, 0.0, 0), 0.0)
+
+    def test_oversized_call_passes_on_a_full_bucket(self):
+        self.assertEqual(_Bucket(60, 6000, 0).take(LIMITS, 10 ** 6, 0.0, 0), 0.0)
+
+
+class RateLimiterTests(TestCase):
+    def test_database_backend_retries_after_a_lost_race(self):
+        backend = DatabaseBucketBackend()
+        self.assertEqual(backend.try_acquire("test", LIMITS, 0, 0.0), 0.0)
+        take = _Bucket.take
+        raced = []
+
+        def take_after_another_worker(bucket, *args):
+            if not raced:
+                # Another process spends a request between our read and our write
+                raced.append(True)
+                row = RateLimitBucket.objects.get(provider="test")
+                RateLimitBucket.objects.filter(pk=row.pk).update(requests=row.requests - 1, version=row.version + 1)
+            return take(bucket, *args)
+
+        with mock.patch.object(_Bucket, "take", take_after_another_worker):
+            self.assertEqual(backend.try_acquire("test", LIMITS, 0, 0.0), 0.0)
+        row = RateLimitBucket.objects.get(provider="test")
+        self.assertEqual(row.version, 3)
+        self.assertAlmostEqual(row.requests, 57, places=0)
+
+    def test_gives_up_after_max_wait(self):
+        limiter = RateLimiter(backend=LocalBucketBackend(), limits={"p": {"requests_per_minute": 1, "tokens_per_minute": 100}},
+                              reserve=0.0, max_wait=0.05)
+        limiter.acquire("p", 0, INTERACTIVE)
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire("p", 0, INTERACTIVE)
+
+    def test_background_calls_leave_the_reserve(self):
+        limiter = RateLimiter(backend=LocalBucketBackend(), limits={"p": {"requests_per_minute": 5, "tokens_per_minute": 100}},
+                              reserve=0.5, max_wait=0.05)
+        limiter.acquire("p", 0, BACKGROUND)
+        limiter.acquire("p", 0, BACKGROUND)
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire("p", 0, BACKGROUND)
+        limiter.acquire("p", 0, INTERACTIVE)
+
+    def test_unknown_provider_is_not_limited(self):
+        RateLimiter(backend=LocalBucketBackend(), limits={}, max_wait=0).acquire("other", 10 ** 9)
+
+
+class RangeParsingTests(SimpleTestCase):
+    def test_ranges(self):
+        self.assertEqual(_parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(_parse_range("bytes=900-", 1000), (900, 999))
+        self.assertEqual(_parse_range("bytes=990-2000", 1000), (990, 999))
+        self.assertEqual(_parse_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(_parse_range("bytes=-5000", 1000), (0, 999))
+
+    def test_unsatisfiable(self):
+        self.assertIs(_parse_range("bytes=1000-", 1000), False)
+        self.assertIs(_parse_range("bytes=50-10", 1000), False)
+        self.assertIs(_parse_range("bytes=-0", 1000), False)
+
+    def test_ignored(self):
+        for header in ("bytes=-", "bytes=0-1,5-6", "items=0-1", "bytes=a-b"):
+            self.assertIsNone(_parse_range(header, 1000), header)
+
+    def test_batched_sends_first_line_alone(self):
+        chunks = list(_batched(["header\n"] + ["row\n"] * 10, size=8))
+        self.assertEqual(chunks[0], b"header\n")
+        self.assertEqual(b"".join(chunks), b"header\n" + b"row\n" * 10)
+        self.assertTrue(all(len(chunk) <= 8 for chunk in chunks[1:]))
+
+
+class RankScoresTests(SimpleTestCase):
+    def test_ties_share_the_best_rank(self):
+        ranks, percentiles = rank_scores([90, 80, 80, 70, 10])
+        self.assertEqual(ranks.tolist(), [1, 2, 2, 4, 5])
+        self.assertEqual(percentiles.tolist(), [100, 50, 50, 25, 0])
+
+    def test_small_boards(self):
+        self.assertEqual([a.tolist() for a in rank_scores([])], [[], []])
+        self.assertEqual([a.tolist() for a in rank_scores([55])], [[1], [100]])
+
+    def test_buckets(self):
+        self.assertEqual([bucket(p) for p in (100, 90, 89, 75, 50, 49, 0)],
+                         ["top10", "top10", "top25", "top25", "top50", "rest", "rest"])
+
+
+class QuestionStatisticsTests(SimpleTestCase):
+    def arrays(self, question_group, question_label, answer_group, score, blank, overall):
+        groups = max(question_group) + 1
+        return {
+            "texts": [f"q{i}" for i in range(groups)],
+            "hashes": [f"h{i}" for i in range(groups)],
+            "question_group": np.array(question_group),
+            "question_label": np.array(question_label),
+            "answer_group": np.array(answer_group),
+            "score": np.array(score),
+            "blank": np.array(blank),
+            "overall": np.array(overall),
+        }
+
+    def test_statistics_per_group(self):
+        arrays = self.arrays(
+            question_group=[0, 0, 0, 1, 1],
+            question_label=[2, 2, 0, 1, 1],
+            answer_group=[0, 0, 0, 1, 1],
+            score=[20, 40, 100, 80, 0],
+            blank=[False, False, False, False, True],
+            overall=[10, 30, 90, -1, 50],
+        )
+        stats = question_statistics(arrays, min_answers=2, min_pairs=3, bands=(45, 70))
+        self.assertEqual(stats["asked"].tolist(), [3, 2])
+        self.assertEqual(stats["answered"].tolist(), [3, 1])
+        self.assertEqual(stats["skipped"].tolist(), [0, 1])
+        self.assertEqual(stats["labelled"].tolist(), [2, 1])
+        self.assertAlmostEqual(stats["mean"][0], 160 / 3)
+        self.assertAlmostEqual(stats["std"][0], np.std([20, 40, 100]))
+        self.assertEqual(stats["histogram"][0].tolist(), [0, 1, 1, 0, 1])
+        self.assertAlmostEqual(stats["discrimination"][0], np.corrcoef([20, 40, 100], [10, 30, 90])[0, 1])
+        # Group 1: one answer, no overall score -> no difficulty, no discrimination
+        self.assertEqual(stats["empirical"].tolist(), [1, -1])
+        self.assertTrue(np.isnan(stats["discrimination"][1]))
+        self.assertEqual(stats["skip"].tolist(), [0.0, 0.5])
+
+    def test_difficulty_bands(self):
+        arrays = self.arrays([0, 1, 2], [1, 1, 1], [0, 0, 1, 1, 2, 2], [10, 20, 50, 60, 90, 100],
+                             [False] * 6, [-1] * 6)
+        stats = question_statistics(arrays, min_answers=2, min_pairs=3, bands=(45, 70))
+        self.assertEqual(stats["empirical"].tolist(), [2, 1, 0])
+
+
+class MinHashTests(SimpleTestCase):
+    base = "I would put a cache in front of the database and shard the data by user id to spread the load evenly"
+
+    def signature(self, text):
+        return minhash(shingles(text)[0])
+
+    def test_estimates_jaccard(self):
+        a, b = shingles(self.base)[0], shingles(self.base.replace("evenly", "fairly"))[0]
+        jaccard = len(np.intersect1d(a, b)) / len(np.union1d(a, b))
+        estimate = (self.signature(self.base) == self.signature(self.base.replace("evenly", "fairly"))).mean()
+        self.assertEqual(self.signature(self.base).shape, (NUM_PERM,))
+        self.assertAlmostEqual(estimate, jaccard, delta=0.15)
+
+    def test_clusters_near_duplicates_only(self):
+        texts = [
+            self.base,
+            self.base.replace("evenly", "fairly"),
+            "Indexes are balanced trees that let the engine find rows without scanning the whole table on disk",
+            self.base + " across regions",
+        ]
+        signatures = np.vstack([self.signature(text) for text in texts])
+        clusters = cluster_signatures([10, 11, 12, 13], signatures, threshold=0.6)
+        self.assertEqual(sorted(clusters), [10, 11, 13])
+        self.assertEqual({rep for rep, _ in clusters.values()}, {10})
+        self.assertTrue(all(sim >= 0.6 for _, sim in clusters.values()))
+
+    def test_no_clusters_for_a_single_row(self):
+        self.assertEqual(cluster_signatures([1], np.vstack([self.signature(self.base)]), 0.6), {})
+
+
+class AnswerSimilarityEngineTests(TestCase):
+    base = MinHashTests.base
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="recruiter", email="r@example.com", password="x")
+        self.job = JobDescription.objects.create(user=user, title="Backend", description="d", requirements="r")
+        self.link = InterviewSession.objects.create(user=user, job=self.job, expires_at=timezone.now() + timedelta(days=1))
+        self.engine = AnswerSimilarityEngine(max_workers=0)
+
+    def answer(self, text):
+        session = InterviewSession.objects.create(
+            user=self.link.user, job=self.job, master_token=self.link.token, expires_at=self.link.expires_at,
+        )
+        question = InterviewQuestion.objects.create(session=session, question_text="How would you scale it?",
+                                                    question_type="technical", difficulty="medium")
+        answer = InterviewAnswer.objects.create(session=session, question=question, answer_text=text)
+        self.engine._process(answer.pk)
+        return answer
+
+    def clusters(self):
+        return dict(AnswerSignature.objects.values_list("answer_id", "cluster"))
+
+    def test_new_answers_join_clusters_without_a_group_recluster(self):
+        with mock.patch.object(self.engine, "cluster_group", side_effect=AssertionError("full re-cluster")):
+            first = self.answer(self.base)
+            other = self.answer("Indexes are balanced trees that let the engine find rows without scanning the table")
+            second = self.answer(self.base.replace("evenly", "fairly"))
+            third = self.answer(self.base + " across regions")
+        self.assertEqual(self.clusters(), {first.pk: first.pk, other.pk: None, second.pk: first.pk, third.pk: first.pk})
+        incremental = self.clusters()
+        group_key = AnswerSignature.objects.get(answer=first).group_key
+        self.engine.cluster_group(group_key)
+        self.assertEqual(self.clusters(), incremental)
+
+    def test_edited_answers_are_reclustered(self):
+        first = self.answer(self.base)
+        second = self.answer(self.base.replace("evenly", "fairly"))
+        self.assertEqual(self.clusters(), {first.pk: first.pk, second.pk: first.pk})
+        second.answer_text = "I have not worked on anything like this, so I would ask the team how they handled it before"
+        second.save()
+        self.engine._process(second.pk)
+        self.assertEqual(self.clusters(), {first.pk: None, second.pk: None})
+
+
+class CandidateDigestTests(SimpleTestCase):
+    def test_changes_with_every_vector_input(self):
+        candidate = Candidate(resume_data={"full_text": "Python", "sha256": "abc"}, education="BSc", skills=["Python"])
+        digest = candidate_digest(candidate)
+        candidate.education = "MSc"
+        self.assertNotEqual(candidate_digest(candidate), digest)
+        edited = candidate_digest(candidate)
+        candidate.skills = ["Python", "SQL"]
+        self.assertNotEqual(candidate_digest(candidate), edited)
+        candidate.resume_data = {"full_text": "Python", "sha256": "def"}
+        self.assertNotEqual(candidate_digest(candidate), edited)
+
+
+class KeyPointScorerTests(TestCase):
+    question = "What is a database index and what are its trade-offs?"
+    key_points = ["speeds up lookups of rows", "usually a B-tree structure", "slows down inserts and updates",
+                  "uses extra disk space"]
+    complete = ("An index speeds up lookups of rows because the database keeps a B-tree structure it can search "
+                "instead of scanning the table. The trade-off is that inserts and updates are slower since the tree "
+                "must be updated, and the index uses extra disk space.")
+
+    def score(self, answer, scorer=None):
+        scorer = scorer or KeyPointScorer(require_calibration=False)
+        return scorer.score(self.question, answer, self.key_points)
+
+    def test_complete_answer_is_confident(self):
+        prescore = self.score(self.complete)
+        self.assertGreater(prescore.score, 75)
+        self.assertFalse(prescore.escalate)
+
+    def test_low_scores_go_to_the_model(self):
+        reworded = ("An index lets the engine locate rows without scanning the whole table. It is usually kept as a "
+                    "balanced tree, so inserts must maintain it, and it takes extra disk space.")
+        self.assertTrue(self.score(reworded).escalate)
+        self.assertTrue(self.score("I enjoy working in teams and learning new things every day at my job.").escalate)
+
+    def test_keyword_stuffing_goes_to_the_model(self):
+        dump = " ".join(["index speeds lookups rows b-tree structure slows inserts updates extra disk space"] * 4)
+        prescore = self.score(dump)
+        self.assertGreater(prescore.score, 75)
+        self.assertTrue(prescore.escalate)
+
+    def test_non_answers_stay_local(self):
+        prescore = self.score("I don't know")
+        self.assertEqual((prescore.score, prescore.escalate), (5, False))
+
+    def test_local_scores_need_an_approved_replay(self):
+        self.assertTrue(self.score(self.complete, KeyPointScorer()).escalate)
+        record_replay({"items": 300, "local_rate": 0.1, "local": {"count": 30, "pass_agreement": 1.0}})
+        self.assertTrue(self.score(self.complete, KeyPointScorer()).escalate)
+        replay = record_replay({"items": 300, "local_rate": 0.7, "local": {"count": 210, "pass_agreement": 0.95}})
+        self.assertTrue(replay.approved)
+        self.assertFalse(self.score(self.complete, KeyPointScorer()).escalate)
+        PrescoreReplay.objects.filter(pk=replay.pk).update(scorer_version=SCORER_VERSION - 1)
+        self.assertTrue(self.score(self.complete, KeyPointScorer()).escalate)
+
+
+class EvaluationCacheTests(TestCase):
+    def test_only_model_evaluations_are_cached(self):
+        cache = EvaluationCache()
+        cache.put("Q?", "An answer", ["x"], {"score": 50, "feedback": "Evaluation failed.", "source": "fallback"}, "v1")
+        cache.put("Q?", "An answer", ["x"], {"score": 90, "source": "local"}, "v1")
+        self.assertIsNone(cache.get("Q?", "An answer", ["x"], "v1"))
+        cache.put("Q?", "An answer", ["x"], {"score": 81, "source": "llm"}, "v1")
+        self.assertEqual(cache.get("q", "an answer!", ["x"], "v1"), {"score": 81, "source": "cache"})
+
+    def test_entries_are_per_evaluator_version(self):
+        cache = EvaluationCache()
+        cache.put("Q?", "An answer", ["x"], {"score": 81, "source": "llm"}, "gemini:a:p1")
+        self.assertIsNone(cache.get("Q?", "An answer", ["x"], "gemini:a:p2"))
+        cache.put("Q?", "An answer", ["x"], {"score": 60, "source": "llm"}, "gemini:a:p2")
+        self.assertEqual(cache.invalidate(keep_version="gemini:a:p2"), 1)
+        self.assertEqual(cache.get("Q?", "An answer", ["x"], "gemini:a:p2")["score"], 60)
+
+    def test_entries_are_per_key_points(self):
+        cache = EvaluationCache()
+        cache.put("Q?", "An answer", ["x"], {"score": 81, "source": "llm"}, "v1")
+        self.assertIsNone(cache.get("Q?", "An answer", ["y"], "v1"))
+        cache.put("Q?", "An answer", ["y"], {"score": 40, "source": "llm"}, "v1")
+        # Links asking the same question against different key points don't evict each other
+        self.assertEqual(cache.get("Q?", "An answer", ["x"], "v1")["score"], 81)
+        self.assertEqual(cache.get("Q?", "An answer", ["y"], "v1")["score"], 40)
+
+
+class FakeEvaluator:
+    provider = "fake"
+
+    @classmethod
+    def evaluation_version(cls):
+        return "fake:p1"
+
+    def evaluate_answers(self, items):
+        return [{"score": 80, "feedback": "", "strengths": [], "improvements": []},
+                {"score": 50, "feedback": "Evaluation failed.", "strengths": [], "improvements": [], "source": "fallback"}]
+
+
+class LoopCheckingEvaluator(FakeEvaluator):
+    """Fails the way the database-backed limiter does when called on the event loop"""
+
+    def evaluate_answers(self, items):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return [{"score": 80, "feedback": "", "strengths": [], "improvements": []} for _ in items]
+        raise SynchronousOnlyOperation("called from an async context")
+
+
+class EvaluationDispatcherTests(SimpleTestCase):
+    def dispatcher(self, service_class=FakeEvaluator):
+        dispatcher = EvaluationDispatcher(service_class=service_class, window_ms=0)
+        dispatcher.prescorer = dispatcher.cache = None
+        return dispatcher
+
+    async def test_unbatched_async_evaluations_run_off_the_event_loop(self):
+        evaluation = await self.dispatcher(LoopCheckingEvaluator).aevaluate("Q", "An answer", [])
+        self.assertEqual((evaluation["score"], evaluation["source"]), (80, "llm"))
+
+    def test_unexpected_errors_resolve_every_future(self):
+        batch = [({"question": "Q", "answer": answer, "expected_key_points": []}, Future()) for answer in "ab"]
+        with mock.patch("dashboard.services.evaluation_dispatcher.get_shadow_runner", side_effect=RuntimeError("boom")):
+            self.dispatcher()._dispatch(batch)
+        for _, future in batch:
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=0)
+
+    def test_fallbacks_count_as_primary_failures(self):
+        dispatcher = self.dispatcher()
+        shadow = mock.Mock()
+        batch = [({"question": "Q", "answer": answer, "expected_key_points": []}, mock.Mock()) for answer in "ab"]
+        with mock.patch("dashboard.services.evaluation_dispatcher.get_shadow_runner", return_value=shadow):
+            dispatcher._dispatch(batch)
+        self.assertEqual([call.kwargs["primary_failed"] for call in shadow.mirror.call_args_list], [False, True])
+        self.assertEqual([future.set_result.call_args.args[0]["source"] for _, future in batch], ["llm", "fallback"])
+
+
+class SignatureTests(SimpleTestCase):
+    def test_verify_accepts_only_the_signed_body(self):
+        timestamp = str(int(time.time()))
+        signature = "v1=" + sign("s3cret", timestamp, b'{"events": []}')
+        self.assertTrue(verify("s3cret", timestamp, b'{"events": []}', signature))
+        self.assertFalse(verify("s3cret", timestamp, b'{"events": [1]}', signature))
+        self.assertFalse(verify("other", timestamp, b'{"events": []}', signature))
+        self.assertFalse(verify("s3cret", timestamp, b'{"events": []}', None))
+
+    def test_verify_rejects_stale_or_missing_timestamps(self):
+        old = str(int(time.time()) - 600)
+        self.assertFalse(verify("s3cret", old, b"{}", "v1=" + sign("s3cret", old, b"{}")))
+        self.assertFalse(verify("s3cret", None, b"{}", "v1=" + sign("s3cret", "", b"{}")))
+
+
+def resolves_to(address):
+    """Patch check_url's DNS lookups only; connections still resolve for real"""
+    def getaddrinfo(host, port, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port))]
+
+    return mock.patch("dashboard.services.webhooks.socket", SOCK_STREAM=socket.SOCK_STREAM,
+                      gaierror=socket.gaierror, getaddrinfo=getaddrinfo)
+
+
+class WebhookURLTests(SimpleTestCase):
+    def test_internal_addresses_are_rejected(self):
+        for url in ("https://127.0.0.1/hook", "https://10.0.0.5/hook", "https://169.254.169.254/latest/meta-data",
+                    "https://[::1]/hook", "https://[::ffff:127.0.0.1]/hook", "https://0.0.0.0/hook"):
+            with self.subTest(url=url), self.assertRaises(UnsafeWebhookURL):
+                check_url(url)
+
+    def test_hostnames_are_resolved(self):
+        with resolves_to("192.168.1.10"), self.assertRaises(UnsafeWebhookURL):
+            check_url("https://intranet.example.com/hook")
+        with resolves_to("93.184.216.34"):
+            check_url("https://hooks.example.com/hook")
+
+    def test_https_is_required_outside_debug(self):
+        with resolves_to("93.184.216.34"):
+            with self.assertRaises(UnsafeWebhookURL):
+                check_url("http://hooks.example.com/hook")
+            with override_settings(DEBUG=True):
+                check_url("http://hooks.example.com/hook")
+
+    def test_serializer_rejects_internal_urls(self):
+        serializer = WebhookEndpointSerializer(data={"url": "https://169.254.169.254/latest/meta-data"})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("url", serializer.errors)
+
+
+@override_settings(DEBUG=True, WEBHOOK_ALLOW_PRIVATE_HOSTS=True, WEBHOOK_MAX_ATTEMPTS=4, WEBHOOK_BACKOFF_BASE=10,
+                   WEBHOOK_BACKOFF_MAX=30)
+class WebhookDeliveryTests(TestCase):
+    def setUp(self):
+        self.receiver = WebhookReceiver("s3cret").start()
+        self.addCleanup(self.receiver.stop)
+        self.user = get_user_model().objects.create_user(username="recruiter", password="x")
+        self.endpoint = WebhookEndpoint.objects.create(user=self.user, url=self.receiver.url, secret="s3cret")
+
+    def emit(self, count=1):
+        for subject_id in range(count):
+            emit(self.user.pk, "session.started", subject_id, {"session_id": subject_id})
+
+    def test_batches_are_signed_and_acknowledged(self):
+        self.emit(3)
+        self.assertEqual(WebhookSender(max_workers=0).deliver_due(), 3)
+        self.assertEqual((self.receiver.batches, self.receiver.rejected), (1, 0))
+        self.assertEqual([event["data"]["session_id"] for event in self.receiver.events], [0, 1, 2])
+        self.assertEqual(set(WebhookDelivery.objects.values_list("status", "attempts")), {("delivered", 1)})
+
+    def test_bad_signatures_are_rejected_and_retried(self):
+        WebhookEndpoint.objects.filter(pk=self.endpoint.pk).update(secret="stale")
+        self.emit()
+        self.assertEqual(WebhookSender(max_workers=0).deliver_due(), 0)
+        self.assertEqual(self.receiver.rejected, 1)
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual((delivery.status, delivery.last_status_code, delivery.last_error), ("pending", 401, "HTTP 401"))
+
+    def test_failures_back_off_exponentially_until_max_attempts(self):
+        self.receiver.fail_rate = 1.0
+        self.emit()
+        sender = WebhookSender(max_workers=0)
+        for delay in (10, 20, 30):
+            due = WebhookDelivery.objects.get().next_attempt_at
+            before = timezone.now()
+            self.assertEqual(sender.deliver_endpoint(self.endpoint.pk, now=due), 0)
+            after = timezone.now()
+            delivery = WebhookDelivery.objects.get()
+            self.assertEqual(delivery.status, "pending")
+            self.assertGreaterEqual(delivery.next_attempt_at, before + timedelta(seconds=delay))
+            self.assertLessEqual(delivery.next_attempt_at, after + timedelta(seconds=delay * 1.25))
+        sender.deliver_endpoint(self.endpoint.pk, now=delivery.next_attempt_at)
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual((delivery.status, delivery.attempts, delivery.last_error), ("failed", 4, "HTTP 500"))
+
+    def test_claimed_batches_are_not_sent_twice(self):
+        self.emit(2)
+        first, second = WebhookSender(max_workers=0), WebhookSender(max_workers=0)
+        now = timezone.now()
+        self.assertEqual(len(first._claim(self.endpoint.pk, now)), 2)
+        self.assertEqual(second._claim(self.endpoint.pk, now), [])
+        self.assertEqual(second.deliver_due(now), 0)
+        self.assertEqual(self.receiver.batches, 0)
+        # A crashed sender's claim lapses and the batch is picked up again
+        lapsed = now + timedelta(seconds=first.claim_seconds + 1)
+        self.assertEqual(second.deliver_due(lapsed), 2)
+        self.assertEqual(self.receiver.batches, 1)
+
+    def test_redirects_are_not_followed_and_bodies_not_kept(self):
+        self.emit()
+        post = mock.Mock(return_value=mock.Mock(status_code=302, text="internal details"))
+        WebhookSender(max_workers=0, post=post).deliver_due()
+        self.assertIs(post.call_args.kwargs["allow_redirects"], False)
+        self.assertEqual(WebhookDelivery.objects.get().last_error, "HTTP 302")
+
+    def test_internal_urls_are_blocked_at_send_time(self):
+        self.emit()
+        post = mock.Mock()
+        with override_settings(WEBHOOK_ALLOW_PRIVATE_HOSTS=False):
+            WebhookSender(max_workers=0, post=post).deliver_due()
+        post.assert_not_called()
+        self.assertTrue(WebhookDelivery.objects.get().last_error.startswith("Blocked:"))
+
+    def test_posts_go_to_the_checked_address(self):
+        # The host name resolves only through check_url; the POST must not look it up again
+        port = self.receiver.server.server_address[1]
+        WebhookEndpoint.objects.filter(pk=self.endpoint.pk).update(url=f"http://hooks.invalid:{port}/")
+        self.emit()
+        with resolves_to("127.0.0.1"):
+            self.assertEqual(WebhookSender(max_workers=0).deliver_due(), 1)
+        self.assertEqual(len(self.receiver.events), 1)
+
+
+class PinnedAddressAdapterTests(SimpleTestCase):
+    def test_https_keeps_the_host_name_for_sni_and_certificates(self):
+        pool = PinnedAddressAdapter("93.184.216.34").get_connection("https://hooks.example.com/in")
+        self.assertEqual((pool.host, pool.port), ("93.184.216.34", 443))
+        self.assertEqual(pool.conn_kw["server_hostname"], "hooks.example.com")
+        self.assertEqual(pool.assert_hostname, "hooks.example.com")
+
+    def test_host_header_names_the_url_host(self):
+        request = mock.Mock(url="http://hooks.example.com:8080/in", headers={})
+        PinnedAddressAdapter("93.184.216.34").add_headers(request)
+        self.assertEqual(request.headers["Host"], "hooks.example.com:8080")
+
+
+class SearchScopeTests(TestCase):
+    def setUp(self):
+        # The FTS table is created inside each test's transaction, so each test needs a fresh backend
+        patcher = mock.patch("dashboard.services.search_index._backend", SQLiteFTS5Backend())
+        self.backend = patcher.start()
+        self.addCleanup(patcher.stop)
+        User = get_user_model()
+        self.alice = User.objects.create_user(username="alice", email="alice@example.com", password="x")
+        self.bob = User.objects.create_user(username="bob", email="bob@example.com", password="x")
+
+    def found(self, user, query="zephyrine"):
+        return [(hit.doc_type, hit.object_id) for hit in self.backend.search(query, user.pk)]
+
+    def test_candidates_are_only_found_by_their_recruiters(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            candidate = Candidate.objects.create(
+                name="Zephyrine Okafor", email="z@example.com", created_by=self.alice,
+                resume_data={"full_text": "Kubernetes operator experience"},
+            )
+        self.assertEqual(self.found(self.alice), [("candidate", candidate.pk)])
+        self.assertEqual(self.found(self.alice, "kubernetes"), [("candidate", candidate.pk)])
+        self.assertEqual(self.found(self.bob), [])
+        self.assertEqual(self.found(self.bob, "kubernetes"), [])
+
+        # Interviewing the candidate makes them visible to the interviewer
+        job = JobDescription.objects.create(user=self.bob, title="SRE", description="d", requirements="r")
+        with self.captureOnCommitCallbacks(execute=True):
+            session = InterviewSession.objects.create(
+                user=self.bob, job=job, candidate=candidate, expires_at=timezone.now() + timedelta(days=1),
+            )
+        self.assertIn(("candidate", candidate.pk), self.found(self.bob))
+        self.assertIn(("session", session.pk), self.found(self.bob))
+        self.assertNotIn(("session", session.pk), self.found(self.alice))
+
+
+class SkillTaxonomyTests(SimpleTestCase):
+    def skills(self, text):
+        return set(get_skill_taxonomy().match(text))
+
+    def test_short_forms_in_prose_are_not_skills(self):
+        for text in ("John R. Smith led the team", "Reviewed by R. Jones", "Go to the dashboard and log in",
+                     "R and D were involved"):
+            with self.subTest(text=text):
+                self.assertEqual(self.skills(text), set())
+
+    def test_short_forms_in_a_skill_context(self):
+        self.assertEqual(self.skills("Skills: Python, R, Go."), {"python", "r", "go"})
+        self.assertEqual(self.skills("Python/R/SQL"), {"python", "r", "sql"})
+        self.assertEqual(self.skills("Statistics in R language"), {"r"})
+        self.assertEqual(self.skills("Services written in Go and Rust"), {"go", "rust"})
+        self.assertEqual(get_skill_taxonomy().lookup("go"), "go")
+
+    def test_java_is_not_found_in_javascript(self):
+        self.assertEqual(self.skills("JavaScript and javascript"), {"javascript"})
+        self.assertEqual(self.skills("Java, JavaScript"), {"java", "javascript"})
+        self.assertEqual(self.skills("Java-based services"), {"java"})
+
+    def test_c_family_boundaries(self):
+        self.assertEqual(self.skills("C++ and C#"), {"cpp", "csharp"})
+        self.assertEqual(self.skills("R&D in C++"), {"cpp"})
+
+
+def named_file(data, name):
+    file = io.BytesIO(data)
+    file.name = name
+    return file
+
+
+def docx_file(paragraphs):
+    document = Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return named_file(buffer.getvalue(), "resume.docx")
+
+
+class ResumeExtractionLimitTests(SimpleTestCase):
+    def docx(self, paragraphs):
+        return docx_file(paragraphs)
+
+    def pdf(self, pages):
+        writer = PdfWriter()
+        for _ in range(pages):
+            writer.add_blank_page(width=200, height=200)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return named_file(buffer.getvalue(), "resume.pdf")
+
+    def test_page_limit(self):
+        self.assertEqual(len(list(ResumeParser.iter_text(self.pdf(5), max_pages=3))), 3)
+
+    def test_character_limit_truncates(self):
+        chunks = list(ResumeParser.iter_text(self.docx(["a" * 40, "b" * 40, "c" * 40]), max_chars=60))
+        self.assertEqual(chunks, ["a" * 40, "b" * 20])
+
+    def test_timeout_is_checked_between_pages(self):
+        chunks = ResumeParser.iter_text(self.docx(["one", "two", "three"]), timeout=5)
+        with mock.patch("dashboard.services.resume_parser.time.monotonic", side_effect=[0, 1, 6]):
+            self.assertEqual(list(chunks), ["one", "two"])
+
+    def test_other_formats_yield_nothing(self):
+        self.assertEqual(ResumeParser.extract_text(named_file(b"hello", "resume.txt")), "")
+
+
+class ResumeIngestionPipelineTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        patcher = mock.patch("dashboard.services.search_index._backend")
+        self.search = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pipeline = ResumeIngestionPipeline(max_workers=0)
+        self.candidate = Candidate.objects.create(name="Ada", email="ada@example.com")
+        self.name = StorageService().store(docx_file(["Ada Lovelace", "Python, SQL", "7 years experience"]))
+
+    def test_stages_run_after_commit_and_fill_the_candidate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ingestion = self.pipeline.enqueue(self.name, candidate=self.candidate)
+            self.assertEqual((ingestion.stage, ingestion.status), ("stored", "pending"))
+        ingestion.refresh_from_db()
+        self.assertEqual((ingestion.stage, ingestion.status, ingestion.attempts), ("indexed", "done", 1))
+        self.assertEqual(ingestion.sha256, StorageService.blob_sha256(self.name))
+        self.candidate.refresh_from_db()
+        self.assertEqual((self.candidate.experience_years, self.candidate.resume_data["sha256"]), (7, ingestion.sha256))
+        self.assertIn("Python", self.candidate.skills)
+        self.assertEqual(self.candidate.resume_data["full_text"], ingestion.parsed.text)
+        [documents], _ = self.search.index.call_args
+        self.assertEqual([(doc.doc_type, doc.object_id) for doc in documents], [("candidate", self.candidate.pk)])
+
+        # A finished ingestion is not claimed again
+        self.assertFalse(self.pipeline.run(ingestion.pk))
+
+    def test_identical_files_reuse_the_parse(self):
+        first = self.pipeline.enqueue(self.name)
+        self.pipeline.run(first.pk)
+        second = self.pipeline.enqueue(self.name, candidate=self.candidate)
+        with mock.patch.object(ResumeParser, "extract_text") as extract:
+            self.pipeline.run(second.pk)
+        extract.assert_not_called()
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((second.status, second.parsed_id), ("done", first.parsed_id))
+        self.assertEqual(ParsedResume.objects.count(), 1)
+
+    def test_failures_record_the_stage_and_are_retried(self):
+        ingestion = self.pipeline.enqueue(self.name, candidate=self.candidate)
+        with mock.patch.object(ResumeParser, "extract_text", side_effect=ValueError("corrupt")):
+            self.pipeline.run(ingestion.pk)
+        ingestion.refresh_from_db()
+        self.assertEqual((ingestion.stage, ingestion.status, ingestion.error), ("hashed", "failed", "corrupt"))
+
+        self.assertEqual(self.pipeline.process_pending(), 0)
+        self.assertEqual(self.pipeline.process_pending(retry_failed=True), 1)
+        ingestion.refresh_from_db()
+        self.assertEqual((ingestion.stage, ingestion.status, ingestion.attempts, ingestion.error),
+                         ("indexed", "done", 2, ""))
+
+    @override_settings(RESUME_INGESTION_MAX_ATTEMPTS=1)
+    def test_retries_stop_after_max_attempts(self):
+        ingestion = self.pipeline.enqueue(self.name)
+        with mock.patch.object(ResumeParser, "extract_text", side_effect=ValueError("corrupt")):
+            self.pipeline.run(ingestion.pk)
+        self.assertEqual(self.pipeline.process_pending(retry_failed=True), 0)
+
+    def test_stale_running_rows_are_requeued(self):
+        ingestion = self.pipeline.enqueue(self.name)
+        ResumeIngestion.objects.filter(pk=ingestion.pk).update(
+            status="running", started_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(self.pipeline.process_pending(), 0)
+        self.assertEqual(self.pipeline.process_pending(stale_after=600), 1)
+
+
+class ParseCacheTests(TestCase):
+    def test_same_bytes_are_parsed_once(self):
+        paragraphs = ["Ada Lovelace", "ada@example.com", "Python and Django, 5 years experience"]
+        with mock.patch.object(ResumeParser, "extract_text", wraps=ResumeParser.extract_text) as extract:
+            first = ResumeParser.get_or_parse(docx_file(paragraphs))
+            second = ResumeParser.get_or_parse(docx_file(paragraphs))
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(ParsedResume.objects.count(), 1)
+        self.assertEqual(first, second)
+        self.assertEqual((first["name"], first["email"], first["experience_years"]),
+                         ("Ada Lovelace", "ada@example.com", 5))
+        self.assertIn("Python", first["skills"])
+
+        ResumeParser.get_or_parse(docx_file(paragraphs + ["Go"]))
+        self.assertEqual(ParsedResume.objects.count(), 2)
+
+    def test_entries_from_an_older_parser_are_reparsed_from_stored_text(self):
+        file = docx_file(["Grace Hopper"])
+        digest = file_sha256(file)
+        ParsedResume.objects.create(sha256=digest, text="Grace Hopper\nSQL", data={"name": "stale", "parser_version": 1})
+        with mock.patch.object(ResumeParser, "extract_text") as extract:
+            data = ResumeParser.get_or_parse(file)
+        extract.assert_not_called()
+        self.assertEqual((data["name"], data["parser_version"], data["full_text"]),
+                         ("Grace Hopper", ResumeParser.PARSER_VERSION, "Grace Hopper\nSQL"))
+        self.assertIn("SQL", data["skills"])
+        self.assertEqual(ParsedResume.objects.get().data, {k: v for k, v in data.items()
+                                                           if k not in ("full_text", "sha256")})
+
+
+class BulkResumeImportTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.enterContext(mock.patch("dashboard.services.search_index._backend"))
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.workdir = workdir.name
+
+    def resume(self, file_name, content, email="", **data):
+        """A resume file whose parse is already cached, so no worker process is started"""
+        path = f"{self.workdir}/{file_name}"
+        with open(path, "wb") as file:
+            file.write(content)
+        ParsedResume.objects.get_or_create(sha256=hashlib.sha256(content).hexdigest(), defaults={
+            "text": content.decode(), "data": {"email": email, "parser_version": ResumeParser.PARSER_VERSION, **data},
+        })
+        return file_name, path
+
+    def test_duplicates_by_content_and_email(self):
+        Candidate.objects.create(name="Existing", email="grace@example.com")
+        files = [
+            self.resume("ada.pdf", b"ada", "Ada@Example.com", name="Ada Lovelace", skills=["Python"]),
+            self.resume("ada-copy.pdf", b"ada"),
+            self.resume("ada-v2.pdf", b"ada v2", "ada@example.com"),
+            self.resume("grace.pdf", b"grace"),
+            self.resume("anon.pdf", b"anon"),
+        ]
+        manifest = read_manifest(["file,email,phone", "grace.pdf,GRACE@example.com,", "ada.pdf,,555 0100"])
+        with mock.patch("dashboard.services.bulk_import.ProcessPoolExecutor", side_effect=AssertionError("parsed")):
+            report = BulkResumeImporter(chunk_size=2).run(files, manifest)
+
+        self.assertEqual({k: report[k] for k in ("total", "processed", "created", "duplicates")},
+                         {"total": 5, "processed": 5, "created": 1, "duplicates": 3})
+        self.assertEqual(report["errors"], [{"file": "anon.pdf", "error": "No email address in manifest or resume"}])
+        ada = Candidate.objects.get(email="ada@example.com")
+        self.assertEqual((ada.name, ada.phone, ada.skills), ("Ada Lovelace", "555 0100", ["Python"]))
+        self.assertEqual(StoredBlob.objects.get().ref_count, 1)
+
+    def test_emails_added_meanwhile_fall_back_to_row_by_row(self):
+        files = [self.resume("ada.pdf", b"ada", "ada@example.com"), self.resume("alan.pdf", b"alan", "alan@example.com")]
+        Candidate.objects.create(name="Ada", email="ada@example.com")
+        # The pre-check misses a candidate created after it ran
+        with mock.patch.object(BulkResumeImporter, "_existing_emails", return_value=set()):
+            report = BulkResumeImporter().run(files)
+
+        self.assertEqual((report["created"], report["duplicates"], report["processed"]), (1, 1, 2))
+        self.assertEqual(Candidate.objects.get(email="alan@example.com").resume_data["full_text"], "alan")
+        self.assertEqual(Candidate.objects.count(), 2)
+        # The skipped candidate's stored resume is released again
+        refs = dict(StoredBlob.objects.values_list("sha256", "ref_count"))
+        self.assertEqual(refs, {hashlib.sha256(b"ada").hexdigest(): 0, hashlib.sha256(b"alan").hexdigest(): 1})
+
+
+class StoredBlobTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.enterContext(mock.patch("dashboard.services.search_index._backend"))
+        self.storage = StorageService()
+
+    def gc(self, *args):
+        out = io.StringIO()
+        call_command("gc_resume_blobs", *args, stdout=out)
+        return out.getvalue()
+
+    def age(self, *names):
+        StoredBlob.objects.filter(path__in=names).update(updated_at=timezone.now() - timedelta(hours=2))
+
+    def test_identical_content_is_stored_once_and_counted(self):
+        first = self.storage.store(named_file(b"resume", "Ada.PDF"))
+        second = self.storage.store(named_file(b"resume", "copy.pdf"))
+        self.assertEqual(first, second)
+        self.assertEqual(first, StorageService.blob_path(hashlib.sha256(b"resume").hexdigest(), ".pdf"))
+        self.assertEqual(StoredBlob.objects.get().ref_count, 2)
+        with default_storage.open(first) as file:
+            self.assertEqual(file.read(), b"resume")
+
+        for _ in range(3):
+            self.storage.release(first)
+        self.storage.release("resumes/other.pdf")
+        self.assertEqual(StoredBlob.objects.get().ref_count, 0)
+
+    def test_deleting_a_candidate_releases_its_resume(self):
+        name = self.storage.store(named_file(b"resume", "ada.pdf"))
+        candidate = Candidate.objects.create(name="Ada", email="ada@example.com", resume_file=name)
+        with self.captureOnCommitCallbacks(execute=True):
+            candidate.delete()
+        self.assertEqual(StoredBlob.objects.get().ref_count, 0)
+
+    def test_gc_removes_old_unreferenced_blobs_and_stray_files(self):
+        unused = self.storage.store(named_file(b"unused", "a.pdf"))
+        recent = self.storage.store(named_file(b"recent", "b.pdf"))
+        used = self.storage.store(named_file(b"used", "c.pdf"))
+        self.storage.release(unused)
+        self.storage.release(recent)
+        self.age(unused, used)
+        stray = default_storage.save(f"{BLOB_PREFIX}/tmp/upload", io.BytesIO(b"partial"))
+        old = time.time() - 7200
+        os.utime(default_storage.path(stray), (old, old))
+
+        self.assertIn("Would remove 1 unreferenced blob(s) and 1 stray file(s)", self.gc("--dry-run"))
+        self.assertTrue(default_storage.exists(unused))
+        self.gc()
+        self.assertFalse(default_storage.exists(unused))
+        self.assertFalse(default_storage.exists(stray))
+        self.assertEqual(set(StoredBlob.objects.values_list("path", flat=True)), {recent, used})
+        self.assertTrue(default_storage.exists(recent))
+
+    def test_gc_leaves_blobs_it_cannot_claim(self):
+        name = self.storage.store(named_file(b"resume", "a.pdf"))
+        self.storage.release(name)
+        self.age(name)
+        # Another gc run has claimed it
+        StoredBlob.objects.update(ref_count=-1)
+        self.gc()
+        self.assertTrue(StoredBlob.objects.exists())
+        self.assertTrue(default_storage.exists(name))
+
+    def test_store_waits_for_a_claimed_blob_to_be_collected(self):
+        name = self.storage.store(named_file(b"resume", "a.pdf"))
+        StoredBlob.objects.update(ref_count=-1)
+
+        def collect(seconds):
+            default_storage.delete(name)
+            StoredBlob.objects.all().delete()
+
+        with mock.patch("dashboard.services.storage_service.time.sleep", side_effect=collect) as sleep:
+            self.assertEqual(self.storage.store(named_file(b"resume", "a.pdf")), name)
+        sleep.assert_called_once()
+        self.assertEqual(StoredBlob.objects.get().ref_count, 1)
+        self.assertTrue(default_storage.exists(name))
+
+    def test_recount_repairs_reference_counts(self):
+        name = self.storage.store(named_file(b"resume", "a.pdf"))
+        Candidate.objects.create(name="Ada", email="ada@example.com", resume_file=name)
+        Candidate.objects.create(name="Alan", email="alan@example.com", resume_file=name)
+        self.assertIn("corrected 1 blob(s)", self.gc("--recount"))
+        self.assertEqual(StoredBlob.objects.get().ref_count, 2)
+
+
+class SkillIndexTests(TestCase):
+    def setUp(self):
+        self.enterContext(mock.patch("dashboard.services.search_index._backend"))
+        self.ada = self.candidate("Ada", ["Python", "PostgreSQL", "Kubernetes"], 8)
+        self.alan = self.candidate("Alan", ["python", "Haskell"], 3)
+        self.grace = self.candidate("Grace", ["COBOL", "Team Leadership"], 30)
+
+    def candidate(self, name, skills, years):
+        return Candidate.objects.create(name=name, email=f"{name.lower()}@example.com", skills=skills,
+                                        experience_years=years)
+
+    def names(self, **kwargs):
+        return sorted(filter_candidates(Candidate.objects.all(), **kwargs).values_list("name", flat=True))
+
+    def test_all_and_any_of_skills(self):
+        self.assertEqual(self.names(skills=["Python"]), ["Ada", "Alan"])
+        self.assertEqual(self.names(skills=["python", "Postgres"]), ["Ada"])
+        self.assertEqual(self.names(skills=["Haskell", "k8s"], match="any"), ["Ada", "Alan"])
+        self.assertEqual(self.names(skills=["", " "]), ["Ada", "Alan", "Grace"])
+
+    def test_aliases_of_one_skill_count_once(self):
+        self.assertEqual(self.names(skills=["Python", "python3"]), ["Ada", "Alan"])
+
+    def test_skills_nobody_has(self):
+        self.assertEqual(self.names(skills=["Python", "Erlang"]), [])
+        self.assertEqual(self.names(skills=["Python", "Erlang"], match="any"), ["Ada", "Alan"])
+        self.assertEqual(self.names(skills=["Erlang"], match="any"), [])
+
+    def test_custom_skills_match_case_insensitively(self):
+        self.assertEqual(self.names(skills=["team  leadership"]), ["Grace"])
+
+    def test_minimum_experience(self):
+        self.assertEqual(self.names(skills=["Python"], min_experience=5), ["Ada"])
+        self.assertEqual(self.names(min_experience=10), ["Grace"])
+
+    def test_links_follow_skill_edits(self):
+        self.alan.skills = ["Kubernetes"]
+        self.alan.save()
+        self.assertEqual(self.names(skills=["Python"]), ["Ada"])
+        self.assertEqual(self.names(skills=["Kubernetes"]), ["Ada", "Alan"])
+
+    def test_matching_candidates_ranks_by_overlap(self):
+        user = get_user_model().objects.create_user(username="recruiter", email="r@example.com", password="x")
+        job = JobDescription.objects.create(user=user, title="Platform", description="d", requirements="r",
+                                            skills=["Python", "Kubernetes", "Go"])
+        ranked = [(c.name, c.skill_overlap) for c in matching_candidates(job)]
+        self.assertEqual(ranked, [("Ada", 2), ("Alan", 1)])
+        self.assertEqual([c.name for c in matching_candidates(job, min_overlap=2)], ["Ada"])
+
+
+class IdentityMatchScoreTests(SimpleTestCase):
+    def record(self, email="", phone="", name="", resume_sha256="", resume_text=""):
+        return IdentityRecord(email_key=normalize_email(email), phone_key=normalize_phone(phone),
+                              name_key=" ".join(name_tokens(name)), resume_sha256=resume_sha256,
+                              resume_signature=resume_signature(resume_text))
+
+    def test_normalization(self):
+        self.assertEqual(normalize_email(" Ada.Lovelace+jobs@GoogleMail.com "), "adalovelace@gmail.com")
+        self.assertEqual(normalize_email("ada.lovelace+jobs@example.com"), "ada.lovelace@example.com")
+        self.assertEqual(normalize_phone("+44 7700 900123"), normalize_phone("07700900123"))
+        self.assertEqual(normalize_phone("12-34"), "")
+        self.assertEqual(name_tokens("Lovelace, Ada A."), ["ada", "lovelace"])
+
+    def test_same_email_is_conclusive(self):
+        self.assertEqual(match_score(self.record("a.da@gmail.com"), self.record("ada+x@gmail.com", name="Bob")), 1.0)
+
+    def test_no_single_signal_passes_the_threshold(self):
+        resume = " ".join(f"term{i}" for i in range(60))
+        for a, b in [
+            (self.record(phone="07700900123"), self.record(phone="+44 7700 900123")),
+            (self.record(name="Ada Lovelace"), self.record(name="Lovelace Ada")),
+            (self.record(resume_sha256="f" * 64), self.record(resume_sha256="f" * 64)),
+            (self.record(resume_text=resume), self.record(resume_text=resume)),
+        ]:
+            with self.subTest(a=a.name_key or a.phone_key or "resume"):
+                self.assertLess(match_score(a, b), 0.7)
+
+    def test_combined_signals(self):
+        phone, name = "07700 900123", "Ada Lovelace"
+        self.assertAlmostEqual(match_score(self.record(phone=phone, name=name),
+                                           self.record(phone=phone, name="ada lovelace")), 0.8)
+        # A partial name match is weaker
+        self.assertAlmostEqual(match_score(self.record(phone=phone, name="Ada King Lovelace"),
+                                           self.record(phone=phone, name="Ada Lovelace")), 0.65)
+        self.assertAlmostEqual(match_score(self.record(name="Ada Lovelace", resume_sha256="f" * 64),
+                                           self.record(name="Ada Byron", resume_sha256="f" * 64)), 0.6)
+        self.assertAlmostEqual(match_score(self.record(name=name, resume_sha256="f" * 64),
+                                           self.record(name=name, resume_sha256="f" * 64)), 0.95)
+
+    def test_short_resumes_have_no_signature(self):
+        self.assertEqual(resume_signature("Python developer"), b"")
+
+
+class IdentityResolverTests(TestCase):
+    def setUp(self):
+        self.enterContext(mock.patch("dashboard.services.search_index._backend"))
+        User = get_user_model()
+        self.user = User.objects.create_user(username="recruiter", email="r@example.com", password="x")
+        self.job = JobDescription.objects.create(user=self.user, title="SRE", description="d", requirements="r")
+        self.resolver = IdentityResolver(max_workers=0)
+
+    def session(self, user=None, **candidate):
+        user = user or self.user
+        job = self.job if user == self.user else JobDescription.objects.create(
+            user=user, title="SRE", description="d", requirements="r")
+        expires_at = timezone.now() + timedelta(days=1)
+        link = InterviewSession.objects.create(user=user, job=job, expires_at=expires_at)
+        fields = {f"candidate_{key}": value for key, value in candidate.items()}
+        return InterviewSession.objects.create(user=user, job=job, expires_at=expires_at,
+                                               master_token=link.token, **fields)
+
+    def resolve(self, session):
+        return self.resolver.resolve(session.pk)
+
+    def test_email_variants_and_phone_plus_name_join_one_identity(self):
+        first = self.resolve(self.session(name="Ada Lovelace", email="ada.lovelace@gmail.com", phone="07700 900123"))
+        self.assertEqual(self.resolve(self.session(name="A. Lovelace", email="adalovelace+jobs@gmail.com")), first)
+        self.assertEqual(self.resolve(self.session(name="Ada Lovelace", email="ada@work.example",
+                                                   phone="+44 7700 900123")), first)
+        self.assertEqual(first.records.count(), 3)
+
+    def test_weak_evidence_keeps_people_apart(self):
+        ada = self.resolve(self.session(name="Ada Lovelace", email="ada@example.com", phone="07700 900123"))
+        # Shared office phone, different person
+        self.assertNotEqual(self.resolve(self.session(name="Alan Turing", email="alan@example.com",
+                                                      phone="07700 900123")), ada)
+        # Same name, nothing else
+        self.assertNotEqual(self.resolve(self.session(name="Ada Lovelace", email="other@example.com")), ada)
+
+    def test_identities_are_per_recruiter(self):
+        other = get_user_model().objects.create_user(username="other", email="o@example.com", password="x")
+        ada = self.resolve(self.session(name="Ada", email="ada@example.com"))
+        self.assertNotEqual(self.resolve(self.session(other, name="Ada", email="ada@example.com")), ada)
+
+    def test_a_bridging_session_merges_into_the_oldest_identity(self):
+        by_email = self.resolve(self.session(name="Ada Lovelace", email="ada@example.com"))
+        by_phone = self.resolve(self.session(name="Ada Lovelace", email="ada@work.example", phone="07700 900123"))
+        self.assertNotEqual(by_email, by_phone)
+        bridge = self.resolve(self.session(name="Ada Lovelace", email="ada@example.com", phone="07700 900123"))
+        self.assertEqual(bridge, by_email)
+        self.assertFalse(CandidateIdentity.objects.filter(pk=by_phone.pk).exists())
+        self.assertEqual(by_email.records.count(), 3)
+
+    def test_oversized_blocks_are_skipped(self):
+        with override_settings(IDENTITY_MAX_BLOCK_SIZE=1):
+            resolver = IdentityResolver(max_workers=0)
+        first = resolver.resolve(self.session(name="Ada Lovelace", email="ada@example.com").pk)
+        resolver.resolve(self.session(name="Ada Lovelace", email="ada@example.com").pk)
+        # The email block now holds two records and is no longer used for comparisons
+        third = resolver.resolve(self.session(name="Ada Lovelace", email="ada@example.com").pk)
+        self.assertNotEqual(third, first)
+
+    def test_link_sessions_are_not_resolved(self):
+        link = InterviewSession.objects.create(user=self.user, job=self.job, candidate_email="ada@example.com",
+                                               expires_at=timezone.now() + timedelta(days=1))
+        self.assertIsNone(self.resolve(link))
+        self.assertEqual(self.resolver.resolve_pending(), 0)
+
+
+class FakeRescoringService:
+    """Scores an answer by its text: "fail" falls back, "stop" interrupts, anything else scores 80"""
+    calls = []
+
+    def evaluate_answers(self, items, priority=None):
+        self.calls.append([item["answer"] for item in items])
+        results = []
+        for item in items:
+            if item["answer"] == "stop":
+                raise KeyboardInterrupt
+            source = "fallback" if item["answer"] == "fail" else "llm"
+            results.append({"score": 80, "feedback": "rescored", "strengths": ["s"], "improvements": [], "source": source})
+        return results
+
+
+class RescoringTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="recruiter", email="r@example.com", password="x")
+        job = JobDescription.objects.create(user=user, title="SRE", description="d", requirements="r")
+        session = InterviewSession.objects.create(user=user, job=job, expires_at=timezone.now() + timedelta(days=1))
+        question = InterviewQuestion.objects.create(session=session, question_text="Why?", question_type="technical",
+                                                    difficulty="easy")
+        self.answers = [
+            InterviewAnswer.objects.create(session=session, question=question, answer_text=text, score=score)
+            for text, score in (("one", 50), ("two", 80), ("fail", 20), ("four", 100))
+        ]
+        FakeRescoringService.calls = []
+
+    def rescore(self, version="v2", dry_run=False, restart=False, **kwargs):
+        run = get_run(version, "answers", dry_run=dry_run, restart=restart)
+        return AnswerRescorer(run, chunk_size=1, concurrency=1, service_class=FakeRescoringService).execute(**kwargs)
+
+    def scores(self):
+        return list(InterviewAnswer.objects.order_by("pk").values_list("score", "score_version"))
+
+    def test_dry_run_only_records_deltas(self):
+        run = self.rescore(dry_run=True)
+        self.assertEqual((run.status, run.processed, run.changed, run.failed), ("done", 4, 2, 1))
+        self.assertEqual(run.stats["deltas"], {"<= -21": 0, "-20..-6": 1, "-5..5": 1, "6..20": 0, ">= 21": 1})
+        self.assertEqual(run.stats["largest"], [[self.answers[0].pk, 50, 80], [self.answers[3].pk, 100, 80]])
+        self.assertEqual(self.scores(), [(50, ""), (80, ""), (20, ""), (100, "")])
+        self.assertFalse(ScoreVersion.objects.exists())
+
+    def test_writes_keep_the_original_score(self):
+        self.rescore()
+        self.assertEqual(self.scores(), [(80, "v2"), (80, "v2"), (20, ""), (80, "v2")])
+        first = self.answers[0]
+        versions = dict(ScoreVersion.objects.filter(answer=first).values_list("version", "score"))
+        self.assertEqual(versions, {ORIGINAL_VERSION: 50, "v2": 80})
+        self.assertEqual(InterviewAnswer.objects.get(pk=first.pk).feedback, "rescored")
+
+        # A later version keeps what it replaced; the original stays as it was
+        self.rescore("v3")
+        versions = dict(ScoreVersion.objects.filter(answer=first).values_list("version", "score"))
+        self.assertEqual(versions, {ORIGINAL_VERSION: 50, "v2": 80, "v3": 80})
+
+    def test_limit_pauses_and_the_next_run_resumes(self):
+        run = self.rescore(limit=2)
+        self.assertEqual((run.status, run.checkpoint, run.processed), ("paused", self.answers[1].pk, 2))
+        run = self.rescore()
+        self.assertEqual((run.status, run.processed, run.total), ("done", 4, 4))
+        self.assertEqual(FakeRescoringService.calls, [["one"], ["two"], ["fail"], ["four"]])
+
+        # Finished runs are left alone unless restarted
+        self.assertEqual(self.rescore().processed, 4)
+        self.assertEqual(len(FakeRescoringService.calls), 4)
+        self.assertEqual(self.rescore(restart=True).processed, 4)
+        self.assertEqual(len(FakeRescoringService.calls), 8)
+
+    def test_interrupted_runs_keep_the_last_written_chunk(self):
+        InterviewAnswer.objects.filter(pk=self.answers[2].pk).update(answer_text="stop")
+        with self.assertRaises(KeyboardInterrupt):
+            self.rescore()
+        run = RescoreRun.objects.get()
+        self.assertEqual((run.status, run.checkpoint, run.error), ("paused", self.answers[1].pk, "KeyboardInterrupt()"))
+        self.assertEqual(self.scores()[:2], [(80, "v2"), (80, "v2")])
+
+        InterviewAnswer.objects.filter(pk=self.answers[2].pk).update(answer_text="three")
+        run = self.rescore()
+        self.assertEqual((run.status, run.processed), ("done", 4))
+        self.assertEqual(FakeRescoringService.calls[-2:], [["three"], ["four"]])
+
+
+class ResultExportTests(TestCase):
+    def setUp(self):
+        self.enterContext(mock.patch("dashboard.services.search_index._backend"))
+        self.user = get_user_model().objects.create_user(username="recruiter", email="r@example.com", password="x")
+        job = JobDescription.objects.create(user=self.user, title="Site Reliability", description="d", requirements="r")
+        expires_at = timezone.now() + timedelta(days=1)
+        self.link = InterviewSession.objects.create(user=self.user, job=job, expires_at=expires_at)
+        questions = [("Why  SRE?", "behavioral"), ("Explain SLOs", "technical"), ("Explain error budgets", "technical")]
+        for order, (text, kind) in enumerate(questions):
+            InterviewQuestion.objects.create(session=self.link, question_text=text, question_type=kind,
+                                             difficulty="easy", order=order)
+        self.sessions = []
+        for name, phone, scores in (('=HYPERLINK("x")', "+1 555 0100", (60, 90, 70)), ("Ada", "", (80,))):
+            session = InterviewSession.objects.create(
+                user=self.user, job=job, expires_at=expires_at, master_token=self.link.token, status="completed",
+                candidate_name=name, candidate_phone=phone,
+            )
+            for order, ((text, kind), score) in enumerate(zip(questions, scores)):
+                # Candidate sessions carry their own copies of the link's questions
+                question = InterviewQuestion.objects.create(session=session, question_text=text.upper(),
+                                                            question_type=kind, difficulty="easy", order=order)
+                InterviewAnswer.objects.create(session=session, question=question, answer_text="a", score=score)
+            InterviewResult.objects.create(session=session, overall_score=sum(scores) // len(scores), summary="s",
+                                           recommendation="hire", detailed_feedback="f")
+            self.sessions.append(session)
+
+    def export(self, **kwargs):
+        return ResultExport.for_link(self.link, **kwargs)
+
+    def test_csv_has_a_column_per_question(self):
+        rows = list(csv.DictReader(self.export().csv_lines()))
+        self.assertEqual([row["candidate_name"] for row in rows], ['=HYPERLINK("x")', "Ada"])
+        first, second = rows
+        self.assertEqual((first["Q1: Why SRE?"], first["Q2: Explain SLOs"], first["Q3: Explain error budgets"]),
+                         ("60", "90", "70"))
+        self.assertEqual((first["technical_score"], first["behavioral_score"], first["answered"]), ("80.0", "60.0", "3"))
+        self.assertEqual((second["Q2: Explain SLOs"], second["technical_score"], second["answered"]), ("", "", "1"))
+        self.assertEqual(first["link"], str(self.link.token))
+
+    def test_header_is_sent_before_results_are_read(self):
+        lines = self.export(chunk_size=1).csv_lines()
+        with self.assertNumQueries(1):
+            self.assertTrue(next(lines).startswith("session_id,"))
+        # One query for the results and one per chunk for their answers
+        with self.assertNumQueries(3):
+            self.assertEqual(len(list(lines)), 2)
+
+    def test_excel_output_is_spreadsheet_safe(self):
+        lines = list(self.export().lines("excel"))
+        self.assertTrue(lines[0].startswith("\ufeffsession_id,"))
+        self.assertTrue(all(line.endswith("\r\n") for line in lines))
+        row = next(csv.reader([lines[1]]))
+        self.assertIn("'=HYPERLINK(\"x\")", row)
+        self.assertIn("+1 555 0100", row)
+
+    def test_ndjson_lists_answers(self):
+        records = [json.loads(line) for line in self.export().lines("ndjson")]
+        self.assertEqual(records[1]["questions"], [{"question": "WHY  SRE?", "type": "behavioral", "score": 80}])
+        self.assertEqual(records[0]["overall_score"], 73)
+
+    def test_results_of_other_recruiters_are_left_out(self):
+        other = get_user_model().objects.create_user(username="other", email="o@example.com", password="x")
+        InterviewSession.objects.filter(pk=self.sessions[1].pk).update(user=other)
+        self.assertEqual(len(list(self.export().ndjson_lines())), 1)
+        self.assertEqual(self.export().filename("excel"), "site-reliability-link-results.csv")
@@ -1,8 +1,10 @@
+from django.db import transaction
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from .models import InterviewSession, InterviewAnswer
 from .serializers import InterviewSessionSerializer, InterviewAnswerSerializer
+from dashboard.services import webhooks
 
 class InterviewSessionListCreateAPIView(generics.ListCreateAPIView):
     """API view for listing and creating interview sessions"""
@@ -29,10 +31,12 @@ class InterviewStartAPIView(APIView):
     
     def post(self, request, token):
         try:
-            session = InterviewSession.objects.get(token=token)
+            session = InterviewSession.objects.select_related('job').get(token=token)
             if session.status == 'pending':
-                session.status = 'in_progress'
-                session.save()
+                with transaction.atomic():
+                    session.status = 'in_progress'
+                    session.save()
+                    webhooks.emit(session.user_id, 'session.started', session.pk, webhooks.session_payload(session))
             return Response({'status': 'started'})
         except InterviewSession.DoesNotExist:
             return Response({'error': 'Invalid token'}, status=status.HTTP_404_NOT_FOUND)
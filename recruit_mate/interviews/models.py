@@ -27,6 +27,7 @@ class InterviewSession(TimeStampedModel):
     candidate_phone = models.CharField(max_length=20, blank=True)
     candidate_resume_url = models.URLField(blank=True)
     candidate_resume_file = models.FileField(upload_to='resumes/', blank=True, null=True)
+    candidate_resume_data = models.JSONField(default=dict, blank=True)  # ResumeParser.get_or_parse result
     
     class Meta:
         ordering = ['-created_at']
@@ -67,6 +68,13 @@ class InterviewQuestion(TimeStampedModel):
         return f"Q{self.order}: {self.question_text[:50]}"
 
 class InterviewAnswer(TimeStampedModel):
+    EVALUATION_SOURCES = [
+        ('llm', 'Model'),
+        ('local', 'Local pre-score'),
+        ('cache', 'Cached evaluation'),
+        ('fallback', 'Fallback'),
+    ]
+
     session = models.ForeignKey(InterviewSession, on_delete=models.CASCADE, related_name='answers')
     question = models.ForeignKey(InterviewQuestion, on_delete=models.CASCADE, related_name='answers')
     answer_text = models.TextField()
@@ -74,6 +82,8 @@ class InterviewAnswer(TimeStampedModel):
     feedback = models.TextField(blank=True)
     strengths = models.JSONField(default=list)
     improvements = models.JSONField(default=list)
+    evaluation_source = models.CharField(max_length=10, choices=EVALUATION_SOURCES, default='llm')
+    score_version = models.CharField(max_length=50, blank=True)  # set by re-scoring runs; blank for the original score
     
     class Meta:
         ordering = ['created_at']
@@ -89,6 +99,7 @@ class InterviewResult(TimeStampedModel):
     weaknesses = models.JSONField(default=list)
     recommendation = models.CharField(max_length=20)
     detailed_feedback = models.TextField()
+    score_version = models.CharField(max_length=50, blank=True)  # set by re-scoring runs; blank for the original report
     
     def __str__(self):
         return f"Result for {self.session}"
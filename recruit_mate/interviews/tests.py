@@ -1,3 +1,97 @@
+import json
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from dashboard.services import RateLimitExceeded
+from jobs.models import JobDescription
+from .models import InterviewAnswer, InterviewQuestion, InterviewResult, InterviewSession
 
-# Create your tests here.
+EVALUATION = {"score": 70, "feedback": "ok", "strengths": [], "improvements": [], "source": "llm"}
+REPORT = {"overall_score": 72, "summary": "Solid", "strengths": [], "weaknesses": [], "recommendation": "hire"}
+
+
+class InterviewTakeTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="recruiter", password="x")
+        job = JobDescription.objects.create(user=user, title="Backend engineer", description="d", requirements="r")
+        expires_at = timezone.now() + timedelta(days=1)
+        self.link = InterviewSession.objects.create(user=user, job=job, expires_at=expires_at)
+        self.session = InterviewSession.objects.create(
+            user=user, job=job, expires_at=expires_at, master_token=self.link.token, status="in_progress",
+            candidate_name="Ada",
+        )
+        InterviewQuestion.objects.create(session=self.session, question_text="Why?", question_type="technical",
+                                         difficulty="easy", expected_key_points=["because"])
+        client_session = self.client.session
+        client_session[f"candidate_session_{self.link.token}"] = self.session.pk
+        client_session.save()
+        self.url = reverse("interviews:take", args=[self.link.token])
+
+    def patch(self, evaluate=None, report=None):
+        dispatcher = mock.Mock()
+        dispatcher.aevaluate = mock.AsyncMock(**(evaluate or {"return_value": EVALUATION}))
+        patches = [
+            mock.patch("interviews.views.get_evaluation_dispatcher", return_value=dispatcher),
+            mock.patch("interviews.views.GeminiService.agenerate_report",
+                       mock.AsyncMock(**(report or {"return_value": REPORT}))),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_no_evaluation_quota_keeps_the_answer_for_resubmission(self):
+        self.patch(evaluate={"side_effect": RateLimitExceeded("busy")})
+        response = self.client.post(self.url, {"answer": "Because it scales"})
+        self.assertEqual(response.status_code, 503)
+        self.assertContains(response, "Because it scales", status_code=503)
+        self.assertFalse(InterviewAnswer.objects.exists())
+
+    def test_no_report_quota_is_retried_instead_of_saving_a_placeholder(self):
+        self.patch(report={"side_effect": RateLimitExceeded("busy")})
+        response = self.client.post(self.url, {"answer": "Because it scales"})
+        self.assertEqual(response.status_code, 503)
+        self.assertContains(response, "Finish Interview", status_code=503)
+        self.assertEqual(InterviewAnswer.objects.get().score, 70)
+        self.assertFalse(InterviewResult.objects.exists())
+
+        # A plain visit still offers to finish rather than claiming the interview is done
+        self.assertContains(self.client.get(self.url), "Finish Interview")
+
+        self.patch()
+        self.assertRedirects(self.client.post(self.url), self.url, fetch_redirect_response=False)
+        result = InterviewResult.objects.get()
+        self.assertEqual((result.overall_score, result.recommendation), (72, "hire"))
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.status, "completed")
+
+
+class ExportViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="recruiter", email="r@example.com", password="x")
+        job = JobDescription.objects.create(user=self.user, title="Backend engineer", description="d", requirements="r")
+        expires_at = timezone.now() + timedelta(days=1)
+        self.link = InterviewSession.objects.create(user=self.user, job=job, expires_at=expires_at)
+        session = InterviewSession.objects.create(user=self.user, job=job, expires_at=expires_at,
+                                                  master_token=self.link.token, candidate_name="Ada")
+        InterviewResult.objects.create(session=session, overall_score=72, summary="s", recommendation="hire",
+                                       detailed_feedback="f")
+        self.url = reverse("interviews:export", args=[self.link.pk])
+        self.client.force_login(self.user)
+
+    def test_results_are_streamed_as_a_download(self):
+        response = self.client.get(self.url, {"format": "ndjson"})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="backend-engineer-link-results.ndjson"')
+        self.assertEqual(response["X-Accel-Buffering"], "no")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["candidate_name"] for line in lines], ["Ada"])
+
+    def test_only_the_links_owner_can_export(self):
+        self.assertEqual(self.client.get(self.url, {"format": "xlsx"}).status_code, 404)
+        other = get_user_model().objects.create_user(username="other", email="o@example.com", password="x")
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -10,6 +10,8 @@ urlpatterns = [
     path('<int:pk>/', views.interview_detail_view, name='detail'),
     path('<int:pk>/results/', views.interview_results_view, name='results'),
     path('<int:pk>/candidates/', views.interview_candidates_view, name='candidates'),
+    path('<int:pk>/export/', views.interview_export_view, name='export'),
+    path('<int:pk>/resume/', views.interview_resume_view, name='resume'),
     path('<int:pk>/toggle-status/', views.interview_toggle_status_view, name='toggle_status'),
     path('<int:pk>/delete/', views.interview_delete_view, name='delete'),
     path('<int:pk>/edit/', views.interview_edit_view, name='edit'),
@@ -1,15 +1,33 @@
-from django.shortcuts import render, redirect, get_object_or_404
+import os
+import time
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
 from django.contrib import messages
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.text import slugify
 from datetime import timedelta
 from .models import InterviewSession, InterviewQuestion, InterviewAnswer, InterviewResult
 from jobs.models import JobDescription
 from candidates.models import Candidate
-from dashboard.services import GeminiService, ResumeParser
-from django.http import JsonResponse
+from dashboard.models import AnswerSignature, ResumeIngestion
+from dashboard.decorators import async_login_required
+from dashboard.downloads import export_response, protected_file_response
+from dashboard.services import webhooks
+from dashboard.services import GeminiService, RateLimitExceeded, ResumeParser, StorageService, get_evaluation_dispatcher, get_identity_resolver, get_resume_pipeline, get_shadow_runner, stats_for_questions
+from dashboard.services.prompt_builder import compact_job_context, compact_resume, get_budget
+from dashboard.services.result_export import FORMATS as EXPORT_FORMATS, ResultExport
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_POST
 
+# Report recommendations the leaderboard can be filtered by (Gemini says "reject", OpenAI "no")
+RECOMMENDATION_CHOICES = [('hire', 'Hire'), ('maybe', 'Maybe'), ('no', 'No'), ('reject', 'Reject')]
+
 
 @login_required
 def interview_list_view(request):
@@ -59,8 +77,8 @@ def interview_links_view(request):
     
     return render(request, 'interviews/interview_links.html', {'sessions': sessions})
 
-@login_required
-def interview_create_view(request):
+@async_login_required
+async def interview_create_view(request):
     """Create new interview session"""
     if request.method == 'POST':
         job_id = request.POST.get('job_id')
@@ -68,15 +86,15 @@ def interview_create_view(request):
         num_questions = int(request.POST.get('num_questions', 10))
         difficulty_level = request.POST.get('difficulty_level', 'mixed')
         
-        job = get_object_or_404(JobDescription, pk=job_id, user=request.user)
+        job = await aget_object_or_404(JobDescription, pk=job_id, user=request.user)
         
         # Candidate is optional - can be None for public interview links
         candidate = None
         if candidate_id:
-            candidate = get_object_or_404(Candidate, pk=candidate_id)
+            candidate = await aget_object_or_404(Candidate, pk=candidate_id)
         
         # Create session
-        session = InterviewSession.objects.create(
+        session = await InterviewSession.objects.acreate(
             user=request.user,
             job=job,
             candidate=candidate,
@@ -93,7 +111,7 @@ def interview_create_view(request):
             question_difficulty = request.POST.get(f'custom_question_difficulty_{q_id}', 'medium')
             
             if question_text:
-                InterviewQuestion.objects.create(
+                await InterviewQuestion.objects.acreate(
                     session=session,
                     question_text=question_text,
                     question_type=question_type,
@@ -117,8 +135,12 @@ def interview_create_view(request):
             resume_text = "General candidate profile - will be filled when candidate registers"
             if candidate:
                 if candidate.resume_file:
-                    # Parse the uploaded resume file
-                    parsed_resume = resume_parser.parse_resume(candidate.resume_file)
+                    # Parsed once on upload; candidates created before the cache are parsed here
+                    parsed_resume = candidate.resume_data
+                    if 'full_text' not in parsed_resume:
+                        parsed_resume = await sync_to_async(resume_parser.get_or_parse)(candidate.resume_file)
+                        candidate.resume_data = parsed_resume
+                        await candidate.asave(update_fields=['resume_data'])
                     resume_text = f"""
 Candidate: {candidate.name}
 Email: {candidate.email}
@@ -127,7 +149,7 @@ Experience: {parsed_resume.get('experience_years', 'Not specified')} years
 Skills: {', '.join(parsed_resume.get('skills', candidate.skills))}
 
 Resume Content:
-{parsed_resume.get('full_text', 'Resume content not available')}
+{compact_resume(parsed_resume.get('full_text', ''), get_budget('generate_questions', 'resume')) or 'Resume content not available'}
 """
                 else:
                     # Fallback to basic candidate info
@@ -150,23 +172,33 @@ Experience: {candidate.experience_years or 'Not specified'} years
             else:
                 difficulty_instruction = "Generate a MIX of easy, medium, and hard questions."
             
+            description, requirements = compact_job_context(
+                job.description, job.requirements, get_budget('generate_questions', 'job')
+            )
             job_context = f"""
 Job Title: {job.title}
 
 Job Description:
-{job.description}
+{description}
 
 Requirements:
-{job.requirements}
+{requirements}
 
 Difficulty Level: {difficulty_instruction}
 """
             
-            questions_data = ai_service.generate_questions(
+            started = time.monotonic()
+            questions_data = await ai_service.agenerate_questions(
                 job_context,
                 resume_text,
                 ai_questions_count
             )
+            # Compare with the secondary provider in the background, if shadowing is on
+            get_shadow_runner().mirror(
+                'generate_questions', (job_context, resume_text, ai_questions_count),
+                ai_service.provider, questions_data, (time.monotonic() - started) * 1000,
+                primary_failed=questions_data == ai_service._get_fallback_questions(ai_questions_count),
+            )
             
             # Save AI-generated questions
             for idx, q_data in enumerate(questions_data):
@@ -176,7 +208,7 @@ Difficulty Level: {difficulty_instruction}
                 else:
                     q_difficulty = q_data.get('difficulty', 'medium')
                 
-                InterviewQuestion.objects.create(
+                await InterviewQuestion.objects.acreate(
                     session=session,
                     question_text=q_data.get('question', ''),
                     question_type=q_data.get('type', 'technical'),
@@ -192,7 +224,7 @@ Difficulty Level: {difficulty_instruction}
     
     jobs = JobDescription.objects.filter(user=request.user, is_active=True)
     candidates = Candidate.objects.all()
-    return render(request, 'interviews/interview_create.html', {
+    return await sync_to_async(render)(request, 'interviews/interview_create.html', {
         'jobs': jobs,
         'candidates': candidates
     })
@@ -205,6 +237,11 @@ def interview_detail_view(request, pk):
     questions = session.questions.all()
     answers = session.answers.all()
     
+    # How each question has actually performed across all links asking it
+    question_stats = stats_for_questions(questions)
+    for question in questions:
+        question.stats = question_stats.get(question.pk)
+    
     return render(request, 'interviews/interview_detail.html', {
         'session': session,
         'questions': questions,
@@ -258,48 +295,203 @@ def interview_edit_view(request, pk):
 
 @login_required
 def interview_candidates_view(request, pk):
-    """View all candidates who took this interview"""
+    """Candidates who took this interview, ranked by score or all by start time"""
     session = get_object_or_404(InterviewSession, pk=pk, user=request.user)
     
-    # Get all candidate sessions linked to this master session
-    candidate_sessions = InterviewSession.objects.filter(
-        master_token=session.token,
-        user=request.user
-    ).select_related('result').order_by('-started_at')
+    # All status counts in one grouped query
+    status_counts = dict(
+        InterviewSession.objects.filter(master_token=session.token, user=request.user)
+        .order_by().values_list('status').annotate(count=Count('pk'))
+    )
+    
+    latest_ingestion = ResumeIngestion.objects.filter(session=OuterRef('pk')).order_by('-created_at')
+    duplicate_answers = AnswerSignature.objects.filter(
+        answer__session=OuterRef('pk'), cluster__isnull=False,
+    ).order_by().values('answer__session').annotate(count=Count('pk')).values('count')
+    candidate_sessions = InterviewSession.objects.filter(user=request.user).select_related(
+        'result', 'leaderboard_entry',
+    ).annotate(
+        resume_status=Subquery(latest_ingestion.values('status')[:1]),
+        duplicate_answers=Coalesce(Subquery(duplicate_answers), 0),
+    )
     
-    # Calculate stats
-    total_candidates = candidate_sessions.count()
-    completed_count = candidate_sessions.filter(status='completed').count()
-    in_progress_count = candidate_sessions.filter(status='in_progress').count()
-    abandoned_count = candidate_sessions.filter(status='abandoned').count()
+    ranked = request.GET.get('view') != 'all'
+    recommendation = request.GET.get('recommendation', '')
+    top = None
+    page_obj = None
+    if ranked:
+        # Read in rank order straight off the link's leaderboard index
+        candidate_sessions = candidate_sessions.filter(
+            leaderboard_entry__master_token=session.token,
+        ).order_by('leaderboard_entry__rank', 'pk')
+        if recommendation:
+            candidate_sessions = candidate_sessions.filter(leaderboard_entry__recommendation=recommendation)
+        try:
+            top = min(max(int(request.GET['top']), 1), getattr(settings, 'LEADERBOARD_MAX_TOP', 500))
+        except (KeyError, ValueError):
+            top = None
+        if top:
+            candidate_sessions = candidate_sessions[:top]
+        else:
+            page_obj = Paginator(candidate_sessions, getattr(settings, 'LEADERBOARD_PAGE_SIZE', 25)).get_page(
+                request.GET.get('page')
+            )
+            candidate_sessions = page_obj.object_list
+    else:
+        candidate_sessions = candidate_sessions.filter(master_token=session.token).order_by('-started_at')
     
     return render(request, 'interviews/interview_candidates.html', {
         'session': session,
         'candidates': candidate_sessions,
-        'total_candidates': total_candidates,
-        'completed_count': completed_count,
-        'in_progress_count': in_progress_count,
-        'abandoned_count': abandoned_count
+        'ranked': ranked,
+        'recommendation': recommendation,
+        'recommendation_choices': RECOMMENDATION_CHOICES,
+        'top': top,
+        'page_obj': page_obj,
+        'total_candidates': sum(status_counts.values()),
+        'completed_count': status_counts.get('completed', 0),
+        'in_progress_count': status_counts.get('in_progress', 0),
+        'abandoned_count': status_counts.get('abandoned', 0),
     })
 
-def interview_take_view(request, token):
+@login_required
+def interview_export_view(request, pk):
+    """Stream every result of this link as CSV, NDJSON or spreadsheet CSV (?format=)"""
+    session = get_object_or_404(InterviewSession.objects.select_related('job'), pk=pk, user=request.user)
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        raise Http404('Unknown export format')
+    return export_response(request, ResultExport.for_link(session), fmt)
+
+@login_required
+def interview_resume_view(request, pk):
+    """Resume uploaded by a candidate on one of this recruiter's links"""
+    session = get_object_or_404(InterviewSession, pk=pk, user=request.user)
+    extension = os.path.splitext(session.candidate_resume_file.name)[1]
+    download_name = f"{slugify(session.candidate_name) or 'candidate'}-resume{extension}"
+    return protected_file_response(request, session.candidate_resume_file, download_name)
+
+@transaction.atomic
+def _register_candidate_session(master_session, data, resume_file):
+    """Create a candidate session from the registration form and copy the link's questions"""
+    import uuid
+
+    session = InterviewSession.objects.create(
+        user=master_session.user,
+        job=master_session.job,
+        token=uuid.uuid4(),
+        candidate_name=data.get('candidate_name'),
+        candidate_email=data.get('candidate_email'),
+        candidate_phone=data.get('candidate_phone'),
+        candidate_resume_file=StorageService().store(resume_file),
+        status='in_progress',
+        started_at=timezone.now(),
+        expires_at=master_session.expires_at,
+        master_token=master_session.token
+    )
+
+    # Hashing, text extraction and parsing happen in the background; the
+    # candidate goes straight to the first question.
+    get_resume_pipeline().enqueue(session.candidate_resume_file.name, session=session)
+    get_identity_resolver().enqueue(session.pk)
+
+    # --- FIX APPLIED HERE ---
+    # Copy original master questions WITHOUT regenerating
+
+    master_questions = master_session.questions.all()
+
+    # First copy custom/mandatory questions
+    custom_count = 0
+    custom_questions = master_questions.filter(is_custom=True, is_mandatory=True)
+
+    for q in custom_questions:
+        InterviewQuestion.objects.create(
+            session=session,
+            question_text=q.question_text,
+            question_type=q.question_type,
+            difficulty=q.difficulty,
+            expected_key_points=q.expected_key_points,
+            order=custom_count + 1,
+            is_mandatory=True,
+            is_custom=True
+        )
+        custom_count += 1
+
+    # Then copy AI-generated questions EXACTLY as they were created
+    ai_questions = master_questions.filter(is_custom=False)
+
+    for q in ai_questions:
+        InterviewQuestion.objects.create(
+            session=session,
+            question_text=q.question_text,
+            question_type=q.question_type,
+            difficulty=q.difficulty,
+            expected_key_points=q.expected_key_points,
+            order=custom_count + q.order,
+            is_mandatory=False,
+            is_custom=False
+        )
+
+    # --------------------------------------
+
+    webhooks.emit(session.user_id, 'session.started', session.pk, webhooks.session_payload(session))
+    return session
+
+
+@transaction.atomic
+def _save_answer(session, question, answer_text, evaluation):
+    """Store an evaluated answer together with its answer.scored event"""
+    answer = InterviewAnswer.objects.create(
+        session=session,
+        question=question,
+        answer_text=answer_text,
+        score=evaluation.get('score', 0),
+        feedback=evaluation.get('feedback', ''),
+        strengths=evaluation.get('strengths', []),
+        improvements=evaluation.get('improvements', []),
+        evaluation_source=evaluation.get('source', 'llm')
+    )
+    webhooks.emit(session.user_id, 'answer.scored', answer.pk, webhooks.answer_payload(answer))
+    return answer
+
+
+@transaction.atomic
+def _complete_session(session, report, avg_score):
+    """Store the final report and mark the session completed, with its session.completed event"""
+    result = InterviewResult.objects.create(
+        session=session,
+        overall_score=report.get('overall_score', int(avg_score)),
+        summary=report.get('summary', ''),
+        strengths=report.get('strengths', []),
+        weaknesses=report.get('weaknesses', []),
+        recommendation=report.get('recommendation', 'maybe'),
+        detailed_feedback=report.get('detailed_feedback', '')
+    )
+    session.status = 'completed'
+    session.completed_at = timezone.now()
+    session.save()
+    webhooks.emit(session.user_id, 'session.completed', session.pk, webhooks.result_payload(result))
+    return result
+
+async def interview_take_view(request, token):
     """Candidate takes interview (public view)"""
     # Get the master session (the interview link)
-    master_session = get_object_or_404(InterviewSession, token=token)
+    master_session = await aget_object_or_404(InterviewSession.objects.select_related('job'), token=token)
 
     # Check if expired or deactivated
     if timezone.now() > master_session.expires_at or master_session.status == 'abandoned':
-        return render(request, 'interviews/interview_expired.html')
+        return await sync_to_async(render)(request, 'interviews/interview_expired.html')
 
     # Check if candidate info is in session
-    candidate_session_id = request.session.get(f'candidate_session_{token}')
+    session_key = f'candidate_session_{token}'
+    candidate_session_id = await sync_to_async(request.session.get)(session_key)
 
     if candidate_session_id:
         # Get existing candidate session
         try:
-            session = InterviewSession.objects.get(pk=candidate_session_id)
+            session = await InterviewSession.objects.select_related('job').aget(pk=candidate_session_id)
         except InterviewSession.DoesNotExist:
-            del request.session[f'candidate_session_{token}']
+            await sync_to_async(request.session.pop)(session_key, None)
             return redirect('interviews:take', token=token)
     else:
         # Show registration form
@@ -308,158 +500,113 @@ def interview_take_view(request, token):
             # Resume must be uploaded
             resume_file = request.FILES.get('candidate_resume_file')
             if not resume_file:
-                return render(request, 'interviews/interview_register.html', {
+                return await sync_to_async(render)(request, 'interviews/interview_register.html', {
                     'session': master_session,
                     'error': 'Please upload your resume to continue.'
                 })
 
             # Create candidate session
-            import uuid
-            session = InterviewSession.objects.create(
-                user=master_session.user,
-                job=master_session.job,
-                token=uuid.uuid4(),
-                candidate_name=request.POST.get('candidate_name'),
-                candidate_email=request.POST.get('candidate_email'),
-                candidate_phone=request.POST.get('candidate_phone'),
-                candidate_resume_file=resume_file,
-                status='in_progress',
-                started_at=timezone.now(),
-                expires_at=master_session.expires_at,
-                master_token=master_session.token
-            )
-
-            # Parse resume (only for storing in DB or reporting)
-            resume_parser = ResumeParser()
-            parsed_resume = resume_parser.parse_resume(resume_file)
-
-            # --- FIX APPLIED HERE ---
-            # Copy original master questions WITHOUT regenerating
-
-            master_questions = master_session.questions.all()
-
-            # First copy custom/mandatory questions
-            custom_count = 0
-            custom_questions = master_questions.filter(is_custom=True, is_mandatory=True)
-
-            for q in custom_questions:
-                InterviewQuestion.objects.create(
-                    session=session,
-                    question_text=q.question_text,
-                    question_type=q.question_type,
-                    difficulty=q.difficulty,
-                    expected_key_points=q.expected_key_points,
-                    order=custom_count + 1,
-                    is_mandatory=True,
-                    is_custom=True
-                )
-                custom_count += 1
-
-            # Then copy AI-generated questions EXACTLY as they were created
-            ai_questions = master_questions.filter(is_custom=False)
-
-            for q in ai_questions:
-                InterviewQuestion.objects.create(
-                    session=session,
-                    question_text=q.question_text,
-                    question_type=q.question_type,
-                    difficulty=q.difficulty,
-                    expected_key_points=q.expected_key_points,
-                    order=custom_count + q.order,
-                    is_mandatory=False,
-                    is_custom=False
-                )
-
-            # --------------------------------------
+            session = await sync_to_async(_register_candidate_session)(master_session, request.POST, resume_file)
 
             # Save session ID
-            request.session[f'candidate_session_{token}'] = session.pk
+            await sync_to_async(request.session.__setitem__)(session_key, session.pk)
             return redirect('interviews:take', token=token)
 
         else:
-            return render(request, 'interviews/interview_register.html', {
+            return await sync_to_async(render)(request, 'interviews/interview_register.html', {
                 'session': master_session
             })
 
     # If completed
     if session.status == 'completed':
-        return render(request, 'interviews/interview_completed.html', {'session': session})
+        return await sync_to_async(render)(request, 'interviews/interview_completed.html', {'session': session})
 
     questions = session.questions.all()
     answered_questions = session.answers.values_list('question_id', flat=True)
 
     # Next unanswered question
-    next_question = questions.exclude(id__in=answered_questions).first()
+    next_question = await questions.exclude(id__in=answered_questions).afirst()
 
     if request.method == 'POST' and next_question and 'answer' in request.POST:
         answer_text = request.POST.get('answer')
 
-        # Evaluate with AI
-        ai_service = GeminiService()
-        evaluation = ai_service.evaluate_answer(
-            next_question.question_text,
-            answer_text,
-            next_question.expected_key_points
-        )
-
-        # Save answer
-        InterviewAnswer.objects.create(
-            session=session,
-            question=next_question,
-            answer_text=answer_text,
-            score=evaluation.get('score', 0),
-            feedback=evaluation.get('feedback', ''),
-            strengths=evaluation.get('strengths', []),
-            improvements=evaluation.get('improvements', [])
-        )
-
-        # If finished
-        if session.answers.count() >= questions.count():
-            answers_data = [
-                {
-                    'question': a.question.question_text,
-                    'answer': a.answer_text,
-                    'score': a.score,
-                    'feedback': a.feedback
+        # Evaluate with AI, batched with answers from other sessions
+        try:
+            evaluation = await get_evaluation_dispatcher().aevaluate(
+                next_question.question_text,
+                answer_text,
+                next_question.expected_key_points
+            )
+        except RateLimitExceeded:
+            # Nothing is saved; the candidate resubmits the same answer
+            return await sync_to_async(render)(request, 'interviews/interview_take.html', {
+                'session': session,
+                'question': next_question,
+                'answer_text': answer_text,
+                'error': 'We are receiving a lot of answers right now. Your answer was not lost - please submit it again in a minute.',
+                'progress': {
+                    'answered': await session.answers.acount(),
+                    'total': await questions.acount()
                 }
-                for a in session.answers.all()
-            ]
+            }, status=503)
 
-            avg_score = sum(a.score for a in session.answers.all()) / session.answers.count()
+        # Save answer
+        await sync_to_async(_save_answer)(session, next_question, answer_text, evaluation)
+        if await session.answers.acount() < await questions.acount():
+            return redirect('interviews:take', token=token)
+        next_question = None
+
+    # Every question answered: write the final report (also retried from the form below)
+    pending_report = next_question is None and await session.answers.aexists()
+    if request.method == 'POST' and pending_report:
+        total_questions = await questions.acount()
+        answers = [a async for a in session.answers.select_related('question')]
+        answers_data = [
+            {
+                'question': a.question.question_text,
+                'answer': a.answer_text,
+                'score': a.score,
+                'feedback': a.feedback
+            }
+            for a in answers
+        ]
+
+        avg_score = sum(a.score for a in answers) / len(answers)
 
-            report = ai_service.generate_report({
+        ai_service = GeminiService()
+        try:
+            report = await ai_service.agenerate_report({
                 'candidate_name': session.candidate_name or 'Anonymous',
                 'position': session.job.title,
-                'total_questions': questions.count(),
+                'total_questions': total_questions,
                 'average_score': avg_score,
                 'answers': answers_data
             })
+        except RateLimitExceeded:
+            # The answers are saved; only the report is missing until the candidate retries
+            return await sync_to_async(render)(request, 'interviews/interview_take.html', {
+                'session': session,
+                'question': None,
+                'pending_report': True,
+                'error': 'We are receiving a lot of interviews right now. Your answers are saved - please try again in a minute to finish.',
+                'progress': {
+                    'answered': len(answers),
+                    'total': total_questions
+                }
+            }, status=503)
 
-            # Save final result
-            InterviewResult.objects.create(
-                session=session,
-                overall_score=report.get('overall_score', int(avg_score)),
-                summary=report.get('summary', ''),
-                strengths=report.get('strengths', []),
-                weaknesses=report.get('weaknesses', []),
-                recommendation=report.get('recommendation', 'maybe'),
-                detailed_feedback=report.get('detailed_feedback', '')
-            )
-
-            session.status = 'completed'
-            session.completed_at = timezone.now()
-            session.save()
-
-            return redirect('interviews:take', token=token)
+        # Save final result
+        await sync_to_async(_complete_session)(session, report, avg_score)
 
         return redirect('interviews:take', token=token)
 
-    return render(request, 'interviews/interview_take.html', {
+    return await sync_to_async(render)(request, 'interviews/interview_take.html', {
         'session': session,
         'question': next_question,
+        'pending_report': pending_report,
         'progress': {
-            'answered': session.answers.count(),
-            'total': questions.count()
+            'answered': await session.answers.acount(),
+            'total': await questions.acount()
         }
     })
 
@@ -13,9 +13,22 @@ class JobDescription(TimeStampedModel):
     experience_level = models.CharField(max_length=50, blank=True)
     salary_range = models.CharField(max_length=100, blank=True)
     is_active = models.BooleanField(default=True)
+    # Normalized copy of ``skills``; see services.skill_index
+    skill_set = models.ManyToManyField('dashboard.Skill', through='JobSkill', related_name='jobs', blank=True)
     
     class Meta:
         ordering = ['-created_at']
     
     def __str__(self):
         return self.title
+
+
+class JobSkill(models.Model):
+    job = models.ForeignKey(JobDescription, on_delete=models.CASCADE, related_name='skill_links')
+    skill = models.ForeignKey('dashboard.Skill', on_delete=models.CASCADE, related_name='job_links')
+
+    class Meta:
+        unique_together = [('job', 'skill')]
+
+    def __str__(self):
+        return f"{self.job_id}: {self.skill_id}"
@@ -7,6 +7,8 @@ urlpatterns = [
     path('', views.job_list_view, name='lists'),
     path('create/', views.job_create_view, name='create'),
     path('<int:pk>/', views.job_detail_view, name='detail'),
+    path('<int:pk>/matches/', views.job_matches_view, name='matches'),
+    path('<int:pk>/export/', views.job_export_view, name='export'),
     path('<int:pk>/edit/', views.job_edit_view, name='edit'),
     path('<int:pk>/delete/', views.job_delete_view, name='delete'),
 ]
@@ -1,8 +1,14 @@
-from django.shortcuts import render, redirect, get_object_or_404
+import time
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.http import Http404
 from .models import JobDescription
-from dashboard.services import GeminiService
+from dashboard.decorators import async_login_required
+from dashboard.downloads import export_response
+from dashboard.services import GeminiService, best_matches, matching_candidates
+from dashboard.services.result_export import FORMATS as EXPORT_FORMATS, ResultExport
 
 @login_required
 def job_list_view(request):
@@ -10,8 +16,8 @@ def job_list_view(request):
     jobs = JobDescription.objects.filter(user=request.user)
     return render(request, 'jobs/job_list.html', {'jobs': jobs})
 
-@login_required
-def job_create_view(request):
+@async_login_required
+async def job_create_view(request):
     """Create new job description"""
     if request.method == 'POST':
         title = request.POST.get('title')
@@ -22,9 +28,9 @@ def job_create_view(request):
         
         # Extract skills using AI
         ai_service = GeminiService()
-        skills = ai_service.extract_skills(f"{description}\n\n{requirements}")
+        skills = await ai_service.aextract_skills(f"{description}\n\n{requirements}")
         
-        job = JobDescription.objects.create(
+        job = await JobDescription.objects.acreate(
             user=request.user,
             title=title,
             description=description,
@@ -37,18 +43,47 @@ def job_create_view(request):
         messages.success(request, 'Job description created successfully')
         return redirect('jobs:detail', pk=job.pk)
     
-    return render(request, 'jobs/job_create.html')
+    return await sync_to_async(render)(request, 'jobs/job_create.html')
 
 @login_required
 def job_detail_view(request, pk):
     """View job description details"""
     job = get_object_or_404(JobDescription, pk=pk, user=request.user)
-    return render(request, 'jobs/job_detail.html', {'job': job})
+    return render(request, 'jobs/job_detail.html', {
+        'job': job,
+        'matching_candidates': matching_candidates(job)[:10],
+    })
 
 @login_required
-def job_edit_view(request, pk):
-    """Edit job description"""
+def job_matches_view(request, pk):
+    """Candidate pool ranked by fit with this job (local BM25 match, no LLM calls)"""
     job = get_object_or_404(JobDescription, pk=pk, user=request.user)
+    started = time.perf_counter()
+    matches = best_matches(job, k=50)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    top_score = matches[0][1] if matches else 0
+    return render(request, 'jobs/job_matches.html', {
+        'job': job,
+        'matches': [
+            {'candidate': candidate, 'score': round(score, 2), 'percent': round(100 * score / top_score)}
+            for candidate, score in matches
+        ],
+        'elapsed_ms': round(elapsed_ms, 1),
+    })
+
+@login_required
+def job_export_view(request, pk):
+    """Stream every interview result for this job as CSV, NDJSON or spreadsheet CSV (?format=)"""
+    job = get_object_or_404(JobDescription, pk=pk, user=request.user)
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        raise Http404('Unknown export format')
+    return export_response(request, ResultExport.for_job(job), fmt)
+
+@async_login_required
+async def job_edit_view(request, pk):
+    """Edit job description"""
+    job = await aget_object_or_404(JobDescription, pk=pk, user=request.user)
     
     if request.method == 'POST':
         job.title = request.POST.get('title')
@@ -59,13 +94,13 @@ def job_edit_view(request, pk):
         
         # Re-extract skills
         ai_service = GeminiService()
-        job.skills = ai_service.extract_skills(f"{job.description}\n\n{job.requirements}")
+        job.skills = await ai_service.aextract_skills(f"{job.description}\n\n{job.requirements}")
         
-        job.save()
+        await job.asave()
         messages.success(request, 'Job description updated successfully')
         return redirect('jobs:detail', pk=job.pk)
     
-    return render(request, 'jobs/job_edit.html', {'job': job})
+    return await sync_to_async(render)(request, 'jobs/job_edit.html', {'job': job})
 
 @login_required
 def job_delete_view(request, pk):
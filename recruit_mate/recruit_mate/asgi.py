@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'recruit_mate.settings')
+# One event loop per process: LLM calls in async views use the native async clients.
+os.environ.setdefault('ASYNC_LLM_CLIENTS', 'True')
 
 application = get_asgi_application()
@@ -146,10 +146,56 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resume downloads go through an authenticated view. In production let the
+# front proxy send the bytes: "nginx" (X-Accel-Redirect to the internal
+# location below, aliased to MEDIA_ROOT) or "sendfile" (Apache/lighttpd
+# X-Sendfile). "django" streams from the worker and is meant for development.
+PROTECTED_MEDIA_BACKEND = os.getenv("PROTECTED_MEDIA_BACKEND", "django")
+PROTECTED_MEDIA_INTERNAL_URL = "/protected-media/"
+
 # File upload settings
-FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
+# Uploads above 256KB are spooled to a temp file instead of held in memory.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 262144  # 256KB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 
+# Resume text extraction limits (per file). The timeout is checked between
+# pages, so a single slow page can run past it.
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", 50))
+RESUME_MAX_CHARS = int(os.getenv("RESUME_MAX_CHARS", 200000))
+RESUME_EXTRACT_TIMEOUT = int(os.getenv("RESUME_EXTRACT_TIMEOUT", 20))  # seconds, between pages
+
+# Canonical skills, aliases and categories used by ResumeParser
+SKILL_TAXONOMY_PATH = BASE_DIR / 'dashboard' / 'data' / 'skills.json'
+
+# Bulk resume import (import_resumes command and the candidates import page)
+BULK_IMPORT_WORKERS = int(os.getenv("BULK_IMPORT_WORKERS", 0)) or None  # None = one per core
+BULK_IMPORT_CHUNK_SIZE = 500
+BULK_IMPORT_MAX_FILES = 5000
+BULK_IMPORT_MAX_BYTES = 500 * 1024 * 1024  # uncompressed ZIP size
+
+# Full-text search over candidates, resumes, jobs and answers. Maintained on
+# save; rebuild with the rebuild_search_index command.
+SEARCH_BACKEND = "dashboard.services.search_index.SQLiteFTS5Backend"
+SEARCH_RESULTS_PER_PAGE = 20
+
+# Local job-to-candidate ranking (services.match_engine): terms kept per
+# candidate vector, and the share of changed candidates that triggers a
+# full rebuild of a worker's in-memory index.
+MATCH_MAX_TERMS = 256
+MATCH_DELTA_RATIO = 0.05
+
+# Near-duplicate answers on public links (services.answer_similarity):
+# estimated Jaccard similarity of word 3-grams at which answers are flagged.
+ANSWER_SIMILARITY_WORKERS = int(os.getenv("ANSWER_SIMILARITY_WORKERS", 1))
+ANSWER_DUPLICATE_THRESHOLD = 0.6
+ANSWER_DUPLICATE_MIN_WORDS = 8
+
+# Duplicate candidates across emails (services.identity_resolution): sessions
+# scoring at least the threshold on email/phone/name/resume evidence are merged.
+IDENTITY_RESOLUTION_WORKERS = int(os.getenv("IDENTITY_RESOLUTION_WORKERS", 1))
+IDENTITY_MATCH_THRESHOLD = 0.7
+IDENTITY_MAX_BLOCK_SIZE = 200
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -165,6 +211,105 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Await Gemini/OpenAI natively in async views. Enabled by asgi.py; WSGI workers
+# keep it off and run LLM calls from async views in a worker thread instead.
+ASYNC_LLM_CLIENTS = os.getenv("ASYNC_LLM_CLIENTS", "False") == "True"
+
+# Answer evaluations arriving within this window are sent as one batched prompt
+# (0 disables batching). Items a batch fails on are re-sent together as one
+# smaller batch after a backoff (seconds), never one call per item.
+EVALUATION_BATCH_WINDOW_MS = int(os.getenv("EVALUATION_BATCH_WINDOW_MS", 100))
+EVALUATION_BATCH_MAX_SIZE = int(os.getenv("EVALUATION_BATCH_MAX_SIZE", 20))
+EVALUATION_BATCH_WORKERS = int(os.getenv("EVALUATION_BATCH_WORKERS", 4))
+EVALUATION_BATCH_RETRIES = 1
+EVALUATION_BATCH_RETRY_DELAY = 1.0
+
+# Local key-point pre-scoring (services.answer_prescorer): answers scored with
+# at least PRESCORE_MIN_CONFIDENCE skip the model; scores inside or below the
+# borderline band, and keyword-stuffed answers, always go to the model. Local
+# scores are only final once replay_prescorer has measured this pass/fail
+# agreement with the model on at least this many answers kept local.
+PRESCORE_ENABLED = os.getenv("PRESCORE_ENABLED", "True") == "True"
+PRESCORE_MIN_CONFIDENCE = 0.7
+PRESCORE_BORDERLINE = (40, 75)
+PRESCORE_MAX_KEYWORD_DENSITY = 0.5
+PRESCORE_MIN_FUNCTION_WORDS = 0.2
+PRESCORE_MIN_AGREEMENT = 0.9
+PRESCORE_MIN_REPLAY_ITEMS = 200
+
+# Evaluation memoization (services.evaluation_cache): model evaluations are
+# reused for the same normalized answer to the same question wording, and
+# optionally for near-identical answers (estimated Jaccard of word 3-grams).
+EVALUATION_CACHE_ENABLED = os.getenv("EVALUATION_CACHE_ENABLED", "True") == "True"
+EVALUATION_CACHE_NEAR_DUPLICATES = os.getenv("EVALUATION_CACHE_NEAR_DUPLICATES", "False") == "True"
+EVALUATION_CACHE_NEAR_THRESHOLD = 0.9
+EVALUATION_CACHE_NEAR_CANDIDATES = 1000
+
+# Historical re-scoring (rescore_interviews): rows per checkpointed chunk and
+# concurrent model calls per chunk.
+RESCORE_CHUNK_SIZE = 100
+RESCORE_CONCURRENCY = int(os.getenv("RESCORE_CONCURRENCY", 4))
+
+# Shadow mode (services.shadow_mode): mirror this share of primary LLM calls
+# to the secondary provider in the background and store both for comparison
+# (shadow_report). 0 disables it.
+SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", 0))
+SHADOW_SECONDARY_SERVICE = "dashboard.services.ai_service.AIService"
+SHADOW_OPERATIONS = ("evaluate_answer", "generate_questions")
+SHADOW_WORKERS = 2
+SHADOW_MAX_PENDING = 100
+
+# Per-link leaderboards (services.leaderboard): re-ranked in the background
+# when a result is written; ranked candidates per page and the largest top-K.
+LEADERBOARD_WORKERS = int(os.getenv("LEADERBOARD_WORKERS", 1))
+LEADERBOARD_PAGE_SIZE = 25
+LEADERBOARD_MAX_TOP = 500
+
+# Question analytics (compute_question_stats): answers needed before a
+# question gets an empirical difficulty, mean-score bands below which it
+# counts as hard and from which it counts as easy, and answers with an
+# overall score needed for the discrimination index.
+QUESTION_ANALYTICS_MIN_ANSWERS = 5
+QUESTION_DIFFICULTY_BANDS = (45, 70)
+QUESTION_DISCRIMINATION_MIN_PAIRS = 10
+
+# Result exports (services.result_export): results read per database round trip.
+EXPORT_CHUNK_SIZE = 500
+
+# Outbound webhooks (services.webhooks): events per signed POST, retries with
+# exponential backoff (seconds), and how long a sender's claim on a batch lasts.
+# WEBHOOK_WORKERS = 0 leaves all sending to the deliver_webhooks worker.
+# Endpoints must be https (http under DEBUG) on public addresses;
+# WEBHOOK_ALLOW_PRIVATE_HOSTS=1 permits local hosts for webhook_receiver.
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", 1))
+WEBHOOK_BATCH_SIZE = 50
+WEBHOOK_MAX_ATTEMPTS = 8
+WEBHOOK_BACKOFF_BASE = 10
+WEBHOOK_BACKOFF_MAX = 3600
+WEBHOOK_TIMEOUT = 5
+WEBHOOK_CLAIM_SECONDS = 60
+WEBHOOK_EXPIRED_LOOKBACK_HOURS = 24
+WEBHOOK_ALLOW_PRIVATE_HOSTS = os.getenv("WEBHOOK_ALLOW_PRIVATE_HOSTS") == "1"
+
+# Background resume processing after upload; 0 workers processes inline.
+RESUME_INGESTION_WORKERS = int(os.getenv("RESUME_INGESTION_WORKERS", 2))
+RESUME_INGESTION_MAX_ATTEMPTS = 3
+
+# Outbound LLM quotas shared by all workers through the database backend.
+LLM_RATE_LIMITS = {
+    "gemini": {
+        "requests_per_minute": int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", 15)),
+        "tokens_per_minute": int(os.getenv("GEMINI_TOKENS_PER_MINUTE", 250000)),
+    },
+    "openai": {
+        "requests_per_minute": int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", 500)),
+        "tokens_per_minute": int(os.getenv("OPENAI_TOKENS_PER_MINUTE", 200000)),
+    },
+}
+LLM_RATE_LIMIT_BACKEND = os.getenv("LLM_RATE_LIMIT_BACKEND", "database")  # or "local"
+LLM_RATE_LIMIT_INTERACTIVE_RESERVE = 0.2  # share of each budget kept for candidate-facing calls
+LLM_RATE_LIMIT_MAX_WAIT = 30  # seconds a call may queue before giving up
+
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [